@@ -17,16 +17,25 @@ from flask_sqlalchemy import SQLAlchemy
 from dotenv import load_dotenv
 import os
 import pymysql
-from models import init_db
-from routes import clinica_routes, restaurante_routes, automoviles_routes
+from models import db, init_db
+from routes import clinica_routes, restaurante_routes, automoviles_routes, metrics_routes, job_routes
+from repositories.audit_log import audit_log
+from repositories.change_feed import change_feed
+from routes.admission import admission_controller
+from routes.idempotency import idempotency_store
+from services.job_queue import job_queue
 
 # Instala el controlador MySQLdb para pymysql
 pymysql.install_as_MySQLdb()
 # Carga las variables de entorno desde un archivo .env
-def create_app():
+def create_app(test_config=None):
     """
     Crea y configura una instancia de la aplicación Flask.
 
+    Args:
+        test_config (dict, optional): Configuración que reemplaza a la obtenida del entorno,
+            p. ej. binds y réplicas SQLite para pruebas locales.
+
     Returns:
         Flask: La aplicación Flask configurada.
     """
@@ -54,13 +63,93 @@ def create_app():
     }
     flask_app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+    # Configura las réplicas de solo lectura opcionales de cada bind (URLs separadas por comas)
+    flask_app.config['SQLALCHEMY_REPLICAS'] = {
+        bind_key: [url.strip() for url in os.getenv(f'DB_REPLICAS_{bind_key.upper()}', '').split(',') if url.strip()]
+        for bind_key in flask_app.config['SQLALCHEMY_BINDS']
+    }
+
+    # Configura las plantillas de esquema por inquilino; cada inquilino vive en su propio esquema de cada bind
+    flask_app.config['TENANT_URL_TEMPLATES'] = {
+        'clinica': f'{connection_params}/clinica_{{tenant}}?charset=utf8mb4',
+        'restaurante': f'{connection_params}/restaurante_{{tenant}}?charset=utf8mb4',
+        'automoviles': f'{connection_params}/venta_automoviles_{{tenant}}?charset=utf8mb4'
+    }
+    flask_app.config['TENANT_ALLOWLIST'] = [tenant for tenant in os.getenv('TENANTS', '').split(',') if tenant]
+    flask_app.config['TENANT_CONNECTION_BUDGET'] = int(os.getenv('TENANT_CONNECTION_BUDGET', 200))
+
+    # Configura los recursos cuyas inserciones se confirman en grupo (p. ej. GROUP_COMMIT=pedidos)
+    flask_app.config['GROUP_COMMIT'] = [name for name in os.getenv('GROUP_COMMIT', '').split(',') if name]
+    flask_app.config['GROUP_COMMIT_MAX_ROWS'] = int(os.getenv('GROUP_COMMIT_MAX_ROWS', 100))
+    flask_app.config['GROUP_COMMIT_MAX_DELAY_MS'] = int(os.getenv('GROUP_COMMIT_MAX_DELAY_MS', 5))
+    flask_app.config['GROUP_COMMIT_MAX_QUEUE'] = int(os.getenv('GROUP_COMMIT_MAX_QUEUE', 1000))
+
+    # Configura el tiempo que se conservan las respuestas de las solicitudes con Idempotency-Key
+    flask_app.config['IDEMPOTENCY_TTL'] = int(os.getenv('IDEMPOTENCY_TTL', 86400))
+    flask_app.config['IDEMPOTENCY_MAX_KEYS'] = int(os.getenv('IDEMPOTENCY_MAX_KEYS', 10000))
+
+    # Configura el control de admisión: solicitudes concurrentes por bind (0 lo desactiva), lugares reservados
+    # para las solicitudes interactivas y concurrencia de cada ruta de reportes o escrituras masivas
+    flask_app.config['ADMISSION_BIND_LIMIT'] = int(os.getenv('ADMISSION_BIND_LIMIT', 16))
+    flask_app.config['ADMISSION_RESERVED'] = int(os.getenv('ADMISSION_RESERVED', 4))
+    flask_app.config['ADMISSION_BULK_LIMIT'] = int(os.getenv('ADMISSION_BULK_LIMIT', 2))
+    flask_app.config['ADMISSION_MAX_QUEUE'] = int(os.getenv('ADMISSION_MAX_QUEUE', 64))
+
+    # Configura el canal de cambios: eventos recientes por bind, eventos pendientes por suscriptor y suscriptores
+    flask_app.config['CHANGE_FEED_HISTORY'] = int(os.getenv('CHANGE_FEED_HISTORY', 1000))
+    flask_app.config['CHANGE_FEED_BUFFER'] = int(os.getenv('CHANGE_FEED_BUFFER', 256))
+    flask_app.config['CHANGE_FEED_MAX_SUBSCRIBERS'] = int(os.getenv('CHANGE_FEED_MAX_SUBSCRIBERS', 5000))
+
+    # Configura el margen en segundos de /changes ante las transacciones en curso (ver stable_until)
+    flask_app.config['CHANGES_SAFETY_MARGIN'] = float(os.getenv('CHANGES_SAFETY_MARGIN', 1.0))
+
+    # Configura los trabajos en segundo plano: trabajos simultáneos por bind y procesos para dar formato a los archivos
+    flask_app.config['JOBS_BIND_LIMIT'] = int(os.getenv('JOBS_BIND_LIMIT', 2))
+    flask_app.config['JOBS_PROCESSES'] = int(os.getenv('JOBS_PROCESSES', 2))
+    if os.getenv('JOBS_DIR'):
+        flask_app.config['JOBS_DIR'] = os.getenv('JOBS_DIR')
+        flask_app.config['JOBS_DB'] = os.path.join(os.getenv('JOBS_DIR'), 'jobs.sqlite')
+
+    # Configura la bitácora de auditoría: archivo SQLite, transacciones en cola y registros por lote de escritura
+    flask_app.config['AUDIT_ENABLED'] = os.getenv('AUDIT_ENABLED', 'true').lower() != 'false'
+    flask_app.config['AUDIT_MAX_QUEUE'] = int(os.getenv('AUDIT_MAX_QUEUE', 10000))
+    flask_app.config['AUDIT_BATCH_SIZE'] = int(os.getenv('AUDIT_BATCH_SIZE', 500))
+    if os.getenv('AUDIT_DB'):
+        flask_app.config['AUDIT_DB'] = os.getenv('AUDIT_DB')
+
+    if test_config is not None:
+        flask_app.config.update(test_config)
+
     # Inicializa la base de datos
     init_db(flask_app)
 
+    # Inicializa el almacén de llaves de idempotencia de POST y PUT
+    idempotency_store.init_app(flask_app)
+
+    # Inicializa el control de admisión; las respuestas repetidas por idempotencia no ocupan lugares
+    admission_controller.init_app(flask_app)
+
+    # Inicializa la cola de trabajos en segundo plano
+    job_queue.init_app(flask_app)
+
+    # Inicializa el canal de cambios que reciben los clientes suscritos a /api/<dominio>/events
+    change_feed.init_app(flask_app)
+
+    # Inicializa la bitácora de auditoría, que registra en segundo plano las escrituras confirmadas
+    audit_log.init_app(flask_app, db)
+
     # Registra los blueprints con prefijos de URL
     flask_app.register_blueprint(clinica_routes.bp, url_prefix='/api/clinica')
     flask_app.register_blueprint(restaurante_routes.bp, url_prefix='/api/restaurante')
     flask_app.register_blueprint(automoviles_routes.bp, url_prefix='/api/automoviles')
+    flask_app.register_blueprint(metrics_routes.bp, url_prefix='/api/metrics')
+    flask_app.register_blueprint(job_routes.bp, url_prefix='/api/jobs')
+
+    # Registra los mismos blueprints con el inquilino como segmento de URL (alternativa a la cabecera X-Tenant)
+    flask_app.register_blueprint(clinica_routes.bp, url_prefix='/api/tenants/<tenant>/clinica', name='clinica_tenant')
+    flask_app.register_blueprint(restaurante_routes.bp, url_prefix='/api/tenants/<tenant>/restaurante', name='restaurante_tenant')
+    flask_app.register_blueprint(automoviles_routes.bp, url_prefix='/api/tenants/<tenant>/automoviles', name='automoviles_tenant')
+    flask_app.register_blueprint(job_routes.bp, url_prefix='/api/tenants/<tenant>/jobs', name='jobs_tenant')
 
     return flask_app
 
@@ -1,6 +1,10 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+import json
+import threading
+import time
 import requests
+import uuid
 from widgets.input_dialog import InputDialog
 from datetime import datetime
 
@@ -21,6 +25,7 @@ class CRUDApp:
         notebook (ttk.Notebook): Contenedor de pestañas para las bases de datos.
         current_view (dict): Diccionario para almacenar la vista actual de cada pestaña.
         current_theme (str): Tema actual de la aplicación.
+        feed_connected (dict): Indica, por base de datos, si su canal de cambios está conectado.
     """
 
     def __init__(self):
@@ -97,6 +102,10 @@ class CRUDApp:
         # Establecer tema inicial
         self.current_theme = 'forest-light'
 
+        # Escuchar los cambios de cada base de datos para actualizar los registros en su lugar
+        self.feed_connected = {}
+        self.start_change_feeds()
+
     def toggle_theme(self):
         """
         Alterna el tema de la aplicación entre 'forest-light' y 'forest-dark'.
@@ -164,78 +173,78 @@ class CRUDApp:
        """
         tables_config = {
             'clinica': {
-                'Pacientes': {'endpoint': 'clinica/pacientes', 'columns': [
+                'Pacientes': {'endpoint': 'clinica/pacientes', 'model': 'paciente', 'columns': [
                     ('id', 'ID', 50), ('nombre', 'Nombre', 150),
                     ('direccion', 'Dirección', 200), ('telefono', 'Teléfono', 100),
                     ('fecha_nacimiento', 'Fecha Nacimiento', 120),
                     ('historial_medico', 'Historial Médico', 300)
                 ]},
-                'Médicos': {'endpoint': 'clinica/medicos', 'columns': [
+                'Médicos': {'endpoint': 'clinica/medicos', 'model': 'medico', 'columns': [
                     ('id', 'ID', 50), ('nombre', 'Nombre', 150),
                     ('especialidad', 'Especialidad', 150),
                     ('licencia_medica', 'Licencia', 100),
                     ('informacion_contacto', 'Contacto', 200)
                 ]},
-                'Citas': {'endpoint': 'clinica/citas', 'columns': [
+                'Citas': {'endpoint': 'clinica/citas', 'model': 'cita', 'columns': [
                     ('id', 'ID', 50), ('id_paciente', 'ID Paciente', 100),
                     ('id_medico', 'ID Médico', 100),
                     ('fecha_hora', 'Fecha y Hora', 150),
                     ('motivo_visita', 'Motivo', 300)
                 ]},
-                'Tratamientos': {'endpoint': 'clinica/tratamientos', 'columns': [
+                'Tratamientos': {'endpoint': 'clinica/tratamientos', 'model': 'tratamiento', 'columns': [
                     ('id', 'ID', 50), ('nombre', 'Nombre', 150),
                     ('descripcion', 'Descripción', 300),
                     ('costo', 'Costo', 100)
                 ]}
             },
             'restaurante': {
-                'Clientes': {'endpoint': 'restaurante/clientes_restaurante', 'columns': [
+                'Clientes': {'endpoint': 'restaurante/clientes_restaurante', 'model': 'cliente', 'columns': [
                     ('id', 'ID', 50), ('nombre', 'Nombre', 150),
                     ('correo_electronico', 'Email', 200),
                     ('telefono', 'Teléfono', 100)
                 ]},
-                'Empleados': {'endpoint': 'restaurante/empleados', 'columns': [
+                'Empleados': {'endpoint': 'restaurante/empleados', 'model': 'empleado', 'columns': [
                     ('id', 'ID', 50), ('nombre', 'Nombre', 150),
                     ('posicion', 'Posición', 150),
                     ('fecha_contratacion', 'Fecha Contratación', 150)
                 ]},
-                'Platos': {'endpoint': 'restaurante/platos', 'columns': [
+                'Platos': {'endpoint': 'restaurante/platos', 'model': 'plato', 'columns': [
                     ('id', 'ID', 50), ('nombre', 'Nombre', 150),
                     ('cantidad_disponible', 'Cantidad', 100),
                     ('unidad_medida', 'Unidad', 100)
                 ]},
-                'Ingredientes': {'endpoint': 'restaurante/ingredientes', 'columns': [
+                'Ingredientes': {'endpoint': 'restaurante/ingredientes', 'model': 'ingrediente', 'columns': [
                     ('id', 'ID', 50), ('nombre', 'Nombre', 150),
                     ('cantidad_disponible', 'Cantidad', 100),
                     ('unidad_medida', 'Unidad', 100)
                 ]},
-                'Pedidos': {'endpoint': 'restaurante/pedidos', 'columns': [
+                'Pedidos': {'endpoint': 'restaurante/pedidos', 'model': 'pedido', 'columns': [
                     ('id', 'ID', 50), ('id_cliente', 'ID Cliente', 100),
                     ('id_empleado', 'ID Empleado', 100),
                     ('fecha_hora', 'Fecha y Hora', 150)
                 ]}
             },
             'automoviles': {
-                'Clientes': {'endpoint': 'automoviles/clientes_automoviles', 'columns': [
+                'Clientes': {'endpoint': 'automoviles/clientes_automoviles', 'model': 'cliente', 'columns': [
                     ('id', 'ID', 50), ('nombre', 'Nombre', 150),
                     ('direccion', 'Dirección', 200),
                     ('correo_electronico', 'Email', 200),
                     ('telefono', 'Teléfono', 100)
                 ]},
-                'Vendedores': {'endpoint': 'automoviles/vendedores', 'columns': [
+                'Vendedores': {'endpoint': 'automoviles/vendedores', 'model': 'vendedor', 'columns': [
                     ('id', 'ID', 50), ('nombre', 'Nombre', 150),
                     ('direccion', 'Dirección', 200),
                     ('telefono', 'Teléfono', 100),
                     ('fecha_contratacion', 'Fecha Contratación', 150)
                 ]},
-                'Vehículos': {'endpoint': 'automoviles/vehiculos', 'columns': [
+                'Vehículos': {'endpoint': 'automoviles/vehiculos', 'model': 'vehiculo', 'columns': [
                     ('vin', 'VIN', 150), ('marca', 'Marca', 100),
                     ('modelo', 'Modelo', 100), ('anio', 'Año', 70),
                     ('color', 'Color', 100), ('tipo', 'Tipo', 100),
                     ('precio', 'Precio', 100),
                     ('fecha_recepcion', 'Fecha Recepción', 150)
                 ]},
-                'Ventas': {'endpoint': 'automoviles/ventas', 'columns': [
+                'Ventas': {'endpoint': 'automoviles/ventas', 'model': 'venta', 'columns': [
                     ('id', 'ID', 50), ('id_cliente', 'ID Cliente', 100),
                     ('id_vendedor', 'ID Vendedor', 100),
                     ('vin', 'VIN', 150), ('fecha', 'Fecha', 150),
@@ -270,6 +279,141 @@ class CRUDApp:
                 tree.configure(style='Treeview')
             ])
 
+    def refresh_after_write(self, config):
+        """
+        Actualiza los datos tras una escritura propia solo si el canal de cambios de la base de datos no está
+        conectado; si lo está, el cambio llega como evento y se aplica en su lugar.
+
+        Args:
+            config (dict): Configuración de la tabla escrita.
+        """
+        if not self.feed_connected.get(config['endpoint'].split('/')[0]):
+            self.refresh_data()
+
+    def start_change_feeds(self):
+        """
+        Inicia un hilo por base de datos que escucha su canal de cambios.
+        """
+        for tab_name in ['clinica', 'restaurante', 'automoviles']:
+            threading.Thread(target=self.listen_changes, args=(tab_name,), daemon=True).start()
+
+    def listen_changes(self, tab_name):
+        """
+        Escucha el flujo Server-Sent Events de cambios de una base de datos, obtiene en este hilo el registro de
+        cada evento y aplica el evento en el hilo de la interfaz. Si la conexión se corta, se reconecta con el id
+        del último evento recibido para no perder cambios.
+
+        Args:
+            tab_name (str): Nombre de la base de datos ('clinica', 'restaurante' o 'automoviles').
+        """
+        last_event_id = None
+        while True:
+            try:
+                headers = {'Last-Event-ID': last_event_id} if last_event_id else {}
+                with requests.get(f"{self.API_URL}/{tab_name}/events", headers=headers, stream=True,
+                                  timeout=(5, 60)) as response:
+                    if response.status_code != 200:
+                        raise requests.ConnectionError(response.status_code)
+                    self.feed_connected[tab_name] = True
+                    event = {}
+                    for line in response.iter_lines(decode_unicode=True):
+                        if line:
+                            field, _, value = line.partition(':')
+                            event[field] = value.lstrip()
+                            continue
+                        if 'data' in event:
+                            last_event_id = event.get('id', last_event_id)
+                            change = json.loads(event['data'])
+                            record = self.fetch_change(tab_name, change)
+                            self.root.after(0, self.apply_change, tab_name, change, record)
+                        event = {}
+            except (requests.RequestException, ValueError):
+                pass
+            self.feed_connected[tab_name] = False
+            time.sleep(3)
+
+    def fetch_change(self, tab_name, change):
+        """
+        Obtiene de la API el registro de un evento del canal de cambios si pertenece a la tabla mostrada. Se
+        llama desde el hilo que escucha el canal, para que la consulta no detenga la interfaz.
+
+        Args:
+            tab_name (str): Nombre de la base de datos del evento.
+            change (dict): Evento con 'model', 'pk', 'op' y 'version'.
+
+        Returns:
+            dict: Registro actual, o None si no se necesita o no se pudo obtener.
+        """
+        config = self.current_view['current_config']
+        if change['op'] in ('delete', 'reset') or not config or not config['endpoint'].startswith(f"{tab_name}/") \
+                or change['model'] != config['model']:
+            return None
+        try:
+            response = requests.get(f"{self.API_URL}/{config['endpoint']}/{change['pk']}", timeout=10)
+        except requests.RequestException:
+            return None
+        return response.json() if response.status_code == 200 else None
+
+    def apply_change(self, tab_name, change, record):
+        """
+        Aplica un evento del canal de cambios a la tabla mostrada: elimina o actualiza la fila del registro y
+        agrega los registros nuevos si caben en la página actual, sin volver a cargarla.
+
+        Args:
+            tab_name (str): Nombre de la base de datos del evento.
+            change (dict): Evento con 'model', 'pk', 'op' y 'version'.
+            record (dict): Registro obtenido por fetch_change, o None.
+        """
+        tree = self.current_view['current_tree']
+        config = self.current_view['current_config']
+        if not tree or not config or not config['endpoint'].startswith(f"{tab_name}/"):
+            return
+        if change['op'] == 'reset':
+            self.refresh_data()
+            return
+        if change['model'] != config['model']:
+            return
+
+        item = next((item for item in tree.get_children()
+                     if str(tree.item(item)['values'][1]) == str(change['pk'])), None)
+        if change['op'] == 'delete':
+            if item:
+                tree.delete(item)
+            return
+
+        page_size = self.current_view[tab_name]['pagination']['page_size']
+        if record is None or item is None and (self.has_next or len(tree.get_children()) >= page_size):
+            return
+        values = self.format_row(record, config)
+        if item:
+            values[0] = tree.item(item)['values'][0]
+            tree.item(item, values=values)
+        else:
+            tree.insert('', 'end', values=values)
+
+    def send_write(self, method, url, payload, attempts=3):
+        """
+        Envía una escritura a la API con una llave de idempotencia, reintentándola si la conexión falla o se
+        agota el tiempo de espera. Todos los intentos usan la misma llave, por lo que la API ejecuta la
+        escritura una sola vez y repite su respuesta en los reintentos.
+
+        Args:
+            method (str): Método HTTP ('POST' o 'PUT').
+            url (str): URL del recurso.
+            payload (dict): Datos del registro.
+            attempts (int): Número máximo de intentos.
+
+        Returns:
+            requests.Response: Respuesta de la API.
+        """
+        headers = {'Idempotency-Key': str(uuid.uuid4())}
+        for attempt in range(attempts):
+            try:
+                return requests.request(method, url, json=payload, headers=headers, timeout=10)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == attempts - 1:
+                    raise
+
     def add_record(self):
         """
         Abre un cuadro de diálogo para agregar un nuevo registro.
@@ -284,13 +428,14 @@ class CRUDApp:
 
         if dialog.result:
             try:
-                response = requests.post(
+                response = self.send_write(
+                    'POST',
                     f"{self.API_URL}/{config['endpoint']}",
-                    json=dialog.result
+                    dialog.result
                 )
                 if response.status_code == 201:
                     messagebox.showinfo("Éxito", "Registro agregado correctamente")
-                    self.refresh_data()
+                    self.refresh_after_write(config)
                 else:
                     messagebox.showerror("Error", "No se pudo agregar el registro")
             except Exception as e:
@@ -322,13 +467,14 @@ class CRUDApp:
         if dialog.result:
             try:
                 record_id = values[1]
-                response = requests.put(
+                response = self.send_write(
+                    'PUT',
                     f"{self.API_URL}/{config['endpoint']}/{record_id}",
-                    json=dialog.result
+                    dialog.result
                 )
                 if response.status_code == 200:
                     messagebox.showinfo("Éxito", "Registro actualizado correctamente")
-                    self.refresh_data()
+                    self.refresh_after_write(config)
                 else:
                     messagebox.showerror("Error", "No se pudo actualizar el registro")
             except Exception as e:
@@ -376,7 +522,7 @@ class CRUDApp:
                                         + (f"\nNo se pudieron eliminar {error_count} registros" if error_count > 0 else ""))
                 else:
                     messagebox.showerror("Error", "No se pudo eliminar ningún registro")
-                self.refresh_data()
+                self.refresh_after_write(config)
             except Exception as e:
                 messagebox.showerror("Error", f"Error al eliminar registros: {str(e)}")
 
@@ -740,14 +886,7 @@ class CRUDApp:
                 # Limpiar y actualizar el Treeview
                 tree.delete(*tree.get_children())
                 for item in data.get('data', []):
-                    values = ['☐']
-                    for col in self.current_view['current_config']['columns']:
-                        value = item.get(col[0], '')
-                        # Formatear fechas a DD/MM/YYYY
-                        if isinstance(value, str) and ('fecha' in col[0].lower()):
-                            value = self.format_date(value)
-                        values.append(str(value))
-                    tree.insert('', 'end', values=values)
+                    tree.insert('', 'end', values=self.format_row(item, self.current_view['current_config']))
 
                 # Actualizar los controles de paginación después de cargar los datos
                 self.root.after(100, self.update_pagination_controls)
@@ -757,6 +896,26 @@ class CRUDApp:
             messagebox.showerror("Error", f"Error al cargar datos: {str(e)}")
             return False
 
+    def format_row(self, item, config):
+        """
+        Convierte un registro de la API en los valores de una fila del Treeview.
+
+        Args:
+            item (dict): Registro devuelto por la API.
+            config (dict): Configuración de la tabla.
+
+        Returns:
+            list: Casilla de verificación seguida del valor de cada columna.
+        """
+        values = ['☐']
+        for col in config['columns']:
+            value = item.get(col[0], '')
+            # Formatear fechas a DD/MM/YYYY
+            if isinstance(value, str) and ('fecha' in col[0].lower()):
+                value = self.format_date(value)
+            values.append(str(value))
+        return values
+
     def format_date(self, date_val):
         """
         Formatea cadenas de fecha a DD/MM/YYYY.
@@ -0,0 +1,106 @@
+# Migración: seguimiento de cambios (GET /api/<dominio>/<recurso>/changes)
+# Agrega a una base de datos creada antes del seguimiento de cambios las columnas Version y Fecha_Actualizacion
+# de las tablas con seguimiento y la tabla cambio_eliminado, tal como las define modelos_relacionales.sql.
+# Se ejecuta una sola vez: MySQL no admite ADD COLUMN IF NOT EXISTS.
+# Los registros existentes quedan con la versión 1 y la fecha de la migración.
+
+# Base de datos: clinica
+USE clinica;
+
+ALTER TABLE paciente
+    ADD COLUMN Version             BIGINT      NOT NULL DEFAULT 1,
+    ADD COLUMN Fecha_Actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD INDEX ix_paciente_Fecha_Actualizacion (Fecha_Actualizacion);
+
+ALTER TABLE medico
+    ADD COLUMN Version             BIGINT      NOT NULL DEFAULT 1,
+    ADD COLUMN Fecha_Actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD INDEX ix_medico_Fecha_Actualizacion (Fecha_Actualizacion);
+
+ALTER TABLE cita
+    ADD COLUMN Version             BIGINT      NOT NULL DEFAULT 1,
+    ADD COLUMN Fecha_Actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD INDEX ix_cita_Fecha_Actualizacion (Fecha_Actualizacion);
+
+ALTER TABLE tratamiento
+    ADD COLUMN Version             BIGINT      NOT NULL DEFAULT 1,
+    ADD COLUMN Fecha_Actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD INDEX ix_tratamiento_Fecha_Actualizacion (Fecha_Actualizacion);
+
+CREATE TABLE IF NOT EXISTS cambio_eliminado
+(
+    ID_Eliminado BIGINT AUTO_INCREMENT PRIMARY KEY,
+    Tabla        VARCHAR(50) NOT NULL,
+    Llave        VARCHAR(64) NOT NULL,
+    Fecha        DATETIME(6) NOT NULL,
+    INDEX idx_cambio_eliminado_tabla_fecha (Tabla, Fecha, ID_Eliminado)
+);
+
+# Base de datos: Restaurante
+USE restaurante;
+
+ALTER TABLE cliente
+    ADD COLUMN Version             BIGINT      NOT NULL DEFAULT 1,
+    ADD COLUMN Fecha_Actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD INDEX ix_cliente_Fecha_Actualizacion (Fecha_Actualizacion);
+
+ALTER TABLE empleado
+    ADD COLUMN Version             BIGINT      NOT NULL DEFAULT 1,
+    ADD COLUMN Fecha_Actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD INDEX ix_empleado_Fecha_Actualizacion (Fecha_Actualizacion);
+
+ALTER TABLE plato
+    ADD COLUMN Version             BIGINT      NOT NULL DEFAULT 1,
+    ADD COLUMN Fecha_Actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD INDEX ix_plato_Fecha_Actualizacion (Fecha_Actualizacion);
+
+ALTER TABLE ingrediente
+    ADD COLUMN Version             BIGINT      NOT NULL DEFAULT 1,
+    ADD COLUMN Fecha_Actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD INDEX ix_ingrediente_Fecha_Actualizacion (Fecha_Actualizacion);
+
+ALTER TABLE pedido
+    ADD COLUMN Version             BIGINT      NOT NULL DEFAULT 1,
+    ADD COLUMN Fecha_Actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD INDEX ix_pedido_Fecha_Actualizacion (Fecha_Actualizacion);
+
+CREATE TABLE IF NOT EXISTS cambio_eliminado
+(
+    ID_Eliminado BIGINT AUTO_INCREMENT PRIMARY KEY,
+    Tabla        VARCHAR(50) NOT NULL,
+    Llave        VARCHAR(64) NOT NULL,
+    Fecha        DATETIME(6) NOT NULL,
+    INDEX idx_cambio_eliminado_tabla_fecha (Tabla, Fecha, ID_Eliminado)
+);
+
+# Base de datos: Venta_Automoviles
+USE venta_automoviles;
+
+ALTER TABLE cliente
+    ADD COLUMN Version             BIGINT      NOT NULL DEFAULT 1,
+    ADD COLUMN Fecha_Actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD INDEX ix_cliente_Fecha_Actualizacion (Fecha_Actualizacion);
+
+ALTER TABLE vendedor
+    ADD COLUMN Version             BIGINT      NOT NULL DEFAULT 1,
+    ADD COLUMN Fecha_Actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD INDEX ix_vendedor_Fecha_Actualizacion (Fecha_Actualizacion);
+
+ALTER TABLE vehiculo
+    ADD COLUMN Version             BIGINT      NOT NULL DEFAULT 1,
+    ADD COLUMN Fecha_Actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD INDEX ix_vehiculo_Fecha_Actualizacion (Fecha_Actualizacion);
+
+ALTER TABLE venta
+    ADD COLUMN Version             BIGINT      NOT NULL DEFAULT 1,
+    ADD COLUMN Fecha_Actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD INDEX ix_venta_Fecha_Actualizacion (Fecha_Actualizacion);
+
+CREATE TABLE IF NOT EXISTS cambio_eliminado
+(
+    ID_Eliminado BIGINT AUTO_INCREMENT PRIMARY KEY,
+    Tabla        VARCHAR(50) NOT NULL,
+    Llave        VARCHAR(64) NOT NULL,
+    Fecha        DATETIME(6) NOT NULL,
+    INDEX idx_cambio_eliminado_tabla_fecha (Tabla, Fecha, ID_Eliminado)
+);
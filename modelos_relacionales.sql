@@ -10,7 +10,10 @@ CREATE TABLE IF NOT EXISTS paciente
     Direccion        VARCHAR(255) NOT NULL,
     Telefono         VARCHAR(15)  NOT NULL,
     Fecha_Nacimiento DATE         NOT NULL,
-    Historial_Medico TEXT         NOT NULL
+    Historial_Medico TEXT         NOT NULL,
+    Version             BIGINT      NOT NULL DEFAULT 1,
+    Fecha_Actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    INDEX ix_paciente_Fecha_Actualizacion (Fecha_Actualizacion)
 );
 
 CREATE TABLE IF NOT EXISTS medico
@@ -19,7 +22,10 @@ CREATE TABLE IF NOT EXISTS medico
     Nombre               VARCHAR(100) NOT NULL,
     Especialidad         VARCHAR(100) NOT NULL,
     Licencia_Medica      VARCHAR(50)  NOT NULL,
-    Informacion_Contacto TEXT         NOT NULL
+    Informacion_Contacto TEXT         NOT NULL,
+    Version              BIGINT      NOT NULL DEFAULT 1,
+    Fecha_Actualizacion  DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    INDEX ix_medico_Fecha_Actualizacion (Fecha_Actualizacion)
 );
 
 CREATE TABLE IF NOT EXISTS cita
@@ -29,18 +35,59 @@ CREATE TABLE IF NOT EXISTS cita
     ID_Medico     INT      NOT NULL,
     Fecha_Hora    DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
     Motivo_Visita TEXT     NOT NULL,
+    Version             BIGINT      NOT NULL DEFAULT 1,
+    Fecha_Actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    INDEX ix_cita_Fecha_Actualizacion (Fecha_Actualizacion),
+    INDEX idx_cita_paciente_fecha (ID_Paciente, Fecha_Hora),
+    INDEX idx_cita_paciente_medico (ID_Paciente, ID_Medico),
     FOREIGN KEY (ID_Paciente) REFERENCES paciente (ID_Paciente)
         ON DELETE RESTRICT ON UPDATE CASCADE,
     FOREIGN KEY (ID_Medico) REFERENCES medico (ID_Medico)
         ON DELETE RESTRICT ON UPDATE CASCADE
 );
 
+CREATE TABLE IF NOT EXISTS horario_medico
+(
+    ID_Horario       INT AUTO_INCREMENT PRIMARY KEY,
+    ID_Medico        INT      NOT NULL,
+    Dia_Semana       SMALLINT NOT NULL,
+    Hora_Inicio      TIME     NOT NULL,
+    Hora_Fin         TIME     NOT NULL,
+    Duracion_Minutos INT      NOT NULL DEFAULT 30,
+    INDEX idx_horario_medico (ID_Medico),
+    FOREIGN KEY (ID_Medico) REFERENCES medico (ID_Medico)
+        ON DELETE CASCADE ON UPDATE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS cita_resumen_diario
+(
+    Fecha       DATE NOT NULL,
+    ID_Medico   INT  NOT NULL,
+    Anio_Mes    INT  NOT NULL,
+    Anio_Semana INT  NOT NULL,
+    Total       INT  NOT NULL DEFAULT 0,
+    PRIMARY KEY (Fecha, ID_Medico),
+    INDEX idx_cita_resumen_medico_fecha (ID_Medico, Fecha)
+);
+
 CREATE TABLE IF NOT EXISTS tratamiento
 (
     ID_Tratamiento INT AUTO_INCREMENT PRIMARY KEY,
     Nombre         VARCHAR(100)   NOT NULL,
     Descripcion    TEXT           NOT NULL,
-    Costo          DECIMAL(10, 2) NOT NULL
+    Costo          DECIMAL(10, 2) NOT NULL,
+    Version             BIGINT      NOT NULL DEFAULT 1,
+    Fecha_Actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    INDEX ix_tratamiento_Fecha_Actualizacion (Fecha_Actualizacion)
+);
+
+CREATE TABLE IF NOT EXISTS cambio_eliminado
+(
+    ID_Eliminado BIGINT AUTO_INCREMENT PRIMARY KEY,
+    Tabla        VARCHAR(50) NOT NULL,
+    Llave        VARCHAR(64) NOT NULL,
+    Fecha        DATETIME(6) NOT NULL,
+    INDEX idx_cambio_eliminado_tabla_fecha (Tabla, Fecha, ID_Eliminado)
 );
 
 # Base de datos: Restaurante
@@ -53,7 +100,10 @@ CREATE TABLE IF NOT EXISTS cliente
     ID_Cliente         INT AUTO_INCREMENT PRIMARY KEY,
     Nombre             VARCHAR(100) NOT NULL,
     Correo_Electronico VARCHAR(100) NOT NULL UNIQUE,
-    Telefono           VARCHAR(15)  NOT NULL
+    Telefono           VARCHAR(15)  NOT NULL,
+    Version             BIGINT      NOT NULL DEFAULT 1,
+    Fecha_Actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    INDEX ix_cliente_Fecha_Actualizacion (Fecha_Actualizacion)
 );
 
 CREATE TABLE IF NOT EXISTS empleado
@@ -61,7 +111,10 @@ CREATE TABLE IF NOT EXISTS empleado
     ID_Empleado        INT AUTO_INCREMENT PRIMARY KEY,
     Nombre             VARCHAR(100) NOT NULL,
     Posicion           VARCHAR(50)  NOT NULL,
-    Fecha_Contratacion DATETIME     NOT NULL DEFAULT CURRENT_TIMESTAMP
+    Fecha_Contratacion DATETIME     NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    Version             BIGINT      NOT NULL DEFAULT 1,
+    Fecha_Actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    INDEX ix_empleado_Fecha_Actualizacion (Fecha_Actualizacion)
 );
 
 CREATE TABLE IF NOT EXISTS plato
@@ -69,7 +122,10 @@ CREATE TABLE IF NOT EXISTS plato
     ID_Platillo         INT AUTO_INCREMENT PRIMARY KEY,
     Nombre              VARCHAR(100) NOT NULL,
     Cantidad_Disponible INT(10)      NOT NULL,
-    Unidad_Medida       VARCHAR(20)  NOT NULL
+    Unidad_Medida       VARCHAR(20)  NOT NULL,
+    Version             BIGINT      NOT NULL DEFAULT 1,
+    Fecha_Actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    INDEX ix_plato_Fecha_Actualizacion (Fecha_Actualizacion)
 );
 
 CREATE TABLE IF NOT EXISTS ingrediente
@@ -77,7 +133,10 @@ CREATE TABLE IF NOT EXISTS ingrediente
     ID_Ingrediente      INT AUTO_INCREMENT PRIMARY KEY,
     Nombre              VARCHAR(100) NOT NULL,
     Cantidad_Disponible INT(10)      NOT NULL,
-    Unidad_Medida       VARCHAR(20)  NOT NULL
+    Unidad_Medida       VARCHAR(20)  NOT NULL,
+    Version             BIGINT      NOT NULL DEFAULT 1,
+    Fecha_Actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    INDEX ix_ingrediente_Fecha_Actualizacion (Fecha_Actualizacion)
 );
 
 CREATE TABLE IF NOT EXISTS pedido
@@ -86,12 +145,51 @@ CREATE TABLE IF NOT EXISTS pedido
     ID_Cliente  INT      NOT NULL,
     ID_Empleado INT      NOT NULL,
     Fecha_Hora  DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    Version             BIGINT      NOT NULL DEFAULT 1,
+    Fecha_Actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    INDEX ix_pedido_Fecha_Actualizacion (Fecha_Actualizacion),
+    INDEX idx_pedido_fecha_hora (Fecha_Hora, ID_Empleado, ID_Cliente),
     FOREIGN KEY (ID_Cliente) REFERENCES cliente (ID_Cliente)
         ON DELETE RESTRICT ON UPDATE CASCADE,
     FOREIGN KEY (ID_Empleado) REFERENCES empleado (ID_Empleado)
         ON DELETE RESTRICT ON UPDATE CASCADE
 );
 
+CREATE TABLE IF NOT EXISTS linea_pedido
+(
+    ID_Linea    INT AUTO_INCREMENT PRIMARY KEY,
+    ID_Pedido   INT NOT NULL,
+    ID_Platillo INT NOT NULL,
+    Cantidad    INT NOT NULL CHECK (Cantidad > 0),
+    INDEX idx_linea_pedido_pedido (ID_Pedido),
+    FOREIGN KEY (ID_Pedido) REFERENCES pedido (ID_Pedido)
+        ON DELETE CASCADE ON UPDATE CASCADE,
+    FOREIGN KEY (ID_Platillo) REFERENCES plato (ID_Platillo)
+        ON DELETE RESTRICT ON UPDATE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS receta_plato
+(
+    ID_Receta      INT AUTO_INCREMENT PRIMARY KEY,
+    ID_Platillo    INT NOT NULL,
+    ID_Ingrediente INT NOT NULL,
+    Cantidad       INT NOT NULL CHECK (Cantidad > 0),
+    CONSTRAINT uq_receta_plato_ingrediente UNIQUE (ID_Platillo, ID_Ingrediente),
+    FOREIGN KEY (ID_Platillo) REFERENCES plato (ID_Platillo)
+        ON DELETE CASCADE ON UPDATE CASCADE,
+    FOREIGN KEY (ID_Ingrediente) REFERENCES ingrediente (ID_Ingrediente)
+        ON DELETE RESTRICT ON UPDATE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS cambio_eliminado
+(
+    ID_Eliminado BIGINT AUTO_INCREMENT PRIMARY KEY,
+    Tabla        VARCHAR(50) NOT NULL,
+    Llave        VARCHAR(64) NOT NULL,
+    Fecha        DATETIME(6) NOT NULL,
+    INDEX idx_cambio_eliminado_tabla_fecha (Tabla, Fecha, ID_Eliminado)
+);
+
 # Base de datos: Venta_Automoviles
 CREATE DATABASE IF NOT EXISTS venta_automoviles;
 
@@ -103,7 +201,10 @@ CREATE TABLE IF NOT EXISTS cliente
     Nombre             VARCHAR(100) NOT NULL,
     Direccion          VARCHAR(255) NOT NULL,
     Correo_Electronico VARCHAR(100) NOT NULL UNIQUE,
-    Telefono           VARCHAR(15)  NOT NULL
+    Telefono           VARCHAR(15)  NOT NULL,
+    Version             BIGINT      NOT NULL DEFAULT 1,
+    Fecha_Actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    INDEX ix_cliente_Fecha_Actualizacion (Fecha_Actualizacion)
 );
 
 CREATE TABLE IF NOT EXISTS vendedor
@@ -112,7 +213,10 @@ CREATE TABLE IF NOT EXISTS vendedor
     Nombre             VARCHAR(100) NOT NULL,
     Direccion          VARCHAR(255) NOT NULL,
     Telefono           VARCHAR(15)  NOT NULL,
-    Fecha_Contratacion DATETIME     NOT NULL DEFAULT CURRENT_TIMESTAMP
+    Fecha_Contratacion DATETIME     NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    Version             BIGINT      NOT NULL DEFAULT 1,
+    Fecha_Actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    INDEX ix_vendedor_Fecha_Actualizacion (Fecha_Actualizacion)
 );
 
 CREATE TABLE IF NOT EXISTS vehiculo
@@ -124,7 +228,10 @@ CREATE TABLE IF NOT EXISTS vehiculo
     Color           VARCHAR(20)    NOT NULL,
     Tipo            VARCHAR(50)    NOT NULL,
     Precio          DECIMAL(10, 2) NOT NULL,
-    Fecha_Recepcion DATETIME       NOT NULL DEFAULT CURRENT_TIMESTAMP
+    Fecha_Recepcion DATETIME       NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    Version             BIGINT      NOT NULL DEFAULT 1,
+    Fecha_Actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    INDEX ix_vehiculo_Fecha_Actualizacion (Fecha_Actualizacion)
 );
 
 CREATE TABLE IF NOT EXISTS venta
@@ -135,6 +242,9 @@ CREATE TABLE IF NOT EXISTS venta
     VIN         VARCHAR(17)    NOT NULL,
     Fecha       DATETIME       NOT NULL DEFAULT CURRENT_TIMESTAMP,
     Precio      DECIMAL(10, 2) NOT NULL,
+    Version             BIGINT      NOT NULL DEFAULT 1,
+    Fecha_Actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    INDEX ix_venta_Fecha_Actualizacion (Fecha_Actualizacion),
     FOREIGN KEY (ID_Cliente) REFERENCES cliente (ID_Cliente)
         ON DELETE RESTRICT ON UPDATE CASCADE,
     FOREIGN KEY (ID_Vendedor) REFERENCES Vendedor (ID_Vendedor)
@@ -143,6 +253,27 @@ CREATE TABLE IF NOT EXISTS venta
         ON DELETE RESTRICT ON UPDATE CASCADE
 );
 
+CREATE TABLE IF NOT EXISTS venta_resumen_mensual
+(
+    Anio_Mes    INT            NOT NULL,
+    ID_Vendedor INT            NOT NULL,
+    Marca       VARCHAR(50)    NOT NULL,
+    Modelo      VARCHAR(50)    NOT NULL,
+    Unidades    INT            NOT NULL DEFAULT 0,
+    Ingresos    DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    Version     BIGINT         NOT NULL DEFAULT 1,
+    PRIMARY KEY (Anio_Mes, ID_Vendedor, Marca, Modelo)
+);
+
+CREATE TABLE IF NOT EXISTS cambio_eliminado
+(
+    ID_Eliminado BIGINT AUTO_INCREMENT PRIMARY KEY,
+    Tabla        VARCHAR(50) NOT NULL,
+    Llave        VARCHAR(64) NOT NULL,
+    Fecha        DATETIME(6) NOT NULL,
+    INDEX idx_cambio_eliminado_tabla_fecha (Tabla, Fecha, ID_Eliminado)
+);
+
 ### Volcado de datos mediante procedimientos almacenados para la base de datos clinica ###
 USE clinica;
 # Crear 1000 registros en la tabla paciente
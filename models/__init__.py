@@ -1,8 +1,16 @@
 # Importa la clase SQLAlchemy de flask_sqlalchemy
 from flask_sqlalchemy import SQLAlchemy
+from .routing import ReplicaRouter, RoutingSession, CONSISTENCY_HEADER
+from .tenancy import TenantRegistry, TENANT_HEADER, current_tenant
 
-# Crea una instancia de SQLAlchemy
-db = SQLAlchemy()
+# Crea una instancia de SQLAlchemy cuya sesión enruta las consultas por inquilino y las lecturas hacia las réplicas
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+# Crea el enrutador de réplicas de solo lectura
+replica_router = ReplicaRouter()
+
+# Crea el registro de motores por inquilino
+tenant_registry = TenantRegistry()
 
 def init_db(app):
     """
@@ -12,15 +20,22 @@ def init_db(app):
         app (Flask): La instancia de la aplicación Flask.
     """
     db.init_app(app)
+    replica_router.init_app(app)
+    tenant_registry.init_app(app)
+
+# Importa el seguimiento de cambios de los modelos
+from .tracking import ChangeTracking, eliminados, is_tracked, record_deletes, stable_until
 
 # Importa las clases de los modelos
-from .clinica import Paciente, Medico, Cita, Tratamiento
-from .restaurante import ClienteRestaurante, Empleado, Plato, Ingrediente, Pedido
-from .automoviles import ClienteAutomoviles, Vendedor, Vehiculo, Venta
+from .clinica import Paciente, Medico, Cita, Tratamiento, HorarioMedico, CitaResumenDiario
+from .restaurante import ClienteRestaurante, Empleado, Plato, Ingrediente, Pedido, LineaPedido, RecetaPlato
+from .automoviles import ClienteAutomoviles, Vendedor, Vehiculo, Venta, VentaResumenMensual
 
 # Define qué elementos se exportan cuando se importa el módulo
-__all__ = ['db', 'init_db',
-           'Paciente', 'Medico', 'Cita', 'Tratamiento',
-           'ClienteRestaurante', 'Empleado', 'Plato', 'Ingrediente', 'Pedido',
-           'ClienteAutomoviles', 'Vendedor', 'Vehiculo', 'Venta'
+__all__ = ['db', 'init_db', 'replica_router', 'CONSISTENCY_HEADER',
+           'tenant_registry', 'TENANT_HEADER', 'current_tenant',
+           'ChangeTracking', 'eliminados', 'is_tracked', 'record_deletes', 'stable_until',
+           'Paciente', 'Medico', 'Cita', 'Tratamiento', 'HorarioMedico', 'CitaResumenDiario',
+           'ClienteRestaurante', 'Empleado', 'Plato', 'Ingrediente', 'Pedido', 'LineaPedido', 'RecetaPlato',
+           'ClienteAutomoviles', 'Vendedor', 'Vehiculo', 'Venta', 'VentaResumenMensual'
            ]
\ No newline at end of file
@@ -1,7 +1,8 @@
 from models import db
+from models.tracking import ChangeTracking
 from sqlalchemy.orm import validates
 
-class ClienteAutomoviles(db.Model):
+class ClienteAutomoviles(ChangeTracking, db.Model):
     """
     Modelo que representa a un cliente de automóviles.
 
@@ -14,6 +15,8 @@ class ClienteAutomoviles(db.Model):
         correo_electronico (str): Correo electrónico del cliente.
         telefono (str): Teléfono del cliente.
         ventas (list): Lista de ventas asociadas al cliente.
+        version (int): Número de escrituras del registro (ver ChangeTracking).
+        updated_at (datetime): Fecha de la última escritura del registro.
     """
     __bind_key__ = 'automoviles'
     __tablename__ = 'cliente'
@@ -43,7 +46,7 @@ class ClienteAutomoviles(db.Model):
         assert '@' in correo_electronico, "Correo Electronico debe contener @"
         return correo_electronico
 
-class Vendedor(db.Model):
+class Vendedor(ChangeTracking, db.Model):
     """
     Modelo que representa a un vendedor.
 
@@ -56,6 +59,8 @@ class Vendedor(db.Model):
         telefono (str): Teléfono del vendedor.
         fecha_contratacion (datetime): Fecha de contratación del vendedor.
         ventas (list): Lista de ventas asociadas al vendedor.
+        version (int): Número de escrituras del registro (ver ChangeTracking).
+        updated_at (datetime): Fecha de la última escritura del registro.
     """
     __bind_key__ = 'automoviles'
     __tablename__ = 'vendedor'
@@ -66,7 +71,7 @@ class Vendedor(db.Model):
     fecha_contratacion = db.Column('Fecha_Contratacion', db.DateTime, nullable=False, default=db.func.current_timestamp())
     ventas = db.relationship('Venta', backref='vendedor', lazy=True)
 
-class Vehiculo(db.Model):
+class Vehiculo(ChangeTracking, db.Model):
     """
     Modelo que representa a un vehículo.
 
@@ -82,6 +87,8 @@ class Vehiculo(db.Model):
         precio (decimal): Precio del vehículo.
         fecha_recepcion (datetime): Fecha de recepción del vehículo.
         ventas (list): Lista de ventas asociadas al vehículo.
+        version (int): Número de escrituras del registro (ver ChangeTracking).
+        updated_at (datetime): Fecha de la última escritura del registro.
     """
     __bind_key__ = 'automoviles'
     __tablename__ = 'vehiculo'
@@ -95,7 +102,7 @@ class Vehiculo(db.Model):
     fecha_recepcion = db.Column('Fecha_Recepcion', db.DateTime, nullable=False, default=db.func.current_timestamp())
     ventas = db.relationship('Venta', backref='vehiculo', lazy=True)
 
-class Venta(db.Model):
+class Venta(ChangeTracking, db.Model):
     """
     Modelo que representa una venta.
 
@@ -108,6 +115,8 @@ class Venta(db.Model):
         vin (str): Número de identificación del vehículo (VIN) asociado a la venta.
         fecha (datetime): Fecha de la venta.
         precio (decimal): Precio de la venta.
+        version (int): Número de escrituras del registro (ver ChangeTracking).
+        updated_at (datetime): Fecha de la última escritura del registro.
     """
     __bind_key__ = 'automoviles'
     __tablename__ = 'venta'
@@ -116,4 +125,32 @@ class Venta(db.Model):
     id_vendedor = db.Column('ID_Vendedor', db.Integer, db.ForeignKey('vendedor.ID_Vendedor'), nullable=False)
     vin = db.Column('VIN', db.String(17), db.ForeignKey('vehiculo.VIN'), nullable=False)
     fecha = db.Column('Fecha', db.DateTime, nullable=False, default=db.func.current_timestamp())
-    precio = db.Column('Precio', db.Numeric(10, 2), nullable=False)
\ No newline at end of file
+    precio = db.Column('Precio', db.Numeric(10, 2), nullable=False)
+
+class VentaResumenMensual(db.Model):
+    """
+    Modelo que representa las ventas de un mes agregadas por vendedor, marca y modelo (tabla materializada
+    para reportes).
+
+    Se mantiene incrementalmente en la misma transacción que las escrituras de Venta.
+
+    Atributos:
+        __bind_key__ (str): Enlace a la base de datos 'automoviles'.
+        __tablename__ (str): Nombre de la tabla en la base de datos.
+        anio_mes (int): Año y mes de las ventas (AAAAMM).
+        id_vendedor (int): Identificador del vendedor.
+        marca (str): Marca de los vehículos vendidos.
+        modelo (str): Modelo de los vehículos vendidos.
+        unidades (int): Número de ventas.
+        ingresos (decimal): Suma de los precios de venta.
+        version (int): Número de escrituras de la fila; su suma en un rango de meses versiona los reportes.
+    """
+    __bind_key__ = 'automoviles'
+    __tablename__ = 'venta_resumen_mensual'
+    anio_mes = db.Column('Anio_Mes', db.Integer, primary_key=True)
+    id_vendedor = db.Column('ID_Vendedor', db.Integer, primary_key=True)
+    marca = db.Column('Marca', db.String(50), primary_key=True)
+    modelo = db.Column('Modelo', db.String(50), primary_key=True)
+    unidades = db.Column('Unidades', db.Integer, nullable=False, default=0)
+    ingresos = db.Column('Ingresos', db.Numeric(14, 2), nullable=False, default=0)
+    version = db.Column('Version', db.BigInteger, nullable=False, default=1)
@@ -1,7 +1,8 @@
 from models import db
+from models.tracking import ChangeTracking
 from sqlalchemy.orm import validates
 
-class Paciente(db.Model):
+class Paciente(ChangeTracking, db.Model):
     """
     Modelo que representa a un paciente.
 
@@ -15,6 +16,8 @@ class Paciente(db.Model):
         fecha_nacimiento (date): Fecha de nacimiento del paciente.
         historial_medico (str): Historial médico del paciente.
         citas (list): Lista de citas asociadas al paciente.
+        version (int): Número de escrituras del registro (ver ChangeTracking).
+        updated_at (datetime): Fecha de la última escritura del registro.
     """
     __bind_key__ = 'clinica'
     __tablename__ = 'paciente'
@@ -44,7 +47,7 @@ class Paciente(db.Model):
         assert len(telefono) <= 15, "El teléfono debe tener máximo 15 caracteres"
         return telefono
 
-class Medico(db.Model):
+class Medico(ChangeTracking, db.Model):
     """
     Modelo que representa a un médico.
 
@@ -57,6 +60,8 @@ class Medico(db.Model):
         licencia_medica (str): Licencia médica del médico.
         informacion_contacto (str): Información de contacto del médico.
         citas (list): Lista de citas asociadas al médico.
+        version (int): Número de escrituras del registro (ver ChangeTracking).
+        updated_at (datetime): Fecha de la última escritura del registro.
     """
     __bind_key__ = 'clinica'
     __tablename__ = 'medico'
@@ -67,7 +72,7 @@ class Medico(db.Model):
     informacion_contacto = db.Column('Informacion_Contacto', db.Text, nullable=False)
     citas = db.relationship('Cita', backref='medico', lazy=True)
 
-class Cita(db.Model):
+class Cita(ChangeTracking, db.Model):
     """
     Modelo que representa una cita médica.
 
@@ -79,16 +84,24 @@ class Cita(db.Model):
         id_medico (int): Identificador del médico asociado a la cita.
         fecha_hora (datetime): Fecha y hora de la cita.
         motivo_visita (str): Motivo de la visita.
+        version (int): Número de escrituras del registro (ver ChangeTracking).
+        updated_at (datetime): Fecha de la última escritura del registro.
+        __table_args__ (tuple): Índices de la tabla.
     """
     __bind_key__ = 'clinica'
     __tablename__ = 'cita'
+    __table_args__ = (
+        # Historial de un paciente por fecha (paginación por llave) y conteo de visitas por médico
+        db.Index('idx_cita_paciente_fecha', 'ID_Paciente', 'Fecha_Hora'),
+        db.Index('idx_cita_paciente_medico', 'ID_Paciente', 'ID_Medico'),
+    )
     id = db.Column('ID_Cita', db.Integer, primary_key=True)
     id_paciente = db.Column('ID_Paciente', db.Integer, db.ForeignKey('paciente.ID_Paciente'), nullable=False)
     id_medico = db.Column('ID_Medico', db.Integer, db.ForeignKey('medico.ID_Medico'), nullable=False)
     fecha_hora = db.Column('Fecha_Hora', db.DateTime, nullable=False, default=db.func.current_timestamp())
     motivo_visita = db.Column('Motivo_Visita', db.Text, nullable=False)
 
-class Tratamiento(db.Model):
+class Tratamiento(ChangeTracking, db.Model):
     """
     Modelo que representa un tratamiento médico.
 
@@ -99,10 +112,99 @@ class Tratamiento(db.Model):
         nombre (str): Nombre del tratamiento.
         descripcion (str): Descripción del tratamiento.
         costo (decimal): Costo del tratamiento.
+        version (int): Número de escrituras del registro (ver ChangeTracking).
+        updated_at (datetime): Fecha de la última escritura del registro.
     """
     __bind_key__ = 'clinica'
     __tablename__ = 'tratamiento'
     id = db.Column('ID_Tratamiento', db.Integer, primary_key=True)
     nombre = db.Column('Nombre', db.String(100), nullable=False)
     descripcion = db.Column('Descripcion', db.Text, nullable=False)
-    costo = db.Column('Costo', db.Numeric(10, 2), nullable=False)
\ No newline at end of file
+    costo = db.Column('Costo', db.Numeric(10, 2), nullable=False)
+
+
+class HorarioMedico(db.Model):
+    """
+    Modelo que representa un bloque del horario de atención semanal de un médico.
+
+    Atributos:
+        __bind_key__ (str): Enlace a la base de datos 'clinica'.
+        __tablename__ (str): Nombre de la tabla en la base de datos.
+        id (int): Identificador único del bloque de horario.
+        id_medico (int): Identificador del médico.
+        dia_semana (int): Día de la semana (0 = lunes, 6 = domingo).
+        hora_inicio (time): Hora de inicio de la atención.
+        hora_fin (time): Hora de fin de la atención.
+        duracion_minutos (int): Duración de cada cita en minutos.
+        __table_args__ (tuple): Índices de la tabla.
+    """
+    __bind_key__ = 'clinica'
+    __tablename__ = 'horario_medico'
+    __table_args__ = (db.Index('idx_horario_medico', 'ID_Medico'),)
+    id = db.Column('ID_Horario', db.Integer, primary_key=True)
+    id_medico = db.Column('ID_Medico', db.Integer, db.ForeignKey('medico.ID_Medico'), nullable=False)
+    dia_semana = db.Column('Dia_Semana', db.SmallInteger, nullable=False)
+    hora_inicio = db.Column('Hora_Inicio', db.Time, nullable=False)
+    hora_fin = db.Column('Hora_Fin', db.Time, nullable=False)
+    duracion_minutos = db.Column('Duracion_Minutos', db.Integer, nullable=False, default=30)
+
+    @validates('dia_semana')
+    def validate_dia_semana(self, key, dia_semana):
+        """
+        Valida que el día de la semana esté entre 0 (lunes) y 6 (domingo).
+
+        Args:
+            key (str): Nombre del campo.
+            dia_semana (int): Valor del día a validar.
+
+        Returns:
+            int: Día validado.
+
+        Raises:
+            AssertionError: Si el día está fuera de rango.
+        """
+        assert 0 <= int(dia_semana) <= 6, "El día de la semana debe estar entre 0 (lunes) y 6 (domingo)"
+        return int(dia_semana)
+
+    @validates('duracion_minutos')
+    def validate_duracion_minutos(self, key, duracion_minutos):
+        """
+        Valida que la duración de las citas sea positiva.
+
+        Args:
+            key (str): Nombre del campo.
+            duracion_minutos (int): Valor de la duración a validar.
+
+        Returns:
+            int: Duración validada.
+
+        Raises:
+            AssertionError: Si la duración no es positiva.
+        """
+        assert int(duracion_minutos) > 0, "La duración de las citas debe ser positiva"
+        return int(duracion_minutos)
+
+class CitaResumenDiario(db.Model):
+    """
+    Modelo que representa el número de citas de un médico en un día (tabla de resumen para reportes).
+
+    Se mantiene incrementalmente en la misma transacción que las escrituras de Cita.
+
+    Atributos:
+        __bind_key__ (str): Enlace a la base de datos 'clinica'.
+        __tablename__ (str): Nombre de la tabla en la base de datos.
+        __table_args__ (tuple): Índices de la tabla.
+        fecha (date): Día de las citas.
+        id_medico (int): Identificador del médico.
+        anio_mes (int): Año y mes del día (AAAAMM), para agrupar por mes.
+        anio_semana (int): Año y semana ISO del día (AAAASS), para agrupar por semana.
+        total (int): Número de citas del médico en el día.
+    """
+    __bind_key__ = 'clinica'
+    __tablename__ = 'cita_resumen_diario'
+    __table_args__ = (db.Index('idx_cita_resumen_medico_fecha', 'ID_Medico', 'Fecha'),)
+    fecha = db.Column('Fecha', db.Date, primary_key=True)
+    id_medico = db.Column('ID_Medico', db.Integer, primary_key=True)
+    anio_mes = db.Column('Anio_Mes', db.Integer, nullable=False)
+    anio_semana = db.Column('Anio_Semana', db.Integer, nullable=False)
+    total = db.Column('Total', db.Integer, nullable=False, default=0)
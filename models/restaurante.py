@@ -1,7 +1,8 @@
 from models import db
+from models.tracking import ChangeTracking
 from sqlalchemy.orm import validates
 
-class ClienteRestaurante(db.Model):
+class ClienteRestaurante(ChangeTracking, db.Model):
     """
     Modelo que representa a un cliente de restaurante.
 
@@ -13,6 +14,8 @@ class ClienteRestaurante(db.Model):
         correo_electronico (str): Correo electrónico del cliente.
         telefono (str): Teléfono del cliente.
         pedidos (list): Lista de pedidos asociados al cliente.
+        version (int): Número de escrituras del registro (ver ChangeTracking).
+        updated_at (datetime): Fecha de la última escritura del registro.
     """
     __bind_key__ = 'restaurante'
     __tablename__ = 'cliente'
@@ -40,7 +43,7 @@ class ClienteRestaurante(db.Model):
         assert '@' in correo_electronico, "Correo Electronico debe contener @"
         return correo_electronico
 
-class Empleado(db.Model):
+class Empleado(ChangeTracking, db.Model):
     """
     Modelo que representa a un empleado.
 
@@ -52,6 +55,8 @@ class Empleado(db.Model):
         posicion (str): Posición del empleado.
         fecha_contratacion (datetime): Fecha de contratación del empleado.
         pedidos (list): Lista de pedidos asociados al empleado.
+        version (int): Número de escrituras del registro (ver ChangeTracking).
+        updated_at (datetime): Fecha de la última escritura del registro.
     """
     __bind_key__ = 'restaurante'
     __tablename__ = 'empleado'
@@ -61,7 +66,7 @@ class Empleado(db.Model):
     fecha_contratacion = db.Column('Fecha_Contratacion', db.DateTime, nullable=False, default=db.func.current_timestamp())
     pedidos = db.relationship('Pedido', backref='empleado', lazy=True)
 
-class Plato(db.Model):
+class Plato(ChangeTracking, db.Model):
     """
     Modelo que representa un plato.
 
@@ -72,6 +77,8 @@ class Plato(db.Model):
         nombre (str): Nombre del plato.
         cantidad_disponible (int): Cantidad disponible del plato.
         unidad_medida (str): Unidad de medida del plato.
+        version (int): Número de escrituras del registro (ver ChangeTracking).
+        updated_at (datetime): Fecha de la última escritura del registro.
     """
     __bind_key__ = 'restaurante'
     __tablename__ = 'plato'
@@ -80,7 +87,7 @@ class Plato(db.Model):
     cantidad_disponible = db.Column('Cantidad_Disponible', db.Integer, nullable=False)
     unidad_medida = db.Column('Unidad_Medida', db.String(20), nullable=False)
 
-class Ingrediente(db.Model):
+class Ingrediente(ChangeTracking, db.Model):
     """
     Modelo que representa un ingrediente.
 
@@ -91,6 +98,8 @@ class Ingrediente(db.Model):
         nombre (str): Nombre del ingrediente.
         cantidad_disponible (int): Cantidad disponible del ingrediente.
         unidad_medida (str): Unidad de medida del ingrediente.
+        version (int): Número de escrituras del registro (ver ChangeTracking).
+        updated_at (datetime): Fecha de la última escritura del registro.
     """
     __bind_key__ = 'restaurante'
     __tablename__ = 'ingrediente'
@@ -99,21 +108,105 @@ class Ingrediente(db.Model):
     cantidad_disponible = db.Column('Cantidad_Disponible', db.Integer, nullable=False)
     unidad_medida = db.Column('Unidad_Medida', db.String(20), nullable=False)
 
-class Pedido(db.Model):
+class Pedido(ChangeTracking, db.Model):
     """
     Modelo que representa un pedido.
 
     Atributos:
         __bind_key__ (str): Enlace a la base de datos 'restaurante'.
         __tablename__ (str): Nombre de la tabla en la base de datos.
+        __table_args__ (tuple): Índices de la tabla.
         id (int): Identificador único del pedido.
         id_cliente (int): Identificador del cliente asociado al pedido.
         id_empleado (int): Identificador del empleado asociado al pedido.
         fecha_hora (datetime): Fecha y hora del pedido.
+        version (int): Número de escrituras del registro (ver ChangeTracking).
+        updated_at (datetime): Fecha de la última escritura del registro.
     """
     __bind_key__ = 'restaurante'
     __tablename__ = 'pedido'
+    # Índice de cobertura para las series de tiempo agrupadas por empleado o cliente
+    __table_args__ = (db.Index('idx_pedido_fecha_hora', 'Fecha_Hora', 'ID_Empleado', 'ID_Cliente'),)
     id = db.Column('ID_Pedido', db.Integer, primary_key=True)
     id_cliente = db.Column('ID_Cliente', db.Integer, db.ForeignKey('cliente.ID_Cliente'), nullable=False)
     id_empleado = db.Column('ID_Empleado', db.Integer, db.ForeignKey('empleado.ID_Empleado'), nullable=False)
-    fecha_hora = db.Column('Fecha_Hora', db.DateTime, nullable=False, default=db.func.current_timestamp())
\ No newline at end of file
+    fecha_hora = db.Column('Fecha_Hora', db.DateTime, nullable=False, default=db.func.current_timestamp())
+
+
+class LineaPedido(db.Model):
+    """
+    Modelo que representa una línea de un pedido (plato y cantidad).
+
+    Atributos:
+        __bind_key__ (str): Enlace a la base de datos 'restaurante'.
+        __tablename__ (str): Nombre de la tabla en la base de datos.
+        __table_args__ (tuple): Índices de la tabla.
+        id (int): Identificador único de la línea.
+        id_pedido (int): Identificador del pedido.
+        id_plato (int): Identificador del plato pedido.
+        cantidad (int): Cantidad de platos.
+    """
+    __bind_key__ = 'restaurante'
+    __tablename__ = 'linea_pedido'
+    __table_args__ = (db.Index('idx_linea_pedido_pedido', 'ID_Pedido'),)
+    id = db.Column('ID_Linea', db.Integer, primary_key=True)
+    id_pedido = db.Column('ID_Pedido', db.Integer, db.ForeignKey('pedido.ID_Pedido', ondelete='CASCADE'), nullable=False)
+    id_plato = db.Column('ID_Platillo', db.Integer, db.ForeignKey('plato.ID_Platillo'), nullable=False)
+    cantidad = db.Column('Cantidad', db.Integer, nullable=False)
+
+    @validates('cantidad')
+    def validate_cantidad(self, key, cantidad):
+        """
+        Valida que la cantidad sea positiva.
+
+        Args:
+            key (str): Nombre del campo.
+            cantidad (int): Cantidad a validar.
+
+        Returns:
+            int: Cantidad validada.
+
+        Raises:
+            AssertionError: Si la cantidad no es positiva.
+        """
+        assert int(cantidad) > 0, "Cantidad debe ser mayor que 0"
+        return cantidad
+
+class RecetaPlato(db.Model):
+    """
+    Modelo que representa la cantidad de un ingrediente que consume cada unidad de un plato.
+
+    Atributos:
+        __bind_key__ (str): Enlace a la base de datos 'restaurante'.
+        __tablename__ (str): Nombre de la tabla en la base de datos.
+        __table_args__ (tuple): Restricciones de la tabla.
+        id (int): Identificador único del renglón de la receta.
+        id_plato (int): Identificador del plato.
+        id_ingrediente (int): Identificador del ingrediente.
+        cantidad (int): Cantidad del ingrediente por unidad del plato, en su unidad de medida.
+    """
+    __bind_key__ = 'restaurante'
+    __tablename__ = 'receta_plato'
+    __table_args__ = (db.UniqueConstraint('ID_Platillo', 'ID_Ingrediente', name='uq_receta_plato_ingrediente'),)
+    id = db.Column('ID_Receta', db.Integer, primary_key=True)
+    id_plato = db.Column('ID_Platillo', db.Integer, db.ForeignKey('plato.ID_Platillo', ondelete='CASCADE'), nullable=False)
+    id_ingrediente = db.Column('ID_Ingrediente', db.Integer, db.ForeignKey('ingrediente.ID_Ingrediente'), nullable=False)
+    cantidad = db.Column('Cantidad', db.Integer, nullable=False)
+
+    @validates('cantidad')
+    def validate_cantidad(self, key, cantidad):
+        """
+        Valida que la cantidad sea positiva.
+
+        Args:
+            key (str): Nombre del campo.
+            cantidad (int): Cantidad a validar.
+
+        Returns:
+            int: Cantidad validada.
+
+        Raises:
+            AssertionError: Si la cantidad no es positiva.
+        """
+        assert int(cantidad) > 0, "Cantidad debe ser mayor que 0"
+        return cantidad
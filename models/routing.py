@@ -0,0 +1,433 @@
+# Este archivo contiene el enrutamiento de lecturas hacia réplicas de solo lectura para cada bind de la base de datos.
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+import sqlalchemy as sa
+from flask import current_app, g, has_app_context, request
+from flask_sqlalchemy.session import Session
+
+# Cabecera HTTP con la que se intercambian los tokens de consistencia
+CONSISTENCY_HEADER = 'X-Consistency-Token'
+
+# Resolución del retraso que informa MySQL (Seconds_Behind_Source se trunca a segundos enteros)
+LAG_RESOLUTION = 1.0
+
+# Posición válida en un token: instante en milisegundos o conjunto de GTID ('uuid[:etiqueta]:1-5,uuid:7')
+_POSITION = re.compile(r'\d+|[0-9A-Fa-f-]+(:[A-Za-z0-9_-]+)+(,[0-9A-Fa-f-]+(:[A-Za-z0-9_-]+)+)*')
+
+
+class Replica:
+    """
+    Réplica de solo lectura asociada a un bind.
+
+    Atributos:
+        engine (Engine): Motor de SQLAlchemy de la réplica.
+        ejected_until (float): Instante hasta el cual la réplica está fuera de servicio.
+        lag (float): Retraso de replicación medido en segundos.
+        checked_at (float): Instante de la última verificación de salud.
+        gtid_executed (Optional[str]): GTID ejecutados por la réplica en la última verificación, si usa GTID.
+    """
+
+    def __init__(self, engine):
+        """
+        Inicializa la réplica con su motor.
+
+        Args:
+            engine (Engine): Motor de SQLAlchemy de la réplica.
+        """
+        self.engine = engine
+        self.ejected_until = 0.0
+        self.lag = 0.0
+        self.checked_at = 0.0
+        self.gtid_executed = None
+
+    @property
+    def applied_at(self):
+        """
+        Instante (epoch en segundos) hasta el cual la réplica tiene aplicadas con seguridad las escrituras del
+        primario. Se resta además la resolución del retraso medido, que puede ser hasta un segundo mayor.
+
+        Returns:
+            float: Instante de la última verificación menos el retraso medido y su resolución.
+        """
+        return self.checked_at - self.lag - LAG_RESOLUTION
+
+    def has_applied(self, gtid_set):
+        """
+        Indica si la réplica ya aplicó todas las transacciones de un conjunto de GTID del primario, primero con
+        los GTID de la última verificación de salud y, si no alcanzan, consultando a la réplica.
+
+        Args:
+            gtid_set (str): Conjunto de GTID ejecutados en el primario (ver ReplicaRouter.issue_token).
+
+        Returns:
+            bool: True si el conjunto está contenido en los GTID ejecutados por la réplica.
+        """
+        # gtid_executed solo crece, así que el último valor verificado basta para confirmar sin consultar
+        if self.gtid_executed and _gtid_subset(gtid_set, self.gtid_executed):
+            return True
+        try:
+            with self.engine.connect() as connection:
+                return bool(connection.execute(
+                    sa.text('SELECT GTID_SUBSET(:gtid_set, @@GLOBAL.gtid_executed)'), {'gtid_set': gtid_set}
+                ).scalar())
+        except sa.exc.DBAPIError:
+            return False
+
+    def eject(self, seconds):
+        """
+        Saca la réplica de servicio durante un número de segundos.
+
+        Args:
+            seconds (float): Duración de la expulsión.
+        """
+        self.ejected_until = time.time() + seconds
+
+
+class ReplicaRouter:
+    """
+    Enruta las consultas de solo lectura hacia réplicas sanas de cada bind y emite
+    tokens de consistencia para garantizar lectura de las propias escrituras.
+
+    En MySQL con GTID el token lleva los GTID ejecutados en el primario tras la escritura, y solo se lee de
+    las réplicas que ya los aplicaron (GTID_SUBSET). Sin GTID lleva el instante de la escritura, y solo se lee
+    de las réplicas cuyo retraso medido garantiza haberlo alcanzado.
+
+    La configuración se lee de la aplicación Flask:
+        SQLALCHEMY_REPLICAS (dict): URLs de réplicas por bind, p. ej. {'clinica': ['mysql+pymysql://...']}.
+        REPLICA_MAX_LAG (float): Retraso máximo en segundos antes de expulsar una réplica.
+        REPLICA_CHECK_INTERVAL (float): Segundos entre verificaciones de salud de cada réplica.
+        REPLICA_EJECT_SECONDS (float): Segundos que una réplica fallida permanece fuera de servicio.
+    """
+
+    def __init__(self):
+        """
+        Inicializa el enrutador sin réplicas registradas.
+        """
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        Crea los motores de las réplicas configuradas para la aplicación.
+
+        Args:
+            app (Flask): La instancia de la aplicación Flask.
+        """
+        app.config.setdefault('SQLALCHEMY_REPLICAS', {})
+        app.config.setdefault('REPLICA_MAX_LAG', 5.0)
+        app.config.setdefault('REPLICA_CHECK_INTERVAL', 10.0)
+        app.config.setdefault('REPLICA_EJECT_SECONDS', 30.0)
+
+        replicas = {}
+        for bind_key, urls in app.config['SQLALCHEMY_REPLICAS'].items():
+            replicas[bind_key] = [self._create_replica(app, url) for url in urls if url]
+        app.extensions['replicas'] = replicas
+        app.extensions['replica_router'] = self
+
+    def _create_replica(self, app, url):
+        """
+        Crea una réplica y registra la expulsión automática ante errores de conexión.
+
+        Args:
+            app (Flask): La instancia de la aplicación Flask.
+            url (str): URL de conexión de la réplica.
+
+        Returns:
+            Replica: La réplica creada.
+        """
+        # Las opciones del primario (SSL, plugin de autenticación) solo aplican a MySQL
+        options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})) if url.startswith('mysql') else {}
+        replica = Replica(sa.create_engine(url, **options))
+        eject_seconds = app.config['REPLICA_EJECT_SECONDS']
+
+        @sa.event.listens_for(replica.engine, 'handle_error')
+        def _eject_on_disconnect(context):
+            if context.is_disconnect:
+                replica.eject(eject_seconds)
+
+        return replica
+
+    def _check(self, replica, bind_key):
+        """
+        Verifica la salud y el retraso de una réplica, expulsándola si falla o se atrasa, y guarda sus GTID
+        ejecutados para comprobar los tokens de consistencia sin consultarla.
+
+        Args:
+            replica (Replica): Réplica a verificar.
+            bind_key (str): Bind al que pertenece la réplica.
+        """
+        config = current_app.config
+        try:
+            with replica.engine.connect() as connection:
+                lag = 0.0
+                gtid_executed = None
+                if replica.engine.dialect.name == 'mysql':
+                    status = connection.exec_driver_sql('SHOW REPLICA STATUS').mappings().first()
+                    if status is not None:
+                        behind = status.get('Seconds_Behind_Source')
+                        # Un valor nulo indica que el hilo SQL de replicación está detenido
+                        lag = float(behind) if behind is not None else float('inf')
+                    gtid_executed = ''.join((connection.exec_driver_sql(
+                        'SELECT @@GLOBAL.gtid_executed').scalar() or '').split()) or None
+                else:
+                    connection.exec_driver_sql('SELECT 1')
+        except sa.exc.DBAPIError:
+            current_app.logger.warning(
+                'Réplica de %s no disponible: %s', bind_key, replica.engine.url.render_as_string(hide_password=True)
+            )
+            replica.eject(config['REPLICA_EJECT_SECONDS'])
+            return
+
+        replica.lag = lag
+        replica.gtid_executed = gtid_executed
+        replica.checked_at = time.time()
+        if lag > config['REPLICA_MAX_LAG']:
+            replica.eject(config['REPLICA_CHECK_INTERVAL'])
+
+    def pick(self, bind_key, position=None):
+        """
+        Elige una réplica sana del bind que ya haya aplicado las escrituras hasta una posición del primario.
+
+        La elección se decide una vez por solicitud y bind, y se reutiliza en las consultas siguientes mientras
+        la réplica elegida siga en servicio.
+
+        Args:
+            bind_key (str): Bind de la consulta.
+            position (Optional[str]): Posición del token de consistencia del bind: conjunto de GTID o instante
+                en milisegundos. Sin ella sirve cualquier réplica sana.
+
+        Returns:
+            Optional[Engine]: Motor de la réplica elegida o None si se debe usar el primario.
+        """
+        replicas = current_app.extensions.get('replicas', {}).get(bind_key)
+        if not replicas:
+            return None
+
+        picks = g.setdefault('replica_picks', {})
+        if (bind_key, position) in picks:
+            replica = picks[bind_key, position]
+            if replica is None or replica.ejected_until <= time.time():
+                return replica.engine if replica is not None else None
+
+        replica = self._choose(replicas, bind_key, position)
+        picks[bind_key, position] = replica
+        return replica.engine if replica is not None else None
+
+    def _choose(self, replicas, bind_key, position):
+        """
+        Verifica las réplicas del bind que lo requieran y elige una que ya haya aplicado la posición.
+
+        Args:
+            replicas (List[Replica]): Réplicas del bind.
+            bind_key (str): Bind de la consulta.
+            position (Optional[str]): Posición del token de consistencia del bind (ver pick).
+
+        Returns:
+            Optional[Replica]: Réplica elegida o None si se debe usar el primario.
+        """
+        now = time.time()
+        interval = current_app.config['REPLICA_CHECK_INTERVAL']
+        for replica in replicas:
+            if replica.ejected_until <= now and now - replica.checked_at >= interval:
+                # Solo un hilo verifica cada réplica; los demás usan el último estado conocido
+                if self._lock.acquire(blocking=False):
+                    try:
+                        self._check(replica, bind_key)
+                    finally:
+                        self._lock.release()
+
+        candidates = [replica for replica in replicas if replica.ejected_until <= now and replica.checked_at > 0]
+        if position is not None and position.isdigit():
+            candidates = [replica for replica in candidates if replica.applied_at >= int(position) / 1000]
+        elif position is not None:
+            # Se pregunta a las réplicas en orden aleatorio y se usa la primera que ya aplicó los GTID
+            random.shuffle(candidates)
+            return next((replica for replica in candidates if replica.has_applied(position)), None)
+        if not candidates:
+            return None
+        return random.choice(candidates)
+
+    @staticmethod
+    def _position(bind_key):
+        """
+        Obtiene la posición del primario de un bind tras una escritura confirmada: sus GTID ejecutados, si el bind
+        tiene réplicas y el primario es MySQL con GTID, o el instante actual en milisegundos.
+
+        Args:
+            bind_key (str): Bind en el que se realizó la escritura.
+
+        Returns:
+            str: Conjunto de GTID o instante en milisegundos.
+        """
+        engine = current_app.extensions['sqlalchemy'].engines.get(bind_key)
+        if current_app.extensions.get('replicas', {}).get(bind_key) and not g.get('tenant') \
+                and engine is not None and engine.dialect.name == 'mysql':
+            try:
+                with engine.connect() as connection:
+                    gtid_set = connection.exec_driver_sql('SELECT @@GLOBAL.gtid_executed').scalar()
+            except sa.exc.DBAPIError:
+                gtid_set = None
+            if gtid_set:
+                # MySQL separa los conjuntos de cada servidor con saltos de línea
+                return ''.join(gtid_set.split())
+        return str(int(time.time() * 1000))
+
+    @staticmethod
+    def issue_token(bind_key):
+        """
+        Emite un token de consistencia para una escritura recién confirmada en un bind.
+
+        El token se combina con el recibido en la solicitud para conservar las escrituras previas en otros binds.
+
+        Args:
+            bind_key (str): Bind en el que se realizó la escritura.
+
+        Returns:
+            str: Token de consistencia con formato 'bind=posición[;bind=posición]', donde la posición es un
+            conjunto de GTID o un instante en milisegundos.
+        """
+        tokens = ReplicaRouter.parse_token(request.headers.get(CONSISTENCY_HEADER, '')) if request else {}
+        tokens[bind_key] = ReplicaRouter._position(bind_key)
+        return ';'.join(f'{key}={value}' for key, value in sorted(tokens.items()))
+
+    @staticmethod
+    def parse_token(value):
+        """
+        Interpreta un token de consistencia, ignorando las partes mal formadas.
+
+        Args:
+            value (str): Token recibido del cliente.
+
+        Returns:
+            dict: Posición (conjunto de GTID o instante en milisegundos) de la última escritura por bind.
+        """
+        tokens = {}
+        for part in value.split(';'):
+            bind_key, _, position = part.strip().partition('=')
+            if bind_key and _POSITION.fullmatch(position):
+                tokens[bind_key] = position
+        return tokens
+
+    @contextmanager
+    def reading(self):
+        """
+        Marca las consultas ejecutadas dentro del bloque como lecturas aptas para réplicas.
+        """
+        previous = g.get('db_read_only', False)
+        g.db_read_only = True
+        try:
+            yield
+        finally:
+            g.db_read_only = previous
+
+    @contextmanager
+    def primary(self):
+        """
+        Envía al primario las consultas ejecutadas dentro del bloque, aunque esté dentro de un bloque reading().
+        """
+        previous = g.get('db_read_only', False)
+        g.db_read_only = False
+        try:
+            yield
+        finally:
+            g.db_read_only = previous
+
+
+class RoutingSession(Session):
+    """
+    Sesión que envía las consultas al motor del inquilino de la solicitud, si lo hay; en caso contrario,
+    envía a una réplica las consultas marcadas como de solo lectura y el resto al primario del bind.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        """
+        Selecciona el motor del inquilino, una réplica para las lecturas o delega en la selección por bind key.
+
+        Returns:
+            Engine: Motor con el que se ejecutará la consulta.
+        """
+        if bind is None and has_app_context():
+            bind_key = _bind_key_for(mapper, clause)
+            tenant = g.get('tenant')
+            if tenant and bind_key is not None:
+                engine = current_app.extensions['tenant_registry'].engine_for(bind_key, tenant)
+                if engine is not None:
+                    return engine
+
+            if bind_key is not None and g.get('db_read_only') and not (self.new or self.dirty or self.deleted):
+                tokens = ReplicaRouter.parse_token(request.headers.get(CONSISTENCY_HEADER, '')) if request else {}
+                engine = current_app.extensions['replica_router'].pick(bind_key, tokens.get(bind_key))
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _gtid_intervals(gtid_set):
+    """
+    Interpreta un conjunto de GTID ('uuid:1-5:7,uuid:etiqueta:1-3') en los intervalos de cada origen.
+
+    Args:
+        gtid_set (str): Conjunto de GTID sin espacios.
+
+    Returns:
+        dict: Lista de intervalos (inicio, fin) por par (uuid, etiqueta).
+    """
+    intervals = {}
+    for part in gtid_set.split(','):
+        uuid, *pieces = part.split(':')
+        tag = ''
+        for piece in pieces:
+            if not piece[:1].isdigit():
+                tag = piece.lower()
+                continue
+            start, _, end = piece.partition('-')
+            intervals.setdefault((uuid.lower(), tag), []).append((int(start), int(end or start)))
+    return intervals
+
+
+def _gtid_subset(gtid_set, executed):
+    """
+    Indica si un conjunto de GTID está contenido en otro, como GTID_SUBSET de MySQL.
+
+    Args:
+        gtid_set (str): Conjunto de GTID buscado.
+        executed (str): Conjunto de GTID ejecutados.
+
+    Returns:
+        bool: True si cada transacción de gtid_set está en executed.
+    """
+    executed = {source: sorted(ranges) for source, ranges in _gtid_intervals(executed).items()}
+    for source, ranges in _gtid_intervals(gtid_set).items():
+        for start, end in ranges:
+            # Se extiende la cobertura desde el inicio con los intervalos ejecutados, ordenados por inicio
+            covered = start - 1
+            for low, high in executed.get(source, []):
+                if low <= covered + 1:
+                    covered = max(covered, high)
+            if covered < end:
+                return False
+    return True
+
+
+def _bind_key_for(mapper, clause):
+    """
+    Obtiene el bind key de la tabla asociada al mapper o a la sentencia consultada.
+
+    Args:
+        mapper: Mapper o clase del modelo consultado.
+        clause: Sentencia o tabla consultada.
+
+    Returns:
+        Optional[str]: Bind key de la tabla o None si no se puede determinar.
+    """
+    table = None
+    if mapper is not None:
+        table = sa.inspect(mapper).local_table
+    elif isinstance(clause, sa.Table):
+        table = clause
+    elif isinstance(clause, sa.sql.dml.UpdateBase) and isinstance(clause.table, sa.Table):
+        table = clause.table
+    return table.metadata.info.get('bind_key') if table is not None else None
@@ -0,0 +1,147 @@
+# Este archivo contiene el registro de binds por inquilino (tenant), con motores creados bajo demanda y desalojados por LRU.
+import re
+import threading
+from collections import OrderedDict
+
+import sqlalchemy as sa
+from flask import current_app, g, has_app_context, jsonify, request
+
+# Cabecera HTTP con la que el cliente elige el inquilino
+TENANT_HEADER = 'X-Tenant'
+
+# Los identificadores de inquilino forman parte del nombre del esquema, por lo que se restringen
+TENANT_PATTERN = re.compile(r'^[A-Za-z0-9_]{1,48}$')
+
+
+class TenantCapacityError(RuntimeError):
+    """
+    Excepción lanzada cuando no hay conexiones disponibles en el presupuesto global para un nuevo inquilino.
+    """
+
+
+def current_tenant():
+    """
+    Obtiene el inquilino elegido para la solicitud en curso.
+
+    Returns:
+        Optional[str]: Identificador del inquilino o None si se usan los binds por defecto.
+    """
+    return g.get('tenant') if has_app_context() else None
+
+
+class TenantRegistry:
+    """
+    Registro de motores por (bind, inquilino). Los mismos modelos sirven a todos los inquilinos:
+    solo cambia el motor al que la sesión envía las consultas.
+
+    La configuración se lee de la aplicación Flask:
+        TENANT_URL_TEMPLATES (dict): Plantilla de URL por bind con el marcador '{tenant}'.
+        TENANT_ALLOWLIST (list): Inquilinos permitidos; si está vacío se acepta cualquiera con formato válido.
+        TENANT_POOL_SIZE (int): Conexiones persistentes por motor de inquilino.
+        TENANT_MAX_OVERFLOW (int): Conexiones adicionales por motor de inquilino.
+        TENANT_CONNECTION_BUDGET (int): Máximo de conexiones entre todos los motores de inquilinos.
+    """
+
+    def __init__(self):
+        """
+        Inicializa el registro sin motores.
+        """
+        self._lock = threading.Lock()
+        self._engines = OrderedDict()
+
+    def init_app(self, app):
+        """
+        Configura el registro y la selección del inquilino en cada solicitud.
+
+        Args:
+            app (Flask): La instancia de la aplicación Flask.
+        """
+        app.config.setdefault('TENANT_URL_TEMPLATES', {})
+        app.config.setdefault('TENANT_ALLOWLIST', [])
+        app.config.setdefault('TENANT_POOL_SIZE', 2)
+        app.config.setdefault('TENANT_MAX_OVERFLOW', 3)
+        app.config.setdefault('TENANT_CONNECTION_BUDGET', 200)
+        app.extensions['tenant_registry'] = self
+
+        @app.url_value_preprocessor
+        def _pull_tenant(endpoint, values):
+            # Las rutas con prefijo '/api/tenants/<tenant>/...' reciben el inquilino como segmento de URL
+            g.tenant = values.pop('tenant', None) if values else None
+
+        @app.before_request
+        def _select_tenant():
+            tenant = g.get('tenant') or request.headers.get(TENANT_HEADER)
+            if not tenant:
+                g.tenant = None
+                return None
+            allowlist = app.config['TENANT_ALLOWLIST']
+            if not TENANT_PATTERN.match(tenant) or (allowlist and tenant not in allowlist):
+                return jsonify({'message': f'Inquilino no válido: {tenant}'}), 400
+            g.tenant = tenant
+            return None
+
+        @app.errorhandler(TenantCapacityError)
+        def _handle_capacity(e):
+            return jsonify({'message': str(e)}), 503, {'Retry-After': '1'}
+
+    def engine_for(self, bind_key, tenant):
+        """
+        Obtiene el motor de un inquilino para un bind, creándolo bajo demanda.
+
+        Args:
+            bind_key (str): Bind del modelo consultado.
+            tenant (str): Identificador del inquilino.
+
+        Returns:
+            Optional[Engine]: Motor del inquilino o None si el bind no admite inquilinos.
+
+        Raises:
+            TenantCapacityError: Si el presupuesto de conexiones está agotado por motores en uso.
+        """
+        template = current_app.config['TENANT_URL_TEMPLATES'].get(bind_key)
+        if template is None:
+            return None
+
+        key = (bind_key, tenant)
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is not None:
+                self._engines.move_to_end(key)
+                return engine
+
+            config = current_app.config
+            capacity = config['TENANT_POOL_SIZE'] + config['TENANT_MAX_OVERFLOW']
+            self._make_room(capacity, config['TENANT_CONNECTION_BUDGET'])
+
+            url = template.format(tenant=tenant)
+            options = {'pool_size': config['TENANT_POOL_SIZE'], 'max_overflow': config['TENANT_MAX_OVERFLOW']}
+            if url.startswith('mysql'):
+                options.update(config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+                options.setdefault('pool_recycle', 3600)
+            engine = sa.create_engine(url, **options)
+            self._engines[key] = engine
+            return engine
+
+    def _make_room(self, capacity, budget):
+        """
+        Desaloja los motores inactivos menos usados recientemente hasta que quepa un nuevo motor.
+
+        Args:
+            capacity (int): Conexiones máximas que reservará el nuevo motor.
+            budget (int): Presupuesto global de conexiones.
+
+        Raises:
+            TenantCapacityError: Si no hay motores inactivos que desalojar.
+        """
+        reserved = len(self._engines) * capacity
+        for key in list(self._engines):
+            if reserved + capacity <= budget:
+                return
+            engine = self._engines[key]
+            # Solo se desalojan motores sin conexiones prestadas
+            if engine.pool.checkedout() == 0:
+                del self._engines[key]
+                engine.dispose()
+                reserved -= capacity
+        if reserved + capacity > budget:
+            raise TenantCapacityError('Presupuesto de conexiones de inquilinos agotado')
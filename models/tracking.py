@@ -0,0 +1,135 @@
+# Este archivo contiene el seguimiento de cambios: versión de fila, fecha de actualización y registro de eliminaciones.
+from datetime import datetime, timedelta
+from typing import Iterable
+from sqlalchemy import bindparam, insert, literal_column, select, text
+from sqlalchemy.dialects import mysql
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import declared_attr
+from sqlalchemy.sql.functions import FunctionElement
+from models import db
+
+# Binds cuyas tablas tienen seguimiento de cambios
+BINDS = ('clinica', 'restaurante', 'automoviles')
+
+# Fecha con microsegundos, para ordenar las escrituras de un mismo segundo
+PreciseDateTime = db.DateTime().with_variant(mysql.DATETIME(fsp=6), 'mysql')
+
+
+class exact_now(FunctionElement):
+    """
+    Fecha y hora del servidor de base de datos en el instante en que se evalúa, con microsegundos. En MySQL es
+    SYSDATE(6) y no NOW(6), que devuelve la hora de inicio de la sentencia: así la fecha de cada fila escrita es
+    posterior al inicio de su transacción (ver stable_until).
+    """
+    type = PreciseDateTime
+    inherit_cache = True
+
+
+@compiles(exact_now, 'mysql')
+def _exact_now_mysql(element, compiler, **kw):
+    return 'SYSDATE(6)'
+
+
+@compiles(exact_now)
+def _exact_now(element, compiler, **kw):
+    return "STRFTIME('%Y-%m-%d %H:%M:%f000', 'now', 'localtime')"
+
+
+# Registros eliminados de las tablas con seguimiento (tombstones), una tabla por bind
+eliminados = {
+    bind: db.Table(
+        'cambio_eliminado',
+        db.Column('ID_Eliminado', db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True),
+        db.Column('Tabla', db.String(50), nullable=False),
+        db.Column('Llave', db.String(64), nullable=False),
+        db.Column('Fecha', PreciseDateTime, nullable=False),
+        db.Index('idx_cambio_eliminado_tabla_fecha', 'Tabla', 'Fecha', 'ID_Eliminado'),
+        bind_key=bind
+    )
+    for bind in BINDS
+}
+
+
+def record_deletes(session, model, keys: Iterable) -> None:
+    """
+    Registra en cambio_eliminado los registros eliminados de una tabla con seguimiento, dentro de la
+    transacción en curso, para que los clientes que sincronizan por fecha también reciban las eliminaciones.
+
+    Args:
+        session: Sesión de la transacción en curso.
+        model (db.Model): Modelo con seguimiento de cambios.
+        keys (Iterable): Llaves primarias de los registros eliminados.
+    """
+    keys = list(keys)
+    if not keys:
+        return
+    table = eliminados[model.__bind_key__]
+    statement = insert(table).values(Tabla=model.__tablename__, Llave=bindparam('llave'), Fecha=exact_now())
+    session.connection(bind_arguments={'mapper': model}).execute(statement, [{'llave': str(key)} for key in keys])
+
+
+def stable_until(session, model, margin: float) -> datetime:
+    """
+    Obtiene la fecha antes de la cual ya no puede confirmarse ninguna escritura de la tabla de un modelo.
+
+    En MySQL es el inicio de la transacción activa más antigua (information_schema.INNODB_TRX, que requiere el
+    privilegio PROCESS) o, sin transacciones activas, la hora actual: como cada fila se escribe con una fecha
+    posterior al inicio de su transacción (ver exact_now), las filas con una fecha anterior ya se confirmaron
+    o se revirtieron. Se resta un margen para cubrir la resolución de un segundo de INNODB_TRX.
+
+    Se debe consultar en el primario y antes de leer las filas, en una transacción nueva, para que la lectura
+    vea todas las escrituras confirmadas antes de la fecha.
+
+    Args:
+        session: Sesión con la que se leen los cambios.
+        model (db.Model): Modelo con seguimiento de cambios.
+        margin (float): Segundos que se restan a la fecha.
+
+    Returns:
+        datetime: Fecha límite de los cambios que se pueden entregar.
+    """
+    connection = session.connection(bind_arguments={'mapper': model})
+    if connection.dialect.name == 'mysql':
+        now, oldest = connection.execute(
+            text('SELECT SYSDATE(6), (SELECT MIN(trx_started) FROM information_schema.INNODB_TRX)')
+        ).one()
+        until = min(now, oldest) if oldest is not None else now
+    else:
+        until = connection.scalar(select(exact_now()))
+    return until - timedelta(seconds=margin)
+
+
+class ChangeTracking:
+    """
+    Mezcla que agrega el seguimiento de cambios a un modelo: el número de escrituras del registro y la fecha de
+    la última, que asigna la base de datos en cada inserción o actualización (también en las hechas con
+    sentencias INSERT y UPDATE sin pasar por el modelo). Ninguna de las dos requiere bloqueos fuera de la fila
+    escrita, y no se pueden escribir desde la API.
+
+    Atributos:
+        version (int): Número de escrituras del registro.
+        updated_at (datetime): Fecha de la última escritura del registro.
+    """
+
+    @declared_attr
+    def version(cls):
+        return db.Column('Version', db.BigInteger, nullable=False, default=1,
+                         onupdate=literal_column('Version') + 1, info={'tracking': True})
+
+    @declared_attr
+    def updated_at(cls):
+        return db.Column('Fecha_Actualizacion', PreciseDateTime, nullable=False, default=exact_now(),
+                         onupdate=exact_now(), index=True, info={'tracking': True})
+
+
+def is_tracked(model) -> bool:
+    """
+    Indica si un modelo tiene seguimiento de cambios.
+
+    Args:
+        model (db.Model): Modelo.
+
+    Returns:
+        bool: True si el modelo usa ChangeTracking.
+    """
+    return isinstance(model, type) and issubclass(model, ChangeTracking)
@@ -1,5 +1,28 @@
 # Este archivo es el encargado de exportar las clases de los repositorios
 from .base_repository import BaseRepository
+from .audit_log import AuditLog, audit_log
+from .audit_repository import AuditRepository
+from .cita_repository import CitaRepository
+from .cita_resumen_repository import CitaResumenRepository
+from .medico_repository import MedicoRepository
+from .horario_medico_repository import HorarioMedicoRepository
+from .agenda_index import AgendaIndex
+from .batch import batch, after_commit, in_batch
+from .exceptions import ConflictError, InsufficientStockError, InvalidExpressionError
+from .filter_expression import compile_assignments, compile_filter
+from .identity_cache import IdentityCache
+from .reference_snapshot import ReferenceSnapshot
+from .single_flight import SingleFlight
+from .change_feed import ChangeFeed, change_feed
+from .transaction_retry import TransactionRetry, transaction_retry
+from .pedido_repository import PedidoRepository
+from .vehiculo_facet_index import VehiculoFacetIndex
+from .vehiculo_repository import VehiculoRepository
+from .venta_repository import VentaRepository
+from .venta_resumen_repository import VentaResumenRepository
 
 # Exportamos las clases
-__all__ = ['BaseRepository']
\ No newline at end of file
+__all__ = ['BaseRepository', 'AuditLog', 'audit_log', 'AuditRepository', 'CitaRepository', 'CitaResumenRepository', 'MedicoRepository', 'HorarioMedicoRepository',
+           'AgendaIndex', 'batch', 'after_commit', 'in_batch', 'ConflictError', 'InsufficientStockError', 'InvalidExpressionError', 'compile_assignments',
+           'compile_filter', 'IdentityCache', 'ReferenceSnapshot', 'SingleFlight', 'ChangeFeed', 'change_feed', 'TransactionRetry', 'transaction_retry', 'PedidoRepository',
+           'VentaRepository', 'VentaResumenRepository', 'VehiculoFacetIndex', 'VehiculoRepository']
\ No newline at end of file
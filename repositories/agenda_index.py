@@ -0,0 +1,196 @@
+# Este archivo contiene el índice en memoria de las citas reservadas de cada médico.
+import bisect
+import threading
+import time
+from array import array
+from datetime import datetime, timedelta
+
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import select
+from models import Cita, current_tenant, replica_router
+
+EPOCH = datetime(1970, 1, 1)
+MINUTE = timedelta(minutes=1)
+
+
+def to_minutes(value: datetime) -> int:
+    """
+    Convierte una fecha y hora en minutos desde 1970-01-01, sin considerar zona horaria.
+
+    Args:
+        value (datetime): Fecha y hora a convertir.
+
+    Returns:
+        int: Minutos transcurridos.
+    """
+    return (value.replace(tzinfo=None) - EPOCH) // MINUTE
+
+
+def from_minutes(value: int) -> datetime:
+    """
+    Convierte minutos desde 1970-01-01 en fecha y hora.
+
+    Args:
+        value (int): Minutos transcurridos.
+
+    Returns:
+        datetime: Fecha y hora correspondiente.
+    """
+    return EPOCH + value * MINUTE
+
+
+class AgendaIndex:
+    """
+    Índice de intervalos de las citas reservadas por médico, a partir del día anterior a la carga.
+
+    Cada médico tiene un arreglo ordenado con el inicio de sus citas en minutos; las búsquedas de conflictos y
+    huecos son binarias. El índice se carga con una sola consulta, se mantiene con las escrituras de citas del
+    proceso y se recarga al vencer su TTL para incorporar las escrituras de otros procesos.
+
+    La recarga se lee del primario y fuera del candado; las escrituras del proceso confirmadas mientras tanto
+    se anotan en un diario del inquilino y se aplican a la carga antes de instalarla, para no perderlas.
+
+    Atributos:
+        db (SQLAlchemy): Instancia de SQLAlchemy para manejar la base de datos.
+        ttl (float): Segundos de vigencia del índice antes de recargarlo.
+    """
+
+    def __init__(self, db: SQLAlchemy, ttl: float = 300.0):
+        """
+        Inicializa el índice vacío; se carga en el primer uso.
+
+        Args:
+            db (SQLAlchemy): Instancia de SQLAlchemy.
+            ttl (float): Segundos de vigencia del índice.
+        """
+        self.db = db
+        self.ttl = ttl
+        self._indexes = {}
+        self._journals = {}
+        self._lock = threading.Lock()
+
+    def _load(self) -> tuple:
+        """
+        Carga las citas desde el día anterior, agrupadas por médico y ordenadas por fecha. Se lee del primario,
+        con una conexión propia y no en la transacción de la solicitud, para que la carga incluya todas las
+        escrituras confirmadas antes de empezarla.
+
+        Returns:
+            tuple: Instante de carga, minuto inicial cubierto y arreglos de inicios por médico.
+        """
+        since = datetime.combine(datetime.now().date() - timedelta(days=1), datetime.min.time())
+        statement = select(Cita.id_medico, Cita.fecha_hora) \
+            .where(Cita.fecha_hora >= since) \
+            .order_by(Cita.id_medico, Cita.fecha_hora)
+        with replica_router.primary():
+            engine = self.db.session.get_bind(mapper=Cita)
+        with engine.connect() as connection:
+            rows = connection.execute(statement).all()
+
+        booked = {}
+        for id_medico, fecha_hora in rows:
+            booked.setdefault(id_medico, array('q')).append(to_minutes(fecha_hora))
+        return time.monotonic(), to_minutes(since), booked
+
+    def _current(self) -> tuple:
+        """
+        Obtiene el índice del inquilino actual, recargándolo si expiró.
+
+        Returns:
+            tuple: Instante de carga, minuto inicial cubierto y arreglos de inicios por médico.
+        """
+        tenant = current_tenant()
+        index = self._indexes.get(tenant)
+        if index is None or time.monotonic() - index[0] >= self.ttl:
+            journal = []
+            with self._lock:
+                self._journals.setdefault(tenant, []).append(journal)
+            try:
+                loaded = self._load()
+            finally:
+                with self._lock:
+                    self._journals[tenant].remove(journal)
+            with self._lock:
+                for apply, id_medico, minute in journal:
+                    apply(loaded[2], id_medico, minute)
+                self._indexes[tenant] = loaded
+            index = loaded
+        return index
+
+    def _write(self, apply, id_medico: int, fecha_hora: datetime) -> None:
+        """
+        Aplica una escritura confirmada al índice del inquilino actual y la anota en los diarios de sus cargas en
+        curso.
+
+        Args:
+            apply (Callable): _insert o _delete.
+            id_medico (int): Identificador del médico.
+            fecha_hora (datetime): Inicio de la cita.
+        """
+        tenant = current_tenant()
+        minute = to_minutes(fecha_hora)
+        with self._lock:
+            index = self._indexes.get(tenant)
+            if index is not None:
+                apply(index[2], id_medico, minute)
+            for journal in self._journals.get(tenant, ()):
+                journal.append((apply, id_medico, minute))
+
+    @staticmethod
+    def _insert(booked: dict, id_medico: int, minute: int) -> None:
+        """
+        Agrega un inicio a los arreglos por médico si aún no está; la carga puede haberlo leído ya.
+        """
+        starts = booked.setdefault(id_medico, array('q'))
+        position = bisect.bisect_left(starts, minute)
+        if position == len(starts) or starts[position] != minute:
+            starts.insert(position, minute)
+
+    @staticmethod
+    def _delete(booked: dict, id_medico: int, minute: int) -> None:
+        """
+        Quita un inicio de los arreglos por médico, si está.
+        """
+        starts = booked.get(id_medico)
+        if starts is None:
+            return
+        position = bisect.bisect_left(starts, minute)
+        if position < len(starts) and starts[position] == minute:
+            del starts[position]
+
+    def booked(self, id_medico: int, desde: datetime, hasta: datetime) -> array:
+        """
+        Obtiene los inicios de las citas de un médico en un rango.
+
+        Args:
+            id_medico (int): Identificador del médico.
+            desde (datetime): Inicio del rango.
+            hasta (datetime): Fin del rango (exclusivo).
+
+        Returns:
+            array: Inicios en minutos, ordenados.
+        """
+        _, _, booked = self._current()
+        starts = booked.get(id_medico, array('q'))
+        with self._lock:
+            return starts[bisect.bisect_left(starts, to_minutes(desde)):bisect.bisect_left(starts, to_minutes(hasta))]
+
+    def add(self, id_medico: int, fecha_hora: datetime) -> None:
+        """
+        Registra una cita reservada.
+
+        Args:
+            id_medico (int): Identificador del médico.
+            fecha_hora (datetime): Inicio de la cita.
+        """
+        self._write(self._insert, id_medico, fecha_hora)
+
+    def remove(self, id_medico: int, fecha_hora: datetime) -> None:
+        """
+        Elimina una cita reservada.
+
+        Args:
+            id_medico (int): Identificador del médico.
+            fecha_hora (datetime): Inicio de la cita.
+        """
+        self._write(self._delete, id_medico, fecha_hora)
@@ -0,0 +1,373 @@
+# Este archivo contiene la bitácora de auditoría, que registra las escrituras confirmadas sin agregar consultas a sus transacciones.
+import atexit
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional
+from flask import g, has_request_context, request
+from sqlalchemy import event, inspect
+from models import current_tenant, is_tracked
+from repositories.audit_repository import AuditRepository
+
+# Cabecera HTTP con la que el cliente identifica al usuario que hace la escritura
+AUDIT_USER_HEADER = 'X-Usuario'
+
+# Llave de session.info con los registros de auditoría de la transacción en curso
+_PENDING = 'auditoria'
+
+
+class AuditLog:
+    """
+    Bitácora de auditoría de las tablas con seguimiento de cambios (ver ChangeTracking): quién creó, modificó o
+    eliminó cada registro y los valores anteriores y nuevos de las columnas que cambiaron.
+
+    Los cambios se capturan con los eventos de la sesión: al enviar una escritura (after_flush) se calcula la
+    diferencia de cada instancia a partir del historial de sus atributos, sin consultar la base de datos, y se
+    guarda en la sesión; las escrituras por sentencias (actualizaciones y eliminaciones por filtro, upserts), que
+    no pasan por las instancias, agregan con stage los valores que ya leyeron. Al confirmar la transacción
+    (after_commit), sus registros se encolan con una sola operación en una cola acotada en memoria, y si
+    termina sin confirmarse se descartan. Un hilo escritor toma los registros de la cola y los agrega a la
+    bitácora por lotes (ver AuditRepository), por lo que la escritura solo paga el cálculo de la diferencia y el
+    encolado.
+
+    Si la cola sigue llena después de esperar AUDIT_QUEUE_TIMEOUT_MS, los registros de la transacción se
+    descartan y se cuentan en 'dropped': la transacción ya se confirmó y no se puede rechazar. Al terminar el
+    proceso, los registros pendientes se escriben antes de salir.
+
+    La configuración se lee de la aplicación Flask:
+        AUDIT_ENABLED (bool): Si se registran las escrituras.
+        AUDIT_DB (str): Ruta del archivo SQLite de la bitácora.
+        AUDIT_MAX_QUEUE (int): Transacciones que puede acumular la cola.
+        AUDIT_QUEUE_TIMEOUT_MS (int): Milisegundos que se espera a que la cola tenga lugar.
+        AUDIT_BATCH_SIZE (int): Registros por lote de escritura.
+        AUDIT_FLUSH_INTERVAL_MS (int): Milisegundos que el escritor espera a completar un lote.
+        AUDIT_SHUTDOWN_TIMEOUT (float): Segundos que se espera al escritor al terminar el proceso.
+    """
+
+    def __init__(self):
+        """
+        Inicializa la bitácora sin almacenamiento; la cola y el hilo escritor se crean en el primer uso.
+        """
+        self.repository = None
+        self.enabled = False
+        self._queue = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._listening = False
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def init_app(self, app, db):
+        """
+        Configura la bitácora con la aplicación Flask y escucha los eventos de su sesión.
+
+        Args:
+            app (Flask): La instancia de la aplicación Flask.
+            db (SQLAlchemy): Instancia de SQLAlchemy cuya sesión se audita.
+        """
+        app.config.setdefault('AUDIT_ENABLED', True)
+        app.config.setdefault('AUDIT_DB', os.path.join(app.instance_path, 'audit.sqlite'))
+        app.config.setdefault('AUDIT_MAX_QUEUE', 10000)
+        app.config.setdefault('AUDIT_QUEUE_TIMEOUT_MS', 50)
+        app.config.setdefault('AUDIT_BATCH_SIZE', 500)
+        app.config.setdefault('AUDIT_FLUSH_INTERVAL_MS', 200)
+        app.config.setdefault('AUDIT_SHUTDOWN_TIMEOUT', 10.0)
+        self.enabled = app.config['AUDIT_ENABLED']
+        self.max_queue = app.config['AUDIT_MAX_QUEUE']
+        self.queue_timeout = app.config['AUDIT_QUEUE_TIMEOUT_MS'] / 1000
+        self.batch_size = app.config['AUDIT_BATCH_SIZE']
+        self.flush_interval = app.config['AUDIT_FLUSH_INTERVAL_MS'] / 1000
+        self.shutdown_timeout = app.config['AUDIT_SHUTDOWN_TIMEOUT']
+        if self.enabled:
+            os.makedirs(os.path.dirname(app.config['AUDIT_DB']) or '.', exist_ok=True)
+            self.repository = AuditRepository(app.config['AUDIT_DB'])
+        with self._lock:
+            if not self._listening:
+                event.listen(db.session, 'after_flush', self._after_flush)
+                event.listen(db.session, 'after_commit', self._after_commit)
+                event.listen(db.session, 'after_transaction_end', self._after_transaction_end)
+                self._listening = True
+        app.extensions['audit_log'] = self
+
+    @staticmethod
+    def actor() -> Optional[str]:
+        """
+        Identifica a quien hace la escritura: el trabajo en segundo plano que la ejecuta, el usuario de la
+        cabecera X-Usuario o, sin ella, la dirección del cliente. Quien escribe en otro hilo en nombre de una
+        solicitud debe capturarlo en la solicitud y asignarlo a g.audit_actor (ver GroupCommitBuffer).
+        """
+        actor = g.get('audit_actor')
+        if actor is None and has_request_context():
+            actor = request.headers.get(AUDIT_USER_HEADER) or request.remote_addr
+        return actor
+
+    def stage(self, session, model, operation: str, current: Optional[dict], previous: Optional[dict]) -> None:
+        """
+        Agrega a la transacción en curso el registro de una escritura hecha con sentencias, a partir de los
+        valores del registro antes y después de ella. Las escrituras por instancias se registran solas.
+
+        Args:
+            session: Sesión de la transacción en curso.
+            model (db.Model): Modelo escrito.
+            operation (str): 'create', 'update' o 'delete'.
+            current (Optional[dict]): Valores del registro tras la escritura (None al eliminar).
+            previous (Optional[dict]): Valores del registro antes de la escritura (None al crear).
+        """
+        if not self.enabled or not is_tracked(model):
+            return
+        mapper = inspect(model)
+        key = mapper.get_property_by_column(mapper.primary_key[0]).key
+        cambios = {}
+        for attr in mapper.column_attrs:
+            if attr.columns[0].info.get('tracking'):
+                continue
+            before = previous.get(attr.key) if previous is not None else None
+            after = current.get(attr.key) if current is not None else None
+            if before != after:
+                cambios[attr.key] = [before, after]
+        if operation == 'update' and not cambios:
+            return
+        self._pending(session).append(
+            self._record(model, (current or previous)[key], operation, cambios)
+        )
+
+    @staticmethod
+    def _pending(session) -> list:
+        """
+        Obtiene los registros de auditoría de la transacción en curso de una sesión.
+        """
+        pending = session.info.get(_PENDING)
+        if pending is None:
+            pending = session.info[_PENDING] = []
+        return pending
+
+    def _record(self, model, llave, operation: str, cambios: dict) -> dict:
+        """
+        Construye un registro de auditoría con el inquilino y el autor de la escritura.
+        """
+        return {'bind': model.__bind_key__, 'inquilino': current_tenant(), 'tabla': model.__tablename__,
+                'llave': llave, 'operacion': operation, 'usuario': self.actor(), 'cambios': cambios}
+
+    def _after_flush(self, session, flush_context) -> None:
+        """
+        Calcula la diferencia de cada instancia enviada de una tabla con seguimiento, a partir del historial de sus
+        atributos, que aún conserva los valores anteriores.
+        """
+        if not self.enabled:
+            return
+        records = []
+        for operation, instances in (('create', session.new), ('update', session.dirty), ('delete', session.deleted)):
+            for instance in instances:
+                model = type(instance)
+                if not is_tracked(model):
+                    continue
+                state = inspect(instance)
+                mapper = state.mapper
+                cambios = {}
+                for attr in mapper.column_attrs:
+                    if attr.columns[0].info.get('tracking'):
+                        continue
+                    if operation == 'create':
+                        value = state.dict.get(attr.key)
+                        if value is not None:
+                            cambios[attr.key] = [None, value]
+                    elif operation == 'delete':
+                        cambios[attr.key] = [state.dict.get(attr.key), None]
+                    else:
+                        history = state.attrs[attr.key].history
+                        if history.added or history.deleted:
+                            before = history.deleted[0] if history.deleted else None
+                            after = history.added[0] if history.added else None
+                            if before != after:
+                                cambios[attr.key] = [before, after]
+                if operation == 'update' and not cambios:
+                    continue
+                llave = mapper.primary_key_from_instance(instance)[0]
+                records.append(self._record(model, llave, operation, cambios))
+        if records:
+            self._pending(session).extend(records)
+
+    def _after_commit(self, session) -> None:
+        """
+        Encola los registros de la transacción confirmada.
+        """
+        records = session.info.pop(_PENDING, None)
+        if records:
+            self._enqueue(datetime.now(), records)
+
+    def _after_transaction_end(self, session, transaction) -> None:
+        """
+        Descarta los registros de la transacción si terminó sin confirmarse (revertida o cerrada); los de una
+        transacción confirmada ya se tomaron en _after_commit.
+        """
+        if transaction.parent is None:
+            session.info.pop(_PENDING, None)
+
+    def _start(self) -> None:
+        """
+        Crea la cola y el hilo escritor, y registra la escritura de los pendientes al terminar el proceso. Debe
+        llamarse con el candado tomado.
+        """
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _enqueue(self, fecha: datetime, records: List[dict]) -> None:
+        """
+        Encola los registros de una transacción; si la cola sigue llena después de esperar, los descarta.
+
+        Args:
+            fecha (datetime): Fecha de la confirmación.
+            records (List[dict]): Registros de la transacción.
+        """
+        with self._lock:
+            if self._queue is None:
+                self._start()
+        try:
+            self._queue.put((fecha, records), timeout=self.queue_timeout)
+        except queue.Full:
+            with self._lock:
+                self.dropped += len(records)
+            return
+        with self._lock:
+            self.enqueued += len(records)
+
+    def _collect(self) -> tuple:
+        """
+        Espera la primera transacción y toma las siguientes hasta completar AUDIT_BATCH_SIZE registros o cumplir
+        AUDIT_FLUSH_INTERVAL_MS.
+
+        Returns:
+            tuple: Registros del lote, eventos de flush a señalar tras escribirlo y si se pidió detener el escritor.
+        """
+        records, flushed, stop = [], [], False
+        deadline = None
+        while len(records) < self.batch_size:
+            timeout = None if deadline is None else deadline - time.monotonic()
+            if timeout is not None and timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is None:
+                stop = True
+                break
+            if isinstance(item, threading.Event):
+                flushed.append(item)
+                break
+            fecha, transaction = item
+            records.extend({**record, 'fecha': fecha} for record in transaction)
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+        return records, flushed, stop
+
+    def _run(self) -> None:
+        """
+        Ciclo del hilo escritor: agrega un lote de registros a la bitácora en cada vuelta. Si la escritura falla,
+        el lote se reintenta tras AUDIT_FLUSH_INTERVAL_MS; mientras tanto, la cola sigue acotada.
+        """
+        while True:
+            records, flushed, stop = self._collect()
+            while records:
+                try:
+                    self.repository.append(records)
+                except Exception:
+                    with self._lock:
+                        self.errors += 1
+                    if stop:
+                        break
+                    time.sleep(self.flush_interval)
+                    continue
+                with self._lock:
+                    self.batches += 1
+                    self.written += len(records)
+                break
+            for flush_event in flushed:
+                flush_event.set()
+            if stop:
+                return
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Espera a que se escriban los registros encolados hasta el momento. Si la cola sigue llena durante
+        AUDIT_SHUTDOWN_TIMEOUT (o el tiempo de espera, si es menor), no se espera más.
+
+        Args:
+            timeout (Optional[float]): Segundos máximos de espera.
+
+        Returns:
+            bool: True si se escribieron antes del tiempo de espera.
+        """
+        with self._lock:
+            if self._queue is None or not self._thread.is_alive():
+                return True
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=min(timeout, self.shutdown_timeout) if timeout is not None
+                            else self.shutdown_timeout)
+        except queue.Full:
+            return False
+        return done.wait(max(deadline - time.monotonic(), 0) if deadline is not None else None)
+
+    def close(self) -> None:
+        """
+        Escribe los registros pendientes y detiene el hilo escritor; se llama al terminar el proceso. Si la cola
+        sigue llena o el escritor no termina durante AUDIT_SHUTDOWN_TIMEOUT, los registros aún encolados se
+        descartan y se cuentan en 'dropped' para no bloquear la salida del proceso.
+        """
+        with self._lock:
+            if self._queue is None or not self._thread.is_alive():
+                return
+        try:
+            self._queue.put(None, timeout=self.shutdown_timeout)
+        except queue.Full:
+            self._discard()
+            return
+        self._thread.join(self.shutdown_timeout)
+        if self._thread.is_alive():
+            self._discard()
+
+    def _discard(self) -> None:
+        """
+        Vacía la cola sin escribirla y cuenta sus registros en 'dropped'.
+        """
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if isinstance(item, tuple):
+                with self._lock:
+                    self.dropped += len(item[1])
+
+    def stats(self) -> dict:
+        """
+        Obtiene las estadísticas de la bitácora.
+
+        Returns:
+            dict: Registros encolados, escritos y descartados, lotes escritos, errores de escritura y
+            transacciones en cola.
+        """
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'enqueued': self.enqueued,
+                'written': self.written,
+                'batches': self.batches,
+                'records_per_batch': self.written / self.batches if self.batches else 0.0,
+                'dropped': self.dropped,
+                'errors': self.errors,
+                'queued': self._queue.qsize() if self._queue is not None else 0
+            }
+
+
+# Bitácora de auditoría de la aplicación
+audit_log = AuditLog()
@@ -0,0 +1,107 @@
+# Este archivo contiene el repositorio de la bitácora de auditoría, guardada en una base de datos SQLite local.
+import json
+import sqlite3
+from contextlib import contextmanager
+from typing import List, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS auditoria (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fecha TEXT NOT NULL,
+    bind TEXT NOT NULL,
+    inquilino TEXT,
+    tabla TEXT NOT NULL,
+    llave TEXT NOT NULL,
+    operacion TEXT NOT NULL,
+    usuario TEXT,
+    cambios TEXT NOT NULL
+);
+DROP INDEX IF EXISTS idx_auditoria_tabla_llave;
+CREATE INDEX IF NOT EXISTS idx_auditoria_bind_tabla_llave ON auditoria (bind, tabla, llave, id);
+CREATE TRIGGER IF NOT EXISTS auditoria_sin_actualizar BEFORE UPDATE ON auditoria
+BEGIN
+    SELECT RAISE(ABORT, 'La bitácora de auditoría solo admite inserciones');
+END;
+CREATE TRIGGER IF NOT EXISTS auditoria_sin_eliminar BEFORE DELETE ON auditoria
+BEGIN
+    SELECT RAISE(ABORT, 'La bitácora de auditoría solo admite inserciones');
+END;
+"""
+
+
+class AuditRepository:
+    """
+    Repositorio de la bitácora de auditoría: una tabla de solo inserción con una fila por registro escrito,
+    con la operación, quién la hizo y los valores anteriores y nuevos de las columnas que cambiaron.
+
+    La bitácora se guarda en un archivo SQLite local, fuera de las bases de datos de los dominios, para que
+    escribirla no ocupe conexiones ni bloqueos de sus transacciones. Los disparadores de la tabla rechazan
+    cualquier UPDATE o DELETE.
+
+    Atributos:
+        path (str): Ruta del archivo SQLite.
+    """
+
+    def __init__(self, path: str):
+        """
+        Inicializa el repositorio y crea la tabla si no existe.
+
+        Args:
+            path (str): Ruta del archivo SQLite.
+        """
+        self.path = path
+        with self._connect() as connection:
+            connection.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """
+        Abre una conexión con el archivo SQLite y confirma al salir.
+        """
+        connection = sqlite3.connect(self.path, timeout=10)
+        connection.row_factory = sqlite3.Row
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def append(self, records: List[dict]) -> None:
+        """
+        Agrega un lote de registros de auditoría en una sola transacción.
+
+        Args:
+            records (List[dict]): Registros con 'fecha', 'bind', 'inquilino', 'tabla', 'llave', 'operacion',
+                'usuario' y 'cambios' (columna -> [anterior, nuevo]).
+        """
+        with self._connect() as connection:
+            connection.executemany(
+                'INSERT INTO auditoria (fecha, bind, inquilino, tabla, llave, operacion, usuario, cambios) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [(record['fecha'].isoformat(timespec='microseconds'), record['bind'], record['inquilino'],
+                  record['tabla'], str(record['llave']), record['operacion'], record['usuario'],
+                  json.dumps(record['cambios'], default=str)) for record in records]
+            )
+
+    def history(self, bind: str, tabla: str, llave, inquilino: Optional[str], limit: int = 100) -> List[dict]:
+        """
+        Obtiene los registros de auditoría de un registro, del más reciente al más antiguo. El bind distingue las
+        tablas con el mismo nombre en dominios distintos (p. ej. cliente).
+
+        Args:
+            bind (str): Bind del dominio de la tabla.
+            tabla (str): Nombre de la tabla.
+            llave: Llave primaria del registro.
+            inquilino (Optional[str]): Inquilino del registro.
+            limit (int): Número máximo de registros.
+
+        Returns:
+            List[dict]: Registros de auditoría, con 'cambios' decodificado.
+        """
+        with self._connect() as connection:
+            rows = connection.execute(
+                'SELECT * FROM auditoria WHERE bind = ? AND tabla = ? AND llave = ? AND inquilino IS ? '
+                'ORDER BY id DESC LIMIT ?',
+                (bind, tabla, str(llave), inquilino, limit)
+            ).fetchall()
+        return [{**dict(row), 'cambios': json.loads(row['cambios'])} for row in rows]
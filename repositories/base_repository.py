@@ -1,10 +1,48 @@
 # Esse archivo contiene la implementación de un repositorio base que puede ser utilizado para crear repositorios específicos para cada modelo del banco de datos.
+import unicodedata
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from functools import partial, wraps
 from flask_sqlalchemy import SQLAlchemy
-from typing import TypeVar, Generic, Type, List, Optional
+from sqlalchemy import and_, delete, func, inspect, or_, select, true, update
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+from typing import TypeVar, Generic, Type, List, Optional, Dict, Callable, Iterator
+from models import current_tenant, eliminados, is_tracked, record_deletes, stable_until
+from repositories.audit_log import audit_log
+from repositories.batch import after_commit, in_batch
+from repositories.change_feed import change_feed
+from repositories.filter_expression import compile_assignments, compile_filter
+from repositories.identity_cache import IdentityCache, MISSING
+from repositories.reference_snapshot import ReferenceSnapshot
+from repositories.single_flight import SingleFlight
+from repositories.transaction_retry import transaction_retry
+from repositories.upsert import upsert
 
 # Definimos un tipo genérico T
 T = TypeVar('T')
 
+
+def transactional(method: Callable) -> Callable:
+    """
+    Decora un método de escritura de un repositorio para ejecutarlo como una transacción que se repite si la base
+    de datos la aborta por interbloqueo o por tiempo de espera de bloqueo (ver TransactionRetry). El método debe
+    poder repetirse desde el principio.
+
+    Args:
+        method (Callable): Método de escritura del repositorio.
+
+    Returns:
+        Callable: Método decorado.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        return transaction_retry.run(self.db.session, lambda: method(self, *args, **kwargs),
+                                     self.model.__tablename__)
+    return wrapper
+
+
 # Definimos la clase BaseRepository que recibe un tipo genérico T
 class BaseRepository(Generic[T]):
     """
@@ -13,18 +51,175 @@ class BaseRepository(Generic[T]):
     Atributos:
         db (SQLAlchemy): Instancia de SQLAlchemy para manejar la base de datos.
         model (Type[T]): Modelo de la base de datos para el cual se crea el repositorio.
+        cache (Optional[IdentityCache]): Caché de identidad por llave primaria entre solicitudes.
+        flights (SingleFlight): Agrupador de las lecturas idénticas concurrentes de la tabla.
     """
 
-    def __init__(self, db: SQLAlchemy, model: Type[T]):
+    def __init__(self, db: SQLAlchemy, model: Type[T], cache: Optional[IdentityCache] = None):
         """
         Inicializa el repositorio con una instancia de SQLAlchemy y un modelo.
 
         Args:
             db (SQLAlchemy): Instancia de SQLAlchemy.
             model (Type[T]): Modelo de la base de datos.
+            cache (Optional[IdentityCache]): Caché de identidad para las consultas por id, p. ej. en tablas de referencia.
         """
         self.db = db
         self.model = model
+        self.cache = cache
+        self.flights = SingleFlight(model.__tablename__)
+        mapper = inspect(model)
+        self._key_attr = mapper.get_property_by_column(mapper.primary_key[0]).key
+        # Columnas de seguimiento de cambios (ver ChangeTracking), que se asignan solas y no se escriben
+        self._tracking = {attr.key for attr in mapper.column_attrs if attr.columns[0].info.get('tracking')}
+
+    def _cache_key(self, id) -> tuple:
+        """
+        Construye la llave de caché de un registro, separando los registros de cada inquilino.
+
+        Args:
+            id: Identificador del registro.
+
+        Returns:
+            tuple: Llave (inquilino, id).
+        """
+        return current_tenant(), id
+
+    def _from_cache(self, id, values: dict) -> T:
+        """
+        Reconstruye una instancia persistente a partir de los valores en caché sin consultar la base de datos.
+
+        Args:
+            id: Identificador del registro.
+            values (dict): Valores de columna guardados en caché.
+
+        Returns:
+            T: Instancia asociada a la sesión actual.
+        """
+        existing = self.db.session.identity_map.get(identity_key(self.model, id))
+        if existing is not None:
+            return existing
+        instance = self.model(**values)
+        make_transient_to_detached(instance)
+        return self.db.session.merge(instance, load=False)
+
+    def _values(self, instance: T) -> dict:
+        """
+        Obtiene los valores de columna de una instancia.
+
+        Args:
+            instance (T): Instancia del modelo.
+
+        Returns:
+            dict: Valor de cada atributo de columna.
+        """
+        return {attr.key: getattr(instance, attr.key) for attr in inspect(self.model).column_attrs}
+
+    def _load_updated_at(self, instances: List[T]) -> None:
+        """
+        Carga en una sola consulta la fecha de actualización que la base de datos asignó a los registros recién
+        insertados, en lugar de una consulta por registro al leer el atributo expirado.
+
+        Args:
+            instances (List[T]): Instancias insertadas en la transacción en curso.
+        """
+        mapper = inspect(self.model)
+        key = mapper.get_property_by_column(mapper.primary_key[0]).key
+        expired = {getattr(instance, key): instance for instance in instances
+                   if 'updated_at' in inspect(instance).expired_attributes}
+        if not expired:
+            return
+        column = getattr(self.model, key)
+        rows = self.db.session.execute(
+            select(column, self.model.updated_at).where(column.in_(list(expired))),
+            bind_arguments={'mapper': self.model}
+        )
+        for pk, updated_at in rows:
+            set_committed_value(expired[pk], 'updated_at', updated_at)
+
+    def _writable(self, values: dict) -> dict:
+        """
+        Descarta de los valores a escribir las columnas de seguimiento de cambios, que se asignan solas.
+
+        Args:
+            values (dict): Valor por atributo de columna.
+
+        Returns:
+            dict: Valores sin las columnas de seguimiento.
+        """
+        if not self._tracking:
+            return values
+        return {key: value for key, value in values.items() if key not in self._tracking}
+
+    def _record_deletes(self, keys) -> None:
+        """
+        Registra las llaves eliminadas en la transacción en curso si el modelo tiene seguimiento de cambios.
+
+        Args:
+            keys (Iterable): Llaves primarias de los registros eliminados.
+        """
+        if is_tracked(self.model):
+            record_deletes(self.db.session, self.model, keys)
+
+    def _before_commit(self, operation: str, current: Optional[dict], previous: Optional[dict]) -> None:
+        """
+        Se ejecuta dentro de la transacción de una escritura, después de enviarla y antes de confirmarla.
+
+        Los repositorios específicos lo sobrescriben para validar o mantener datos derivados en la misma transacción;
+        una excepción aquí impide la confirmación.
+
+        Args:
+            operation (str): 'create', 'update' o 'delete'.
+            current (Optional[dict]): Valores del registro tras la escritura (None al eliminar).
+            previous (Optional[dict]): Valores del registro antes de la escritura (None al crear).
+        """
+
+    def _after_commit(self, operation: str, current: Optional[dict], previous: Optional[dict]) -> None:
+        """
+        Se ejecuta después de confirmar una escritura. Invalida la entrada de la caché de identidad, olvida las
+        lecturas en curso de la tabla, descarta sus instantáneas de referencia si se eliminó el registro y publica
+        el cambio en el canal de cambios del bind.
+
+        Args:
+            operation (str): 'create', 'update' o 'delete'.
+            current (Optional[dict]): Valores del registro tras la escritura (None al eliminar).
+            previous (Optional[dict]): Valores del registro antes de la escritura (None al crear).
+        """
+        pk = (current or previous)[self._key_attr]
+        if self.cache is not None:
+            self.cache.invalidate(self._cache_key(pk))
+        SingleFlight.forget_table(self.model.__tablename__)
+        if operation == 'delete':
+            ReferenceSnapshot.invalidate_table(self.model.__tablename__)
+        change_feed.publish(self.model.__bind_key__, current_tenant(), self.model.__tablename__, pk, operation)
+
+    def _commit(self, operation: str, current: Optional[dict], previous: Optional[dict]) -> None:
+        """
+        Confirma una escritura ya enviada y llama a _after_commit. Dentro de un lote transaccional
+        (ver repositories.batch) no confirma: la escritura queda enviada con flush y _after_commit se difiere
+        hasta que se confirme el lote.
+
+        Args:
+            operation (str): 'create', 'update' o 'delete'.
+            current (Optional[dict]): Valores del registro tras la escritura (None al eliminar).
+            previous (Optional[dict]): Valores del registro antes de la escritura (None al crear).
+        """
+        if not in_batch():
+            self.db.session.commit()
+        after_commit(lambda: self._after_commit(operation, current, previous))
+
+    def _get_for_write(self, id) -> Optional[T]:
+        """
+        Obtiene un registro desde la base de datos para modificarlo, ignorando la caché y refrescando la
+        instancia de la sesión para que los cambios se comparen contra los valores reales.
+
+        Args:
+            id: Identificador del registro.
+
+        Returns:
+            Optional[T]: El registro encontrado o None si no existe.
+        """
+        return self.db.session.get(self.model, id, populate_existing=True)
 
     def get_all(self) -> List[T]:
         """
@@ -45,8 +240,25 @@ class BaseRepository(Generic[T]):
         Returns:
             Optional[T]: El registro encontrado o None si no existe.
         """
-        return self.db.session.get(self.model, id)
+        if self.cache is None:
+            return self.db.session.get(self.model, id)
+
+        key = self._cache_key(id)
+        values = self.cache.get(key)
+        if values is MISSING:
+            return None
+        if values is not None:
+            return self._from_cache(id, values)
 
+        instance = self.db.session.get(self.model, id)
+        if instance is None:
+            self.cache.put(key, MISSING)
+        elif not self.db.session.is_modified(instance) and not in_batch():
+            # Solo se guardan los valores confirmados, no los cambios pendientes de la sesión ni los de un lote
+            self.cache.put(key, self._values(instance))
+        return instance
+
+    @transactional
     def create(self, **kwargs) -> T:
         """
         Crea un nuevo registro.
@@ -57,11 +269,40 @@ class BaseRepository(Generic[T]):
         Returns:
             T: La instancia del modelo creada.
         """
-        instance = self.model(**kwargs)
+        instance = self.model(**self._writable(kwargs))
         self.db.session.add(instance)
-        self.db.session.commit()
+        self.db.session.flush()
+        current = self._values(instance)
+        self._before_commit('create', current, None)
+        self._commit('create', current, None)
         return instance
 
+    @transactional
+    def create_many(self, rows: List[dict]) -> List[dict]:
+        """
+        Crea varios registros en una sola transacción, con una sola confirmación.
+
+        Args:
+            rows (List[dict]): Atributos de cada registro a crear.
+
+        Returns:
+            List[dict]: Valores de columna de cada registro creado, en el mismo orden, incluido su id generado.
+        """
+        instances = [self.model(**self._writable(kwargs)) for kwargs in rows]
+        self.db.session.add_all(instances)
+        self.db.session.flush()
+        if is_tracked(self.model):
+            self._load_updated_at(instances)
+        values = [self._values(instance) for instance in instances]
+        for current in values:
+            self._before_commit('create', current, None)
+        if not in_batch():
+            self.db.session.commit()
+        for current in values:
+            after_commit(partial(self._after_commit, 'create', current, None))
+        return values
+
+    @transactional
     def update(self, id: int, **kwargs) -> Optional[T]:
         """
         Actualiza un registro.
@@ -73,13 +314,18 @@ class BaseRepository(Generic[T]):
         Returns:
             Optional[T]: La instancia del modelo actualizada o None si no existe.
         """
-        instance = self.get_by_id(id)
+        instance = self._get_for_write(id)
         if instance:
-            for key, value in kwargs.items():
+            previous = self._values(instance)
+            for key, value in self._writable(kwargs).items():
                 setattr(instance, key, value)
-            self.db.session.commit()
+            self.db.session.flush()
+            current = self._values(instance)
+            self._before_commit('update', current, previous)
+            self._commit('update', current, previous)
         return instance
 
+    @transactional
     def delete(self, id: int) -> bool:
         """
         Elimina un registro.
@@ -90,9 +336,366 @@ class BaseRepository(Generic[T]):
         Returns:
             bool: True si el registro fue eliminado, False si no existe.
         """
-        instance = self.get_by_id(id)
+        instance = self._get_for_write(id)
         if instance:
+            previous = self._values(instance)
             self.db.session.delete(instance)
-            self.db.session.commit()
+            self.db.session.flush()
+            self._record_deletes([previous[self._key_attr]])
+            self._before_commit('delete', None, previous)
+            self._commit('delete', None, previous)
             return True
-        return False
\ No newline at end of file
+        return False
+
+    def count_where(self, filter_text: Optional[str]) -> int:
+        """
+        Cuenta los registros que cumplen una expresión de filtro.
+
+        Args:
+            filter_text (Optional[str]): Expresión de filtro (ver compile_filter); sin filtro se cuentan todos.
+
+        Returns:
+            int: Número de registros que cumplen el filtro.
+
+        Raises:
+            InvalidExpressionError: Si la expresión no es válida.
+        """
+        condition = compile_filter(self.model, filter_text) if filter_text else true()
+        return self.db.session.scalar(select(func.count()).select_from(self.model).where(condition))
+
+    def iter_where(self, filter_text: Optional[str], batch_size: int = 1000) -> Iterator[List[dict]]:
+        """
+        Recorre por lotes de llaves primarias consecutivas los registros que cumplen una expresión de filtro,
+        sin cargarlos todos en memoria ni crear instancias del modelo.
+
+        Args:
+            filter_text (Optional[str]): Expresión de filtro (ver compile_filter); sin filtro se recorren todos.
+            batch_size (int): Número máximo de registros por lote.
+
+        Returns:
+            Iterator[List[dict]]: Valores de columna de los registros de cada lote, en orden de llave.
+
+        Raises:
+            InvalidExpressionError: Si la expresión no es válida.
+        """
+        condition = compile_filter(self.model, filter_text) if filter_text else true()
+        key = getattr(self.model, self._key_attr)
+        columns = [getattr(self.model, attr.key) for attr in inspect(self.model).column_attrs]
+        last = None
+        while True:
+            statement = select(*columns).where(condition).order_by(key).limit(batch_size)
+            if last is not None:
+                statement = statement.where(key > last)
+            rows = [dict(row) for row in self.db.session.execute(statement).mappings()]
+            if rows:
+                yield rows
+            if len(rows) < batch_size:
+                return
+            last = rows[-1][self._key_attr]
+
+    def get_changes(self, cursor: tuple, limit: int = 1000, margin: float = 1.0) -> dict:
+        """
+        Obtiene los registros escritos y eliminados después de una posición de sincronización, por llave de
+        recorrido (fecha de actualización, llave primaria) sobre las columnas de seguimiento de cambios (ver
+        ChangeTracking).
+
+        Solo se entregan los cambios anteriores a stable_until, que ya no pueden confirmarse después de la
+        lectura: así un cambio que se confirma tarde nunca queda detrás de la posición que recibió el cliente.
+        Los registros y las eliminaciones se leen como dos recorridos con su propia posición; cuando alguno
+        llena su página, ambos se recortan a la fecha de su último elemento, para que la respuesta no entregue
+        cambios de una fecha sin los de las fechas anteriores.
+
+        Args:
+            cursor (tuple): Posición (fecha y llave del último registro, fecha e id de la última eliminación);
+                (None, None, None, 0) para empezar desde el principio.
+            limit (int): Número máximo de registros y de eliminaciones.
+            margin (float): Segundos de margen de stable_until.
+
+        Returns:
+            dict: Valores de columna de los registros ('rows'), llave y fecha de las eliminaciones
+            ('deleted'), posición siguiente ('cursor') y si quedan cambios por leer ('has_more').
+        """
+        row_fecha, row_key, deleted_fecha, deleted_id = cursor
+        # El límite se calcula en una transacción nueva, antes de la instantánea con la que se leen los cambios
+        self.db.session.commit()
+        until = stable_until(self.db.session, self.model, margin)
+
+        key = getattr(self.model, self._key_attr)
+        fecha = self.model.updated_at
+        columns = [getattr(self.model, attr.key) for attr in inspect(self.model).column_attrs]
+        statement = select(*columns).where(fecha < until).order_by(fecha, key).limit(limit + 1)
+        if row_fecha is not None:
+            statement = statement.where(or_(fecha > row_fecha, and_(fecha == row_fecha, key > row_key)))
+        rows = [dict(row) for row in self.db.session.execute(statement).mappings()]
+
+        table = eliminados[self.model.__bind_key__]
+        statement = select(table.c.ID_Eliminado, table.c.Llave, table.c.Fecha) \
+            .where(table.c.Tabla == self.model.__tablename__, table.c.Fecha < until) \
+            .order_by(table.c.Fecha, table.c.ID_Eliminado).limit(limit + 1)
+        if deleted_fecha is not None:
+            statement = statement.where(or_(table.c.Fecha > deleted_fecha,
+                                            and_(table.c.Fecha == deleted_fecha, table.c.ID_Eliminado > deleted_id)))
+        deleted = self.db.session.execute(statement, bind_arguments={'mapper': self.model}).all()
+
+        bound = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            bound = rows[-1]['updated_at']
+        if len(deleted) > limit:
+            deleted = deleted[:limit]
+            bound = min(bound, deleted[-1].Fecha) if bound is not None else deleted[-1].Fecha
+        if bound is not None:
+            rows = [row for row in rows if row['updated_at'] <= bound]
+            deleted = [row for row in deleted if row.Fecha <= bound]
+
+        if rows:
+            row_fecha, row_key = rows[-1]['updated_at'], rows[-1][self._key_attr]
+        if deleted:
+            deleted_fecha, deleted_id = deleted[-1].Fecha, deleted[-1].ID_Eliminado
+        python_type = key.type.python_type
+        return {
+            'rows': rows,
+            'deleted': [{'pk': python_type(row.Llave), 'fecha': row.Fecha} for row in deleted],
+            'cursor': (row_fecha, row_key, deleted_fecha, deleted_id),
+            'has_more': bound is not None
+        }
+
+    @transactional
+    def _write_batch(self, operation: str, condition, values: Optional[dict], batch_size: int, last) -> list:
+        """
+        Escribe un lote de _write_where en su propia transacción: bloquea sus filas (SELECT ... FOR UPDATE) y lee
+        sus valores, ejecuta una sola sentencia sobre sus llaves y llama a _before_commit y _after_commit por
+        registro, como las escrituras individuales, para mantener los datos derivados y las cachés. Como la
+        sentencia no pasa por las instancias, los cambios se agregan a la bitácora de auditoría con los valores
+        leídos.
+
+        Args:
+            operation (str): 'update' o 'delete'.
+            condition (ColumnElement): Condición de los registros a escribir.
+            values (Optional[dict]): Expresión por columna a asignar (None al eliminar).
+            batch_size (int): Número máximo de registros del lote.
+            last: Última llave del lote anterior (None en el primero).
+
+        Returns:
+            list: Llaves de los registros escritos.
+        """
+        key = getattr(self.model, self._key_attr)
+        columns = [getattr(self.model, attr.key) for attr in inspect(self.model).column_attrs]
+        statement = select(*columns).where(condition).order_by(key).limit(batch_size).with_for_update()
+        if last is not None:
+            statement = statement.where(key > last)
+        previous = {row[self._key_attr]: dict(row) for row in self.db.session.execute(statement).mappings()}
+        if not previous:
+            return []
+
+        if operation == 'update':
+            self.db.session.execute(update(self.model).where(key.in_(previous)).values(values),
+                                    execution_options={'synchronize_session': False})
+            current = {row[self._key_attr]: dict(row) for row in
+                       self.db.session.execute(select(*columns).where(key.in_(previous))).mappings()}
+        else:
+            self.db.session.execute(delete(self.model).where(key.in_(previous)),
+                                    execution_options={'synchronize_session': False})
+            self._record_deletes(previous)
+            current = {}
+
+        for id, values_before in previous.items():
+            self._before_commit(operation, current.get(id), values_before)
+            audit_log.stage(self.db.session, self.model, operation, current.get(id), values_before)
+        self.db.session.commit()
+        for id, values_before in previous.items():
+            self._after_commit(operation, current.get(id), values_before)
+        return list(previous)
+
+    def _write_where(self, operation: str, condition, values: Optional[dict], batch_size: int,
+                     on_batch: Optional[Callable[[int], None]] = None) -> int:
+        """
+        Aplica una sentencia UPDATE o DELETE a los registros que cumplen una condición, por lotes de llaves
+        primarias consecutivas, cada lote en su propia transacción para acotar el tiempo de los bloqueos.
+
+        El recorrido avanza por llave, por lo que un registro que sigue cumpliendo el filtro tras actualizarse no
+        se procesa dos veces.
+
+        Args:
+            operation (str): 'update' o 'delete'.
+            condition (ColumnElement): Condición de los registros a escribir.
+            values (Optional[dict]): Expresión por columna a asignar (None al eliminar).
+            batch_size (int): Número máximo de registros por lote.
+            on_batch (Optional[Callable[[int], None]]): Se llama tras confirmar cada lote con el total de
+                registros escritos; una excepción en él detiene la escritura.
+
+        Returns:
+            int: Número de registros escritos. Si un lote falla, los lotes anteriores ya quedaron confirmados.
+        """
+        total, last = 0, None
+        while True:
+            keys = self._write_batch(operation, condition, values, batch_size, last)
+            total += len(keys)
+            if on_batch is not None:
+                on_batch(total)
+            if len(keys) < batch_size:
+                return total
+            last = max(keys)
+
+    def update_where(self, filter_text: str, set_text: str, batch_size: int = 1000,
+                     on_batch: Optional[Callable[[int], None]] = None) -> int:
+        """
+        Actualiza con sentencias UPDATE por lotes los registros que cumplen una expresión de filtro.
+
+        Las asignaciones se ejecutan en la base de datos, por lo que pueden usar los valores actuales de las
+        columnas (p. ej. "precio = precio * 0.95"); las validaciones de los modelos no se aplican.
+
+        Args:
+            filter_text (str): Expresión de filtro (ver compile_filter).
+            set_text (str): Asignaciones separadas por comas (ver compile_assignments).
+            batch_size (int): Número máximo de registros por lote.
+            on_batch (Optional[Callable[[int], None]]): Se llama tras cada lote con el total actualizado.
+
+        Returns:
+            int: Número de registros actualizados.
+
+        Raises:
+            InvalidExpressionError: Si alguna expresión no es válida.
+        """
+        condition = compile_filter(self.model, filter_text)
+        values = compile_assignments(self.model, set_text)
+        return self._write_where('update', condition, values, batch_size, on_batch)
+
+    def delete_where(self, filter_text: str, batch_size: int = 1000,
+                     on_batch: Optional[Callable[[int], None]] = None) -> int:
+        """
+        Elimina con sentencias DELETE por lotes los registros que cumplen una expresión de filtro.
+
+        Args:
+            filter_text (str): Expresión de filtro (ver compile_filter).
+            batch_size (int): Número máximo de registros por lote.
+            on_batch (Optional[Callable[[int], None]]): Se llama tras cada lote con el total eliminado.
+
+        Returns:
+            int: Número de registros eliminados.
+
+        Raises:
+            InvalidExpressionError: Si la expresión no es válida.
+        """
+        condition = compile_filter(self.model, filter_text)
+        return self._write_where('delete', condition, None, batch_size, on_batch)
+
+    def _coerce_columns(self, values: dict) -> dict:
+        """
+        Convierte los valores recibidos como texto o número al tipo de Python de su columna (fechas, enteros y
+        decimales), para escribirlos con sentencias sin pasar por el modelo y compararlos con los valores guardados.
+
+        Args:
+            values (dict): Valor por atributo de columna.
+
+        Returns:
+            dict: Valores convertidos.
+
+        Raises:
+            ValueError: Si un texto no es una fecha o un número válido para su columna.
+        """
+        coerced = {}
+        for key, value in values.items():
+            try:
+                python_type = getattr(self.model, key).type.python_type
+            except NotImplementedError:
+                python_type = None
+            if isinstance(value, str) and python_type in (date, datetime):
+                value = python_type.fromisoformat(value)
+            elif isinstance(value, str) and python_type is int or \
+                    python_type is Decimal and value is not None and not isinstance(value, Decimal):
+                try:
+                    value = python_type(str(value))
+                except (ValueError, InvalidOperation) as e:
+                    raise ValueError(f'Valor numérico no válido para {key}: {value}') from e
+            coerced[key] = value
+        return coerced
+
+    @staticmethod
+    def _fold(value):
+        """
+        Normaliza un valor de texto como lo compara la intercalación por defecto de MySQL (utf8mb4_0900_ai_ci),
+        que no distingue mayúsculas ni acentos.
+
+        Args:
+            value: Valor a normalizar.
+
+        Returns:
+            El texto sin mayúsculas ni acentos, o el mismo valor si no es texto.
+        """
+        if not isinstance(value, str):
+            return value
+        return ''.join(char for char in unicodedata.normalize('NFKD', value.casefold())
+                       if not unicodedata.combining(char))
+
+    @transactional
+    def upsert_many(self, key: str, rows: List[dict], batch_size: int = 500) -> Dict[str, int]:
+        """
+        Inserta o actualiza registros identificados por una llave natural única (p. ej. el correo electrónico),
+        en una sola transacción.
+
+        Los registros existentes se leen y bloquean por lotes para clasificar cada fila como nueva, modificada o
+        sin cambios; solo las nuevas y modificadas se escriben, con sentencias INSERT ... ON DUPLICATE KEY UPDATE
+        (ON CONFLICT DO UPDATE en SQLite) de varias filas. Como las escrituras individuales, se llama a
+        _before_commit y _after_commit por registro escrito, y cada uno se agrega a la bitácora de auditoría.
+
+        En MySQL las llaves de texto se comparan como lo hace su intercalación, sin distinguir mayúsculas ni
+        acentos, para clasificar cada fila igual que la base de datos (ver _fold); la llave guardada no cambia.
+
+        Args:
+            key (str): Atributo de la llave natural.
+            rows (List[dict]): Registros a sincronizar, con llaves únicas entre sí.
+            batch_size (int): Número máximo de filas por sentencia.
+
+        Returns:
+            Dict[str, int]: Número de registros insertados, actualizados y sin cambios.
+
+        Raises:
+            ValueError: Si un valor no es válido para su columna o si dos llaves son iguales para la base de datos.
+        """
+        attr = getattr(self.model, key)
+        columns = [getattr(self.model, column.key) for column in inspect(self.model).column_attrs]
+        dialect = self.db.session.get_bind(mapper=self.model).dialect.name
+        fold = self._fold if dialect == 'mysql' else (lambda value: value)
+        coerced = [self._coerce_columns(self._writable(row)) for row in rows]
+        rows = {fold(row[key]): row for row in coerced}
+        if len(rows) < len(coerced):
+            raise ValueError(f'Valores de {key} repetidos sin distinguir mayúsculas ni acentos')
+        keys = [row[key] for row in rows.values()]
+
+        previous = {}
+        for start in range(0, len(keys), batch_size):
+            statement = select(*columns).where(attr.in_(keys[start:start + batch_size])).with_for_update()
+            previous.update({fold(row[key]): dict(row) for row in self.db.session.execute(statement).mappings()})
+
+        changed = [(value, row) for value, row in rows.items() if value not in previous
+                   or any(previous[value][field] != row[field] for field in row if field != key)]
+
+        # Una sentencia de varias filas requiere las mismas columnas en todas sus filas
+        groups = {}
+        for _, row in changed:
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+        for fields, group in groups.items():
+            names = [getattr(self.model, field).expression.name for field in fields if field != key]
+            names = names or [attr.expression.name]
+            for start in range(0, len(group), batch_size):
+                upsert(self.db.session, self.model, group[start:start + batch_size], [key],
+                       lambda table_columns, inserted: {table_columns[name]: inserted[name] for name in names})
+
+        current = {}
+        changed_keys = [value for value, _ in changed]
+        for start in range(0, len(changed), batch_size):
+            batch_keys = [row[key] for _, row in changed[start:start + batch_size]]
+            statement = select(*columns).where(attr.in_(batch_keys))
+            current.update({fold(row[key]): dict(row) for row in self.db.session.execute(statement).mappings()})
+
+        for value in changed_keys:
+            self._before_commit('update' if value in previous else 'create', current[value], previous.get(value))
+            audit_log.stage(self.db.session, self.model, 'update' if value in previous else 'create', current[value],
+                            previous.get(value))
+        self.db.session.commit()
+        for value in changed_keys:
+            self._after_commit('update' if value in previous else 'create', current[value], previous.get(value))
+
+        inserted = sum(1 for value in changed_keys if value not in previous)
+        return {'insertados': inserted, 'actualizados': len(changed) - inserted, 'sin_cambios': len(rows) - len(changed)}
\ No newline at end of file
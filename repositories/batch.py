@@ -0,0 +1,60 @@
+# Este archivo contiene el lote transaccional, que agrupa varias escrituras de los repositorios en una sola transacción.
+from contextlib import contextmanager
+from typing import Callable
+from flask import g
+
+
+def in_batch() -> bool:
+    """
+    Indica si la solicitud actual está ejecutando un lote transaccional.
+
+    Returns:
+        bool: True dentro de un lote.
+    """
+    return g.get('batch_callbacks') is not None
+
+
+def after_commit(callback: Callable[[], None]) -> None:
+    """
+    Ejecuta una acción que debe ocurrir después de confirmar una escritura (p. ej. invalidar cachés o actualizar
+    índices en memoria): de inmediato fuera de un lote, o al confirmar el lote, en orden, dentro de uno.
+
+    Args:
+        callback (Callable[[], None]): Acción a ejecutar.
+    """
+    callbacks = g.get('batch_callbacks')
+    if callbacks is None:
+        callback()
+    else:
+        callbacks.append(callback)
+
+
+@contextmanager
+def batch(session):
+    """
+    Ejecuta varias escrituras de los repositorios en una sola transacción.
+
+    Dentro del lote, los repositorios envían cada escritura con flush en lugar de confirmarla, y sus acciones
+    posteriores a la confirmación se difieren; al salir sin errores se confirma una sola vez y se ejecutan las
+    acciones diferidas, y ante cualquier excepción se revierte todo el lote y se descartan.
+
+    Args:
+        session: Sesión de SQLAlchemy en la que se ejecuta el lote.
+
+    Raises:
+        RuntimeError: Si ya hay un lote en curso en la solicitud.
+    """
+    if in_batch():
+        raise RuntimeError('Ya hay un lote en curso')
+    g.batch_callbacks = []
+    try:
+        yield
+        session.commit()
+        callbacks = g.batch_callbacks
+    except BaseException:
+        session.rollback()
+        raise
+    finally:
+        g.batch_callbacks = None
+    for callback in callbacks:
+        callback()
@@ -0,0 +1,191 @@
+# Este archivo contiene el canal de cambios, que publica las escrituras confirmadas a los clientes suscritos.
+import itertools
+import threading
+from collections import deque
+from typing import Iterator, Optional, Set
+
+# Evento que indica al suscriptor que perdió eventos y debe volver a cargar sus datos
+RESET = 'reset'
+
+
+class _Topic:
+    """
+    Eventos recientes de un bind de un inquilino, compartidos por todos sus suscriptores.
+
+    Atributos:
+        history (deque): Últimos eventos publicados, en orden de versión.
+        version (int): Versión del último evento publicado.
+        subscribers (int): Suscriptores conectados.
+    """
+
+    def __init__(self, history):
+        self.history = deque(maxlen=history)
+        self.version = 0
+        self.subscribers = 0
+        self.condition = threading.Condition()
+
+
+class ChangeFeed:
+    """
+    Canal de cambios en memoria: los repositorios publican un evento compacto por cada escritura confirmada
+    (tabla, llave primaria, operación y versión) y los clientes suscritos a su bind lo reciben sin volver a
+    consultar la API.
+
+    Los eventos de cada bind e inquilino se guardan una sola vez en un historial acotado, y cada suscriptor
+    solo guarda la versión del último evento que recibió: su búfer son los eventos del historial posteriores a
+    ella, acotado a CHANGE_FEED_BUFFER eventos. Un suscriptor que se retrasa más que eso, o que se reconecta
+    desde una versión que ya no está en el historial, recibe un evento 'reset' y debe volver a cargar sus
+    datos. Así, un suscriptor inactivo no ocupa más que un contador y publicar no copia el evento por
+    suscriptor.
+
+    La configuración se lee de la aplicación Flask:
+        CHANGE_FEED_HISTORY (int): Eventos recientes que se conservan por bind e inquilino.
+        CHANGE_FEED_BUFFER (int): Eventos pendientes que puede acumular un suscriptor.
+        CHANGE_FEED_HEARTBEAT (float): Segundos sin eventos tras los cuales se envía un latido.
+        CHANGE_FEED_MAX_SUBSCRIBERS (int): Suscriptores conectados como máximo.
+    """
+
+    def __init__(self):
+        """
+        Inicializa el canal sin eventos ni suscriptores.
+        """
+        self._topics = {}
+        self._lock = threading.Lock()
+        self.history = 1000
+        self.buffer = 256
+        self.heartbeat = 15.0
+        self.max_subscribers = 5000
+        self.published = 0
+        self.resets = 0
+
+    def init_app(self, app):
+        """
+        Configura el canal con la aplicación Flask.
+
+        Args:
+            app (Flask): La instancia de la aplicación Flask.
+        """
+        app.config.setdefault('CHANGE_FEED_HISTORY', 1000)
+        app.config.setdefault('CHANGE_FEED_BUFFER', 256)
+        app.config.setdefault('CHANGE_FEED_HEARTBEAT', 15.0)
+        app.config.setdefault('CHANGE_FEED_MAX_SUBSCRIBERS', 5000)
+        self.history = app.config['CHANGE_FEED_HISTORY']
+        self.buffer = min(app.config['CHANGE_FEED_BUFFER'], self.history)
+        self.heartbeat = app.config['CHANGE_FEED_HEARTBEAT']
+        self.max_subscribers = app.config['CHANGE_FEED_MAX_SUBSCRIBERS']
+        self._topics = {}
+        app.extensions['change_feed'] = self
+
+    def _topic(self, bind: str, tenant: Optional[str]) -> _Topic:
+        """
+        Obtiene los eventos de un bind de un inquilino, creándolos en el primer uso.
+        """
+        with self._lock:
+            topic = self._topics.get((bind, tenant))
+            if topic is None:
+                topic = self._topics[(bind, tenant)] = _Topic(self.history)
+            return topic
+
+    def publish(self, bind: str, tenant: Optional[str], table: str, pk, operation: str) -> int:
+        """
+        Publica un cambio confirmado y despierta a los suscriptores del bind.
+
+        Args:
+            bind (str): Bind de la tabla.
+            tenant (Optional[str]): Inquilino de la escritura.
+            table (str): Nombre de la tabla.
+            pk: Llave primaria del registro.
+            operation (str): 'create', 'update' o 'delete'.
+
+        Returns:
+            int: Versión del evento dentro del bind del inquilino.
+        """
+        topic = self._topic(bind, tenant)
+        with topic.condition:
+            topic.version += 1
+            topic.history.append({'model': table, 'pk': pk, 'op': operation, 'version': topic.version})
+            self.published += 1
+            topic.condition.notify_all()
+            return topic.version
+
+    def subscribe(self, bind: str, tenant: Optional[str], since: Optional[int] = None,
+                  tables: Optional[Set[str]] = None) -> Optional[Iterator[Optional[dict]]]:
+        """
+        Suscribe un cliente a los cambios de un bind.
+
+        Args:
+            bind (str): Bind a observar.
+            tenant (Optional[str]): Inquilino de la solicitud.
+            since (Optional[int]): Versión del último evento que recibió el cliente al reconectarse
+                (cabecera Last-Event-ID); sin ella se reciben solo los eventos nuevos.
+            tables (Optional[Set[str]]): Tablas de interés; sin ellas se reciben las de todo el bind.
+
+        Returns:
+            Optional[Iterator[Optional[dict]]]: Eventos en orden de versión, con None como latido tras
+            CHANGE_FEED_HEARTBEAT segundos sin eventos, o None si se alcanzó el máximo de suscriptores.
+        """
+        with self._lock:
+            if sum(topic.subscribers for topic in self._topics.values()) >= self.max_subscribers:
+                return None
+        return self._listen(self._topic(bind, tenant), since, tables)
+
+    def _listen(self, topic: _Topic, since: Optional[int], tables: Optional[Set[str]]) -> Iterator[Optional[dict]]:
+        """
+        Genera los eventos de un suscriptor a partir de la versión que ya recibió. El suscriptor se cuenta
+        desde que se pide el primer evento hasta que se cierra el generador.
+        """
+        with self._lock:
+            topic.subscribers += 1
+        try:
+            with topic.condition:
+                cursor = topic.version
+                reset = False
+                if since is not None and since != cursor:
+                    oldest = topic.history[0]['version'] if topic.history else cursor + 1
+                    if oldest - 1 <= since < cursor:
+                        cursor = since
+                    else:
+                        self.resets += 1
+                        reset = True
+            if reset:
+                yield {'op': RESET, 'version': cursor}
+
+            while True:
+                with topic.condition:
+                    if topic.version == cursor:
+                        topic.condition.wait(self.heartbeat)
+                    if topic.version - cursor > self.buffer:
+                        # El suscriptor no consumió sus eventos a tiempo: se descartan y debe recargar
+                        self.resets += 1
+                        cursor = topic.version
+                        events = [{'op': RESET, 'version': cursor}]
+                    else:
+                        pending = topic.version - cursor
+                        events = list(itertools.islice(reversed(topic.history), pending))[::-1]
+                        cursor = topic.version
+                if not events:
+                    yield None
+                for event in events:
+                    if tables is None or event['op'] == RESET or event['model'] in tables:
+                        yield event
+        finally:
+            with self._lock:
+                topic.subscribers -= 1
+
+    def stats(self) -> dict:
+        """
+        Obtiene las estadísticas del canal.
+
+        Returns:
+            dict: Eventos publicados, reinicios enviados y, por bind e inquilino, versión y suscriptores.
+        """
+        with self._lock:
+            topics = [
+                {'bind': bind, 'tenant': tenant, 'version': topic.version, 'subscribers': topic.subscribers}
+                for (bind, tenant), topic in self._topics.items()
+            ]
+        return {'published': self.published, 'resets': self.resets, 'topics': topics}
+
+
+# Canal de cambios de la aplicación
+change_feed = ChangeFeed()
@@ -0,0 +1,225 @@
+# Este archivo contiene el repositorio de citas, con las consultas del historial de un paciente.
+from datetime import datetime
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import and_, func, or_, select
+from typing import Dict, List, Optional
+from models import Cita, Medico
+from repositories.agenda_index import AgendaIndex
+from repositories.base_repository import BaseRepository, transactional
+from repositories.cita_resumen_repository import CitaResumenRepository
+from repositories.exceptions import ConflictError
+from repositories.horario_medico_repository import HorarioMedicoRepository
+
+
+class CitaRepository(BaseRepository[Cita]):
+    """
+    Repositorio de citas con consultas sobre el índice (ID_Paciente, Fecha_Hora) y control de
+    superposición de citas de un mismo médico.
+
+    Atributos:
+        horario_repository (HorarioMedicoRepository): Repositorio de horarios, para conocer la duración de las citas.
+        agenda (Optional[AgendaIndex]): Índice en memoria de citas reservadas que se mantiene con cada escritura.
+        resumen_repository (Optional[CitaResumenRepository]): Resumen diario de citas que se mantiene en la
+            misma transacción que cada escritura.
+    """
+
+    def __init__(self, db: SQLAlchemy, horario_repository: HorarioMedicoRepository,
+                 agenda: Optional[AgendaIndex] = None, resumen_repository: Optional[CitaResumenRepository] = None):
+        """
+        Inicializa el repositorio de citas.
+
+        Args:
+            db (SQLAlchemy): Instancia de SQLAlchemy.
+            horario_repository (HorarioMedicoRepository): Repositorio de horarios de los médicos.
+            agenda (Optional[AgendaIndex]): Índice de citas reservadas a mantener.
+            resumen_repository (Optional[CitaResumenRepository]): Resumen diario de citas a mantener.
+        """
+        super().__init__(db, Cita)
+        self.horario_repository = horario_repository
+        self.agenda = agenda
+        self.resumen_repository = resumen_repository
+
+    @staticmethod
+    def _coerce_fecha_hora(kwargs: dict) -> dict:
+        """
+        Convierte la fecha y hora recibida como texto ISO ('AAAA-MM-DD[ HH:MM[:SS]]') en datetime.
+
+        Args:
+            kwargs (dict): Atributos de la cita.
+
+        Returns:
+            dict: Atributos con 'fecha_hora' como datetime.
+        """
+        if isinstance(kwargs.get('fecha_hora'), str):
+            kwargs = {**kwargs, 'fecha_hora': datetime.fromisoformat(kwargs['fecha_hora'])}
+        return kwargs
+
+    def _lock_agenda(self, id_medico) -> None:
+        """
+        Bloquea la fila del médico (SELECT ... FOR UPDATE) para serializar las reservas concurrentes de su agenda.
+
+        El bloqueo se toma antes de insertar la cita: la inserción toma un bloqueo compartido sobre el médico por la
+        llave foránea, y pedir después el exclusivo desde dos transacciones provocaría un interbloqueo.
+
+        Args:
+            id_medico: Identificador del médico.
+        """
+        if id_medico is not None:
+            self.db.session.execute(select(Medico.id).where(Medico.id == id_medico).with_for_update())
+
+    @transactional
+    def create(self, **kwargs) -> Cita:
+        """
+        Crea una cita, rechazándola si se superpone con otra del mismo médico.
+
+        Args:
+            **kwargs: Atributos de la cita.
+
+        Returns:
+            Cita: La cita creada.
+
+        Raises:
+            ConflictError: Si el médico ya tiene una cita en ese horario.
+        """
+        self._lock_agenda(kwargs.get('id_medico'))
+        return super().create(**self._coerce_fecha_hora(kwargs))
+
+    @transactional
+    def update(self, id: int, **kwargs) -> Optional[Cita]:
+        """
+        Actualiza una cita, rechazando el cambio si se superpone con otra del mismo médico.
+
+        Args:
+            id (int): Identificador de la cita.
+            **kwargs: Atributos a actualizar.
+
+        Returns:
+            Optional[Cita]: La cita actualizada o None si no existe.
+
+        Raises:
+            ConflictError: Si el médico ya tiene una cita en ese horario.
+        """
+        self._lock_agenda(kwargs.get('id_medico'))
+        return super().update(id, **self._coerce_fecha_hora(kwargs))
+
+    def _before_commit(self, operation: str, current: Optional[dict], previous: Optional[dict]) -> None:
+        """
+        Verifica, dentro de la transacción, que la cita no se superponga con otra del mismo médico y actualiza
+        el resumen diario de citas.
+
+        Raises:
+            ConflictError: Si existe otra cita del médico dentro de la duración de la cita.
+        """
+        super()._before_commit(operation, current, previous)
+        self._check_overlap(current, previous)
+        if self.resumen_repository is not None:
+            self.resumen_repository.apply(previous, current)
+
+    def _check_overlap(self, current: Optional[dict], previous: Optional[dict]) -> None:
+        """
+        Verifica que la cita no se superponga con otra del mismo médico.
+
+        Con la agenda del médico ya bloqueada, la verificación es una lectura con bloqueo, por lo que ve las
+        citas confirmadas por otras transacciones.
+
+        Args:
+            current (Optional[dict]): Valores de la cita tras la escritura (None al eliminar).
+            previous (Optional[dict]): Valores de la cita antes de la escritura (None al crear).
+
+        Raises:
+            ConflictError: Si existe otra cita del médico dentro de la duración de la cita.
+        """
+        if current is None or (previous is not None and previous['id_medico'] == current['id_medico']
+                               and previous['fecha_hora'] == current['fecha_hora']):
+            return
+
+        id_medico, fecha_hora = current['id_medico'], current['fecha_hora']
+        duracion = self.horario_repository.get_duracion(id_medico, fecha_hora)
+        statement = select(Cita.id).where(
+            Cita.id_medico == id_medico,
+            Cita.fecha_hora > fecha_hora - duracion,
+            Cita.fecha_hora < fecha_hora + duracion,
+            Cita.id != current['id']
+        ).limit(1).with_for_update()
+        if self.db.session.execute(statement).first() is not None:
+            raise ConflictError(f'El médico {id_medico} ya tiene una cita cerca de {fecha_hora.isoformat(" ")}')
+
+    def _after_commit(self, operation: str, current: Optional[dict], previous: Optional[dict]) -> None:
+        """
+        Actualiza el índice de citas reservadas con la escritura confirmada.
+        """
+        super()._after_commit(operation, current, previous)
+        if self.agenda is None:
+            return
+        if previous is not None:
+            self.agenda.remove(previous['id_medico'], previous['fecha_hora'])
+        if current is not None:
+            self.agenda.add(current['id_medico'], current['fecha_hora'])
+
+    def get_recent_by_paciente(self, id_paciente: int, limit: int,
+                               before: Optional[tuple] = None) -> List[Cita]:
+        """
+        Obtiene las citas más recientes de un paciente, paginadas por llave (fecha_hora, id) descendente.
+
+        Args:
+            id_paciente (int): Identificador del paciente.
+            limit (int): Número máximo de citas.
+            before (Optional[tuple]): Cursor (fecha_hora, id) de la última cita de la página anterior.
+
+        Returns:
+            List[Cita]: Citas ordenadas de la más reciente a la más antigua.
+        """
+        statement = select(Cita).where(Cita.id_paciente == id_paciente)
+        if before is not None:
+            fecha_hora, id_cita = before
+            statement = statement.where(or_(
+                Cita.fecha_hora < fecha_hora,
+                and_(Cita.fecha_hora == fecha_hora, Cita.id < id_cita)
+            ))
+        statement = statement.order_by(Cita.fecha_hora.desc(), Cita.id.desc()).limit(limit)
+        return list(self.db.session.scalars(statement))
+
+    def count_by_medico(self, id_paciente: int) -> Dict[int, int]:
+        """
+        Cuenta las visitas de un paciente agrupadas por médico.
+
+        Args:
+            id_paciente (int): Identificador del paciente.
+
+        Returns:
+            Dict[int, int]: Número de visitas por identificador de médico.
+        """
+        statement = select(Cita.id_medico, func.count()) \
+            .where(Cita.id_paciente == id_paciente) \
+            .group_by(Cita.id_medico)
+        return dict(self.db.session.execute(statement).all())
+
+    @staticmethod
+    def parse_cursor(value: str) -> tuple:
+        """
+        Interpreta un cursor de paginación con formato '<fecha_hora ISO>_<id>'.
+
+        Args:
+            value (str): Cursor recibido del cliente.
+
+        Returns:
+            tuple: Fecha y hora e identificador de la cita.
+
+        Raises:
+            ValueError: Si el cursor no tiene el formato esperado.
+        """
+        fecha_hora, _, id_cita = value.rpartition('_')
+        return datetime.fromisoformat(fecha_hora), int(id_cita)
+
+    @staticmethod
+    def format_cursor(cita: Cita) -> str:
+        """
+        Genera el cursor de paginación que apunta a una cita.
+
+        Args:
+            cita (Cita): Última cita de la página.
+
+        Returns:
+            str: Cursor con formato '<fecha_hora ISO>_<id>'.
+        """
+        return f'{cita.fecha_hora.isoformat()}_{cita.id}'
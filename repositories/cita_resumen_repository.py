@@ -0,0 +1,180 @@
+# Este archivo contiene el repositorio de la tabla de resumen diario de citas, usada por los reportes de la clínica.
+from datetime import date, datetime, timedelta
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import delete, func, insert, select, update
+from typing import Dict, List, Optional, Tuple
+from models import Cita, CitaResumenDiario, Medico
+from repositories.base_repository import BaseRepository
+from repositories.upsert import upsert
+
+# Columna de agrupación y formato del periodo de cada agrupación de los reportes
+AGRUPACIONES = {
+    'dia': (CitaResumenDiario.fecha, lambda value: value.isoformat()),
+    'semana': (CitaResumenDiario.anio_semana, lambda value: f'{value // 100}-W{value % 100:02d}'),
+    'mes': (CitaResumenDiario.anio_mes, lambda value: f'{value // 100}-{value % 100:02d}'),
+}
+
+
+def _periodos(fecha: date) -> dict:
+    """
+    Calcula las columnas de periodo de un día.
+
+    Args:
+        fecha (date): Día de las citas.
+
+    Returns:
+        dict: Año y mes (AAAAMM) y año y semana ISO (AAAASS) del día.
+    """
+    anio, semana, _ = fecha.isocalendar()
+    return {'anio_mes': fecha.year * 100 + fecha.month, 'anio_semana': anio * 100 + semana}
+
+
+class CitaResumenRepository(BaseRepository[CitaResumenDiario]):
+    """
+    Repositorio del resumen diario de citas por médico. Los reportes leen esta tabla en lugar de recorrer
+    la tabla de citas: unos cientos de filas cubren años de historial.
+    """
+
+    def __init__(self, db: SQLAlchemy):
+        """
+        Inicializa el repositorio del resumen diario.
+
+        Args:
+            db (SQLAlchemy): Instancia de SQLAlchemy.
+        """
+        super().__init__(db, CitaResumenDiario)
+
+    def apply(self, previous: Optional[dict], current: Optional[dict]) -> None:
+        """
+        Aplica al resumen una escritura de cita, dentro de la transacción en curso y sin confirmarla.
+
+        Args:
+            previous (Optional[dict]): Valores de la cita antes de la escritura (None al crear).
+            current (Optional[dict]): Valores de la cita tras la escritura (None al eliminar).
+        """
+        previous_key = (previous['fecha_hora'].date(), previous['id_medico']) if previous else None
+        current_key = (current['fecha_hora'].date(), current['id_medico']) if current else None
+        if previous_key == current_key:
+            return
+
+        if previous_key is not None:
+            fecha, id_medico = previous_key
+            self.db.session.execute(
+                update(CitaResumenDiario)
+                .where(CitaResumenDiario.fecha == fecha, CitaResumenDiario.id_medico == id_medico,
+                       CitaResumenDiario.total > 0)
+                .values(total=CitaResumenDiario.total - 1)
+            )
+        if current_key is not None:
+            fecha, id_medico = current_key
+            upsert(self.db.session, CitaResumenDiario,
+                   [{'fecha': fecha, 'id_medico': id_medico, 'total': 1, **_periodos(fecha)}],
+                   ['fecha', 'id_medico'],
+                   lambda columns, inserted: {columns.Total: columns.Total + inserted.Total})
+
+    def backfill(self, desde: Optional[date] = None, hasta: Optional[date] = None) -> int:
+        """
+        Recalcula el resumen a partir de la tabla de citas, por meses y en una transacción por mes.
+
+        Es idempotente: cada mes borra sus filas del resumen y las vuelve a insertar. Al borrar primero, las
+        escrituras de citas concurrentes esperan a que el mes se confirme y se suman sobre el valor recalculado.
+
+        Args:
+            desde (Optional[date]): Primer día a recalcular (por defecto, el de la cita más antigua).
+            hasta (Optional[date]): Último día a recalcular (por defecto, el de la cita más reciente).
+
+        Returns:
+            int: Número de filas del resumen escritas.
+        """
+        if desde is None or hasta is None:
+            primera, ultima = self.db.session.execute(select(func.min(Cita.fecha_hora), func.max(Cita.fecha_hora))).one()
+            self.db.session.rollback()
+            if primera is None:
+                return 0
+            desde = desde or primera.date()
+            hasta = hasta or ultima.date()
+
+        escritas = 0
+        inicio = desde
+        while inicio <= hasta:
+            fin = min(date(inicio.year + inicio.month // 12, inicio.month % 12 + 1, 1), hasta + timedelta(days=1))
+            self.db.session.execute(
+                delete(CitaResumenDiario).where(CitaResumenDiario.fecha >= inicio, CitaResumenDiario.fecha < fin)
+            )
+            dia = func.date(Cita.fecha_hora)
+            statement = select(dia, Cita.id_medico, func.count()) \
+                .where(Cita.fecha_hora >= datetime.combine(inicio, datetime.min.time()),
+                       Cita.fecha_hora < datetime.combine(fin, datetime.min.time())) \
+                .group_by(dia, Cita.id_medico)
+            rows = []
+            for fecha, id_medico, total in self.db.session.execute(statement):
+                # SQLite devuelve DATE() como texto
+                fecha = date.fromisoformat(fecha) if isinstance(fecha, str) else fecha
+                rows.append({'fecha': fecha, 'id_medico': id_medico, 'total': total, **_periodos(fecha)})
+            if rows:
+                self.db.session.execute(insert(CitaResumenDiario), rows)
+            self.db.session.commit()
+            escritas += len(rows)
+            inicio = fin
+        return escritas
+
+    def get_por_medico(self, agrupacion: str, desde: date, hasta: date,
+                       id_medico: Optional[int] = None) -> List[Tuple[str, int, int]]:
+        """
+        Obtiene el número de citas por médico y periodo.
+
+        Args:
+            agrupacion (str): 'dia', 'semana' o 'mes'.
+            desde (date): Primer día del rango.
+            hasta (date): Último día del rango.
+            id_medico (Optional[int]): Médico a reportar; si es None, todos.
+
+        Returns:
+            List[Tuple[str, int, int]]: Periodo, identificador del médico y número de citas, ordenados por periodo.
+        """
+        column, formato = AGRUPACIONES[agrupacion]
+        statement = select(column, CitaResumenDiario.id_medico, func.sum(CitaResumenDiario.total)) \
+            .where(CitaResumenDiario.fecha >= desde, CitaResumenDiario.fecha <= hasta, CitaResumenDiario.total > 0)
+        if id_medico is not None:
+            statement = statement.where(CitaResumenDiario.id_medico == id_medico)
+        statement = statement.group_by(column, CitaResumenDiario.id_medico) \
+            .order_by(column, CitaResumenDiario.id_medico)
+        return [(formato(periodo), medico, int(total)) for periodo, medico, total in self.db.session.execute(statement)]
+
+    def get_por_especialidad(self, desde: date, hasta: date) -> List[Tuple[str, int, int]]:
+        """
+        Obtiene la carga de citas por especialidad.
+
+        Args:
+            desde (date): Primer día del rango.
+            hasta (date): Último día del rango.
+
+        Returns:
+            List[Tuple[str, int, int]]: Especialidad, número de médicos con citas y número de citas,
+            de la especialidad con más citas a la de menos.
+        """
+        total = func.sum(CitaResumenDiario.total)
+        statement = select(Medico.especialidad, func.count(func.distinct(CitaResumenDiario.id_medico)), total) \
+            .join(Medico, Medico.id == CitaResumenDiario.id_medico) \
+            .where(CitaResumenDiario.fecha >= desde, CitaResumenDiario.fecha <= hasta,
+                   CitaResumenDiario.total > 0) \
+            .group_by(Medico.especialidad) \
+            .order_by(total.desc())
+        return [(especialidad, medicos, int(citas)) for especialidad, medicos, citas in self.db.session.execute(statement)]
+
+    def get_totales_por_medico(self, desde: date, hasta: date) -> Dict[int, Tuple[int, int]]:
+        """
+        Obtiene, por médico, el número de citas y de días con citas en un rango.
+
+        Args:
+            desde (date): Primer día del rango.
+            hasta (date): Último día del rango.
+
+        Returns:
+            Dict[int, Tuple[int, int]]: Número de citas y de días con citas por identificador de médico.
+        """
+        statement = select(CitaResumenDiario.id_medico, func.sum(CitaResumenDiario.total), func.count()) \
+            .where(CitaResumenDiario.fecha >= desde, CitaResumenDiario.fecha <= hasta,
+                   CitaResumenDiario.total > 0) \
+            .group_by(CitaResumenDiario.id_medico)
+        return {id_medico: (int(citas), dias) for id_medico, citas, dias in self.db.session.execute(statement)}
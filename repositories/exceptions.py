@@ -0,0 +1,39 @@
+# Este archivo contiene las excepciones que los repositorios lanzan para rechazar una escritura.
+
+class ConflictError(Exception):
+    """
+    Excepción lanzada cuando una escritura entra en conflicto con el estado actual de los datos
+    (p. ej. una cita que se superpone con otra del mismo médico).
+    """
+
+
+class InsufficientStockError(ConflictError):
+    """
+    Excepción lanzada cuando un pedido requiere más existencias de las disponibles.
+
+    Atributos:
+        faltantes (list): Por cada plato o ingrediente insuficiente, su tipo, id, cantidad solicitada y disponible.
+    """
+
+    def __init__(self, message, faltantes):
+        """
+        Inicializa la excepción con los faltantes de existencias.
+
+        Args:
+            message (str): Mensaje de error.
+            faltantes (list): Platos o ingredientes insuficientes.
+        """
+        super().__init__(message)
+        self.faltantes = faltantes
+
+
+class InvalidExpressionError(ValueError):
+    """
+    Excepción lanzada cuando una expresión de filtro o de asignación de una escritura masiva no es válida.
+    """
+
+
+class BufferFullError(Exception):
+    """
+    Excepción lanzada cuando la cola de un búfer de escritura está llena y la escritura debe reintentarse más tarde.
+    """
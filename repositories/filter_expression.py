@@ -0,0 +1,326 @@
+# Este archivo contiene el compilador de las expresiones de filtro y de asignación de las escrituras masivas.
+import operator
+import re
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, List
+from sqlalchemy import and_, inspect, literal, not_, or_
+from sqlalchemy.sql.elements import ColumnElement
+from repositories.exceptions import InvalidExpressionError
+
+# Números, textos entre comillas simples (con '' como comilla escapada), nombres y operadores
+_TOKEN = re.compile(r"\s*(?:(?P<numero>\d+(?:\.\d+)?)|(?P<texto>'(?:[^']|'')*')|(?P<nombre>[A-Za-z_]\w*)"
+                    r"|(?P<operador><=|>=|!=|<>|[=<>()+\-*/,]))")
+
+_COMPARACIONES = {'=': operator.eq, '!=': operator.ne, '<>': operator.ne, '<': operator.lt, '<=': operator.le,
+                  '>': operator.gt, '>=': operator.ge}
+
+_ARITMETICOS = {'+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv}
+
+_PALABRAS = {'and', 'or', 'not', 'is', 'null', 'like', 'in'}
+
+
+def _tokenize(text: str) -> List[tuple]:
+    """
+    Divide una expresión en símbolos.
+
+    Args:
+        text (str): Expresión.
+
+    Returns:
+        List[tuple]: Tipo y valor de cada símbolo; las palabras reservadas se devuelven en minúsculas.
+
+    Raises:
+        InvalidExpressionError: Si la expresión contiene caracteres no reconocidos.
+    """
+    tokens, position = [], 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None:
+            raise InvalidExpressionError(f'Símbolo no reconocido en la posición {position}: {text[position:position + 10]}')
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'nombre' and value.lower() in _PALABRAS:
+            kind, value = 'palabra', value.lower()
+        tokens.append((kind, value))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """
+    Analizador descendente recursivo de las expresiones sobre las columnas de un modelo.
+
+    Gramática:
+        condicion   := conjuncion ('or' conjuncion)*
+        conjuncion  := negacion ('and' negacion)*
+        negacion    := 'not' negacion | '(' condicion ')' | comparacion
+        comparacion := suma (op suma | 'is' ['not'] 'null' | ['not'] 'like' texto | ['not'] 'in' '(' suma, ... ')')
+        suma        := producto (('+' | '-') producto)*
+        producto    := unario (('*' | '/') unario)*
+        unario      := '-' unario | '(' suma ')' | numero | texto | 'null' | columna
+        asignacion  := columna '=' suma (',' columna '=' suma)*
+    """
+
+    def __init__(self, model, text: str):
+        """
+        Inicializa el analizador.
+
+        Args:
+            model (db.Model): Modelo cuyas columnas se pueden usar en la expresión.
+            text (str): Expresión a analizar.
+        """
+        self.model = model
+        self.columns = {attr.key: getattr(model, attr.key) for attr in inspect(model).column_attrs}
+        self.tokens = _tokenize(text)
+        self.position = 0
+
+    def _peek(self, offset: int = 0) -> tuple:
+        """
+        Obtiene un símbolo sin consumirlo ((None, None) al final de la expresión).
+        """
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None)
+
+    def _accept(self, value: str) -> bool:
+        """
+        Consume el siguiente símbolo si es el operador o la palabra indicada.
+        """
+        if self._peek()[0] in ('operador', 'palabra') and self._peek()[1] == value:
+            self.position += 1
+            return True
+        return False
+
+    def _expect(self, value: str) -> None:
+        """
+        Consume el operador o la palabra indicada, o falla si el siguiente símbolo es otro.
+        """
+        if not self._accept(value):
+            raise InvalidExpressionError(f"Se esperaba '{value}' y se encontró {self._peek()[1] or 'el final'}")
+
+    def end(self) -> None:
+        """
+        Verifica que se consumió toda la expresión.
+        """
+        if self.position < len(self.tokens):
+            raise InvalidExpressionError(f'Símbolo inesperado: {self._peek()[1]}')
+
+    def _column(self, name: str):
+        """
+        Obtiene el atributo de una columna del modelo.
+        """
+        if name not in self.columns:
+            raise InvalidExpressionError(f'Columna desconocida: {name}')
+        return self.columns[name]
+
+    @staticmethod
+    def _coerce(value, other):
+        """
+        Convierte un texto comparado o asignado a una columna de fecha en date o datetime.
+        """
+        if not isinstance(value, str) or not hasattr(other, 'type'):
+            return value
+        try:
+            python_type = other.type.python_type
+        except NotImplementedError:
+            return value
+        try:
+            if python_type is datetime:
+                return datetime.fromisoformat(value)
+            if python_type is date:
+                return date.fromisoformat(value)
+        except ValueError:
+            raise InvalidExpressionError(f'Fecha no válida: {value}')
+        return value
+
+    @classmethod
+    def _binary(cls, function, left, right):
+        """
+        Aplica un operador a dos operandos, convirtiendo los textos de fecha y envolviendo los literales.
+        """
+        left, right = cls._coerce(left, right), cls._coerce(right, left)
+        if not isinstance(left, ColumnElement) and not hasattr(left, 'expression'):
+            left = literal(left)
+        return function(left, right)
+
+    def condicion(self):
+        """
+        condicion := conjuncion ('or' conjuncion)*
+        """
+        terms = [self._conjuncion()]
+        while self._accept('or'):
+            terms.append(self._conjuncion())
+        return terms[0] if len(terms) == 1 else or_(*terms)
+
+    def _conjuncion(self):
+        """
+        conjuncion := negacion ('and' negacion)*
+        """
+        terms = [self._negacion()]
+        while self._accept('and'):
+            terms.append(self._negacion())
+        return terms[0] if len(terms) == 1 else and_(*terms)
+
+    def _negacion(self):
+        """
+        negacion := 'not' negacion | '(' condicion ')' | comparacion
+
+        Un paréntesis puede abrir una condición o una operación aritmética; se intenta primero como condición
+        y, si no lo es, se vuelve a analizar como comparación.
+        """
+        if self._accept('not'):
+            return not_(self._negacion())
+        if self._peek() == ('operador', '('):
+            start = self.position
+            try:
+                self.position += 1
+                condition = self.condicion()
+                self._expect(')')
+                if self._peek()[1] not in (*_COMPARACIONES, *_ARITMETICOS, 'is', 'like', 'in', 'not'):
+                    return condition
+            except InvalidExpressionError:
+                pass
+            self.position = start
+        return self._comparacion()
+
+    def _comparacion(self):
+        """
+        comparacion := suma (op suma | 'is' ['not'] 'null' | ['not'] 'like' texto | ['not'] 'in' '(' lista ')')
+        """
+        left = self._suma()
+        kind, value = self._peek()
+        if kind == 'operador' and value in _COMPARACIONES:
+            self.position += 1
+            return self._binary(_COMPARACIONES[value], left, self._suma())
+        if self._accept('is'):
+            negated = self._accept('not')
+            self._expect('null')
+            left = left if hasattr(left, 'is_') else literal(left)
+            return left.is_not(None) if negated else left.is_(None)
+        negated = self._accept('not')
+        if self._accept('like'):
+            kind, pattern = self._peek()
+            if kind != 'texto':
+                raise InvalidExpressionError("Se esperaba un texto después de 'like'")
+            self.position += 1
+            condition = self._binary(lambda a, b: a.like(b), left, pattern[1:-1].replace("''", "'"))
+        elif self._accept('in'):
+            self._expect('(')
+            values = [self._coerce(self._suma(), left)]
+            while self._accept(','):
+                values.append(self._coerce(self._suma(), left))
+            self._expect(')')
+            condition = (left if hasattr(left, 'in_') else literal(left)).in_(values)
+        else:
+            raise InvalidExpressionError(f"Se esperaba una comparación y se encontró {value or 'el final'}")
+        return not_(condition) if negated else condition
+
+    def _suma(self):
+        """
+        suma := producto (('+' | '-') producto)*
+        """
+        result = self._producto()
+        while self._peek()[0] == 'operador' and self._peek()[1] in ('+', '-'):
+            function = _ARITMETICOS[self._peek()[1]]
+            self.position += 1
+            result = self._binary(function, result, self._producto())
+        return result
+
+    def _producto(self):
+        """
+        producto := unario (('*' | '/') unario)*
+        """
+        result = self._unario()
+        while self._peek()[0] == 'operador' and self._peek()[1] in ('*', '/'):
+            function = _ARITMETICOS[self._peek()[1]]
+            self.position += 1
+            result = self._binary(function, result, self._unario())
+        return result
+
+    def _unario(self):
+        """
+        unario := '-' unario | '(' suma ')' | numero | texto | 'null' | columna
+        """
+        if self._accept('-'):
+            value = self._unario()
+            if not isinstance(value, (int, Decimal, ColumnElement)) and not hasattr(value, 'expression'):
+                raise InvalidExpressionError("El operador '-' requiere un número o una columna")
+            return -value
+        if self._accept('('):
+            value = self._suma()
+            self._expect(')')
+            return value
+        kind, value = self._peek()
+        self.position += 1
+        if kind == 'numero':
+            return Decimal(value) if '.' in value else int(value)
+        if kind == 'texto':
+            return value[1:-1].replace("''", "'")
+        if kind == 'nombre':
+            return self._column(value)
+        if (kind, value) == ('palabra', 'null'):
+            return None
+        raise InvalidExpressionError(f"Se esperaba un valor y se encontró {value or 'el final'}")
+
+    def asignaciones(self) -> Dict:
+        """
+        asignacion := columna '=' suma (',' columna '=' suma)*
+        """
+        values = {}
+        while True:
+            kind, name = self._peek()
+            if kind != 'nombre':
+                raise InvalidExpressionError(f"Se esperaba una columna y se encontró {name or 'el final'}")
+            self.position += 1
+            column = self._column(name)
+            if column.primary_key:
+                raise InvalidExpressionError(f'No se puede asignar la llave primaria: {name}')
+            if column.info.get('tracking'):
+                raise InvalidExpressionError(f'No se puede asignar la columna de seguimiento de cambios: {name}')
+            self._expect('=')
+            values[column] = self._coerce(self._suma(), column)
+            if not self._accept(','):
+                return values
+
+
+def compile_filter(model, text: str):
+    """
+    Compila una expresión de filtro (p. ej. "anio = 2019 and marca in ('Toyota', 'Nissan')") a una condición
+    de SQLAlchemy sobre las columnas del modelo, sin ejecutar ni interpolar texto en el SQL.
+
+    Args:
+        model (db.Model): Modelo a filtrar.
+        text (str): Expresión de filtro.
+
+    Returns:
+        ColumnElement: Condición para la cláusula WHERE.
+
+    Raises:
+        InvalidExpressionError: Si la expresión no es válida o usa columnas que no existen.
+    """
+    parser = _Parser(model, text)
+    condition = parser.condicion()
+    parser.end()
+    return condition
+
+
+def compile_assignments(model, text: str) -> Dict:
+    """
+    Compila una lista de asignaciones (p. ej. "precio = precio * 0.95, color = 'Rojo'") a los valores de una
+    sentencia UPDATE, que pueden referirse a los valores actuales de las columnas.
+
+    Args:
+        model (db.Model): Modelo a actualizar.
+        text (str): Asignaciones separadas por comas.
+
+    Returns:
+        Dict: Expresión por columna a asignar.
+
+    Raises:
+        InvalidExpressionError: Si la expresión no es válida, usa columnas que no existen o asigna la llave primaria.
+    """
+    parser = _Parser(model, text)
+    values = parser.asignaciones()
+    parser.end()
+    return values
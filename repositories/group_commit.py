@@ -0,0 +1,194 @@
+# Este archivo contiene el búfer de confirmación en grupo, que agrupa las inserciones frecuentes en una sola transacción.
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List
+from flask import current_app, g
+from repositories.audit_log import audit_log
+from repositories.base_repository import BaseRepository
+from repositories.exceptions import BufferFullError
+from models import current_tenant
+
+
+class GroupCommitBuffer:
+    """
+    Búfer de confirmación en grupo de las inserciones de un recurso.
+
+    Las solicitudes encolan sus inserciones y esperan su resultado; un hilo escritor las toma de la cola y las
+    confirma juntas, en una sola transacción, cada max_delay_ms milisegundos o cada max_rows filas. Cada
+    solicitud recibe su resultado solo después de la confirmación, por lo que la durabilidad no cambia: solo
+    se comparte el costo de la confirmación. Si la transacción del grupo falla, sus filas se reintentan una por
+    una, para que el error de una fila no afecte a las demás.
+
+    Se activa por recurso con la configuración GROUP_COMMIT (lista de nombres); con el búfer inactivo las
+    inserciones se confirman una por una.
+
+    Atributos:
+        name (str): Nombre del recurso, con el que se activa y se reportan las estadísticas.
+        repository (BaseRepository): Repositorio con el que se insertan las filas.
+    """
+
+    # Búferes creados, para reportar sus estadísticas
+    instances = []
+
+    def __init__(self, name: str, repository: BaseRepository):
+        """
+        Inicializa el búfer; la cola y el hilo escritor se crean en el primer uso.
+
+        Args:
+            name (str): Nombre del recurso.
+            repository (BaseRepository): Repositorio con el que se insertan las filas.
+        """
+        self.name = name
+        self.repository = repository
+        self._queue = None
+        self._lock = threading.Lock()
+        self.groups = 0
+        self.rows = 0
+        self.rejected = 0
+        self.fallbacks = 0
+        GroupCommitBuffer.instances.append(self)
+
+    def enabled(self) -> bool:
+        """
+        Indica si el búfer está activo en la aplicación actual.
+
+        Returns:
+            bool: True si el recurso está en la configuración GROUP_COMMIT.
+        """
+        return self.name in current_app.config.get('GROUP_COMMIT', [])
+
+    def _start(self) -> None:
+        """
+        Crea la cola y el hilo escritor con la configuración de la aplicación actual. Debe llamarse con el
+        candado tomado.
+        """
+        config = current_app.config
+        self.max_rows = config.get('GROUP_COMMIT_MAX_ROWS', 100)
+        self.max_delay = config.get('GROUP_COMMIT_MAX_DELAY_MS', 5) / 1000
+        self.queue_timeout = config.get('GROUP_COMMIT_QUEUE_TIMEOUT_MS', 100) / 1000
+        self._queue = queue.Queue(maxsize=config.get('GROUP_COMMIT_MAX_QUEUE', 1000))
+        threading.Thread(target=self._run, args=(current_app._get_current_object(),),
+                         name=f'group-commit-{self.name}', daemon=True).start()
+
+    def submit(self, data: dict) -> dict:
+        """
+        Encola una inserción y espera a que se confirme.
+
+        Antes de esperar se cierra la sesión de la solicitud, para no retener una conexión del pool que el hilo
+        escritor necesita para confirmar el grupo. El inquilino y el autor de la escritura se capturan aquí,
+        porque el hilo escritor no tiene la solicitud.
+
+        Args:
+            data (dict): Atributos del registro a crear.
+
+        Returns:
+            dict: Valores de columna del registro confirmado, incluido su id generado.
+
+        Raises:
+            BufferFullError: Si la cola sigue llena después de esperar queue_timeout.
+            Exception: El error con el que falló la inserción del registro.
+        """
+        with self._lock:
+            if self._queue is None:
+                self._start()
+        self.repository.db.session.close()
+        future = Future()
+        try:
+            self._queue.put((current_tenant(), audit_log.actor(), data, future), timeout=self.queue_timeout)
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            raise BufferFullError(f'La cola de inserciones de {self.name} está llena')
+        return future.result()
+
+    def _collect(self) -> list:
+        """
+        Espera la primera inserción y toma las siguientes hasta completar max_rows o cumplir max_delay.
+
+        Returns:
+            list: Inserciones del grupo (inquilino, autor, datos, futuro).
+        """
+        group = [self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+        while len(group) < self.max_rows:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                group.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return group
+
+    def _run(self, app) -> None:
+        """
+        Ciclo del hilo escritor: confirma un grupo de inserciones por inquilino y autor en cada vuelta, para que la
+        bitácora de auditoría registre a quien pidió cada inserción.
+
+        Args:
+            app (Flask): Aplicación Flask, para abrir un contexto en el hilo escritor.
+        """
+        while True:
+            group = self._collect()
+            writers = {}
+            for tenant, actor, data, future in group:
+                writers.setdefault((tenant, actor), []).append((data, future))
+            for (tenant, actor), items in writers.items():
+                try:
+                    with app.app_context():
+                        g.tenant = tenant
+                        g.audit_actor = actor
+                        self._write(items)
+                except BaseException as e:
+                    for _, future in items:
+                        if not future.done():
+                            future.set_exception(e)
+
+    def _write(self, items: List[tuple]) -> None:
+        """
+        Inserta y confirma un grupo en una sola transacción; si falla, inserta cada fila en su propia transacción.
+
+        Args:
+            items (List[tuple]): Datos y futuro de cada inserción del grupo.
+        """
+        session = self.repository.db.session
+        try:
+            values = self.repository.create_many([data for data, _ in items])
+        except Exception:
+            session.rollback()
+            with self._lock:
+                self.fallbacks += 1
+            for data, future in items:
+                try:
+                    future.set_result(self.repository._values(self.repository.create(**data)))
+                except Exception as e:
+                    session.rollback()
+                    future.set_exception(e)
+            return
+
+        with self._lock:
+            self.groups += 1
+            self.rows += len(items)
+        for (_, future), row in zip(items, values):
+            future.set_result(row)
+
+    def stats(self) -> dict:
+        """
+        Obtiene las estadísticas de uso del búfer.
+
+        Returns:
+            dict: Grupos confirmados, filas, filas por grupo, rechazos por cola llena, reintentos fila por fila
+            y tamaño actual de la cola.
+        """
+        with self._lock:
+            return {
+                'name': self.name,
+                'groups': self.groups,
+                'rows': self.rows,
+                'rows_per_group': self.rows / self.groups if self.groups else 0.0,
+                'rejected': self.rejected,
+                'fallbacks': self.fallbacks,
+                'queued': self._queue.qsize() if self._queue is not None else 0
+            }
@@ -0,0 +1,64 @@
+# Este archivo contiene el repositorio de horarios de atención de los médicos.
+from datetime import datetime, time, timedelta
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import select
+from typing import Dict, Iterable, List, Tuple
+from models import HorarioMedico
+from repositories.base_repository import BaseRepository
+
+# Horario aplicado a los médicos sin horario configurado: de lunes a viernes de 9:00 a 17:00, citas de 30 minutos
+DEFAULT_HORARIO = {dia: [(time(9, 0), time(17, 0), 30)] for dia in range(5)}
+
+
+class HorarioMedicoRepository(BaseRepository[HorarioMedico]):
+    """
+    Repositorio de los bloques de horario semanal de los médicos.
+    """
+
+    def __init__(self, db: SQLAlchemy):
+        """
+        Inicializa el repositorio de horarios.
+
+        Args:
+            db (SQLAlchemy): Instancia de SQLAlchemy.
+        """
+        super().__init__(db, HorarioMedico)
+
+    def get_by_medicos(self, ids: Iterable[int]) -> Dict[int, Dict[int, List[Tuple[time, time, int]]]]:
+        """
+        Obtiene el horario semanal de varios médicos en una sola consulta.
+
+        Args:
+            ids (Iterable[int]): Identificadores de los médicos.
+
+        Returns:
+            Dict: Por médico, los bloques (hora_inicio, hora_fin, duracion_minutos) de cada día de la semana.
+            Los médicos sin horario configurado reciben DEFAULT_HORARIO.
+        """
+        ids = list(ids)
+        horarios = {id_medico: {} for id_medico in ids}
+        statement = select(HorarioMedico).where(HorarioMedico.id_medico.in_(ids)) \
+            .order_by(HorarioMedico.id_medico, HorarioMedico.dia_semana, HorarioMedico.hora_inicio)
+        for bloque in self.db.session.scalars(statement):
+            horarios[bloque.id_medico].setdefault(bloque.dia_semana, []).append(
+                (bloque.hora_inicio, bloque.hora_fin, bloque.duracion_minutos)
+            )
+        return {id_medico: horario or DEFAULT_HORARIO for id_medico, horario in horarios.items()}
+
+    def get_duracion(self, id_medico: int, fecha_hora: datetime) -> timedelta:
+        """
+        Obtiene la duración de una cita de un médico según el bloque de horario en que cae.
+
+        Args:
+            id_medico (int): Identificador del médico.
+            fecha_hora (datetime): Inicio de la cita.
+
+        Returns:
+            timedelta: Duración del bloque correspondiente, o la del primer bloque del día si la cita
+            cae fuera de horario, o 30 minutos si ese día no tiene horario.
+        """
+        bloques = self.get_by_medicos([id_medico])[id_medico].get(fecha_hora.weekday(), [])
+        for inicio, fin, duracion in bloques:
+            if inicio <= fecha_hora.time() < fin:
+                return timedelta(minutes=duracion)
+        return timedelta(minutes=bloques[0][2] if bloques else 30)
@@ -0,0 +1,127 @@
+# Este archivo contiene la caché de identidad por llave primaria que comparten las solicitudes de un mismo proceso.
+import threading
+import time
+from collections import OrderedDict
+
+# Marcador de las llaves primarias que no existen en la base de datos (caché negativa)
+MISSING = object()
+
+
+class IdentityCache:
+    """
+    Caché LRU con expiración por entrada de los valores de columna de un modelo, indexados por llave primaria.
+
+    Guarda valores planos en lugar de instancias del ORM, para que cada solicitud reconstruya su propia
+    instancia sin compartir estado entre sesiones. Las escrituras del mismo proceso invalidan las entradas;
+    el TTL acota el tiempo que una entrada puede quedar desactualizada por escrituras de otros procesos.
+
+    Atributos:
+        name (str): Nombre con el que se reportan las estadísticas.
+        ttl (float): Segundos de vida de las entradas encontradas.
+        negative_ttl (float): Segundos de vida de las entradas de llaves inexistentes.
+        max_size (int): Número máximo de entradas.
+    """
+
+    # Cachés creadas, para reportar sus estadísticas
+    instances = []
+
+    def __init__(self, name, ttl=300.0, max_size=1000, negative_ttl=30.0):
+        """
+        Inicializa la caché vacía.
+
+        Args:
+            name (str): Nombre con el que se reportan las estadísticas.
+            ttl (float): Segundos de vida de las entradas encontradas.
+            max_size (int): Número máximo de entradas.
+            negative_ttl (float): Segundos de vida de las entradas de llaves inexistentes.
+        """
+        self.name = name
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        IdentityCache.instances.append(self)
+
+    def get(self, key):
+        """
+        Obtiene los valores guardados para una llave.
+
+        Args:
+            key (tuple): Llave de la entrada (inquilino, llave primaria).
+
+        Returns:
+            Optional[dict]: Valores de columna, MISSING si la llave no existe en la base de datos,
+            o None si no hay una entrada vigente.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if entry[1] is MISSING:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return entry[1]
+
+    def put(self, key, values):
+        """
+        Guarda los valores de una llave, desalojando la entrada menos usada si se excede el tamaño.
+
+        Args:
+            key (tuple): Llave de la entrada (inquilino, llave primaria).
+            values: Valores de columna o MISSING si la llave no existe.
+        """
+        ttl = self.negative_ttl if values is MISSING else self.ttl
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, values)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        """
+        Elimina la entrada de una llave.
+
+        Args:
+            key (tuple): Llave de la entrada (inquilino, llave primaria).
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Elimina todas las entradas.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Obtiene las estadísticas de uso de la caché.
+
+        Returns:
+            dict: Aciertos, aciertos negativos, fallos, desalojos, tamaño y tasa de aciertos.
+        """
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                'name': self.name,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'negative_hits': self.negative_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits + self.negative_hits) / lookups if lookups else 0.0
+            }
@@ -0,0 +1,222 @@
+# Este archivo contiene el repositorio de los trabajos en segundo plano, guardados en una base de datos SQLite local.
+import json
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional
+
+# Estados de un trabajo
+EN_COLA = 'en_cola'
+EN_EJECUCION = 'en_ejecucion'
+COMPLETADO = 'completado'
+ERROR = 'error'
+CANCELADO = 'cancelado'
+INTERRUMPIDO = 'interrumpido'
+
+# Estados en los que un trabajo ya no cambia
+TERMINADOS = (COMPLETADO, ERROR, CANCELADO, INTERRUMPIDO)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trabajo (
+    id TEXT PRIMARY KEY,
+    tipo TEXT NOT NULL,
+    bind TEXT NOT NULL,
+    inquilino TEXT,
+    estado TEXT NOT NULL,
+    parametros TEXT NOT NULL,
+    progreso INTEGER NOT NULL DEFAULT 0,
+    total INTEGER,
+    resultado TEXT,
+    error TEXT,
+    cancelar INTEGER NOT NULL DEFAULT 0,
+    creado TEXT NOT NULL,
+    iniciado TEXT,
+    terminado TEXT
+)
+"""
+
+
+class JobRepository:
+    """
+    Repositorio del estado de los trabajos en segundo plano.
+
+    El estado se guarda en una tabla SQLite local, fuera de las bases de datos de los dominios, para que
+    escribir el progreso no compita con las escrituras de los trabajos y para conservar el historial entre
+    reinicios del proceso.
+
+    Atributos:
+        path (str): Ruta del archivo SQLite.
+    """
+
+    def __init__(self, path: str):
+        """
+        Inicializa el repositorio y crea la tabla si no existe.
+
+        Args:
+            path (str): Ruta del archivo SQLite.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        with self._connect() as connection:
+            connection.execute(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """
+        Abre una conexión con el archivo SQLite y confirma al salir; cada operación usa la suya, para poder
+        llamarse desde cualquier hilo.
+        """
+        connection = sqlite3.connect(self.path, timeout=10)
+        connection.row_factory = sqlite3.Row
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now().isoformat(timespec='seconds')
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> dict:
+        """
+        Convierte una fila de la tabla en un diccionario, decodificando sus columnas JSON.
+        """
+        job = dict(row)
+        job['parametros'] = json.loads(job['parametros'])
+        job['resultado'] = json.loads(job['resultado']) if job['resultado'] is not None else None
+        job['cancelar'] = bool(job['cancelar'])
+        return job
+
+    def create(self, tipo: str, bind: str, inquilino: Optional[str], parametros: dict) -> dict:
+        """
+        Crea un trabajo en cola.
+
+        Args:
+            tipo (str): Tipo del trabajo.
+            bind (str): Bind sobre el que se ejecuta.
+            inquilino (Optional[str]): Inquilino que lo creó.
+            parametros (dict): Parámetros del trabajo.
+
+        Returns:
+            dict: Trabajo creado.
+        """
+        id = uuid.uuid4().hex
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                'INSERT INTO trabajo (id, tipo, bind, inquilino, estado, parametros, creado) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (id, tipo, bind, inquilino, EN_COLA, json.dumps(parametros, default=str), self._now())
+            )
+        return self.get_by_id(id)
+
+    def get_by_id(self, id: str) -> Optional[dict]:
+        """
+        Obtiene un trabajo por su identificador.
+
+        Args:
+            id (str): Identificador del trabajo.
+
+        Returns:
+            Optional[dict]: Trabajo o None si no existe.
+        """
+        with self._connect() as connection:
+            row = connection.execute('SELECT * FROM trabajo WHERE id = ?', (id,)).fetchone()
+        return self._to_dict(row) if row is not None else None
+
+    def start(self, id: str) -> bool:
+        """
+        Marca un trabajo en cola como en ejecución.
+
+        Args:
+            id (str): Identificador del trabajo.
+
+        Returns:
+            bool: True si el trabajo estaba en cola y no se había pedido cancelarlo.
+        """
+        with self._lock, self._connect() as connection:
+            started = connection.execute(
+                'UPDATE trabajo SET estado = ?, iniciado = ? WHERE id = ? AND estado = ? AND cancelar = 0',
+                (EN_EJECUCION, self._now(), id, EN_COLA)
+            ).rowcount
+        return started == 1
+
+    def progress(self, id: str, progreso: int, total: Optional[int]) -> bool:
+        """
+        Guarda el progreso de un trabajo en ejecución.
+
+        Args:
+            id (str): Identificador del trabajo.
+            progreso (int): Unidades procesadas.
+            total (Optional[int]): Unidades totales, si se conocen.
+
+        Returns:
+            bool: True si se pidió cancelar el trabajo.
+        """
+        with self._lock, self._connect() as connection:
+            connection.execute('UPDATE trabajo SET progreso = ?, total = COALESCE(?, total) WHERE id = ?',
+                               (progreso, total, id))
+            row = connection.execute('SELECT cancelar FROM trabajo WHERE id = ?', (id,)).fetchone()
+        return bool(row['cancelar'])
+
+    def finish(self, id: str, estado: str, resultado: Optional[dict] = None, error: Optional[str] = None) -> None:
+        """
+        Marca un trabajo como terminado.
+
+        Args:
+            id (str): Identificador del trabajo.
+            estado (str): Estado final (completado, error o cancelado).
+            resultado (Optional[dict]): Resultado del trabajo.
+            error (Optional[str]): Mensaje de error.
+        """
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                'UPDATE trabajo SET estado = ?, resultado = ?, error = ?, terminado = ? WHERE id = ?',
+                (estado, json.dumps(resultado, default=str) if resultado is not None else None, error,
+                 self._now(), id)
+            )
+
+    def cancel(self, id: str) -> Optional[dict]:
+        """
+        Pide cancelar un trabajo. Un trabajo en cola se cancela de inmediato; uno en ejecución se detiene en su
+        siguiente reporte de progreso.
+
+        Args:
+            id (str): Identificador del trabajo.
+
+        Returns:
+            Optional[dict]: Trabajo actualizado o None si no existe.
+        """
+        with self._lock, self._connect() as connection:
+            connection.execute('UPDATE trabajo SET cancelar = 1 WHERE id = ? AND estado IN (?, ?)',
+                               (id, EN_COLA, EN_EJECUCION))
+            connection.execute('UPDATE trabajo SET estado = ?, terminado = ? WHERE id = ? AND estado = ?',
+                               (CANCELADO, self._now(), id, EN_COLA))
+        return self.get_by_id(id)
+
+    def interrupt_unfinished(self) -> int:
+        """
+        Marca como interrumpidos los trabajos que quedaron en cola o en ejecución al detenerse el proceso.
+
+        Returns:
+            int: Número de trabajos interrumpidos.
+        """
+        with self._lock, self._connect() as connection:
+            return connection.execute('UPDATE trabajo SET estado = ?, terminado = ? WHERE estado IN (?, ?)',
+                                      (INTERRUMPIDO, self._now(), EN_COLA, EN_EJECUCION)).rowcount
+
+    def count_by_estado(self) -> dict:
+        """
+        Cuenta los trabajos por bind y estado.
+
+        Returns:
+            dict: Número de trabajos por estado, por bind.
+        """
+        with self._connect() as connection:
+            rows = connection.execute('SELECT bind, estado, COUNT(*) AS n FROM trabajo GROUP BY bind, estado')
+            counts = {}
+            for row in rows:
+                counts.setdefault(row['bind'], {})[row['estado']] = row['n']
+        return counts
@@ -0,0 +1,36 @@
+# Este archivo contiene el repositorio de médicos.
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import select
+from typing import List, Optional
+from models import Medico
+from repositories.base_repository import BaseRepository
+from repositories.identity_cache import IdentityCache
+
+
+class MedicoRepository(BaseRepository[Medico]):
+    """
+    Repositorio de médicos con búsqueda por especialidad.
+    """
+
+    def __init__(self, db: SQLAlchemy, cache: Optional[IdentityCache] = None):
+        """
+        Inicializa el repositorio de médicos.
+
+        Args:
+            db (SQLAlchemy): Instancia de SQLAlchemy.
+            cache (Optional[IdentityCache]): Caché de identidad para las consultas por id.
+        """
+        super().__init__(db, Medico, cache=cache)
+
+    def get_by_especialidad(self, especialidad: str) -> List[Medico]:
+        """
+        Obtiene los médicos de una especialidad.
+
+        Args:
+            especialidad (str): Especialidad a buscar.
+
+        Returns:
+            List[Medico]: Médicos de la especialidad ordenados por nombre.
+        """
+        statement = select(Medico).where(Medico.especialidad == especialidad).order_by(Medico.nombre)
+        return list(self.db.session.scalars(statement))
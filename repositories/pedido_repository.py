@@ -0,0 +1,305 @@
+# Este archivo contiene el repositorio de pedidos, con la colocación de pedidos con líneas y las series de tiempo.
+from datetime import datetime, timedelta
+from functools import partial
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import case, func, insert, inspect, select, update
+from typing import Dict, List, Optional
+from models import Ingrediente, LineaPedido, Pedido, Plato, RecetaPlato, current_tenant, is_tracked
+from repositories.audit_log import audit_log
+from repositories.base_repository import BaseRepository, transactional
+from repositories.batch import after_commit
+from repositories.change_feed import change_feed
+from repositories.exceptions import InsufficientStockError
+from repositories.identity_cache import IdentityCache
+from repositories.single_flight import SingleFlight
+
+# Por granularidad: duración del intervalo, rango por defecto y rango máximo de una consulta
+GRANULARIDADES = {
+    'minuto': (timedelta(minutes=1), timedelta(hours=1), timedelta(days=1)),
+    'hora': (timedelta(hours=1), timedelta(days=1), timedelta(days=31)),
+    'dia': (timedelta(days=1), timedelta(days=30), timedelta(days=366)),
+}
+
+# Columnas por las que se pueden agrupar las series
+AGRUPACIONES = {
+    'empleado': Pedido.id_empleado,
+    'cliente': Pedido.id_cliente,
+}
+
+# Formato con que cada motor trunca la fecha al inicio del intervalo
+_FORMATOS = {
+    'mysql': {'minuto': '%Y-%m-%d %H:%i:00', 'hora': '%Y-%m-%d %H:00:00', 'dia': '%Y-%m-%d 00:00:00'},
+    'sqlite': {'minuto': '%Y-%m-%d %H:%M:00', 'hora': '%Y-%m-%d %H:00:00', 'dia': '%Y-%m-%d 00:00:00'},
+}
+
+
+def inicio_intervalo(fecha_hora: datetime, granularidad: str) -> datetime:
+    """
+    Trunca una fecha al inicio de su intervalo.
+
+    Args:
+        fecha_hora (datetime): Fecha a truncar.
+        granularidad (str): 'minuto', 'hora' o 'dia'.
+
+    Returns:
+        datetime: Inicio del intervalo que contiene la fecha.
+    """
+    fecha_hora = fecha_hora.replace(second=0, microsecond=0)
+    if granularidad == 'minuto':
+        return fecha_hora
+    fecha_hora = fecha_hora.replace(minute=0)
+    return fecha_hora if granularidad == 'hora' else fecha_hora.replace(hour=0)
+
+
+class PedidoRepository(BaseRepository[Pedido]):
+    """
+    Repositorio de pedidos: colocación de pedidos con líneas que descuentan existencias y conteos por intervalo
+    de tiempo sobre el índice (Fecha_Hora, ID_Empleado, ID_Cliente).
+
+    Atributos:
+        series_cache (Optional[IdentityCache]): Caché de los intervalos cerrados de las series; cada escritura
+            invalida los intervalos que contienen al pedido.
+        plato_cache (Optional[IdentityCache]): Caché de identidad de los platos, que se invalida al descontar
+            sus existencias.
+    """
+
+    def __init__(self, db: SQLAlchemy, series_cache: Optional[IdentityCache] = None,
+                 plato_cache: Optional[IdentityCache] = None):
+        """
+        Inicializa el repositorio de pedidos.
+
+        Args:
+            db (SQLAlchemy): Instancia de SQLAlchemy.
+            series_cache (Optional[IdentityCache]): Caché de los intervalos cerrados de las series.
+            plato_cache (Optional[IdentityCache]): Caché de identidad de los platos.
+        """
+        super().__init__(db, Pedido)
+        self.series_cache = series_cache
+        self.plato_cache = plato_cache
+
+    @staticmethod
+    def _coerce_fecha_hora(kwargs: dict) -> dict:
+        """
+        Convierte la fecha y hora recibida como texto ISO en datetime.
+
+        Args:
+            kwargs (dict): Atributos del pedido.
+
+        Returns:
+            dict: Atributos con 'fecha_hora' como datetime.
+        """
+        if isinstance(kwargs.get('fecha_hora'), str):
+            kwargs = {**kwargs, 'fecha_hora': datetime.fromisoformat(kwargs['fecha_hora'])}
+        return kwargs
+
+    def create(self, **kwargs) -> Pedido:
+        """
+        Crea un pedido.
+
+        Args:
+            **kwargs: Atributos del pedido.
+
+        Returns:
+            Pedido: El pedido creado.
+        """
+        return super().create(**self._coerce_fecha_hora(kwargs))
+
+    def create_many(self, rows: List[dict]) -> List[dict]:
+        """
+        Crea varios pedidos con una sola confirmación.
+
+        Args:
+            rows (List[dict]): Atributos de cada pedido.
+
+        Returns:
+            List[dict]: Valores de columna de cada pedido creado.
+        """
+        return super().create_many([self._coerce_fecha_hora(row) for row in rows])
+
+    def update(self, id: int, **kwargs) -> Optional[Pedido]:
+        """
+        Actualiza un pedido.
+
+        Args:
+            id (int): Identificador del pedido.
+            **kwargs: Atributos a actualizar.
+
+        Returns:
+            Optional[Pedido]: El pedido actualizado o None si no existe.
+        """
+        return super().update(id, **self._coerce_fecha_hora(kwargs))
+
+    def _decrement(self, model, cantidades: Dict[int, int], tipo: str) -> None:
+        """
+        Descuenta existencias con una sola sentencia condicional:
+        UPDATE ... SET Cantidad_Disponible = Cantidad_Disponible - CASE id ... END
+        WHERE id IN (...) AND Cantidad_Disponible >= CASE id ... END.
+
+        Si alguna fila no tiene existencias suficientes, no se actualiza y el número de filas afectadas no
+        coincide; en ese caso se revierte la transacción.
+
+        Como la sentencia no pasa por las instancias, si la bitácora de auditoría registra el modelo se bloquean
+        y leen antes las filas (SELECT ... FOR UPDATE) para agregar cada cambio con sus valores, como _write_batch.
+
+        Args:
+            model (db.Model): Plato o Ingrediente.
+            cantidades (Dict[int, int]): Cantidad a descontar por identificador.
+            tipo (str): Nombre del tipo de existencia, para el detalle del error.
+
+        Raises:
+            InsufficientStockError: Si alguna existencia quedaría negativa.
+        """
+        if not cantidades:
+            return
+        previous = {}
+        if audit_log.enabled and is_tracked(model):
+            columns = [getattr(model, attr.key) for attr in inspect(model).column_attrs]
+            statement = select(*columns).where(model.id.in_(cantidades)).order_by(model.id).with_for_update()
+            previous = {row['id']: dict(row) for row in self.db.session.execute(statement).mappings()}
+
+        cantidad = case(cantidades, value=model.id)
+        statement = update(model.__table__) \
+            .where(model.id.in_(cantidades), model.cantidad_disponible >= cantidad) \
+            .values({model.cantidad_disponible: model.cantidad_disponible - cantidad})
+        if self.db.session.execute(statement).rowcount == len(cantidades):
+            for id, values in previous.items():
+                current = {**values, 'cantidad_disponible': values['cantidad_disponible'] - cantidades[id]}
+                audit_log.stage(self.db.session, model, 'update', current, values)
+            return
+
+        self.db.session.rollback()
+        disponibles = dict(self.db.session.execute(
+            select(model.id, model.cantidad_disponible).where(model.id.in_(cantidades))
+        ).all())
+        faltantes = [{'tipo': tipo, 'id': id, 'solicitado': solicitado, 'disponible': disponibles.get(id)}
+                     for id, solicitado in sorted(cantidades.items())
+                     if disponibles.get(id) is None or disponibles[id] < solicitado]
+        raise InsufficientStockError(f'Existencias insuficientes de {tipo}', faltantes)
+
+    @transactional
+    def create_with_lineas(self, lineas: List[dict], **kwargs) -> Pedido:
+        """
+        Coloca un pedido con sus líneas en una sola transacción: descuenta las existencias de los platos y de
+        los ingredientes de sus recetas, inserta el pedido e inserta sus líneas en bloque.
+
+        Las existencias se descuentan antes de insertar, para tomar los bloqueos exclusivos de las filas antes
+        de que las llaves foráneas de las líneas tomen bloqueos compartidos sobre los mismos platos.
+
+        Args:
+            lineas (List[dict]): Líneas del pedido con 'id_plato' y 'cantidad'.
+            **kwargs: Atributos del pedido.
+
+        Returns:
+            Pedido: El pedido creado.
+
+        Raises:
+            InsufficientStockError: Si algún plato o ingrediente no tiene existencias suficientes.
+        """
+        platos = {}
+        for linea in lineas:
+            platos[int(linea['id_plato'])] = platos.get(int(linea['id_plato']), 0) + int(linea['cantidad'])
+
+        ingredientes = {}
+        recetas = select(RecetaPlato.id_plato, RecetaPlato.id_ingrediente, RecetaPlato.cantidad) \
+            .where(RecetaPlato.id_plato.in_(platos))
+        for id_plato, id_ingrediente, cantidad in self.db.session.execute(recetas):
+            ingredientes[id_ingrediente] = ingredientes.get(id_ingrediente, 0) + cantidad * platos[id_plato]
+
+        self._decrement(Plato, platos, 'plato')
+        self._decrement(Ingrediente, ingredientes, 'ingrediente')
+
+        instance = self.model(**self._writable(self._coerce_fecha_hora(kwargs)))
+        self.db.session.add(instance)
+        self.db.session.flush()
+        self.db.session.execute(insert(LineaPedido), [
+            {'id_pedido': instance.id, 'id_plato': int(linea['id_plato']), 'cantidad': int(linea['cantidad'])}
+            for linea in lineas
+        ])
+        current = self._values(instance)
+        self._before_commit('create', current, None)
+        self._commit('create', current, None)
+        if self.plato_cache is not None:
+            for id_plato in platos:
+                after_commit(partial(self.plato_cache.invalidate, self._cache_key(id_plato)))
+        # Las existencias de los platos e ingredientes cambiaron sin pasar por sus repositorios
+        after_commit(partial(SingleFlight.forget_table, Plato.__tablename__))
+        after_commit(partial(SingleFlight.forget_table, Ingrediente.__tablename__))
+        for model, cantidades in ((Plato, platos), (Ingrediente, ingredientes)):
+            for id in cantidades:
+                after_commit(partial(change_feed.publish, model.__bind_key__, current_tenant(), model.__tablename__,
+                                     id, 'update'))
+        return instance
+
+    def get_lineas(self, id_pedido: int) -> List[LineaPedido]:
+        """
+        Obtiene las líneas de un pedido.
+
+        Args:
+            id_pedido (int): Identificador del pedido.
+
+        Returns:
+            List[LineaPedido]: Líneas del pedido.
+        """
+        statement = select(LineaPedido).where(LineaPedido.id_pedido == id_pedido).order_by(LineaPedido.id)
+        return list(self.db.session.scalars(statement))
+
+    def _after_commit(self, operation: str, current: Optional[dict], previous: Optional[dict]) -> None:
+        """
+        Invalida los intervalos en caché que contienen al pedido antes y después de la escritura.
+        """
+        super()._after_commit(operation, current, previous)
+        if self.series_cache is None:
+            return
+        for values in (previous, current):
+            if values is None:
+                continue
+            for granularidad in GRANULARIDADES:
+                inicio = inicio_intervalo(values['fecha_hora'], granularidad)
+                for agrupar in (None, *AGRUPACIONES):
+                    self.series_cache.invalidate(self.series_key(granularidad, agrupar, inicio))
+
+    @staticmethod
+    def series_key(granularidad: str, agrupar: Optional[str], inicio: datetime) -> tuple:
+        """
+        Construye la llave de caché de un intervalo de una serie.
+
+        Args:
+            granularidad (str): 'minuto', 'hora' o 'dia'.
+            agrupar (Optional[str]): 'empleado', 'cliente' o None.
+            inicio (datetime): Inicio del intervalo.
+
+        Returns:
+            tuple: Llave (inquilino, granularidad, agrupación, inicio).
+        """
+        return current_tenant(), granularidad, agrupar, inicio
+
+    def count_by_intervalo(self, granularidad: str, agrupar: Optional[str], desde: datetime,
+                           hasta: datetime) -> Dict[datetime, Dict[Optional[int], int]]:
+        """
+        Cuenta los pedidos de un rango por intervalo y, opcionalmente, por empleado o cliente, con un
+        GROUP BY sobre el rango del índice de Fecha_Hora.
+
+        Args:
+            granularidad (str): 'minuto', 'hora' o 'dia'.
+            agrupar (Optional[str]): 'empleado', 'cliente' o None.
+            desde (datetime): Inicio del rango (incluido).
+            hasta (datetime): Fin del rango (excluido).
+
+        Returns:
+            Dict: Por inicio de intervalo, el número de pedidos de cada grupo (llave None si no se agrupa).
+            Los intervalos sin pedidos no aparecen.
+        """
+        dialect = self.db.session.get_bind(mapper=Pedido).dialect.name
+        formato = _FORMATOS['mysql' if dialect == 'mysql' else 'sqlite'][granularidad]
+        intervalo = func.date_format(Pedido.fecha_hora, formato) if dialect == 'mysql' \
+            else func.strftime(formato, Pedido.fecha_hora)
+        columns = [intervalo] + ([AGRUPACIONES[agrupar]] if agrupar else [])
+        statement = select(*columns, func.count()) \
+            .where(Pedido.fecha_hora >= desde, Pedido.fecha_hora < hasta) \
+            .group_by(*columns)
+
+        conteos = {}
+        for row in self.db.session.execute(statement):
+            grupo = row[1] if agrupar else None
+            conteos.setdefault(datetime.fromisoformat(row[0]), {})[grupo] = row[-1]
+        return conteos
@@ -0,0 +1,185 @@
+# Este archivo contiene las instantáneas compactas en memoria de las tablas de referencia (llave -> nombre visible).
+import bisect
+import sys
+import threading
+import time
+from array import array
+
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import inspect, select
+from typing import Dict, Iterable, Sequence, Set
+from models import current_tenant, replica_router
+
+
+class ReferenceSnapshot:
+    """
+    Instantánea de solo lectura de la correspondencia llave primaria -> nombre visible de una tabla de referencia.
+
+    Las llaves se guardan ordenadas en un arreglo compacto (array de enteros o lista de cadenas internadas) y los
+    nombres en una lista paralela de cadenas internadas; las búsquedas son binarias. La instantánea se reconstruye
+    bajo demanda cuando supera su TTL. Las llaves ausentes se confirman contra la base de datos en una sola consulta,
+    por lo que los registros creados después de la última reconstrucción no se rechazan. Al eliminar un registro de
+    la tabla, el repositorio descarta la instantánea del inquilino (ver invalidate_table), que se reconstruye desde
+    el primario, para no aceptar llaves eliminadas.
+
+    Atributos:
+        db (SQLAlchemy): Instancia de SQLAlchemy para manejar la base de datos.
+        model (db.Model): Modelo de la tabla de referencia.
+        name (str): Nombre de la referencia, usado como prefijo del nombre resuelto en las respuestas.
+        label_fields (Sequence[str]): Campos que forman el nombre visible.
+        ttl (float): Segundos de vigencia de la instantánea.
+    """
+
+    # Instantáneas creadas, para descartarlas por tabla al eliminar registros
+    instances = []
+
+    def __init__(self, db: SQLAlchemy, model, name: str, label_fields: Sequence[str] = ('nombre',), ttl: float = 60.0):
+        """
+        Inicializa la instantánea sin datos; se carga en el primer uso.
+
+        Args:
+            db (SQLAlchemy): Instancia de SQLAlchemy.
+            model (db.Model): Modelo de la tabla de referencia.
+            name (str): Nombre de la referencia.
+            label_fields (Sequence[str]): Campos que forman el nombre visible, unidos por espacios.
+            ttl (float): Segundos de vigencia de la instantánea.
+        """
+        self.db = db
+        self.model = model
+        self.name = name
+        self.label_fields = tuple(label_fields)
+        self.ttl = ttl
+        mapper = inspect(model)
+        self._key_attr = mapper.get_property_by_column(mapper.primary_key[0]).key
+        self._snapshots = {}
+        self._invalidated = {}
+        self._lock = threading.Lock()
+        ReferenceSnapshot.instances.append(self)
+
+    def _build(self, primary: bool = False):
+        """
+        Carga la tabla completa de llaves y nombres ordenada por llave.
+
+        Args:
+            primary (bool): Si se lee del primario en lugar de una réplica, p. ej. tras una eliminación.
+
+        Returns:
+            tuple: Instante de inicio de la carga, arreglo de llaves y lista de nombres.
+        """
+        loaded_at = time.monotonic()
+        key_column = getattr(self.model, self._key_attr)
+        statement = select(key_column, *[getattr(self.model, field) for field in self.label_fields]).order_by(key_column)
+        with replica_router.primary() if primary else replica_router.reading():
+            rows = self.db.session.execute(statement).all()
+
+        keys = array('q', (row[0] for row in rows)) if rows and isinstance(rows[0][0], int) \
+            else [sys.intern(row[0]) for row in rows]
+        names = [sys.intern(' '.join(str(value) for value in row[1:])) for row in rows]
+        return loaded_at, keys, names
+
+    def _current(self):
+        """
+        Obtiene la instantánea del inquilino actual, reconstruyéndola si expiró.
+
+        Returns:
+            tuple: Instante de carga, arreglo de llaves y lista de nombres.
+        """
+        tenant = current_tenant()
+        snapshot = self._snapshots.get(tenant)
+        if snapshot is not None and time.monotonic() - snapshot[0] < self.ttl:
+            return snapshot
+        # Un solo hilo reconstruye; los demás siguen usando la instantánea anterior si existe
+        if snapshot is not None and not self._lock.acquire(blocking=False):
+            return snapshot
+        if snapshot is None:
+            self._lock.acquire()
+        try:
+            snapshot = self._build(primary=snapshot is None and tenant in self._invalidated)
+            self._snapshots[tenant] = snapshot
+            # Una eliminación confirmada durante la carga puede no estar en ella
+            if snapshot[0] <= self._invalidated.get(tenant, float('-inf')):
+                self._snapshots.pop(tenant, None)
+            return snapshot
+        finally:
+            self._lock.release()
+
+    def invalidate(self) -> None:
+        """
+        Descarta la instantánea del inquilino actual; la siguiente consulta la reconstruye desde el primario.
+        """
+        tenant = current_tenant()
+        self._invalidated[tenant] = time.monotonic()
+        self._snapshots.pop(tenant, None)
+
+    @classmethod
+    def invalidate_table(cls, name: str) -> None:
+        """
+        Descarta la instantánea del inquilino actual de las referencias a una tabla.
+
+        Args:
+            name (str): Nombre de la tabla.
+        """
+        for instance in cls.instances:
+            if instance.model.__tablename__ == name:
+                instance.invalidate()
+
+    def _coerce(self, key):
+        """
+        Convierte una llave recibida en la solicitud al tipo de la llave primaria.
+
+        Args:
+            key: Llave recibida.
+
+        Returns:
+            La llave convertida o None si no es válida.
+        """
+        # int() trunca 5.7 a 5 y convierte True en 1; esas llaves no son válidas
+        if isinstance(key, bool) or isinstance(key, float) and not key.is_integer():
+            return None
+        python_type = inspect(self.model).primary_key[0].type.python_type
+        try:
+            return python_type(key)
+        except (TypeError, ValueError):
+            return None
+
+    def resolve(self, keys: Iterable) -> Dict:
+        """
+        Resuelve los nombres visibles de un conjunto de llaves.
+
+        Args:
+            keys (Iterable): Llaves a resolver.
+
+        Returns:
+            Dict: Nombre visible por llave; las llaves inexistentes no aparecen.
+        """
+        _, snapshot_keys, names = self._current()
+        resolved, pending = {}, set()
+        for key in set(keys) - {None}:
+            position = bisect.bisect_left(snapshot_keys, key)
+            if position < len(snapshot_keys) and snapshot_keys[position] == key:
+                resolved[key] = names[position]
+            else:
+                pending.add(key)
+
+        if pending:
+            key_column = getattr(self.model, self._key_attr)
+            statement = select(key_column, *[getattr(self.model, field) for field in self.label_fields]) \
+                .where(key_column.in_(pending))
+            for row in self.db.session.execute(statement):
+                resolved[row[0]] = ' '.join(str(value) for value in row[1:])
+        return resolved
+
+    def missing(self, keys: Iterable) -> Set:
+        """
+        Obtiene las llaves que no existen en la tabla de referencia, validándolas en bloque.
+
+        Args:
+            keys (Iterable): Llaves a validar, tal como llegaron en la solicitud.
+
+        Returns:
+            Set: Llaves inexistentes o con un tipo no válido.
+        """
+        keys = set(keys)
+        coerced = {key: self._coerce(key) for key in keys}
+        resolved = self.resolve(value for value in coerced.values() if value is not None)
+        return {key for key, value in coerced.items() if value is None or value not in resolved}
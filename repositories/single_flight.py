@@ -0,0 +1,129 @@
+# Este archivo contiene la agrupación de lecturas idénticas concurrentes en una sola ejecución (single-flight).
+import threading
+from typing import Callable, Hashable, TypeVar
+
+R = TypeVar('R')
+
+
+class _Flight:
+    """
+    Ejecución en curso de una lectura, cuyo resultado comparten todas las solicitudes que la esperan.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Agrupa las lecturas idénticas concurrentes de una tabla: la primera solicitud de una llave ejecuta la
+    consulta y las que llegan mientras está en curso esperan y reciben el mismo resultado serializado, en lugar
+    de repetir la consulta. Así, una ráfaga de lecturas iguales (p. ej. varias pestañas abiertas a la vez o la
+    primera página tras invalidar una caché) se reduce a una sola consulta por llave.
+
+    Solo se comparten ejecuciones en curso, no resultados ya terminados. Las escrituras confirmadas en la tabla
+    olvidan las ejecuciones en curso, para que las lecturas que llegan después de una escritura no reciban un
+    resultado consultado antes de ella.
+
+    Atributos:
+        name (str): Nombre de la tabla, con el que se reportan las estadísticas.
+    """
+
+    # Agrupadores creados, para reportar sus estadísticas y olvidar ejecuciones por tabla
+    instances = []
+
+    def __init__(self, name: str):
+        """
+        Inicializa el agrupador sin ejecuciones en curso.
+
+        Args:
+            name (str): Nombre de la tabla.
+        """
+        self.name = name
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.shared = 0
+        SingleFlight.instances.append(self)
+
+    def do(self, key: Hashable, work: Callable[[], R]) -> R:
+        """
+        Ejecuta una lectura, o espera la ejecución en curso de la misma llave y devuelve su resultado.
+
+        Args:
+            key (Hashable): Llave de la lectura; debe incluir todo lo que cambia su resultado.
+            work (Callable[[], R]): Lectura a ejecutar; su resultado no debe modificarse después, porque lo
+                comparten varias solicitudes.
+
+        Returns:
+            R: Resultado de la lectura.
+
+        Raises:
+            Exception: El error con el que falló la lectura.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.executions += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = work()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.done.set()
+
+    def forget(self) -> None:
+        """
+        Olvida las ejecuciones en curso: las lecturas siguientes inician su propia ejecución. Las que ya
+        esperan reciben el resultado de la ejecución que esperaban.
+        """
+        with self._lock:
+            self._flights.clear()
+
+    @classmethod
+    def forget_table(cls, name: str) -> None:
+        """
+        Olvida las ejecuciones en curso de los agrupadores de una tabla.
+
+        Args:
+            name (str): Nombre de la tabla.
+        """
+        for instance in cls.instances:
+            if instance.name == name:
+                instance.forget()
+
+    def stats(self) -> dict:
+        """
+        Obtiene las estadísticas del agrupador.
+
+        Returns:
+            dict: Consultas ejecutadas, lecturas que compartieron una ejecución, tasa de lecturas compartidas y
+            ejecuciones en curso.
+        """
+        with self._lock:
+            reads = self.executions + self.shared
+            return {
+                'name': self.name,
+                'executions': self.executions,
+                'shared': self.shared,
+                'shared_rate': self.shared / reads if reads else 0.0,
+                'in_flight': len(self._flights)
+            }
@@ -0,0 +1,139 @@
+# Este archivo contiene el reintento de las transacciones abortadas por interbloqueos o esperas de bloqueo.
+import random
+import threading
+import time
+from typing import Callable, Optional, TypeVar
+from flask import g
+from sqlalchemy.exc import DBAPIError
+
+R = TypeVar('R')
+
+# Errores de MySQL tras los cuales la transacción completa puede repetirse
+RETRYABLE_MYSQL_ERRORS = {1205: 'lock_wait_timeout', 1213: 'deadlock'}
+
+
+def classify(error: BaseException) -> Optional[str]:
+    """
+    Clasifica un error de la base de datos como reintentable.
+
+    Args:
+        error (BaseException): Error capturado.
+
+    Returns:
+        Optional[str]: 'deadlock', 'lock_wait_timeout' o 'locked' (base de datos SQLite bloqueada) si la
+        transacción puede repetirse, None en otro caso.
+    """
+    if not isinstance(error, DBAPIError) or error.orig is None:
+        return None
+    args = getattr(error.orig, 'args', ())
+    if args and args[0] in RETRYABLE_MYSQL_ERRORS:
+        return RETRYABLE_MYSQL_ERRORS[args[0]]
+    if 'database is locked' in str(error.orig):
+        return 'locked'
+    return None
+
+
+class TransactionRetry:
+    """
+    Ejecuta transacciones de escritura y las repite cuando la base de datos las aborta por interbloqueo (1213) o
+    por tiempo de espera de bloqueo (1205), con esperas exponenciales aleatorias ("full jitter") dentro de un
+    plazo, para que las transacciones en conflicto no se repitan al mismo tiempo.
+
+    Una transacción anidada (p. ej. la de un repositorio llamada desde la de otro, o desde un lote) se ejecuta
+    dentro de la exterior, que es la única que se repite.
+
+    Atributos:
+        max_attempts (int): Número máximo de intentos por transacción.
+        base_delay (float): Espera máxima, en segundos, antes del primer reintento; se duplica en cada uno.
+        max_delay (float): Espera máxima, en segundos, entre dos intentos.
+        deadline (float): Segundos tras los cuales ya no se inicia otro intento.
+    """
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 0.01, max_delay: float = 0.5,
+                 deadline: float = 2.0):
+        """
+        Inicializa la política de reintentos.
+
+        Args:
+            max_attempts (int): Número máximo de intentos.
+            base_delay (float): Espera máxima antes del primer reintento.
+            max_delay (float): Espera máxima entre intentos.
+            deadline (float): Plazo total de la transacción en segundos.
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def _count(self, name: str, counter: str) -> None:
+        """
+        Incrementa un contador de las estadísticas de una transacción.
+        """
+        with self._lock:
+            counters = self._counters.setdefault(name, {'transactions': 0, 'retries': 0, 'recovered': 0,
+                                                        'exhausted': 0, 'deadlock': 0, 'lock_wait_timeout': 0,
+                                                        'locked': 0})
+            counters[counter] += 1
+
+    def run(self, session, work: Callable[[], R], name: str) -> R:
+        """
+        Ejecuta una transacción, revirtiéndola y repitiéndola si falla por un error reintentable.
+
+        Args:
+            session: Sesión en la que se ejecuta la transacción.
+            work (Callable[[], R]): Transacción completa, incluida su confirmación; debe poder repetirse desde el
+                principio.
+            name (str): Nombre con el que se reportan las estadísticas (p. ej. la tabla).
+
+        Returns:
+            R: Resultado de la transacción.
+
+        Raises:
+            DBAPIError: El último error reintentable, si se agotan los intentos o el plazo.
+        """
+        if g.get('transaction_active'):
+            return work()
+
+        self._count(name, 'transactions')
+        start = time.monotonic()
+        attempt = 0
+        g.transaction_active = True
+        try:
+            while True:
+                try:
+                    result = work()
+                    if attempt:
+                        self._count(name, 'recovered')
+                    return result
+                except DBAPIError as e:
+                    kind = classify(e)
+                    if kind is None:
+                        raise
+                    session.rollback()
+                    self._count(name, kind)
+                    attempt += 1
+                    delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+                    if attempt >= self.max_attempts or time.monotonic() - start + delay > self.deadline:
+                        self._count(name, 'exhausted')
+                        raise
+                    self._count(name, 'retries')
+                    time.sleep(delay)
+        finally:
+            g.transaction_active = False
+
+    def stats(self) -> dict:
+        """
+        Obtiene las estadísticas de reintentos.
+
+        Returns:
+            dict: Por nombre de transacción: transacciones, reintentos, transacciones que se recuperaron tras
+            reintentar, transacciones que agotaron sus intentos y errores de cada tipo.
+        """
+        with self._lock:
+            return {name: dict(counters) for name, counters in self._counters.items()}
+
+
+# Política compartida por los repositorios y los lotes transaccionales
+transaction_retry = TransactionRetry()
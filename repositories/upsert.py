@@ -0,0 +1,38 @@
+# Este archivo contiene la construcción de sentencias INSERT ... ON DUPLICATE KEY UPDATE independientes del motor.
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from typing import Callable, Dict, List, Sequence
+
+
+def upsert(session, model, rows: List[Dict], keys: Sequence[str], update: Callable):
+    """
+    Inserta filas o actualiza las existentes en una sola sentencia: INSERT ... ON DUPLICATE KEY UPDATE en MySQL
+    e INSERT ... ON CONFLICT DO UPDATE en SQLite.
+
+    Args:
+        session: Sesión con la que se ejecuta la sentencia.
+        model (db.Model): Modelo de la tabla.
+        rows (List[Dict]): Filas a insertar, con los nombres de los atributos del modelo.
+        keys (Sequence[str]): Atributos de la llave única que detecta el conflicto.
+        update (Callable): Función (columnas, insertadas) -> dict que devuelve, por columna, la expresión con la que
+            se actualiza la fila existente; 'insertadas' referencia los valores que se intentaron insertar. Las
+            columnas de seguimiento de cambios (ver ChangeTracking) de la fila existente siempre se actualizan con
+            la expresión de su onupdate.
+
+    Returns:
+        CursorResult: Resultado de la sentencia.
+    """
+    table = model.__table__
+    tracking = {column: column.onupdate.arg for column in table.columns if column.info.get('tracking')}
+    if session.get_bind(mapper=model).dialect.name == 'mysql':
+        statement = mysql_insert(model).values(rows)
+        values = update(table.c, statement.inserted)
+        values.update(tracking)
+        statement = statement.on_duplicate_key_update(values)
+    else:
+        statement = sqlite_insert(model).values(rows)
+        columns = [getattr(model, key).expression for key in keys]
+        values = update(table.c, statement.excluded)
+        values.update(tracking)
+        statement = statement.on_conflict_do_update(index_elements=columns, set_=values)
+    return session.execute(statement)
@@ -0,0 +1,288 @@
+# Este archivo contiene el índice de mapas de bits en memoria para la búsqueda por facetas de vehículos.
+import threading
+import time
+from array import array
+from decimal import Decimal
+from typing import Dict, Iterable, Optional
+
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import select
+from models import Vehiculo, current_tenant, replica_router
+
+# Facetas de valor exacto
+CATEGORIAS = ('marca', 'tipo', 'color')
+
+
+def _centavos(precio) -> int:
+    """
+    Convierte un precio en centavos.
+
+    Args:
+        precio: Precio como Decimal, número o texto.
+
+    Returns:
+        int: Precio en centavos.
+
+    Raises:
+        ValueError: Si el precio no es finito (infinito o NaN).
+    """
+    valor = Decimal(str(precio))
+    if not valor.is_finite():
+        raise ValueError(f'Precio no válido: {precio}')
+    return int(valor * 100)
+
+
+class _Facetas:
+    """
+    Índice de un inquilino. Cada vehículo ocupa una posición (bit) y cada valor de faceta tiene un mapa de bits
+    (entero de Python) con las posiciones de los vehículos que lo tienen; el precio se guarda además en una
+    columna de centavos por posición, para filtrar los rangos que cortan un intervalo de precios.
+    """
+
+    def __init__(self, ancho_precio: int):
+        """
+        Inicializa el índice vacío.
+
+        Args:
+            ancho_precio (int): Ancho en centavos de los intervalos de la faceta de precio.
+        """
+        self.loaded_at = time.monotonic()
+        self.ancho_precio = ancho_precio
+        self.vins = []
+        self.slots = {}
+        self.libres = []
+        self.precios = array('q')
+        self.valores = []
+        self.todos = 0
+        self.bitmaps = {faceta: {} for faceta in (*CATEGORIAS, 'anio', 'precio')}
+
+    def _valores(self, vehiculo: dict) -> dict:
+        """
+        Obtiene el valor de cada faceta de un vehículo.
+        """
+        valores = {faceta: vehiculo[faceta] for faceta in CATEGORIAS}
+        valores['anio'] = int(vehiculo['anio'])
+        valores['precio'] = _centavos(vehiculo['precio']) // self.ancho_precio * self.ancho_precio
+        return valores
+
+    def add(self, vehiculo: dict) -> None:
+        """
+        Agrega un vehículo al índice, reutilizando las posiciones libres.
+        """
+        if vehiculo['vin'] in self.slots:
+            self.remove(vehiculo['vin'])
+        valores = self._valores(vehiculo)
+        if self.libres:
+            slot = self.libres.pop()
+            self.vins[slot], self.valores[slot] = vehiculo['vin'], valores
+            self.precios[slot] = _centavos(vehiculo['precio'])
+        else:
+            slot = len(self.vins)
+            self.vins.append(vehiculo['vin'])
+            self.valores.append(valores)
+            self.precios.append(_centavos(vehiculo['precio']))
+        self.slots[vehiculo['vin']] = slot
+        bit = 1 << slot
+        self.todos |= bit
+        for faceta, valor in valores.items():
+            self.bitmaps[faceta][valor] = self.bitmaps[faceta].get(valor, 0) | bit
+
+    def remove(self, vin: str) -> None:
+        """
+        Quita un vehículo del índice.
+        """
+        slot = self.slots.pop(vin, None)
+        if slot is None:
+            return
+        bit = 1 << slot
+        self.todos &= ~bit
+        for faceta, valor in self.valores[slot].items():
+            bitmap = self.bitmaps[faceta][valor] & ~bit
+            if bitmap:
+                self.bitmaps[faceta][valor] = bitmap
+            else:
+                del self.bitmaps[faceta][valor]
+        self.vins[slot], self.valores[slot] = None, None
+        self.libres.append(slot)
+
+    def _rango(self, faceta: str, minimo: Optional[int], maximo: Optional[int]) -> int:
+        """
+        Une los mapas de bits de los valores de una faceta numérica dentro de un rango.
+        """
+        bitmap = 0
+        for valor, bits in self.bitmaps[faceta].items():
+            if (minimo is None or valor >= minimo) and (maximo is None or valor <= maximo):
+                bitmap |= bits
+        return bitmap
+
+    def _rango_precio(self, minimo: Optional[int], maximo: Optional[int]) -> int:
+        """
+        Obtiene el mapa de bits de los vehículos con precio dentro de un rango en centavos: une los intervalos
+        completamente incluidos y revisa vehículo por vehículo solo los intervalos de los extremos.
+        """
+        ancho = self.ancho_precio
+        bitmap = 0
+        for inicio, bits in self.bitmaps['precio'].items():
+            fin = inicio + ancho - 1
+            if (minimo is not None and fin < minimo) or (maximo is not None and inicio > maximo):
+                continue
+            if (minimo is None or inicio >= minimo) and (maximo is None or fin <= maximo):
+                bitmap |= bits
+                continue
+            while bits:
+                low = bits & -bits
+                precio = self.precios[low.bit_length() - 1]
+                if (minimo is None or precio >= minimo) and (maximo is None or precio <= maximo):
+                    bitmap |= low
+                bits ^= low
+        return bitmap
+
+    def search(self, categorias: Dict[str, Iterable[str]], anio: tuple, precio: tuple,
+               offset: int, limit: int) -> dict:
+        """
+        Busca los vehículos que cumplen todos los filtros y cuenta los de cada valor de faceta.
+
+        Los conteos de una faceta aplican los filtros de las demás facetas pero no el suyo, para que el cliente
+        vea cuántos vehículos obtendría al cambiar esa selección.
+        """
+        mascaras = {}
+        for faceta, valores in categorias.items():
+            bitmap = 0
+            for valor in valores:
+                bitmap |= self.bitmaps[faceta].get(valor, 0)
+            mascaras[faceta] = bitmap
+        if anio != (None, None):
+            mascaras['anio'] = self._rango('anio', *anio)
+        if precio != (None, None):
+            mascaras['precio'] = self._rango_precio(*precio)
+
+        def combinar(excluida=None):
+            bitmap = self.todos
+            for faceta, mascara in mascaras.items():
+                if faceta != excluida:
+                    bitmap &= mascara
+            return bitmap
+
+        resultado = combinar()
+        vins = []
+        bits, posicion = resultado, 0
+        while bits and len(vins) < limit:
+            low = bits & -bits
+            if posicion >= offset:
+                vins.append(self.vins[low.bit_length() - 1])
+            posicion += 1
+            bits ^= low
+
+        facetas = {}
+        for faceta, valores in self.bitmaps.items():
+            base = combinar(faceta)
+            conteos = {}
+            for valor, bitmap in valores.items():
+                total = (base & bitmap).bit_count()
+                if total:
+                    conteos[valor] = total
+            facetas[faceta] = conteos
+        return {'total': resultado.bit_count(), 'vins': vins, 'facetas': facetas}
+
+
+class VehiculoFacetIndex:
+    """
+    Índice en memoria de los vehículos para la búsqueda por facetas (marca, tipo, color, año y precio).
+
+    Los filtros y conteos son operaciones AND/OR y conteo de bits sobre mapas de bits, una por valor de faceta,
+    sin recorrer los vehículos. El índice se carga con una sola consulta, se mantiene con las escrituras de
+    vehículos del proceso y se recarga al vencer su TTL para incorporar las escrituras de otros procesos.
+
+    Atributos:
+        db (SQLAlchemy): Instancia de SQLAlchemy para manejar la base de datos.
+        ttl (float): Segundos de vigencia del índice antes de recargarlo.
+        ancho_precio (int): Ancho en unidades monetarias de los intervalos de la faceta de precio.
+    """
+
+    def __init__(self, db: SQLAlchemy, ttl: float = 300.0, ancho_precio: int = 5000):
+        """
+        Inicializa el índice vacío; se carga en el primer uso.
+
+        Args:
+            db (SQLAlchemy): Instancia de SQLAlchemy.
+            ttl (float): Segundos de vigencia del índice.
+            ancho_precio (int): Ancho de los intervalos de precio.
+        """
+        self.db = db
+        self.ttl = ttl
+        self.ancho_precio = ancho_precio
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def _load(self) -> _Facetas:
+        """
+        Carga todos los vehículos.
+
+        Returns:
+            _Facetas: Índice del inquilino actual.
+        """
+        columns = [Vehiculo.vin, *[getattr(Vehiculo, faceta) for faceta in CATEGORIAS], Vehiculo.anio, Vehiculo.precio]
+        with replica_router.reading():
+            rows = self.db.session.execute(select(*columns)).mappings().all()
+        facetas = _Facetas(self.ancho_precio * 100)
+        for row in rows:
+            facetas.add(row)
+        return facetas
+
+    def _current(self) -> _Facetas:
+        """
+        Obtiene el índice del inquilino actual, cargándolo si no existe o expiró. Debe llamarse con el candado tomado.
+
+        Returns:
+            _Facetas: Índice del inquilino actual.
+        """
+        tenant = current_tenant()
+        facetas = self._indexes.get(tenant)
+        if facetas is None or time.monotonic() - facetas.loaded_at > self.ttl:
+            facetas = self._indexes[tenant] = self._load()
+        return facetas
+
+    def update(self, previous: Optional[dict], current: Optional[dict]) -> None:
+        """
+        Aplica al índice del inquilino actual, si ya está cargado, una escritura de vehículo confirmada.
+
+        Args:
+            previous (Optional[dict]): Valores del vehículo antes de la escritura (None al crear).
+            current (Optional[dict]): Valores del vehículo tras la escritura (None al eliminar).
+        """
+        with self._lock:
+            facetas = self._indexes.get(current_tenant())
+            if facetas is None:
+                return
+            if previous is not None:
+                facetas.remove(previous['vin'])
+            if current is not None:
+                facetas.add(current)
+
+    def search(self, categorias: Dict[str, Iterable[str]], anio: tuple = (None, None),
+               precio: tuple = (None, None), offset: int = 0, limit: int = 50) -> dict:
+        """
+        Busca vehículos por facetas.
+
+        Args:
+            categorias (Dict[str, Iterable[str]]): Valores aceptados por faceta de valor exacto ('marca', 'tipo',
+                'color'); un vehículo cumple la faceta si tiene cualquiera de ellos.
+            anio (tuple): Año mínimo y máximo (None para no acotar).
+            precio (tuple): Precio mínimo y máximo (None para no acotar).
+            offset (int): Número de vehículos a omitir.
+            limit (int): Número máximo de VIN a devolver.
+
+        Returns:
+            dict: Total de vehículos encontrados, VIN de la página y conteos por valor de cada faceta; los
+            intervalos de precio se identifican por su precio inicial.
+
+        Raises:
+            ValueError: Si un precio no es finito.
+        """
+        precio = tuple(None if valor is None else _centavos(valor) for valor in precio)
+        with self._lock:
+            resultado = self._current().search(categorias, anio, precio, offset, limit)
+        resultado['facetas']['precio'] = {f'{inicio // 100}-{inicio // 100 + self.ancho_precio}': total
+                                          for inicio, total in sorted(resultado['facetas']['precio'].items())}
+        resultado['facetas']['anio'] = dict(sorted(resultado['facetas']['anio'].items()))
+        return resultado
@@ -0,0 +1,49 @@
+# Este archivo contiene el repositorio de vehículos, que mantiene el índice por facetas y los agregados de ventas.
+from flask_sqlalchemy import SQLAlchemy
+from typing import Optional
+from models import Vehiculo
+from repositories.base_repository import BaseRepository
+from repositories.vehiculo_facet_index import VehiculoFacetIndex
+from repositories.venta_resumen_repository import VentaResumenRepository
+
+
+class VehiculoRepository(BaseRepository[Vehiculo]):
+    """
+    Repositorio de vehículos.
+
+    Atributos:
+        facet_index (Optional[VehiculoFacetIndex]): Índice de búsqueda por facetas que se mantiene con cada escritura.
+        resumen_repository (Optional[VentaResumenRepository]): Agregados mensuales de ventas, que agrupan las
+            ventas por la marca y el modelo actuales de su vehículo.
+    """
+
+    def __init__(self, db: SQLAlchemy, facet_index: Optional[VehiculoFacetIndex] = None,
+                 resumen_repository: Optional[VentaResumenRepository] = None):
+        """
+        Inicializa el repositorio de vehículos.
+
+        Args:
+            db (SQLAlchemy): Instancia de SQLAlchemy.
+            facet_index (Optional[VehiculoFacetIndex]): Índice de búsqueda por facetas a mantener.
+            resumen_repository (Optional[VentaResumenRepository]): Agregados mensuales de ventas a mantener.
+        """
+        super().__init__(db, Vehiculo)
+        self.facet_index = facet_index
+        self.resumen_repository = resumen_repository
+
+    def _before_commit(self, operation: str, current: Optional[dict], previous: Optional[dict]) -> None:
+        """
+        Mueve las ventas del vehículo a su nuevo grupo de los agregados si cambió su marca o su modelo, dentro de
+        la transacción de la escritura.
+        """
+        super()._before_commit(operation, current, previous)
+        if self.resumen_repository is not None and operation == 'update':
+            self.resumen_repository.move_vehiculo(previous, current)
+
+    def _after_commit(self, operation: str, current: Optional[dict], previous: Optional[dict]) -> None:
+        """
+        Actualiza el índice de búsqueda por facetas con la escritura confirmada.
+        """
+        super()._after_commit(operation, current, previous)
+        if self.facet_index is not None:
+            self.facet_index.update(previous, current)
@@ -0,0 +1,96 @@
+# Este archivo contiene el repositorio de ventas, que mantiene los agregados mensuales y el ranking de vendedores con cada escritura.
+from datetime import datetime
+from decimal import Decimal
+from flask_sqlalchemy import SQLAlchemy
+from typing import Optional
+from models import Venta
+from repositories.base_repository import BaseRepository
+from repositories.venta_resumen_repository import VentaResumenRepository
+from services.ranking_vendedores_service import RankingVendedoresService
+
+
+class VentaRepository(BaseRepository[Venta]):
+    """
+    Repositorio de ventas.
+
+    Atributos:
+        resumen_repository (Optional[VentaResumenRepository]): Agregados mensuales de ventas que se mantienen en
+            la misma transacción que cada escritura.
+        ranking (Optional[RankingVendedoresService]): Ranking de vendedores en memoria que se actualiza tras
+            confirmar cada escritura.
+    """
+
+    def __init__(self, db: SQLAlchemy, resumen_repository: Optional[VentaResumenRepository] = None,
+                 ranking: Optional[RankingVendedoresService] = None):
+        """
+        Inicializa el repositorio de ventas.
+
+        Args:
+            db (SQLAlchemy): Instancia de SQLAlchemy.
+            resumen_repository (Optional[VentaResumenRepository]): Agregados mensuales de ventas a mantener.
+            ranking (Optional[RankingVendedoresService]): Ranking de vendedores a mantener.
+        """
+        super().__init__(db, Venta)
+        self.resumen_repository = resumen_repository
+        self.ranking = ranking
+
+    @staticmethod
+    def _coerce(kwargs: dict) -> dict:
+        """
+        Convierte la fecha recibida como texto ISO en datetime y el precio en Decimal, para que los agregados
+        se calculen con los mismos tipos que devuelve la base de datos.
+
+        Args:
+            kwargs (dict): Atributos de la venta.
+
+        Returns:
+            dict: Atributos con 'fecha' como datetime y 'precio' como Decimal.
+        """
+        kwargs = dict(kwargs)
+        if isinstance(kwargs.get('fecha'), str):
+            kwargs['fecha'] = datetime.fromisoformat(kwargs['fecha'])
+        if kwargs.get('precio') is not None and not isinstance(kwargs['precio'], Decimal):
+            kwargs['precio'] = Decimal(str(kwargs['precio']))
+        return kwargs
+
+    def create(self, **kwargs) -> Venta:
+        """
+        Crea una venta.
+
+        Args:
+            **kwargs: Atributos de la venta.
+
+        Returns:
+            Venta: La venta creada.
+        """
+        return super().create(**self._coerce(kwargs))
+
+    def update(self, id: int, **kwargs) -> Optional[Venta]:
+        """
+        Actualiza una venta.
+
+        Args:
+            id (int): Identificador de la venta.
+            **kwargs: Atributos a actualizar.
+
+        Returns:
+            Optional[Venta]: La venta actualizada o None si no existe.
+        """
+        return super().update(id, **self._coerce(kwargs))
+
+    def _before_commit(self, operation: str, current: Optional[dict], previous: Optional[dict]) -> None:
+        """
+        Actualiza los agregados mensuales de ventas dentro de la transacción de la escritura.
+        """
+        super()._before_commit(operation, current, previous)
+        if self.resumen_repository is not None:
+            self.resumen_repository.apply(previous, current)
+
+    def _after_commit(self, operation: str, current: Optional[dict], previous: Optional[dict]) -> None:
+        """
+        Reemplaza en el ranking de vendedores los valores anteriores de la venta por los confirmados. Los valores
+        anteriores son los leídos con la fila bloqueada, por lo que una escritura concurrente no los altera.
+        """
+        super()._after_commit(operation, current, previous)
+        if self.ranking is not None:
+            self.ranking.update(previous, current)
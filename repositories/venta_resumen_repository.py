@@ -0,0 +1,265 @@
+# Este archivo contiene el repositorio de los agregados mensuales de ventas, usados por los reportes de automóviles.
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from flask import current_app, g
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import func, select, update
+from typing import Dict, List, Optional, Sequence
+from models import Vehiculo, Venta, VentaResumenMensual, current_tenant
+from repositories.base_repository import BaseRepository
+from repositories.upsert import upsert
+
+# Columnas por las que se pueden agrupar los reportes de ventas
+DIMENSIONES = {
+    'vendedor': VentaResumenMensual.id_vendedor,
+    'marca': VentaResumenMensual.marca,
+    'modelo': VentaResumenMensual.modelo,
+}
+
+
+def anio_mes(fecha) -> int:
+    """
+    Calcula el mes (AAAAMM) de una fecha.
+
+    Args:
+        fecha (date): Fecha a convertir.
+
+    Returns:
+        int: Año y mes de la fecha.
+    """
+    return fecha.year * 100 + fecha.month
+
+
+def _siguiente_mes(mes: int) -> int:
+    """
+    Calcula el mes siguiente a un mes AAAAMM.
+
+    Args:
+        mes (int): Año y mes.
+
+    Returns:
+        int: Año y mes siguientes.
+    """
+    return mes + 89 if mes % 100 == 12 else mes + 1
+
+
+def _inicio(mes: int) -> datetime:
+    """
+    Obtiene el primer instante de un mes AAAAMM.
+
+    Args:
+        mes (int): Año y mes.
+
+    Returns:
+        datetime: Primer instante del mes.
+    """
+    return datetime(mes // 100, mes % 100, 1)
+
+
+class VentaResumenRepository(BaseRepository[VentaResumenMensual]):
+    """
+    Repositorio de las ventas agregadas por mes, vendedor, marca y modelo. Los reportes leen esta tabla, cuyo
+    tamaño depende del número de meses, vendedores y modelos, y no del número de ventas.
+
+    Cada escritura incrementa la versión de las filas que modifica, y las filas no se eliminan: la suma de las
+    versiones de un rango de meses cambia con cualquier escritura del rango y versiona sus respuestas en caché,
+    sin una fila de versión común que serialice las escrituras de ventas.
+    """
+
+    KEYS = ['anio_mes', 'id_vendedor', 'marca', 'modelo']
+
+    def __init__(self, db: SQLAlchemy):
+        """
+        Inicializa el repositorio de agregados de ventas.
+
+        Args:
+            db (SQLAlchemy): Instancia de SQLAlchemy.
+        """
+        super().__init__(db, VentaResumenMensual)
+
+    def _delta(self, venta: dict, signo: int, vehiculo: Optional[dict] = None) -> Optional[dict]:
+        """
+        Construye la fila de agregado que aporta una venta.
+
+        La marca y el modelo del vehículo se leen con un bloqueo compartido, para que no cambien antes de
+        confirmar: las ventas se agrupan siempre por la marca y el modelo actuales de su vehículo (ver
+        move_vehiculo), y así una venta se resta del mismo grupo al que se sumó.
+
+        Args:
+            venta (dict): Valores de la venta.
+            signo (int): 1 para sumar la venta, -1 para restarla.
+            vehiculo (Optional[dict]): Marca y modelo con los que se agrupa la venta (por defecto, los del
+                vehículo de la venta).
+
+        Returns:
+            Optional[dict]: Fila del agregado o None si el vehículo no existe.
+        """
+        if vehiculo is None:
+            vehiculo = self.db.session.execute(
+                select(Vehiculo.marca, Vehiculo.modelo).where(Vehiculo.vin == venta['vin']).with_for_update(read=True)
+            ).mappings().first()
+            if vehiculo is None:
+                return None
+        return {'anio_mes': anio_mes(venta['fecha']), 'id_vendedor': venta['id_vendedor'],
+                'marca': vehiculo['marca'], 'modelo': vehiculo['modelo'],
+                'unidades': signo, 'ingresos': signo * venta['precio'], 'version': 1}
+
+    def _add(self, row: dict) -> None:
+        """
+        Suma una fila de agregado a la de su grupo, creándola si no existe.
+
+        Args:
+            row (dict): Fila del agregado (ver _delta).
+        """
+        upsert(self.db.session, VentaResumenMensual, [row], self.KEYS,
+               lambda columns, inserted: {columns.Unidades: columns.Unidades + inserted.Unidades,
+                                          columns.Ingresos: columns.Ingresos + inserted.Ingresos,
+                                          columns.Version: columns.Version + 1})
+
+    def apply(self, previous: Optional[dict], current: Optional[dict]) -> None:
+        """
+        Aplica a los agregados una escritura de venta, dentro de la transacción en curso y sin confirmarla.
+
+        Args:
+            previous (Optional[dict]): Valores de la venta antes de la escritura (None al crear).
+            current (Optional[dict]): Valores de la venta tras la escritura (None al eliminar).
+        """
+        campos = ('fecha', 'id_vendedor', 'vin', 'precio')
+        if previous and current and all(previous[campo] == current[campo] for campo in campos):
+            return
+
+        for row in (self._delta(previous, -1) if previous else None, self._delta(current, 1) if current else None):
+            if row is not None:
+                self._add(row)
+
+    def move_vehiculo(self, previous: dict, current: dict) -> None:
+        """
+        Mueve las ventas de un vehículo del grupo de su marca y modelo anteriores al de los nuevos, dentro de la
+        transacción en curso y sin confirmarla.
+
+        Args:
+            previous (dict): Valores del vehículo antes de la escritura.
+            current (dict): Valores del vehículo tras la escritura.
+        """
+        if (previous['marca'], previous['modelo']) == (current['marca'], current['modelo']):
+            return
+        statement = select(Venta.fecha, Venta.id_vendedor, Venta.precio) \
+            .where(Venta.vin == previous['vin']).with_for_update()
+        for venta in self.db.session.execute(statement).mappings().all():
+            self._add(self._delta(venta, -1, previous))
+            self._add(self._delta(venta, 1, current))
+
+    def get_version(self, desde: int, hasta: int) -> int:
+        """
+        Obtiene la versión de los agregados de un rango de meses: la suma de las versiones de sus filas.
+
+        Args:
+            desde (int): Primer mes (AAAAMM).
+            hasta (int): Último mes (AAAAMM).
+
+        Returns:
+            int: Versión del rango (0 si nunca se ha escrito).
+        """
+        version = self.db.session.scalar(
+            select(func.sum(VentaResumenMensual.version))
+            .where(VentaResumenMensual.anio_mes >= desde, VentaResumenMensual.anio_mes <= hasta)
+        )
+        return int(version or 0)
+
+    def _rebuild_mes(self, app, tenant: Optional[str], mes: int) -> int:
+        """
+        Recalcula los agregados de un mes en su propia sesión y transacción. Las filas existentes se ponen en
+        cero y se sobrescriben, en lugar de eliminarse, para que sus versiones solo aumenten.
+
+        Args:
+            app (Flask): Aplicación Flask, para abrir un contexto en el hilo de trabajo.
+            tenant (Optional[str]): Inquilino cuyo esquema se recalcula.
+            mes (int): Año y mes a recalcular.
+
+        Returns:
+            int: Número de filas de agregado escritas.
+        """
+        with app.app_context():
+            g.tenant = tenant
+            self.db.session.execute(
+                update(VentaResumenMensual).where(VentaResumenMensual.anio_mes == mes)
+                .values(unidades=0, ingresos=0, version=VentaResumenMensual.version + 1)
+            )
+            statement = select(Venta.id_vendedor, Vehiculo.marca, Vehiculo.modelo,
+                               func.count(), func.sum(Venta.precio)) \
+                .join(Vehiculo, Vehiculo.vin == Venta.vin) \
+                .where(Venta.fecha >= _inicio(mes), Venta.fecha < _inicio(_siguiente_mes(mes))) \
+                .group_by(Venta.id_vendedor, Vehiculo.marca, Vehiculo.modelo)
+            rows = [{'anio_mes': mes, 'id_vendedor': id_vendedor, 'marca': marca, 'modelo': modelo,
+                     'unidades': unidades, 'ingresos': ingresos, 'version': 1}
+                    for id_vendedor, marca, modelo, unidades, ingresos in self.db.session.execute(statement)]
+            if rows:
+                upsert(self.db.session, VentaResumenMensual, rows, self.KEYS,
+                       lambda columns, inserted: {columns.Unidades: inserted.Unidades,
+                                                  columns.Ingresos: inserted.Ingresos,
+                                                  columns.Version: columns.Version + 1})
+            self.db.session.commit()
+            return len(rows)
+
+    def rebuild(self, desde: Optional[date] = None, hasta: Optional[date] = None, workers: int = 4) -> int:
+        """
+        Recalcula los agregados a partir de las ventas, un mes por tarea y varios meses en paralelo.
+
+        Cada mes se recalcula con un INSERT ... SELECT en su propia transacción, por lo que es idempotente y
+        puede repetirse solo para los meses afectados.
+
+        Args:
+            desde (Optional[date]): Fecha del primer mes a recalcular (por defecto, el de la venta más antigua).
+            hasta (Optional[date]): Fecha del último mes a recalcular (por defecto, el de la venta más reciente).
+            workers (int): Número de meses que se recalculan a la vez.
+
+        Returns:
+            int: Número de filas de agregado escritas.
+        """
+        if desde is None or hasta is None:
+            primera, ultima = self.db.session.execute(select(func.min(Venta.fecha), func.max(Venta.fecha))).one()
+            self.db.session.rollback()
+            if primera is None:
+                return 0
+            desde = desde or primera
+            hasta = hasta or ultima
+
+        meses, mes = [], anio_mes(desde)
+        while mes <= anio_mes(hasta):
+            meses.append(mes)
+            mes = _siguiente_mes(mes)
+
+        app, tenant = current_app._get_current_object(), current_tenant()
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            return sum(executor.map(lambda mes: self._rebuild_mes(app, tenant, mes), meses))
+
+    def get_resumen(self, desde: int, hasta: int, dimensiones: Sequence[str],
+                    filtros: Optional[Dict] = None) -> List[Dict]:
+        """
+        Obtiene las ventas agregadas por mes y por las dimensiones indicadas.
+
+        Args:
+            desde (int): Primer mes (AAAAMM).
+            hasta (int): Último mes (AAAAMM).
+            dimensiones (Sequence[str]): Dimensiones de agrupación ('vendedor', 'marca', 'modelo').
+            filtros (Optional[Dict]): Valor exacto por dimensión para filtrar.
+
+        Returns:
+            List[Dict]: Mes, dimensiones, unidades e ingresos de cada grupo, ordenados por mes.
+        """
+        columns = [DIMENSIONES[dimension] for dimension in dimensiones]
+        unidades, ingresos = func.sum(VentaResumenMensual.unidades), func.sum(VentaResumenMensual.ingresos)
+        statement = select(VentaResumenMensual.anio_mes, *columns, unidades, ingresos) \
+            .where(VentaResumenMensual.anio_mes >= desde, VentaResumenMensual.anio_mes <= hasta,
+                   VentaResumenMensual.unidades > 0)
+        for dimension, value in (filtros or {}).items():
+            statement = statement.where(DIMENSIONES[dimension] == value)
+        statement = statement.group_by(VentaResumenMensual.anio_mes, *columns) \
+            .order_by(VentaResumenMensual.anio_mes, *columns)
+
+        return [{
+            'mes': f'{row[0] // 100}-{row[0] % 100:02d}',
+            **{column.key: value for column, value in zip(columns, row[1:-2])},
+            'unidades': int(row[-2]),
+            'ingresos': row[-1]
+        } for row in self.db.session.execute(statement)]
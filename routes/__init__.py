@@ -2,6 +2,8 @@
 from .clinica_routes import bp as clinica_bp
 from .restaurante_routes import bp as restaurante_bp
 from .automoviles_routes import bp as automoviles_bp
+from .metrics_routes import bp as metrics_bp
+from .job_routes import bp as jobs_bp
 
 # Se importan las rutas de los modulos de la aplicacion.
-__all__ = ['clinica_bp', 'restaurante_bp', 'automoviles_bp']
\ No newline at end of file
+__all__ = ['clinica_bp', 'restaurante_bp', 'automoviles_bp', 'metrics_bp', 'jobs_bp']
\ No newline at end of file
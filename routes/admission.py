@@ -0,0 +1,229 @@
+# Este archivo contiene el control de admisión, que limita las solicitudes concurrentes por base de datos y por ruta.
+import heapq
+import itertools
+import re
+import threading
+import time
+from flask import current_app, g, jsonify, request
+
+# Clases de prioridad, de mayor a menor: las lecturas interactivas pasan antes que las escrituras, y estas antes
+# que los reportes y las escrituras masivas
+PRIORITIES = {'interactive': 0, 'write': 1, 'bulk': 2}
+
+# Rutas de la clase 'bulk' por defecto (nombre de la función de la ruta)
+BULK_ENDPOINTS = (r'^get_reporte_', r'^get_serie_', r'^get_ranking_', r'_where$', r'^upsert_', r'^execute_batch$')
+
+
+class _Gate:
+    """
+    Límite de solicitudes concurrentes con una cola de espera acotada y ordenada por prioridad.
+
+    Atributos:
+        name (str): Nombre con el que se reportan las estadísticas (bind o ruta).
+        limit (int): Número máximo de solicitudes en ejecución.
+        max_queue (int): Número máximo de solicitudes en espera.
+    """
+
+    def __init__(self, name, limit, max_queue):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self.admitted = 0
+        self.shed = {priority: 0 for priority in PRIORITIES}
+        self.max_queued = 0
+
+    def acquire(self, priority, deadline, limit):
+        """
+        Toma un lugar, esperando en la cola hasta el plazo si no hay lugares libres.
+
+        Args:
+            priority (str): Clase de prioridad de la solicitud.
+            deadline (float): Instante (time.monotonic) tras el cual se deja de esperar.
+            limit (int): Número de lugares que puede ocupar la clase de la solicitud.
+
+        Returns:
+            bool: True si se tomó un lugar, False si la solicitud se descarta.
+        """
+        with self._condition:
+            if self.active < limit and not self._waiting:
+                self.active += 1
+                self.admitted += 1
+                return True
+            if len(self._waiting) >= self.max_queue:
+                self.shed[priority] += 1
+                return False
+
+            entry = (PRIORITIES[priority], next(self._sequence))
+            heapq.heappush(self._waiting, entry)
+            self.max_queued = max(self.max_queued, len(self._waiting))
+            while not (self._waiting[0] == entry and self.active < limit):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._waiting.remove(entry)
+                    heapq.heapify(self._waiting)
+                    self.shed[priority] += 1
+                    # La solicitud siguiente puede haber quedado al frente de la cola
+                    self._condition.notify_all()
+                    return False
+                self._condition.wait(remaining)
+            heapq.heappop(self._waiting)
+            self.active += 1
+            self.admitted += 1
+            self._condition.notify_all()
+            return True
+
+    def release(self):
+        """
+        Libera un lugar y despierta a las solicitudes en espera.
+        """
+        with self._condition:
+            self.active -= 1
+            self._condition.notify_all()
+
+    def stats(self):
+        """
+        Obtiene las estadísticas del límite.
+
+        Returns:
+            dict: Límite, solicitudes en ejecución y en espera, admitidas y descartadas por clase.
+        """
+        with self._condition:
+            return {
+                'name': self.name,
+                'limit': self.limit,
+                'active': self.active,
+                'queued': len(self._waiting),
+                'max_queued': self.max_queued,
+                'admitted': self.admitted,
+                'shed': dict(self.shed)
+            }
+
+
+class AdmissionController:
+    """
+    Control de admisión de las rutas de los dominios: cada solicitud toma un lugar en el límite de su ruta (si
+    lo tiene) y en el de su bind antes de ejecutarse, y lo libera al terminar. Si no hay lugares, espera en una
+    cola acotada ordenada por clase de prioridad; si la cola está llena o se cumple el plazo de su clase, se
+    responde 503 con Retry-After en lugar de ocupar un hilo más.
+
+    Así un reporte lento de un bind no acapara los hilos de los demás binds, y dentro de un bind los reportes y
+    las escrituras masivas (clase 'bulk') tienen límite propio por ruta y no pueden ocupar los lugares
+    reservados para las lecturas y escrituras interactivas.
+
+    La configuración se lee de la aplicación Flask:
+        ADMISSION_BIND_LIMIT (int): Solicitudes concurrentes por bind; 0 desactiva el control.
+        ADMISSION_RESERVED (int): Lugares de cada bind que la clase 'bulk' no puede ocupar.
+        ADMISSION_BULK_LIMIT (int): Solicitudes concurrentes por cada ruta de la clase 'bulk'.
+        ADMISSION_ENDPOINT_LIMITS (dict): Límites de rutas específicas, p. ej. {'automoviles.get_ventas': 4}.
+        ADMISSION_MAX_QUEUE (int): Solicitudes en espera por límite.
+        ADMISSION_QUEUE_TIMEOUT_MS (dict): Espera máxima en la cola por clase de prioridad.
+        ADMISSION_BULK_ENDPOINTS (tuple): Expresiones regulares de los nombres de las rutas de la clase 'bulk'.
+    """
+
+    def __init__(self):
+        """
+        Inicializa el control sin límites; se crean en la primera solicitud de cada bind y ruta.
+        """
+        self._gates = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        Configura los límites y la admisión de cada solicitud.
+
+        Args:
+            app (Flask): La instancia de la aplicación Flask.
+        """
+        app.config.setdefault('ADMISSION_BIND_LIMIT', 16)
+        app.config.setdefault('ADMISSION_RESERVED', 4)
+        app.config.setdefault('ADMISSION_BULK_LIMIT', 2)
+        app.config.setdefault('ADMISSION_ENDPOINT_LIMITS', {})
+        app.config.setdefault('ADMISSION_MAX_QUEUE', 64)
+        app.config.setdefault('ADMISSION_QUEUE_TIMEOUT_MS', {'interactive': 1000, 'write': 2000, 'bulk': 5000})
+        app.config.setdefault('ADMISSION_BULK_ENDPOINTS', BULK_ENDPOINTS)
+        app.extensions['admission_controller'] = self
+        self._gates = {}
+
+        @app.before_request
+        def _admit():
+            return self.admit()
+
+        @app.teardown_request
+        def _release(exception):
+            for gate in reversed(g.pop('admission_gates', [])):
+                gate.release()
+
+    def _gate(self, name, limit):
+        """
+        Obtiene el límite de un bind o ruta, creándolo en el primer uso.
+        """
+        with self._lock:
+            gate = self._gates.get(name)
+            if gate is None:
+                gate = self._gates[name] = _Gate(name, limit, current_app.config['ADMISSION_MAX_QUEUE'])
+            return gate
+
+    @staticmethod
+    def _priority(view):
+        """
+        Obtiene la clase de prioridad de la solicitud actual a partir de su método y del nombre de su ruta.
+        """
+        if any(re.search(pattern, view) for pattern in current_app.config['ADMISSION_BULK_ENDPOINTS']):
+            return 'bulk'
+        return 'interactive' if request.method == 'GET' else 'write'
+
+    def admit(self):
+        """
+        Admite la solicitud actual, tomando un lugar en el límite de su ruta y en el de su bind.
+
+        Returns:
+            Optional[Response]: Respuesta 503 si la solicitud se descarta, None si se admite.
+        """
+        config = current_app.config
+        if not config['ADMISSION_BIND_LIMIT'] or request.blueprint is None or request.endpoint is None:
+            return None
+        # El mismo blueprint se registra con y sin prefijo de inquilino; su nombre original es el bind
+        bind = current_app.blueprints[request.blueprint].name
+        if bind not in config['SQLALCHEMY_BINDS']:
+            return None
+
+        view = request.endpoint.rsplit('.', 1)[-1]
+        endpoint = f'{bind}.{view}'
+        priority = self._priority(view)
+        deadline = time.monotonic() + config['ADMISSION_QUEUE_TIMEOUT_MS'][priority] / 1000
+        bind_limit = config['ADMISSION_BIND_LIMIT']
+
+        limits = []
+        endpoint_limit = config['ADMISSION_ENDPOINT_LIMITS'].get(endpoint)
+        if endpoint_limit is None and priority == 'bulk':
+            endpoint_limit = config['ADMISSION_BULK_LIMIT']
+        if endpoint_limit is not None:
+            limits.append((self._gate(endpoint, endpoint_limit), endpoint_limit))
+        class_limit = max(1, bind_limit - config['ADMISSION_RESERVED']) if priority == 'bulk' else bind_limit
+        limits.append((self._gate(bind, bind_limit), class_limit))
+
+        g.admission_gates = []
+        for gate, limit in limits:
+            if not gate.acquire(priority, deadline, limit):
+                return jsonify({'message': f'{gate.name} está saturado, intente de nuevo'}), 503, {'Retry-After': '1'}
+            g.admission_gates.append(gate)
+        return None
+
+    def stats(self):
+        """
+        Obtiene las estadísticas de los límites.
+
+        Returns:
+            list: Estadísticas de cada límite de bind y de ruta.
+        """
+        with self._lock:
+            gates = list(self._gates.values())
+        return [gate.stats() for gate in gates]
+
+
+# Control de admisión de la aplicación
+admission_controller = AdmissionController()
@@ -0,0 +1,55 @@
+from flask import jsonify, request
+from models import current_tenant, db, is_tracked
+from repositories.audit_log import audit_log
+
+
+class AuditRoutes:
+    """
+    Ruta de la bitácora de auditoría de un dominio: el historial de escrituras de un registro de una de sus
+    tablas con seguimiento de cambios, con quién hizo cada una y los valores que cambió.
+
+    Atributos:
+        bind (str): Bind del dominio.
+    """
+
+    def __init__(self, bind):
+        """
+        Inicializa la ruta de la bitácora del dominio.
+
+        Args:
+            bind (str): Bind del dominio (p. ej. 'clinica').
+        """
+        self.bind = bind
+
+    def _tables(self):
+        """
+        Obtiene las tablas con seguimiento de cambios del dominio.
+        """
+        return {mapper.class_.__tablename__ for mapper in db.Model.registry.mappers
+                if is_tracked(mapper.class_) and mapper.class_.__bind_key__ == self.bind}
+
+    def history(self):
+        """
+        Obtiene el historial de escrituras de un registro, de la más reciente a la más antigua. Las escrituras
+        se agregan a la bitácora en segundo plano, por lo que las más recientes pueden tardar en aparecer.
+
+        Parámetros de consulta:
+            tabla (str): Tabla del registro (p. ej. 'paciente').
+            id (str): Llave primaria del registro.
+            limit (int): Número máximo de escrituras (por defecto 100, máximo 1000).
+
+        Returns:
+            Response: Respuesta con las escrituras del registro o mensaje de error.
+        """
+        if not audit_log.enabled:
+            return jsonify({'message': 'La bitácora de auditoría no está activa'}), 404
+        tabla = request.args.get('tabla')
+        id = request.args.get('id')
+        if not tabla or not id:
+            return jsonify({'message': 'Parámetros requeridos faltantes: tabla, id'}), 400
+        if tabla not in self._tables():
+            return jsonify({'message': f'Tabla sin auditoría: {tabla}'}), 400
+        limit = request.args.get('limit', 100, type=int)
+        if not 1 <= limit <= 1000:
+            return jsonify({'message': 'El parámetro limit debe estar entre 1 y 1000'}), 400
+        return jsonify({'data': audit_log.repository.history(self.bind, tabla, id, current_tenant(), limit)})
@@ -1,25 +1,51 @@
 # Este archivo contiene las rutas para los endpoints relacionados con la tabla de automóviles
-from flask import Blueprint, request, jsonify
+import click
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from flask import Blueprint, request, jsonify, g
 from routes.base_routes import BaseRoutes
+from routes.batch_routes import BatchRoutes
+from routes.audit_routes import AuditRoutes
+from routes.event_routes import EventRoutes
+from routes.job_routes import JobRoutes
 from services.base_service import BaseService
+from services.reporte_ventas_service import ReporteVentasService
+from services.ranking_vendedores_service import METRICAS, VENTANAS, RankingVendedoresService
 from repositories.base_repository import BaseRepository
-from models import db, ClienteAutomoviles, Vendedor, Vehiculo, Venta
+from repositories.vehiculo_facet_index import CATEGORIAS, VehiculoFacetIndex
+from repositories.vehiculo_repository import VehiculoRepository
+from repositories.venta_repository import VentaRepository
+from repositories.venta_resumen_repository import DIMENSIONES, VentaResumenRepository
+from repositories.identity_cache import IdentityCache
+from repositories.reference_snapshot import ReferenceSnapshot
+from models import db, replica_router, ClienteAutomoviles, Vendedor, Vehiculo, Venta
 
 # Esta variable contiene la definición de la ruta de este archivo
 bp = Blueprint('automoviles', __name__)
 
 # Se crean los servicios para cada tabla
 cliente_service = BaseService(BaseRepository(db, ClienteAutomoviles))
-vendedor_service = BaseService(BaseRepository(db, Vendedor))
-vehiculo_service = BaseService(BaseRepository(db, Vehiculo))
-venta_service = BaseService(BaseRepository(db, Venta))
+vendedor_service = BaseService(BaseRepository(db, Vendedor, cache=IdentityCache('vendedor')))
+vehiculo_index = VehiculoFacetIndex(db)
+venta_resumen_repository = VentaResumenRepository(db)
+vehiculo_service = BaseService(VehiculoRepository(db, facet_index=vehiculo_index,
+                                                  resumen_repository=venta_resumen_repository))
+ranking_service = RankingVendedoresService(db)
+venta_service = BaseService(VentaRepository(db, resumen_repository=venta_resumen_repository, ranking=ranking_service))
+reporte_ventas_service = ReporteVentasService(venta_resumen_repository,
+                                              IdentityCache('reporte_ventas', ttl=3600, max_size=500))
+
+cliente_snapshot = ReferenceSnapshot(db, ClienteAutomoviles, 'cliente')
+vendedor_snapshot = ReferenceSnapshot(db, Vendedor, 'vendedor')
+vehiculo_snapshot = ReferenceSnapshot(db, Vehiculo, 'vehiculo', label_fields=('marca', 'modelo', 'anio'))
 
 # Los servicios se utilizan para crear las rutas de cada tabla
 clientes_routes = BaseRoutes(
     cliente_service,
     ClienteAutomoviles,
     ['nombre', 'direccion', 'correo_electronico', 'telefono'],
-    'Cliente'
+    'Cliente',
+    natural_key='correo_electronico'
 )
 
 # Se definen las rutas del método GET, POST, PUT y DELETE para la tabla de automóviles
@@ -33,6 +59,30 @@ def get_clientes_automoviles():
     """
     return clientes_routes.get_all()
 
+@bp.route('/clientes_automoviles/changes', methods=['GET'])
+def get_clientes_automoviles_changes():
+    """
+    Obtiene los clientes creados, modificados o eliminados después del token 'since', para sincronizar una copia
+    de la tabla sin volver a descargarla completa.
+
+    Returns:
+        Response: Respuesta con los registros escritos, las llaves eliminadas y el token de la siguiente consulta.
+    """
+    return clientes_routes.get_changes()
+
+@bp.route('/clientes_automoviles/<int:id>', methods=['GET'])
+def get_cliente_automoviles(id):
+    """
+    Obtiene un cliente de automóviles por su identificador.
+
+    Args:
+        id (int): Identificador del cliente.
+
+    Returns:
+        Response: Respuesta con el cliente encontrado.
+    """
+    return clientes_routes.get_by_id(id)
+
 @bp.route('/clientes_automoviles', methods=['POST'])
 def add_cliente_automoviles():
     """
@@ -69,6 +119,36 @@ def delete_cliente_automoviles(id):
     """
     return clientes_routes.delete(id)
 
+@bp.route('/clientes_automoviles', methods=['PATCH'])
+def update_clientes_where():
+    """
+    Actualiza los clientes que cumplen el filtro del parámetro 'filter' con las asignaciones del campo 'set'.
+
+    Returns:
+        Response: Respuesta con el número de registros actualizados, o solo contados con 'dry_run=true'.
+    """
+    return clientes_routes.update_many()
+
+@bp.route('/clientes_automoviles', methods=['DELETE'])
+def delete_clientes_where():
+    """
+    Elimina los clientes que cumplen el filtro del parámetro 'filter'.
+
+    Returns:
+        Response: Respuesta con el número de registros eliminados, o solo contados con 'dry_run=true'.
+    """
+    return clientes_routes.delete_many()
+
+@bp.route('/clientes_automoviles/upsert', methods=['PUT'])
+def upsert_clientes():
+    """
+    Inserta o actualiza los clientes de un arreglo, identificándolos por su correo electrónico, en una sola transacción.
+
+    Returns:
+        Response: Respuesta con el número de registros insertados, actualizados y sin cambios.
+    """
+    return clientes_routes.upsert_many()
+
 # Las demás rutas se crean de la misma forma que las de los clientes
 vendedores_routes = BaseRoutes(
     vendedor_service,
@@ -87,6 +167,56 @@ def get_vendedores():
     """
     return vendedores_routes.get_all()
 
+@bp.route('/vendedores/changes', methods=['GET'])
+def get_vendedores_changes():
+    """
+    Obtiene los vendedores creados, modificados o eliminados después del token 'since', para sincronizar una copia
+    de la tabla sin volver a descargarla completa.
+
+    Returns:
+        Response: Respuesta con los registros escritos, las llaves eliminadas y el token de la siguiente consulta.
+    """
+    return vendedores_routes.get_changes()
+
+@bp.route('/vendedores/<int:id>', methods=['GET'])
+def get_vendedor(id):
+    """
+    Obtiene un vendedor por su identificador.
+
+    Args:
+        id (int): Identificador del vendedor.
+
+    Returns:
+        Response: Respuesta con el vendedor encontrado.
+    """
+    return vendedores_routes.get_by_id(id)
+
+@bp.route('/vendedores/ranking', methods=['GET'])
+def get_ranking_vendedores():
+    """
+    Obtiene los vendedores con más ventas o ingresos en una ventana móvil.
+
+    Parámetros de consulta:
+        window (str): 'hoy', '7d' o '30d' (por defecto '7d').
+        k (int): Número de vendedores (por defecto 10, máximo 100).
+        metrica (str): 'ventas' o 'ingresos' (por defecto 'ventas').
+
+    Returns:
+        Response: Respuesta con el ranking de vendedores.
+    """
+    ventana = request.args.get('window', '7d')
+    metrica = request.args.get('metrica', 'ventas')
+    if ventana not in VENTANAS:
+        return jsonify({'message': f'Ventana no válida: {ventana}'}), 400
+    if metrica not in METRICAS:
+        return jsonify({'message': f'Métrica no válida: {metrica}'}), 400
+    k = min(max(request.args.get('k', 10, type=int), 1), 100)
+
+    ranking = ranking_service.top(ventana, k, metrica)
+    nombres = vendedor_snapshot.resolve(item['id_vendedor'] for item in ranking)
+    return jsonify({'window': ventana, 'metrica': metrica,
+                    'data': [{**item, 'vendedor_nombre': nombres.get(item['id_vendedor'])} for item in ranking]})
+
 @bp.route('/vendedores', methods=['POST'])
 def add_vendedor():
     """
@@ -123,12 +253,33 @@ def delete_vendedor(id):
     """
     return vendedores_routes.delete(id)
 
+@bp.route('/vendedores', methods=['PATCH'])
+def update_vendedores_where():
+    """
+    Actualiza los vendedores que cumplen el filtro del parámetro 'filter' con las asignaciones del campo 'set'.
+
+    Returns:
+        Response: Respuesta con el número de registros actualizados, o solo contados con 'dry_run=true'.
+    """
+    return vendedores_routes.update_many()
+
+@bp.route('/vendedores', methods=['DELETE'])
+def delete_vendedores_where():
+    """
+    Elimina los vendedores que cumplen el filtro del parámetro 'filter'.
+
+    Returns:
+        Response: Respuesta con el número de registros eliminados, o solo contados con 'dry_run=true'.
+    """
+    return vendedores_routes.delete_many()
+
 # Vehículos routes
 vehiculos_routes = BaseRoutes(
     vehiculo_service,
     Vehiculo,
     ['vin', 'marca', 'modelo', 'anio', 'color', 'tipo', 'precio', 'fecha_recepcion'],
-    'Vehículo'
+    'Vehículo',
+    natural_key='vin'
 )
 
 @bp.route('/vehiculos', methods=['GET'])
@@ -141,6 +292,67 @@ def get_vehiculos():
     """
     return vehiculos_routes.get_all()
 
+@bp.route('/vehiculos/changes', methods=['GET'])
+def get_vehiculos_changes():
+    """
+    Obtiene los vehículos creados, modificados o eliminados después del token 'since', para sincronizar una copia
+    de la tabla sin volver a descargarla completa.
+
+    Returns:
+        Response: Respuesta con los registros escritos, las llaves eliminadas y el token de la siguiente consulta.
+    """
+    return vehiculos_routes.get_changes()
+
+@bp.route('/vehiculos/<string:vin>', methods=['GET'])
+def get_vehiculo(vin):
+    """
+    Obtiene un vehículo por su identificador.
+
+    Args:
+        vin (str): Identificador del vehículo.
+
+    Returns:
+        Response: Respuesta con el vehículo encontrado.
+    """
+    return vehiculos_routes.get_by_id(vin)
+
+@bp.route('/vehiculos/buscar', methods=['GET'])
+def search_vehiculos():
+    """
+    Busca vehículos por facetas y devuelve, en la misma respuesta, cuántos vehículos hay en cada valor de faceta.
+
+    Parámetros de consulta:
+        marca, tipo, color (str): Valores aceptados, separados por comas.
+        anio_min, anio_max (int): Rango de años.
+        precio_min, precio_max (Decimal): Rango de precios.
+        page (int): Número de página (por defecto 1).
+        page_size (int): VIN por página (por defecto 50, máximo 500).
+
+    Returns:
+        Response: Respuesta con los VIN encontrados, el total y los conteos por faceta.
+    """
+    categorias = {faceta: [valor for valor in request.args[faceta].split(',') if valor]
+                  for faceta in CATEGORIAS if faceta in request.args}
+    try:
+        anio = tuple(int(request.args[name]) if name in request.args else None for name in ('anio_min', 'anio_max'))
+        precio = tuple(Decimal(request.args[name]) if name in request.args else None
+                       for name in ('precio_min', 'precio_max'))
+        if any(valor is not None and not valor.is_finite() for valor in precio):
+            raise ValueError('Precio no finito')
+    except (ValueError, InvalidOperation):
+        return jsonify({'message': 'Los rangos de año y precio deben ser numéricos'}), 400
+    page = max(request.args.get('page', 1, type=int), 1)
+    page_size = min(max(request.args.get('page_size', 50, type=int), 1), 500)
+
+    resultado = vehiculo_index.search(categorias, anio, precio, (page - 1) * page_size, page_size)
+    return jsonify({
+        'data': resultado['vins'],
+        'total': resultado['total'],
+        'page': page,
+        'page_size': page_size,
+        'facetas': resultado['facetas']
+    })
+
 @bp.route('/vehiculos', methods=['POST'])
 def add_vehiculo():
     """
@@ -164,7 +376,7 @@ def update_vehiculo(vin):
     """
     return vehiculos_routes.update(vin)
 
-@bp.route('/vehiculos/<string:vin>', methods['DELETE'])
+@bp.route('/vehiculos/<string:vin>', methods=['DELETE'])
 def delete_vehiculo(vin):
     """
     Elimina un vehículo existente.
@@ -177,12 +389,43 @@ def delete_vehiculo(vin):
     """
     return vehiculos_routes.delete(vin)
 
+@bp.route('/vehiculos', methods=['PATCH'])
+def update_vehiculos_where():
+    """
+    Actualiza los vehículos que cumplen el filtro del parámetro 'filter' con las asignaciones del campo 'set'.
+
+    Returns:
+        Response: Respuesta con el número de registros actualizados, o solo contados con 'dry_run=true'.
+    """
+    return vehiculos_routes.update_many()
+
+@bp.route('/vehiculos', methods=['DELETE'])
+def delete_vehiculos_where():
+    """
+    Elimina los vehículos que cumplen el filtro del parámetro 'filter'.
+
+    Returns:
+        Response: Respuesta con el número de registros eliminados, o solo contados con 'dry_run=true'.
+    """
+    return vehiculos_routes.delete_many()
+
+@bp.route('/vehiculos/upsert', methods=['PUT'])
+def upsert_vehiculos():
+    """
+    Inserta o actualiza los vehículos de un arreglo, identificándolos por su VIN, en una sola transacción.
+
+    Returns:
+        Response: Respuesta con el número de registros insertados, actualizados y sin cambios.
+    """
+    return vehiculos_routes.upsert_many()
+
 # Ventas routes
 ventas_routes = BaseRoutes(
     venta_service,
     Venta,
     ['id_cliente', 'id_vendedor', 'vin', 'fecha', 'precio'],
-    'Venta'
+    'Venta',
+    references={'id_cliente': cliente_snapshot, 'id_vendedor': vendedor_snapshot, 'vin': vehiculo_snapshot}
 )
 
 @bp.route('/ventas', methods=['GET'])
@@ -195,6 +438,30 @@ def get_ventas():
     """
     return ventas_routes.get_all()
 
+@bp.route('/ventas/changes', methods=['GET'])
+def get_ventas_changes():
+    """
+    Obtiene las ventas creadas, modificadas o eliminadas después del token 'since', para sincronizar una copia
+    de la tabla sin volver a descargarla completa.
+
+    Returns:
+        Response: Respuesta con los registros escritos, las llaves eliminadas y el token de la siguiente consulta.
+    """
+    return ventas_routes.get_changes()
+
+@bp.route('/ventas/<int:id>', methods=['GET'])
+def get_venta(id):
+    """
+    Obtiene una venta por su identificador.
+
+    Args:
+        id (int): Identificador de la venta.
+
+    Returns:
+        Response: Respuesta con la venta encontrada.
+    """
+    return ventas_routes.get_by_id(id)
+
 @bp.route('/ventas', methods=['POST'])
 def add_venta():
     """
@@ -229,4 +496,186 @@ def delete_venta(id):
     Returns:
         Response: Respuesta indicando si la venta fue eliminada.
     """
-    return ventas_routes.delete(id)
\ No newline at end of file
+    return ventas_routes.delete(id)
+
+@bp.route('/ventas', methods=['PATCH'])
+def update_ventas_where():
+    """
+    Actualiza las ventas que cumplen el filtro del parámetro 'filter' con las asignaciones del campo 'set'.
+
+    Returns:
+        Response: Respuesta con el número de registros actualizados, o solo contados con 'dry_run=true'.
+    """
+    return ventas_routes.update_many()
+
+@bp.route('/ventas', methods=['DELETE'])
+def delete_ventas_where():
+    """
+    Elimina las ventas que cumplen el filtro del parámetro 'filter'.
+
+    Returns:
+        Response: Respuesta con el número de registros eliminados, o solo contados con 'dry_run=true'.
+    """
+    return ventas_routes.delete_many()
+
+def _get_mes(name, default):
+    """
+    Obtiene un mes de la solicitud en formato AAAA-MM.
+
+    Args:
+        name (str): Nombre del parámetro.
+        default (date): Valor por defecto.
+
+    Returns:
+        date: Primer día del mes.
+
+    Raises:
+        ValueError: Si el mes no tiene el formato esperado.
+    """
+    return date.fromisoformat(request.args[name] + '-01') if name in request.args else default
+
+@bp.route('/reportes/ventas', methods=['GET'])
+def get_reporte_ventas():
+    """
+    Obtiene las unidades vendidas, los ingresos y el precio promedio por mes, vendedor, marca y modelo.
+
+    La respuesta incluye la versión de los agregados como ETag; si el cliente la envía en If-None-Match y
+    no ha cambiado, se responde 304 sin cuerpo.
+
+    Parámetros de consulta:
+        desde (str): Primer mes en formato AAAA-MM (por defecto, 11 meses antes de 'hasta').
+        hasta (str): Último mes en formato AAAA-MM (por defecto, el mes actual).
+        dimensiones (str): Dimensiones separadas por comas: 'vendedor', 'marca', 'modelo' (por defecto, todas).
+        id_vendedor (int), marca (str), modelo (str): Filtros exactos opcionales.
+
+    Returns:
+        Response: Respuesta con las ventas agregadas.
+    """
+    dimensiones = [dimension for dimension in request.args.get('dimensiones', ','.join(DIMENSIONES)).split(',')
+                   if dimension]
+    invalidas = [dimension for dimension in dimensiones if dimension not in DIMENSIONES]
+    if invalidas:
+        return jsonify({'message': f'Dimensiones no válidas: {", ".join(invalidas)}'}), 400
+    try:
+        hasta = _get_mes('hasta', date.today().replace(day=1))
+        desde = _get_mes('desde', date(hasta.year - 1, hasta.month, 1) if hasta.month == 12
+                         else date(hasta.year - 1, hasta.month + 1, 1))
+    except ValueError:
+        return jsonify({'message': 'Los meses deben tener el formato AAAA-MM'}), 400
+    if hasta < desde:
+        return jsonify({'message': 'El rango debe ser positivo'}), 400
+
+    filtros = {}
+    if 'id_vendedor' in request.args:
+        filtros['vendedor'] = request.args.get('id_vendedor', type=int)
+    for dimension in ('marca', 'modelo'):
+        if dimension in request.args:
+            filtros[dimension] = request.args[dimension]
+
+    with replica_router.reading():
+        etag = f'v{reporte_ventas_service.get_version(desde, hasta)}'
+        if etag in request.if_none_match:
+            return '', 304, {'ETag': f'"{etag}"'}
+        version, data = reporte_ventas_service.get_ventas(desde, hasta, dimensiones, filtros)
+
+    return jsonify({'version': version, 'desde': desde.strftime('%Y-%m'), 'hasta': hasta.strftime('%Y-%m'),
+                    'data': data}), 200, {'ETag': f'"v{version}"'}
+
+@bp.cli.command('rebuild-resumen')
+@click.option('--desde', type=click.DateTime(formats=['%Y-%m']), help='Primer mes a recalcular (AAAA-MM).')
+@click.option('--hasta', type=click.DateTime(formats=['%Y-%m']), help='Último mes a recalcular (AAAA-MM).')
+@click.option('--workers', default=4, show_default=True, help='Meses que se recalculan en paralelo.')
+@click.option('--inquilino', help='Inquilino cuyo esquema se recalcula.')
+def rebuild_resumen(desde, hasta, workers, inquilino):
+    """
+    Recalcula los agregados mensuales de ventas (flask automoviles rebuild-resumen).
+    """
+    g.tenant = inquilino
+    escritas = venta_resumen_repository.rebuild(desde, hasta, workers)
+    click.echo(f'Filas de agregado escritas: {escritas}')
+
+# Lote transaccional con las operaciones sobre los recursos del dominio
+batch_routes = BatchRoutes({
+    'clientes_automoviles': clientes_routes,
+    'vendedores': vendedores_routes,
+    'vehiculos': vehiculos_routes,
+    'ventas': ventas_routes
+})
+
+@bp.route('/batch', methods=['POST'])
+def execute_batch():
+    """
+    Ejecuta en una sola transacción una lista ordenada de operaciones create, update y delete sobre los recursos
+    del dominio; las operaciones pueden usar los ids creados por las anteriores con '$ref'.
+
+    Returns:
+        Response: Respuesta con el resultado de cada operación, o mensaje de error si el lote se revirtió.
+    """
+    return batch_routes.execute()
+
+# Trabajos en segundo plano sobre los recursos del dominio
+job_routes = JobRoutes('automoviles', {
+    'clientes_automoviles': clientes_routes,
+    'vendedores': vendedores_routes,
+    'vehiculos': vehiculos_routes,
+    'ventas': ventas_routes
+})
+
+def _validate_meses(parametros):
+    """
+    Valida el rango opcional de meses ('desde' y 'hasta', AAAA-MM) y los 'workers' del recálculo de ventas.
+    """
+    for field in ('desde', 'hasta'):
+        if parametros.get(field) is not None:
+            date.fromisoformat(f'{parametros[field]}-01')
+    workers = parametros.get('workers', 4)
+    if not isinstance(workers, int) or not 1 <= workers <= 16:
+        raise ValueError('El parámetro workers debe estar entre 1 y 16')
+
+def _rebuild_resumen(context):
+    """
+    Recalcula los agregados mensuales de ventas en segundo plano, como 'flask automoviles rebuild-resumen'.
+    """
+    desde, hasta = (date.fromisoformat(f'{context.parametros[field]}-01') if context.parametros.get(field) else None
+                    for field in ('desde', 'hasta'))
+    return {'escritas': venta_resumen_repository.rebuild(desde, hasta, context.parametros.get('workers', 4))}
+
+job_routes.register('resumen.rebuild', _rebuild_resumen, _validate_meses)
+
+@bp.route('/jobs', methods=['POST'])
+def enqueue_job():
+    """
+    Encola un trabajo en segundo plano del dominio (exportaciones, importaciones, escrituras masivas o
+    recálculos de resúmenes) y responde de inmediato con su identificador.
+
+    Returns:
+        Response: Respuesta 202 con el trabajo encolado y la URL de su estado, o mensaje de error.
+    """
+    return job_routes.enqueue()
+
+# Canal de cambios de las tablas del dominio
+event_routes = EventRoutes('automoviles')
+
+@bp.route('/events', methods=['GET'])
+def get_events():
+    """
+    Abre un flujo Server-Sent Events con un evento por cada registro creado, modificado o eliminado en el
+    dominio, para actualizar los registros en su lugar sin volver a consultar las tablas.
+
+    Returns:
+        Response: Flujo text/event-stream con los cambios del dominio.
+    """
+    return event_routes.stream()
+
+audit_routes = AuditRoutes('automoviles')
+
+@bp.route('/auditoria', methods=['GET'])
+def get_auditoria():
+    """
+    Obtiene el historial de escrituras de un registro del dominio (p. ej. ?tabla=venta&id=3), con quién
+    hizo cada una y los valores anteriores y nuevos de las columnas que cambió.
+
+    Returns:
+        Response: Respuesta con las escrituras del registro o mensaje de error.
+    """
+    return audit_routes.history()
\ No newline at end of file
@@ -1,6 +1,43 @@
-from flask import Blueprint, request, jsonify
+import base64
+import json
+import re
+from datetime import datetime
+from flask import Blueprint, current_app, request, jsonify
+from sqlalchemy import inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import MANYTOONE, selectinload
 from services.base_service import BaseService
-from models import db
+from models import db, replica_router, CONSISTENCY_HEADER, current_tenant
+from repositories.exceptions import BufferFullError, ConflictError, InvalidExpressionError
+from repositories.filter_expression import compile_assignments
+from repositories.transaction_retry import classify
+
+def integrity_error(error):
+    """
+    Describe una violación de restricción de la base de datos sin exponer la sentencia ni sus parámetros: un
+    campo requerido nulo es un error de la solicitud (400) y un valor único repetido o una referencia rota
+    son conflictos con los datos (409).
+
+    Args:
+        error (IntegrityError): Error de integridad capturado.
+
+    Returns:
+        tuple: Mensaje de error y código de estado.
+    """
+    code = error.orig.args[0] if getattr(error.orig, 'args', None) else None
+    text = str(error.orig)
+    if code == 1048 or 'NOT NULL constraint failed' in text:
+        column = re.search(r"Column '(\w+)'|NOT NULL constraint failed: \w+\.(\w+)", text)
+        field = next((name for name in column.groups() if name), None) if column else None
+        return f'Campo requerido nulo: {field.lower()}' if field else 'Un campo requerido es nulo', 400
+    if code == 1062 or 'UNIQUE constraint failed' in text:
+        return 'Ya existe un registro con el mismo valor en un campo único', 409
+    if code == 1451:
+        return 'El registro está referenciado por otros registros', 409
+    if code == 1452 or 'FOREIGN KEY constraint failed' in text:
+        return 'La escritura hace referencia a un registro inexistente o referenciado', 409
+    return 'La escritura viola una restricción de integridad de los datos', 409
+
 
 class BaseRoutes:
     """
@@ -11,9 +48,11 @@ class BaseRoutes:
         model (db.Model): Modelo de la base de datos para el cual se crean las rutas.
         required_fields (list): Lista de campos requeridos para las operaciones CRUD.
         endpoint (str): Nombre del endpoint para los mensajes de respuesta.
+        references (dict): Instantáneas de referencia por campo de llave foránea.
+        natural_key (str): Campo único con el que se identifican los registros al sincronizarlos.
     """
 
-    def __init__(self, service, model, required_fields, endpoint):
+    def __init__(self, service, model, required_fields, endpoint, references=None, natural_key=None):
         """
         Inicializa la clase BaseRoutes con el servicio, modelo, campos requeridos y endpoint.
 
@@ -22,11 +61,17 @@ class BaseRoutes:
             model (db.Model): Modelo de la base de datos.
             required_fields (list): Lista de campos requeridos.
             endpoint (str): Nombre del endpoint.
+            references (dict, optional): Instantáneas (ReferenceSnapshot) por campo de llave foránea, usadas para
+                validar las llaves antes de escribir y para resolver sus nombres en las respuestas.
+            natural_key (str, optional): Campo único (p. ej. 'correo_electronico') con el que upsert_many identifica
+                los registros existentes.
         """
         self.service = service
         self.model = model
         self.required_fields = required_fields
         self.endpoint = endpoint
+        self.references = references or {}
+        self.natural_key = natural_key
 
     def _get_pagination_params(self):
         """
@@ -58,6 +103,20 @@ class BaseRoutes:
         paginated_data = query.offset(offset).limit(page_size).all()
         return paginated_data, total_records, total_pages
 
+    def _get_expand_params(self):
+        """
+        Obtiene las relaciones a expandir de la solicitud (parámetro 'expand', separado por comas).
+
+        Solo se pueden expandir las relaciones muchos-a-uno del modelo, es decir, sus llaves foráneas.
+
+        Returns:
+            tuple: Relaciones a expandir y relaciones no válidas.
+        """
+        names = [name.strip() for name in request.args.get('expand', '').split(',') if name.strip()]
+        relationships = inspect(self.model).relationships
+        invalid = [name for name in names if name not in relationships or relationships[name].direction is not MANYTOONE]
+        return names, invalid
+
     def _validate_required_fields(self, data):
         """
         Valida que los campos requeridos estén presentes en los datos.
@@ -73,28 +132,132 @@ class BaseRoutes:
             return jsonify({'message': f'Campos requeridos faltantes: {", ".join(missing_fields)}'}), 400
         return None
 
-    def _handle_exception(self, e, message):
+    def _validate_references(self, data):
         """
-        Maneja excepciones y devuelve una respuesta con el mensaje de error.
+        Valida que las llaves foráneas de los datos existan en sus tablas de referencia.
 
         Args:
-            e (Exception): Excepción capturada.
-            message (str): Mensaje de error.
+            data (dict): Datos a validar.
 
         Returns:
-            Response: Respuesta con el mensaje de error.
+            Response: Respuesta con mensaje de error si alguna llave no existe, None si todas existen.
         """
-        return jsonify({'message': str(e) if str(e) else message}), 500
+        invalid = [
+            f'{field}={data[field]}' for field, snapshot in self.references.items()
+            if field in data and snapshot.missing([data[field]])
+        ]
+        if invalid:
+            return jsonify({'message': f'Referencias inexistentes: {", ".join(invalid)}'}), 400
+        return None
 
-    def get_all(self):
+    def _resolve_names(self, items, data):
         """
-        Obtiene todos los registros del modelo con paginación y filtro opcional.
+        Agrega a los registros serializados el nombre visible de cada llave foránea.
+
+        Args:
+            items (list): Registros del modelo.
+            data (list): Registros serializados, en el mismo orden, a completar.
+        """
+        if not items:
+            return
+        for field, snapshot in self.references.items():
+            names = snapshot.resolve(getattr(item, field) for item in items)
+            for item, serialized in zip(items, data):
+                serialized[f'{snapshot.name}_nombre'] = names.get(getattr(item, field))
+
+    def _serialize_expanded(self, item, expand):
+        """
+        Agrega a un registro serializado las columnas de sus relaciones expandidas.
+
+        Args:
+            item (db.Model): Registro del modelo con las relaciones ya cargadas.
+            expand (list): Relaciones a expandir.
 
         Returns:
-            Response: Respuesta con los datos paginados y la información de paginación.
+            dict: Columnas de cada relación expandida, o None si la relación está vacía.
         """
-        page, page_size, filter_text = self._get_pagination_params()
-        query = self.model.query
+        expanded = {}
+        for name in expand:
+            related = getattr(item, name)
+            expanded[name] = None if related is None else {
+                attr.key: getattr(related, attr.key) for attr in inspect(related).mapper.column_attrs
+            }
+        return expanded
+
+    def _serialize(self, item):
+        """
+        Convierte un registro del modelo en un diccionario con su id y los campos requeridos.
+
+        Los modelos sin columna 'id' (p. ej. Vehiculo, identificado por 'vin') solo incluyen los campos requeridos.
+
+        Args:
+            item (db.Model): Registro a convertir.
+
+        Returns:
+            dict: Representación del registro.
+        """
+        data = {'id': getattr(item, 'id')} if hasattr(self.model, 'id') else {}
+        data.update({field: getattr(item, field) for field in self.required_fields})
+        return data
+
+    def _get_mass_write_params(self):
+        """
+        Obtiene los parámetros de una escritura masiva: la expresión de filtro ('filter', obligatoria), si solo
+        se cuentan los registros afectados ('dry_run') y el número de registros por lote ('batch_size').
+
+        Returns:
+            tuple: Filtro, modo de prueba, tamaño de lote y respuesta con mensaje de error (None si son válidos).
+        """
+        filter_text = request.args.get('filter', '').strip()
+        dry_run = request.args.get('dry_run', 'false').lower() in ('1', 'true', 'si', 'sí')
+        batch_size = request.args.get('batch_size', 1000, type=int)
+        if not filter_text:
+            return None, None, None, (jsonify({'message': 'El parámetro filter es requerido'}), 400)
+        if not 1 <= batch_size <= 10000:
+            return None, None, None, (jsonify({'message': 'El parámetro batch_size debe estar entre 1 y 10000'}), 400)
+        return filter_text, dry_run, batch_size, None
+
+    def _consistency_headers(self):
+        """
+        Genera la cabecera con el token de consistencia tras una escritura en el bind del modelo.
+
+        Returns:
+            dict: Cabecera con el token que el cliente debe reenviar en sus siguientes lecturas.
+        """
+        return {CONSISTENCY_HEADER: replica_router.issue_token(self.model.__bind_key__)}
+
+    def _single_flight(self, key, work):
+        """
+        Ejecuta una lectura compartiéndola con las solicitudes idénticas concurrentes (ver SingleFlight).
+
+        La llave incluye el inquilino y el token de consistencia de la solicitud, para que solo compartan la
+        lectura las solicitudes que recibirían el mismo resultado.
+
+        Args:
+            key (tuple): Llave de la lectura dentro del recurso (tipo de lectura y sus parámetros).
+            work (Callable): Lectura a ejecutar; devuelve el cuerpo de la respuesta y su código de estado.
+
+        Returns:
+            tuple: Cuerpo de la respuesta y código de estado.
+        """
+        key = (current_tenant(), request.headers.get(CONSISTENCY_HEADER), *key)
+        return self.service.repository.flights.do(key, work)
+
+    def _read_page(self, page, page_size, filter_text, expand):
+        """
+        Consulta y serializa una página del modelo.
+
+        Args:
+            page (int): Número de página.
+            page_size (int): Tamaño de la página.
+            filter_text (str): Texto de filtro sobre los campos requeridos.
+            expand (list): Relaciones a expandir.
+
+        Returns:
+            tuple: Cuerpo de la respuesta y código de estado.
+        """
+        # Cada relación expandida se carga con una sola consulta adicional por página (SELECT ... WHERE id IN (...))
+        query = self.model.query.options(*[selectinload(getattr(self.model, name)) for name in expand])
 
         if filter_text:
             query = query.filter(
@@ -103,13 +266,14 @@ class BaseRoutes:
                 )
             )
 
-        paginated_data, total_records, total_pages = self._paginate_query(query, page, page_size)
+        with replica_router.reading():
+            paginated_data, total_records, total_pages = self._paginate_query(query, page, page_size)
 
-        return jsonify({
-            'data': [{
-                'id': getattr(item, 'id'),
-                **{field: getattr(item, field) for field in self.required_fields}
-            } for item in paginated_data],
+            data = [{**self._serialize(item), **self._serialize_expanded(item, expand)} for item in paginated_data]
+            self._resolve_names(paginated_data, data)
+
+        return {
+            'data': data,
             'pagination': {
                 'page': page,
                 'page_size': page_size,
@@ -118,7 +282,94 @@ class BaseRoutes:
                 'has_next': page < total_pages,
                 'has_prev': page > 1
             }
-        })
+        }, 200
+
+    def _read_one(self, id, expand):
+        """
+        Consulta y serializa un registro del modelo.
+
+        Args:
+            id (int): Identificador del registro.
+            expand (list): Relaciones a expandir.
+
+        Returns:
+            tuple: Cuerpo de la respuesta y código de estado.
+        """
+        with replica_router.reading():
+            resource = self.service.get_by_id(id)
+            if not resource:
+                return {'message': 'Recurso no encontrado'}, 404
+            data = {**self._serialize(resource), **self._serialize_expanded(resource, expand)}
+            self._resolve_names([resource], [data])
+        return data, 200
+
+    def _handle_exception(self, e, message):
+        """
+        Maneja excepciones y devuelve una respuesta con el mensaje de error.
+
+        Los conflictos con el estado de los datos (ConflictError) se responden con 409, las expresiones de filtro
+        o asignación no válidas (InvalidExpressionError) con 400 y las violaciones de restricciones de la base de
+        datos (IntegrityError) con 409 o 400, sin la sentencia ni sus parámetros (ver integrity_error). Si la cola de un búfer de escritura está llena
+        (BufferFullError) o si una transacción agotó sus reintentos por interbloqueos o esperas de bloqueo, se
+        responde 503 con la cabecera Retry-After, para que el cliente reintente.
+
+        Args:
+            e (Exception): Excepción capturada.
+            message (str): Mensaje de error.
+
+        Returns:
+            Response: Respuesta con el mensaje de error.
+        """
+        if isinstance(e, ConflictError):
+            return jsonify({'message': str(e)}), 409
+        if isinstance(e, InvalidExpressionError):
+            return jsonify({'message': str(e)}), 400
+        if isinstance(e, BufferFullError):
+            return jsonify({'message': str(e)}), 503, {'Retry-After': '1'}
+        if isinstance(e, IntegrityError):
+            message, code = integrity_error(e)
+            return jsonify({'message': message}), code
+        if classify(e):
+            return jsonify({'message': 'La base de datos está ocupada, intente de nuevo'}), 503, {'Retry-After': '1'}
+        return jsonify({'message': str(e) if str(e) else message}), 500
+
+    def get_all(self):
+        """
+        Obtiene todos los registros del modelo con paginación y filtro opcional.
+
+        El parámetro 'expand' (p. ej. 'expand=cliente,empleado') incluye las columnas de las relaciones
+        muchos-a-uno indicadas, con un número fijo de consultas por página sin importar su tamaño. Las
+        solicitudes idénticas concurrentes comparten una sola consulta.
+
+        Returns:
+            Response: Respuesta con los datos paginados y la información de paginación.
+        """
+        page, page_size, filter_text = self._get_pagination_params()
+        expand, invalid = self._get_expand_params()
+        if invalid:
+            return jsonify({'message': f'Relaciones no expandibles: {", ".join(invalid)}'}), 400
+
+        body, code = self._single_flight(('page', page, page_size, filter_text, tuple(expand)),
+                                         lambda: self._read_page(page, page_size, filter_text, expand))
+        return jsonify(body), code
+
+    def get_by_id(self, id):
+        """
+        Obtiene un registro del modelo por su identificador. Las solicitudes idénticas concurrentes comparten
+        una sola consulta.
+
+        Args:
+            id (int): Identificador del registro.
+
+        Returns:
+            Response: Respuesta con el registro o mensaje de error si no existe.
+        """
+        expand, invalid = self._get_expand_params()
+        if invalid:
+            return jsonify({'message': f'Relaciones no expandibles: {", ".join(invalid)}'}), 400
+
+        body, code = self._single_flight(('id', id, tuple(expand)), lambda: self._read_one(id, expand))
+        return jsonify(body), code
 
     def create(self):
         """
@@ -128,13 +379,13 @@ class BaseRoutes:
             Response: Respuesta con el mensaje de éxito o error.
         """
         data = request.get_json()
-        validation_result = self._validate_required_fields(data)
+        validation_result = self._validate_required_fields(data) or self._validate_references(data)
         if validation_result:
             return validation_result
 
         try:
             self.service.create(data)
-            return jsonify({'message': f'{self.endpoint} creado'}), 201
+            return jsonify({'message': f'{self.endpoint} creado'}), 201, self._consistency_headers()
         except Exception as e:
             return self._handle_exception(e, 'Error al crear el recurso')
 
@@ -153,13 +404,13 @@ class BaseRoutes:
         if not resource:
             return jsonify({'message': 'Recurso no encontrado'}), 404
 
-        validation_result = self._validate_required_fields(data)
+        validation_result = self._validate_required_fields(data) or self._validate_references(data)
         if validation_result:
             return validation_result
 
         try:
             self.service.update(id, data)
-            return jsonify({'message': f'{self.endpoint} actualizado'}), 200
+            return jsonify({'message': f'{self.endpoint} actualizado'}), 200, self._consistency_headers()
         except Exception as e:
             return self._handle_exception(e, 'Error al actualizar el recurso')
 
@@ -177,6 +428,189 @@ class BaseRoutes:
             success = self.service.delete(id)
             if not success:
                 return jsonify({'message': 'Recurso no encontrado'}), 404
-            return jsonify({'message': f'{self.endpoint} eliminado'}), 200
+            return jsonify({'message': f'{self.endpoint} eliminado'}), 200, self._consistency_headers()
+        except Exception as e:
+            return self._handle_exception(e, 'Error al eliminar el recurso')
+
+    def update_many(self):
+        """
+        Actualiza todos los registros que cumplen una expresión de filtro con sentencias UPDATE por lotes.
+
+        El filtro se recibe en el parámetro 'filter' (p. ej. "anio = 2019") y las asignaciones en el campo 'set'
+        del cuerpo (p. ej. "precio = precio * 0.95"). Con 'dry_run=true' solo se cuentan los registros afectados.
+
+        Returns:
+            Response: Respuesta con el número de registros afectados o mensaje de error.
+        """
+        filter_text, dry_run, batch_size, error = self._get_mass_write_params()
+        if error:
+            return error
+        set_text = (request.get_json(silent=True) or {}).get('set')
+        if not isinstance(set_text, str) or not set_text.strip():
+            return jsonify({'message': 'Campos requeridos faltantes: set'}), 400
+
+        try:
+            if dry_run:
+                # Se compilan también las asignaciones para rechazar una expresión no válida antes de ejecutarla
+                compile_assignments(self.model, set_text)
+                return jsonify({'dry_run': True, 'afectados': self.service.count_where(filter_text)})
+            afectados = self.service.update_where(filter_text, set_text, batch_size)
+            return jsonify({'message': f'{self.endpoint} actualizado', 'afectados': afectados}), 200, \
+                self._consistency_headers()
         except Exception as e:
-            return self._handle_exception(e, 'Error al eliminar el recurso')
\ No newline at end of file
+            return self._handle_exception(e, 'Error al actualizar los recursos')
+
+    def delete_many(self):
+        """
+        Elimina todos los registros que cumplen una expresión de filtro (parámetro 'filter') con sentencias DELETE
+        por lotes. Con 'dry_run=true' solo se cuentan los registros afectados.
+
+        Returns:
+            Response: Respuesta con el número de registros afectados o mensaje de error.
+        """
+        filter_text, dry_run, batch_size, error = self._get_mass_write_params()
+        if error:
+            return error
+
+        try:
+            if dry_run:
+                return jsonify({'dry_run': True, 'afectados': self.service.count_where(filter_text)})
+            afectados = self.service.delete_where(filter_text, batch_size)
+            return jsonify({'message': f'{self.endpoint} eliminado', 'afectados': afectados}), 200, \
+                self._consistency_headers()
+        except Exception as e:
+            return self._handle_exception(e, 'Error al eliminar los recursos')
+
+    def _validate_upsert_rows(self, rows, max_rows=10000):
+        """
+        Valida los registros a sincronizar por la llave natural: cada uno debe ser un objeto con la llave natural
+        y los campos requeridos no nulos, sin campos desconocidos ni llaves repetidas, y con referencias existentes.
+
+        Args:
+            rows (list): Registros a sincronizar.
+            max_rows (int): Número máximo de registros.
+
+        Returns:
+            str: Mensaje de error si algún registro no es válido, None si todos lo son.
+        """
+        if not isinstance(rows, list) or not rows or len(rows) > max_rows:
+            return f'Se esperaba un arreglo de entre 1 y {max_rows} registros'
+
+        mapper = inspect(self.model)
+        key_attr = mapper.get_property_by_column(mapper.primary_key[0]).key
+        columns = {attr.key for attr in mapper.column_attrs if not attr.columns[0].info.get('tracking')}
+        columns -= {key_attr} - {self.natural_key}
+        keys = set()
+        for index, row in enumerate(rows):
+            if not isinstance(row, dict):
+                return f'Registro {index}: se esperaba un objeto'
+            missing_fields = [field for field in (self.natural_key, *self.required_fields) if field not in row]
+            if missing_fields:
+                return f'Registro {index}: campos requeridos faltantes: {", ".join(missing_fields)}'
+            null_fields = [field for field in (self.natural_key, *self.required_fields) if row[field] is None]
+            if null_fields:
+                return f'Registro {index}: campos requeridos nulos: {", ".join(null_fields)}'
+            unknown_fields = sorted(set(row) - columns)
+            if unknown_fields:
+                return f'Registro {index}: campos no válidos: {", ".join(unknown_fields)}'
+            # La llave se compara sin distinguir mayúsculas, como la intercalación de la base de datos
+            value = row[self.natural_key]
+            key = value.casefold() if isinstance(value, str) else value
+            if key in keys:
+                return f'Registro {index}: {self.natural_key} duplicado: {row[self.natural_key]}'
+            keys.add(key)
+
+        invalid = [
+            f'{field}={value}' for field, snapshot in self.references.items()
+            for value in snapshot.missing({row[field] for row in rows if field in row})
+        ]
+        if invalid:
+            return f'Referencias inexistentes: {", ".join(invalid)}'
+        return None
+
+    def upsert_many(self):
+        """
+        Inserta o actualiza en una sola transacción un arreglo de registros identificados por la llave natural
+        del recurso. Cada registro debe traer todos los campos requeridos, como en una actualización completa.
+
+        Returns:
+            Response: Respuesta con el número de registros insertados, actualizados y sin cambios, o mensaje de error.
+        """
+        rows = request.get_json(silent=True)
+        message = self._validate_upsert_rows(rows)
+        if message:
+            return jsonify({'message': message}), 400
+
+        try:
+            counts = self.service.upsert_many(self.natural_key, rows)
+            return jsonify({'message': f'{self.endpoint} sincronizado', **counts}), 200, self._consistency_headers()
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+        except Exception as e:
+            return self._handle_exception(e, 'Error al sincronizar los recursos')
+
+    @staticmethod
+    def _encode_cursor(cursor):
+        """
+        Convierte una posición de sincronización en el token opaco que recibe el cliente.
+        """
+        values = [value.isoformat() if isinstance(value, datetime) else value for value in cursor]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+    def _decode_cursor(self, token):
+        """
+        Convierte un token de sincronización en su posición. La llave debe ser del tipo de la llave primaria del
+        modelo, y solo puede faltar si también falta la fecha.
+
+        Raises:
+            ValueError: Si el token no es válido.
+        """
+        if not token:
+            return None, None, None, 0
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        except (ValueError, TypeError) as e:
+            raise ValueError('El token since no es válido') from e
+        if not isinstance(cursor, list) or len(cursor) != 4 \
+                or not all(value is None or isinstance(value, str) for value in (cursor[0], cursor[2])) \
+                or not isinstance(cursor[3], int) or isinstance(cursor[3], bool):
+            raise ValueError('El token since no es válido')
+        try:
+            fechas = [datetime.fromisoformat(value) if value is not None else None for value in (cursor[0], cursor[2])]
+        except ValueError as e:
+            raise ValueError('El token since no es válido') from e
+        key_type = inspect(self.model).primary_key[0].type.python_type
+        if (cursor[1] is None) != (fechas[0] is None) \
+                or cursor[1] is not None and (not isinstance(cursor[1], key_type) or isinstance(cursor[1], bool)):
+            raise ValueError('El token since no es válido')
+        return fechas[0], cursor[1], fechas[1], cursor[3]
+
+    def get_changes(self):
+        """
+        Obtiene los registros creados, modificados o eliminados después de un token de sincronización, para
+        mantener una copia del recurso al día con un costo proporcional a los cambios y no al tamaño de la tabla.
+
+        Parámetros de consulta:
+            since (str): Token 'next' de la respuesta anterior; sin él se leen todos los registros.
+            limit (int): Número máximo de registros y de eliminaciones por respuesta (por defecto 1000, máximo 10000).
+
+        Returns:
+            Response: Respuesta con los registros escritos ('data'), las llaves eliminadas ('deleted'), el token
+            de la siguiente consulta ('next') y si quedan cambios por leer ('has_more'), o mensaje de error.
+        """
+        limit = request.args.get('limit', 1000, type=int)
+        if not 1 <= limit <= 10000:
+            return jsonify({'message': 'El parámetro limit debe estar entre 1 y 10000'}), 400
+        try:
+            cursor = self._decode_cursor(request.args.get('since', ''))
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+
+        # Se lee en el primario: el límite de los cambios depende de sus transacciones en curso (ver stable_until)
+        changes = self.service.get_changes(cursor, limit, current_app.config.get('CHANGES_SAFETY_MARGIN', 1.0))
+        return jsonify({
+            'data': changes['rows'],
+            'deleted': changes['deleted'],
+            'next': self._encode_cursor(changes['cursor']),
+            'has_more': changes['has_more']
+        })
\ No newline at end of file
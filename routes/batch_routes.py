@@ -0,0 +1,196 @@
+from flask import request, jsonify
+from sqlalchemy import inspect
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from models import db
+from repositories.batch import batch
+from repositories.exceptions import ConflictError
+from repositories.transaction_retry import classify, transaction_retry
+from routes.base_routes import integrity_error
+
+# Número máximo de operaciones por lote
+MAX_OPERACIONES = 1000
+
+class _NotFound(Exception):
+    """
+    Excepción con la que se interrumpe un lote cuando el registro de una operación no existe.
+    """
+
+class BatchRoutes:
+    """
+    Rutas del lote transaccional de un dominio: ejecuta en orden, en una sola transacción, operaciones create,
+    update y delete sobre los recursos del dominio, enviando cada una con flush y confirmando una sola vez.
+
+    Cada operación es un objeto con 'op', 'recurso', 'id' (update y delete), 'data' (create y update) y,
+    opcionalmente, 'ref': un nombre con el que las operaciones siguientes usan el id del registro creado,
+    escribiendo '$nombre' como valor de 'id' o de un campo de 'data'.
+
+    Atributos:
+        resources (dict): Rutas base (BaseRoutes) de cada recurso del dominio, por nombre de recurso.
+    """
+
+    def __init__(self, resources):
+        """
+        Inicializa las rutas del lote con los recursos del dominio.
+
+        Args:
+            resources (dict): Rutas base (BaseRoutes) por nombre de recurso, p. ej. {'pedidos': pedidos_routes}.
+        """
+        self.resources = resources
+
+    @staticmethod
+    def _error(index, message, code=400, resultados=None):
+        """
+        Construye la respuesta de error de un lote, indicando la operación que lo detuvo.
+
+        Args:
+            index (int): Posición de la operación.
+            message (str): Mensaje de error.
+            code (int): Código de estado HTTP.
+            resultados (list, optional): Resultados de las operaciones anteriores, que se revirtieron.
+
+        Returns:
+            Response: Respuesta con el mensaje de error.
+        """
+        body = {'message': f'Operación {index}: {message}', 'operacion': index}
+        if resultados is not None:
+            body['resultados'] = resultados
+        return jsonify(body), code
+
+    def _validate(self, operaciones):
+        """
+        Valida la estructura de las operaciones y sus referencias antes de escribir.
+
+        Las referencias '$nombre' deben corresponder a un 'ref' declarado por una operación create anterior;
+        las llaves foráneas con valores literales se validan contra sus tablas de referencia.
+
+        Args:
+            operaciones (list): Operaciones del lote.
+
+        Returns:
+            Response: Respuesta con mensaje de error si alguna operación no es válida, None si todas lo son.
+        """
+        if not isinstance(operaciones, list) or not operaciones or len(operaciones) > MAX_OPERACIONES:
+            return jsonify({'message': f'Se esperaba un arreglo de entre 1 y {MAX_OPERACIONES} operaciones'}), 400
+
+        refs = set()
+        for index, operacion in enumerate(operaciones):
+            if not isinstance(operacion, dict) or operacion.get('op') not in ('create', 'update', 'delete'):
+                return self._error(index, "'op' debe ser create, update o delete")
+            resource = self.resources.get(operacion.get('recurso'))
+            if resource is None:
+                return self._error(index, f"recurso desconocido: {operacion.get('recurso')}")
+            if operacion['op'] != 'delete' and not isinstance(operacion.get('data'), dict):
+                return self._error(index, "se requiere 'data'")
+            if operacion['op'] != 'create' and 'id' not in operacion:
+                return self._error(index, "se requiere 'id'")
+
+            data = operacion.get('data') or {}
+            values = [operacion.get('id'), *data.values()]
+            unknown = [value for value in values if isinstance(value, str) and value.startswith('$')
+                       and value[1:] not in refs]
+            if unknown:
+                return self._error(index, f'referencias no declaradas: {", ".join(unknown)}')
+
+            if operacion['op'] != 'delete':
+                missing_fields = [field for field in resource.required_fields if field not in data]
+                if missing_fields:
+                    return self._error(index, f'campos requeridos faltantes: {", ".join(missing_fields)}')
+                invalid = [
+                    f'{field}={data[field]}' for field, snapshot in resource.references.items()
+                    if field in data and not (isinstance(data[field], str) and data[field].startswith('$'))
+                    and snapshot.missing([data[field]])
+                ]
+                if invalid:
+                    return self._error(index, f'referencias inexistentes: {", ".join(invalid)}')
+
+            if operacion.get('ref') is not None:
+                if operacion['op'] != 'create' or not isinstance(operacion['ref'], str) or operacion['ref'] in refs:
+                    return self._error(index, "'ref' debe ser un nombre único en una operación create")
+                refs.add(operacion['ref'])
+        return None
+
+    @staticmethod
+    def _resolve(value, ids):
+        """
+        Sustituye una referencia '$nombre' por el id del registro creado en el lote.
+        """
+        return ids[value[1:]] if isinstance(value, str) and value.startswith('$') else value
+
+    def _execute(self, operacion, ids):
+        """
+        Ejecuta una operación dentro del lote.
+
+        Args:
+            operacion (dict): Operación a ejecutar.
+            ids (dict): Ids de los registros creados, por nombre de referencia.
+
+        Returns:
+            dict: Resultado de la operación, o None si el registro a actualizar o eliminar no existe.
+        """
+        resource = self.resources[operacion['recurso']]
+        data = {field: self._resolve(value, ids) for field, value in (operacion.get('data') or {}).items()}
+        id = self._resolve(operacion.get('id'), ids)
+
+        if operacion['op'] == 'create':
+            instance = resource.service.create(data)
+            mapper = inspect(resource.model)
+            id = getattr(instance, mapper.get_property_by_column(mapper.primary_key[0]).key)
+            if operacion.get('ref') is not None:
+                ids[operacion['ref']] = id
+            return {'op': 'create', 'recurso': operacion['recurso'], 'id': id, 'status': 201}
+
+        if operacion['op'] == 'update':
+            if not resource.service.get_by_id(id) or not resource.service.update(id, data):
+                return None
+        elif not resource.service.delete(id):
+            return None
+        return {'op': operacion['op'], 'recurso': operacion['recurso'], 'id': id, 'status': 200}
+
+    def execute(self):
+        """
+        Ejecuta un lote de operaciones en una sola transacción. Si alguna falla, se revierte el lote completo y
+        se indica la operación que lo detuvo.
+
+        Returns:
+            Response: Respuesta con el resultado de cada operación, o mensaje de error.
+        """
+        operaciones = request.get_json(silent=True)
+        validation_result = self._validate(operaciones)
+        if validation_result:
+            return validation_result
+
+        resultados, ids = [], {}
+        index = 0
+
+        def run():
+            nonlocal index
+            resultados.clear()
+            ids.clear()
+            with batch(db.session):
+                for index, operacion in enumerate(operaciones):
+                    resultado = self._execute(operacion, ids)
+                    if resultado is None:
+                        raise _NotFound('Recurso no encontrado')
+                    resultados.append(resultado)
+
+        try:
+            # Si la base de datos aborta el lote por un interbloqueo, se repite completo
+            transaction_retry.run(db.session, run, 'batch')
+        except _NotFound as e:
+            return self._error(index, str(e), 404, resultados)
+        except DBAPIError as e:
+            if classify(e):
+                body, code = self._error(index, 'La base de datos está ocupada, intente de nuevo', 503, resultados)
+                return body, code, {'Retry-After': '1'}
+            if isinstance(e, IntegrityError):
+                return self._error(index, *integrity_error(e), resultados)
+            return self._error(index, str(e) or 'Error al ejecutar el lote', 500, resultados)
+        except ConflictError as e:
+            return self._error(index, str(e), 409, resultados)
+        except ValueError as e:
+            return self._error(index, str(e), 400, resultados)
+        except Exception as e:
+            return self._error(index, str(e) or 'Error al ejecutar el lote', 500, resultados)
+
+        resource = self.resources[operaciones[0]['recurso']]
+        return jsonify({'resultados': resultados}), 200, resource._consistency_headers()
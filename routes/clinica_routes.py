@@ -1,17 +1,45 @@
-from flask import Blueprint, request, jsonify
+import click
+from flask import Blueprint, request, jsonify, g
 from routes.base_routes import BaseRoutes
+from routes.batch_routes import BatchRoutes
+from routes.audit_routes import AuditRoutes
+from routes.event_routes import EventRoutes
+from routes.job_routes import JobRoutes
 from services.base_service import BaseService
+from datetime import date, datetime, timedelta
+from services.paciente_service import PacienteService
+from services.agenda_service import AgendaService
+from services.reporte_clinica_service import ReporteClinicaService
 from repositories.base_repository import BaseRepository
-from models import db, Paciente, Medico, Cita, Tratamiento
+from repositories.cita_repository import CitaRepository
+from repositories.cita_resumen_repository import AGRUPACIONES, CitaResumenRepository
+from repositories.medico_repository import MedicoRepository
+from repositories.horario_medico_repository import HorarioMedicoRepository
+from repositories.agenda_index import AgendaIndex
+from repositories.identity_cache import IdentityCache
+from repositories.reference_snapshot import ReferenceSnapshot
+from models import db, replica_router, Paciente, Medico, Cita, Tratamiento, HorarioMedico
 
 # Este archivo contiene las rutas para los endpoints relacionados con la tabla de la clínica
 bp = Blueprint('clinica', __name__)
 
 # Se crean los servicios para cada tabla
-paciente_service = BaseService(BaseRepository(db, Paciente))
-medico_service = BaseService(BaseRepository(db, Medico))
-cita_service = BaseService(BaseRepository(db, Cita))
-tratamiento_service = BaseService(BaseRepository(db, Tratamiento))
+agenda_index = AgendaIndex(db)
+medico_repository = MedicoRepository(db, cache=IdentityCache('medico'))
+horario_repository = HorarioMedicoRepository(db)
+resumen_repository = CitaResumenRepository(db)
+cita_repository = CitaRepository(db, horario_repository, agenda=agenda_index, resumen_repository=resumen_repository)
+
+paciente_service = PacienteService(BaseRepository(db, Paciente), cita_repository)
+medico_service = BaseService(medico_repository)
+cita_service = BaseService(cita_repository)
+horario_service = BaseService(horario_repository)
+agenda_service = AgendaService(medico_repository, horario_repository, agenda_index)
+reporte_service = ReporteClinicaService(resumen_repository, medico_repository, horario_repository)
+tratamiento_service = BaseService(BaseRepository(db, Tratamiento, cache=IdentityCache('tratamiento')))
+
+paciente_snapshot = ReferenceSnapshot(db, Paciente, 'paciente')
+medico_snapshot = ReferenceSnapshot(db, Medico, 'medico')
 
 # Los servicios se utilizan para crear las rutas de cada tabla
 pacientes_routes = BaseRoutes(
@@ -32,6 +60,79 @@ def get_pacientes():
     """
     return pacientes_routes.get_all()
 
+@bp.route('/pacientes/changes', methods=['GET'])
+def get_pacientes_changes():
+    """
+    Obtiene los pacientes creados, modificados o eliminados después del token 'since', para sincronizar una copia
+    de la tabla sin volver a descargarla completa.
+
+    Returns:
+        Response: Respuesta con los registros escritos, las llaves eliminadas y el token de la siguiente consulta.
+    """
+    return pacientes_routes.get_changes()
+
+@bp.route('/pacientes/<int:id>', methods=['GET'])
+def get_paciente(id):
+    """
+    Obtiene un paciente por su identificador.
+
+    Args:
+        id (int): Identificador del paciente.
+
+    Returns:
+        Response: Respuesta con el paciente encontrado.
+    """
+    return pacientes_routes.get_by_id(id)
+
+@bp.route('/pacientes/<int:id>/resumen', methods=['GET'])
+def get_resumen_paciente(id):
+    """
+    Obtiene el resumen de un paciente: sus datos, sus citas más recientes y el número de visitas por médico.
+
+    Parámetros de consulta:
+        limite (int): Número máximo de citas (por defecto 10, máximo 100).
+        antes (str): Cursor 'siguiente' de una respuesta anterior para continuar el historial.
+
+    Args:
+        id (int): Identificador del paciente.
+
+    Returns:
+        Response: Respuesta con el resumen del paciente.
+    """
+    limite = min(max(request.args.get('limite', 10, type=int), 1), 100)
+    try:
+        antes = CitaRepository.parse_cursor(request.args['antes']) if 'antes' in request.args else None
+    except ValueError:
+        return jsonify({'message': 'Cursor no válido'}), 400
+
+    with replica_router.reading():
+        resumen = paciente_service.get_resumen(id, limite, antes)
+        if not resumen:
+            return jsonify({'message': 'Recurso no encontrado'}), 404
+        paciente, citas, visitas = resumen['paciente'], resumen['citas'], resumen['visitas_por_medico']
+        medicos = medico_snapshot.resolve(visitas)
+
+    return jsonify({
+        'paciente': {
+            'id': paciente.id,
+            **{field: getattr(paciente, field) for field in pacientes_routes.required_fields}
+        },
+        'citas': [{
+            'id': cita.id,
+            'id_medico': cita.id_medico,
+            'medico_nombre': medicos.get(cita.id_medico),
+            'fecha_hora': cita.fecha_hora,
+            'motivo_visita': cita.motivo_visita
+        } for cita in citas],
+        'siguiente': CitaRepository.format_cursor(citas[-1]) if len(citas) == limite else None,
+        'total_visitas': sum(visitas.values()),
+        'visitas_por_medico': [{
+            'id_medico': id_medico,
+            'medico_nombre': medicos.get(id_medico),
+            'visitas': total
+        } for id_medico, total in sorted(visitas.items(), key=lambda item: item[1], reverse=True)]
+    })
+
 @bp.route('/pacientes', methods=['POST'])
 def add_paciente():
     """
@@ -68,6 +169,26 @@ def delete_paciente(id):
     """
     return pacientes_routes.delete(id)
 
+@bp.route('/pacientes', methods=['PATCH'])
+def update_pacientes_where():
+    """
+    Actualiza los pacientes que cumplen el filtro del parámetro 'filter' con las asignaciones del campo 'set'.
+
+    Returns:
+        Response: Respuesta con el número de registros actualizados, o solo contados con 'dry_run=true'.
+    """
+    return pacientes_routes.update_many()
+
+@bp.route('/pacientes', methods=['DELETE'])
+def delete_pacientes_where():
+    """
+    Elimina los pacientes que cumplen el filtro del parámetro 'filter'.
+
+    Returns:
+        Response: Respuesta con el número de registros eliminados, o solo contados con 'dry_run=true'.
+    """
+    return pacientes_routes.delete_many()
+
 # Médicos routes
 medicos_routes = BaseRoutes(
     medico_service,
@@ -86,6 +207,101 @@ def get_medicos():
     """
     return medicos_routes.get_all()
 
+@bp.route('/medicos/changes', methods=['GET'])
+def get_medicos_changes():
+    """
+    Obtiene los médicos creados, modificados o eliminados después del token 'since', para sincronizar una copia
+    de la tabla sin volver a descargarla completa.
+
+    Returns:
+        Response: Respuesta con los registros escritos, las llaves eliminadas y el token de la siguiente consulta.
+    """
+    return medicos_routes.get_changes()
+
+@bp.route('/medicos/<int:id>', methods=['GET'])
+def get_medico(id):
+    """
+    Obtiene un médico por su identificador.
+
+    Args:
+        id (int): Identificador del médico.
+
+    Returns:
+        Response: Respuesta con el médico encontrado.
+    """
+    return medicos_routes.get_by_id(id)
+
+def _get_rango_disponibilidad():
+    """
+    Obtiene el rango de búsqueda de disponibilidad de la solicitud (parámetros 'desde' y 'hasta' en formato ISO).
+
+    Returns:
+        tuple: Inicio y fin del rango; por defecto, los próximos 7 días.
+
+    Raises:
+        ValueError: Si las fechas no son válidas o el rango supera los 62 días.
+    """
+    desde = datetime.fromisoformat(request.args['desde']) if 'desde' in request.args else datetime.now()
+    hasta = datetime.fromisoformat(request.args['hasta']) if 'hasta' in request.args else desde + timedelta(days=7)
+    if hasta <= desde or hasta - desde > timedelta(days=62):
+        raise ValueError('El rango debe ser positivo y de máximo 62 días')
+    return desde, hasta
+
+@bp.route('/medicos/<int:id>/disponibilidad', methods=['GET'])
+def get_disponibilidad_medico(id):
+    """
+    Obtiene los huecos libres de la agenda de un médico.
+
+    Parámetros de consulta:
+        desde (str): Inicio del rango en formato ISO (por defecto, ahora).
+        hasta (str): Fin del rango en formato ISO (por defecto, 7 días después de 'desde').
+
+    Args:
+        id (int): Identificador del médico.
+
+    Returns:
+        Response: Respuesta con los inicios de los huecos libres.
+    """
+    try:
+        desde, hasta = _get_rango_disponibilidad()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    with replica_router.reading():
+        if not medico_service.get_by_id(id):
+            return jsonify({'message': 'Recurso no encontrado'}), 404
+        slots = agenda_service.get_disponibilidad(id, desde, hasta)
+    return jsonify({'id_medico': id, 'disponibilidad': [slot.isoformat(' ') for slot in slots]})
+
+@bp.route('/medicos/disponibilidad', methods=['GET'])
+def search_disponibilidad():
+    """
+    Busca los primeros huecos libres de todos los médicos de una especialidad.
+
+    Parámetros de consulta:
+        especialidad (str): Especialidad de los médicos (requerido).
+        desde (str): Inicio del rango en formato ISO (por defecto, ahora).
+        hasta (str): Fin del rango en formato ISO (por defecto, 7 días después de 'desde').
+        limite (int): Número máximo de huecos por médico (por defecto 10, máximo 100).
+
+    Returns:
+        Response: Respuesta con los huecos libres de cada médico.
+    """
+    especialidad = request.args.get('especialidad')
+    if not especialidad:
+        return jsonify({'message': 'Campos requeridos faltantes: especialidad'}), 400
+    limite = min(max(request.args.get('limite', 10, type=int), 1), 100)
+    try:
+        desde, hasta = _get_rango_disponibilidad()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    with replica_router.reading():
+        results = agenda_service.search(especialidad, desde, hasta, limite)
+    return jsonify({'data': [
+        {**result, 'disponibilidad': [slot.isoformat(' ') for slot in result['disponibilidad']]} for result in results
+    ]})
+
 @bp.route('/medicos', methods=['POST'])
 def add_medico():
     """
@@ -122,12 +338,33 @@ def delete_medico(id):
     """
     return medicos_routes.delete(id)
 
+@bp.route('/medicos', methods=['PATCH'])
+def update_medicos_where():
+    """
+    Actualiza los médicos que cumplen el filtro del parámetro 'filter' con las asignaciones del campo 'set'.
+
+    Returns:
+        Response: Respuesta con el número de registros actualizados, o solo contados con 'dry_run=true'.
+    """
+    return medicos_routes.update_many()
+
+@bp.route('/medicos', methods=['DELETE'])
+def delete_medicos_where():
+    """
+    Elimina los médicos que cumplen el filtro del parámetro 'filter'.
+
+    Returns:
+        Response: Respuesta con el número de registros eliminados, o solo contados con 'dry_run=true'.
+    """
+    return medicos_routes.delete_many()
+
 # Citas routes
 citas_routes = BaseRoutes(
     cita_service,
     Cita,
     ['id_paciente', 'id_medico', 'fecha_hora', 'motivo_visita'],
-    'Cita'
+    'Cita',
+    references={'id_paciente': paciente_snapshot, 'id_medico': medico_snapshot}
 )
 
 @bp.route('/citas', methods=['GET'])
@@ -140,6 +377,30 @@ def get_citas():
     """
     return citas_routes.get_all()
 
+@bp.route('/citas/changes', methods=['GET'])
+def get_citas_changes():
+    """
+    Obtiene las citas creadas, modificadas o eliminadas después del token 'since', para sincronizar una copia
+    de la tabla sin volver a descargarla completa.
+
+    Returns:
+        Response: Respuesta con los registros escritos, las llaves eliminadas y el token de la siguiente consulta.
+    """
+    return citas_routes.get_changes()
+
+@bp.route('/citas/<int:id>', methods=['GET'])
+def get_cita(id):
+    """
+    Obtiene una cita por su identificador.
+
+    Args:
+        id (int): Identificador de la cita.
+
+    Returns:
+        Response: Respuesta con la cita encontrada.
+    """
+    return citas_routes.get_by_id(id)
+
 @bp.route('/citas', methods=['POST'])
 def add_cita():
     """
@@ -176,6 +437,26 @@ def delete_cita(id):
     """
     return citas_routes.delete(id)
 
+@bp.route('/citas', methods=['PATCH'])
+def update_citas_where():
+    """
+    Actualiza las citas que cumplen el filtro del parámetro 'filter' con las asignaciones del campo 'set'.
+
+    Returns:
+        Response: Respuesta con el número de registros actualizados, o solo contados con 'dry_run=true'.
+    """
+    return citas_routes.update_many()
+
+@bp.route('/citas', methods=['DELETE'])
+def delete_citas_where():
+    """
+    Elimina las citas que cumplen el filtro del parámetro 'filter'.
+
+    Returns:
+        Response: Respuesta con el número de registros eliminados, o solo contados con 'dry_run=true'.
+    """
+    return citas_routes.delete_many()
+
 # Tratamientos routes
 tratamientos_routes = BaseRoutes(
     tratamiento_service,
@@ -194,6 +475,30 @@ def get_tratamientos():
     """
     return tratamientos_routes.get_all()
 
+@bp.route('/tratamientos/changes', methods=['GET'])
+def get_tratamientos_changes():
+    """
+    Obtiene los tratamientos creados, modificados o eliminados después del token 'since', para sincronizar una copia
+    de la tabla sin volver a descargarla completa.
+
+    Returns:
+        Response: Respuesta con los registros escritos, las llaves eliminadas y el token de la siguiente consulta.
+    """
+    return tratamientos_routes.get_changes()
+
+@bp.route('/tratamientos/<int:id>', methods=['GET'])
+def get_tratamiento(id):
+    """
+    Obtiene un tratamiento por su identificador.
+
+    Args:
+        id (int): Identificador del tratamiento.
+
+    Returns:
+        Response: Respuesta con el tratamiento encontrado.
+    """
+    return tratamientos_routes.get_by_id(id)
+
 @bp.route('/tratamientos', methods=['POST'])
 def add_tratamiento():
     """
@@ -228,4 +533,294 @@ def delete_tratamiento(id):
     Returns:
         Response: Respuesta indicando si el tratamiento fue eliminado.
     """
-    return tratamientos_routes.delete(id)
\ No newline at end of file
+    return tratamientos_routes.delete(id)
+
+@bp.route('/tratamientos', methods=['PATCH'])
+def update_tratamientos_where():
+    """
+    Actualiza los tratamientos que cumplen el filtro del parámetro 'filter' con las asignaciones del campo 'set'.
+
+    Returns:
+        Response: Respuesta con el número de registros actualizados, o solo contados con 'dry_run=true'.
+    """
+    return tratamientos_routes.update_many()
+
+@bp.route('/tratamientos', methods=['DELETE'])
+def delete_tratamientos_where():
+    """
+    Elimina los tratamientos que cumplen el filtro del parámetro 'filter'.
+
+    Returns:
+        Response: Respuesta con el número de registros eliminados, o solo contados con 'dry_run=true'.
+    """
+    return tratamientos_routes.delete_many()
+
+horarios_routes = BaseRoutes(
+    horario_service,
+    HorarioMedico,
+    ['id_medico', 'dia_semana', 'hora_inicio', 'hora_fin', 'duracion_minutos'],
+    'Horario',
+    references={'id_medico': medico_snapshot}
+)
+
+@bp.route('/horarios', methods=['GET'])
+def get_horarios():
+    """
+    Obtiene todos los bloques de horario de los médicos.
+
+    Returns:
+        Response: Respuesta con la lista de todos los bloques de horario.
+    """
+    return horarios_routes.get_all()
+
+@bp.route('/horarios/<int:id>', methods=['GET'])
+def get_horario(id):
+    """
+    Obtiene un bloque de horario por su identificador.
+
+    Args:
+        id (int): Identificador del bloque de horario.
+
+    Returns:
+        Response: Respuesta con el bloque de horario encontrado.
+    """
+    return horarios_routes.get_by_id(id)
+
+@bp.route('/horarios', methods=['POST'])
+def add_horario():
+    """
+    Agrega un nuevo bloque de horario.
+
+    Returns:
+        Response: Respuesta con el bloque de horario agregado.
+    """
+    return horarios_routes.create()
+
+@bp.route('/horarios/<int:id>', methods=['PUT'])
+def update_horario(id):
+    """
+    Actualiza un bloque de horario existente.
+
+    Args:
+        id (int): Identificador del bloque de horario a actualizar.
+
+    Returns:
+        Response: Respuesta con el bloque de horario actualizado.
+    """
+    return horarios_routes.update(id)
+
+@bp.route('/horarios/<int:id>', methods=['DELETE'])
+def delete_horario(id):
+    """
+    Elimina un bloque de horario existente.
+
+    Args:
+        id (int): Identificador del bloque de horario a eliminar.
+
+    Returns:
+        Response: Respuesta indicando si el bloque de horario fue eliminado.
+    """
+    return horarios_routes.delete(id)
+
+@bp.route('/horarios', methods=['PATCH'])
+def update_horarios_where():
+    """
+    Actualiza los horarios que cumplen el filtro del parámetro 'filter' con las asignaciones del campo 'set'.
+
+    Returns:
+        Response: Respuesta con el número de registros actualizados, o solo contados con 'dry_run=true'.
+    """
+    return horarios_routes.update_many()
+
+@bp.route('/horarios', methods=['DELETE'])
+def delete_horarios_where():
+    """
+    Elimina los horarios que cumplen el filtro del parámetro 'filter'.
+
+    Returns:
+        Response: Respuesta con el número de registros eliminados, o solo contados con 'dry_run=true'.
+    """
+    return horarios_routes.delete_many()
+
+def _get_rango_reporte():
+    """
+    Obtiene el rango de días de un reporte de la solicitud (parámetros 'desde' y 'hasta' en formato AAAA-MM-DD).
+
+    Returns:
+        tuple: Primer y último día del rango; por defecto, los últimos 30 días.
+
+    Raises:
+        ValueError: Si las fechas no son válidas o el rango supera los 10 años.
+    """
+    hasta = date.fromisoformat(request.args['hasta']) if 'hasta' in request.args else date.today()
+    desde = date.fromisoformat(request.args['desde']) if 'desde' in request.args else hasta - timedelta(days=29)
+    if hasta < desde or hasta - desde > timedelta(days=3660):
+        raise ValueError('El rango debe ser positivo y de máximo 10 años')
+    return desde, hasta
+
+@bp.route('/reportes/citas', methods=['GET'])
+def get_reporte_citas():
+    """
+    Obtiene el número de citas por médico y periodo.
+
+    Parámetros de consulta:
+        agrupacion (str): 'dia', 'semana' o 'mes' (por defecto 'dia').
+        desde (str): Primer día del rango (por defecto, 30 días antes de 'hasta').
+        hasta (str): Último día del rango (por defecto, hoy).
+        id_medico (int): Médico a reportar (por defecto, todos).
+
+    Returns:
+        Response: Respuesta con las citas de cada médico por periodo.
+    """
+    agrupacion = request.args.get('agrupacion', 'dia')
+    if agrupacion not in AGRUPACIONES:
+        return jsonify({'message': f'Agrupación no válida: {agrupacion}'}), 400
+    try:
+        desde, hasta = _get_rango_reporte()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    with replica_router.reading():
+        data = reporte_service.get_citas_por_medico(agrupacion, desde, hasta, request.args.get('id_medico', type=int))
+        medicos = medico_snapshot.resolve(item['id_medico'] for item in data)
+    return jsonify({'agrupacion': agrupacion, 'desde': desde.isoformat(), 'hasta': hasta.isoformat(),
+                    'data': [{**item, 'medico_nombre': medicos.get(item['id_medico'])} for item in data]})
+
+@bp.route('/reportes/especialidades', methods=['GET'])
+def get_reporte_especialidades():
+    """
+    Obtiene la carga de citas de cada especialidad.
+
+    Parámetros de consulta:
+        desde (str): Primer día del rango (por defecto, 30 días antes de 'hasta').
+        hasta (str): Último día del rango (por defecto, hoy).
+
+    Returns:
+        Response: Respuesta con las citas y los médicos con citas de cada especialidad.
+    """
+    try:
+        desde, hasta = _get_rango_reporte()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    with replica_router.reading():
+        data = reporte_service.get_carga_por_especialidad(desde, hasta)
+    return jsonify({'desde': desde.isoformat(), 'hasta': hasta.isoformat(), 'data': data})
+
+@bp.route('/reportes/utilizacion', methods=['GET'])
+def get_reporte_utilizacion():
+    """
+    Obtiene la utilización de la agenda de cada médico y sus días laborables sin citas.
+
+    Parámetros de consulta:
+        desde (str): Primer día del rango (por defecto, 30 días antes de 'hasta').
+        hasta (str): Último día del rango (por defecto, hoy).
+
+    Returns:
+        Response: Respuesta con las citas, la capacidad y los huecos de cada médico.
+    """
+    try:
+        desde, hasta = _get_rango_reporte()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    with replica_router.reading():
+        data = reporte_service.get_utilizacion(desde, hasta)
+    return jsonify({'desde': desde.isoformat(), 'hasta': hasta.isoformat(), 'data': data})
+
+@bp.cli.command('backfill-resumen')
+@click.option('--desde', type=click.DateTime(formats=['%Y-%m-%d']), help='Primer día a recalcular.')
+@click.option('--hasta', type=click.DateTime(formats=['%Y-%m-%d']), help='Último día a recalcular.')
+@click.option('--inquilino', help='Inquilino cuyo esquema se recalcula.')
+def backfill_resumen(desde, hasta, inquilino):
+    """
+    Recalcula el resumen diario de citas a partir del historial (flask clinica backfill-resumen).
+    """
+    g.tenant = inquilino
+    escritas = resumen_repository.backfill(desde.date() if desde else None, hasta.date() if hasta else None)
+    click.echo(f'Filas del resumen escritas: {escritas}')
+
+# Lote transaccional con las operaciones sobre los recursos del dominio
+batch_routes = BatchRoutes({
+    'pacientes': pacientes_routes,
+    'medicos': medicos_routes,
+    'citas': citas_routes,
+    'tratamientos': tratamientos_routes,
+    'horarios': horarios_routes
+})
+
+@bp.route('/batch', methods=['POST'])
+def execute_batch():
+    """
+    Ejecuta en una sola transacción una lista ordenada de operaciones create, update y delete sobre los recursos
+    del dominio; las operaciones pueden usar los ids creados por las anteriores con '$ref'.
+
+    Returns:
+        Response: Respuesta con el resultado de cada operación, o mensaje de error si el lote se revirtió.
+    """
+    return batch_routes.execute()
+
+# Trabajos en segundo plano sobre los recursos del dominio
+job_routes = JobRoutes('clinica', {
+    'pacientes': pacientes_routes,
+    'medicos': medicos_routes,
+    'citas': citas_routes,
+    'tratamientos': tratamientos_routes,
+    'horarios': horarios_routes
+})
+
+def _validate_rango(parametros):
+    """
+    Valida el rango opcional ('desde' y 'hasta', AAAA-MM-DD) del recálculo del resumen diario.
+    """
+    for field in ('desde', 'hasta'):
+        if parametros.get(field) is not None:
+            date.fromisoformat(parametros[field])
+
+def _backfill_resumen(context):
+    """
+    Recalcula el resumen diario de citas en segundo plano, como 'flask clinica backfill-resumen'.
+    """
+    desde, hasta = (date.fromisoformat(context.parametros[field]) if context.parametros.get(field) else None
+                    for field in ('desde', 'hasta'))
+    return {'escritas': resumen_repository.backfill(desde, hasta)}
+
+job_routes.register('resumen.backfill', _backfill_resumen, _validate_rango)
+
+@bp.route('/jobs', methods=['POST'])
+def enqueue_job():
+    """
+    Encola un trabajo en segundo plano del dominio (exportaciones, importaciones, escrituras masivas o
+    recálculos de resúmenes) y responde de inmediato con su identificador.
+
+    Returns:
+        Response: Respuesta 202 con el trabajo encolado y la URL de su estado, o mensaje de error.
+    """
+    return job_routes.enqueue()
+
+# Canal de cambios de las tablas del dominio
+event_routes = EventRoutes('clinica')
+
+@bp.route('/events', methods=['GET'])
+def get_events():
+    """
+    Abre un flujo Server-Sent Events con un evento por cada registro creado, modificado o eliminado en el
+    dominio, para actualizar los registros en su lugar sin volver a consultar las tablas.
+
+    Returns:
+        Response: Flujo text/event-stream con los cambios del dominio.
+    """
+    return event_routes.stream()
+
+audit_routes = AuditRoutes('clinica')
+
+@bp.route('/auditoria', methods=['GET'])
+def get_auditoria():
+    """
+    Obtiene el historial de escrituras de un registro del dominio (p. ej. ?tabla=paciente&id=3), con quién
+    hizo cada una y los valores anteriores y nuevos de las columnas que cambió.
+
+    Returns:
+        Response: Respuesta con las escrituras del registro o mensaje de error.
+    """
+    return audit_routes.history()
\ No newline at end of file
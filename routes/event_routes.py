@@ -0,0 +1,76 @@
+import json
+from flask import Response, jsonify, request
+from models import current_tenant
+from repositories.change_feed import RESET, change_feed
+
+
+class EventRoutes:
+    """
+    Ruta del canal de cambios de un dominio: un flujo Server-Sent Events con un evento por cada escritura
+    confirmada en las tablas del dominio, para que los clientes actualicen en su lugar los registros que
+    muestran en lugar de volver a consultar páginas completas.
+
+    Cada evento 'change' lleva la tabla ('model'), la llave primaria ('pk'), la operación ('op') y la versión
+    del evento, que también es su 'id': al reconectarse, el cliente la envía en la cabecera Last-Event-ID (o
+    en el parámetro last_event_id) y recibe los eventos que perdió. Si ya no están disponibles, recibe un
+    evento 'reset' y debe volver a cargar sus datos.
+
+    Atributos:
+        bind (str): Bind del dominio.
+    """
+
+    def __init__(self, bind):
+        """
+        Inicializa la ruta del canal de cambios del dominio.
+
+        Args:
+            bind (str): Bind del dominio (p. ej. 'clinica').
+        """
+        self.bind = bind
+
+    @staticmethod
+    def _format(event):
+        """
+        Da formato Server-Sent Events a un evento, o a un latido si el evento es None.
+        """
+        if event is None:
+            return ': latido\n\n'
+        name = 'reset' if event['op'] == RESET else 'change'
+        return f"id: {event['version']}\nevent: {name}\ndata: {json.dumps(event, default=str)}\n\n"
+
+    def stream(self):
+        """
+        Abre el flujo de cambios del dominio.
+
+        Parámetros de consulta:
+            models (str): Tablas de interés separadas por comas (por defecto, todas las del dominio).
+            last_event_id (int): Versión del último evento recibido, si no se envía la cabecera Last-Event-ID.
+
+        Returns:
+            Response: Flujo text/event-stream, o mensaje de error si el id no es válido o se alcanzó el
+            máximo de suscriptores.
+        """
+        last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+        try:
+            since = int(last_event_id) if last_event_id else None
+        except ValueError:
+            return jsonify({'message': 'Last-Event-ID debe ser un número entero'}), 400
+        models = request.args.get('models')
+        tables = {table.strip() for table in models.split(',') if table.strip()} if models else None
+
+        events = change_feed.subscribe(self.bind, current_tenant(), since, tables)
+        if events is None:
+            return jsonify({'message': 'Se alcanzó el máximo de suscriptores, intente de nuevo'}), 503, {'Retry-After': '5'}
+
+        def generate():
+            # Indica al cliente cuánto esperar antes de reconectarse si se corta el flujo
+            yield 'retry: 3000\n\n'
+            try:
+                for event in events:
+                    yield self._format(event)
+            finally:
+                events.close()
+
+        # El flujo no usa la solicitud ni la sesión: se liberan (y sus lugares de admisión) al empezar a enviarlo
+        return Response(generate(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
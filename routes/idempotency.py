@@ -0,0 +1,219 @@
+# Este archivo contiene el almacén de llaves de idempotencia, con el que los reintentos de POST y PUT no repiten escrituras.
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+from flask import Response, g, jsonify, request
+from models import current_tenant
+
+# Cabecera HTTP con la que el cliente identifica cada operación que puede reintentar
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+
+# Cabecera con la que se marca una respuesta repetida desde el almacén
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+# Métodos cuyas solicitudes admiten llave de idempotencia
+IDEMPOTENT_METHODS = ('POST', 'PUT')
+
+# Cabeceras de la respuesta original que se guardan para repetirlas
+STORED_HEADERS = ('Content-Type', 'X-Consistency-Token', 'Location')
+
+
+class _Pending:
+    """
+    Entrada de una llave cuya solicitud original aún se está ejecutando.
+
+    Atributos:
+        fingerprint (str): Huella de la solicitud original.
+        done (threading.Event): Se activa cuando la solicitud original termina.
+    """
+
+    def __init__(self, fingerprint):
+        self.fingerprint = fingerprint
+        self.done = threading.Event()
+
+
+class IdempotencyStore:
+    """
+    Almacén en memoria de las respuestas de las solicitudes POST y PUT enviadas con la cabecera Idempotency-Key.
+
+    Antes de ejecutar una solicitud con llave se busca la llave del inquilino: si ya tiene respuesta, se
+    devuelve la misma respuesta sin tocar la base de datos; si la solicitud original sigue en curso, el
+    reintento espera su respuesta. La llave se reserva antes de escribir y su respuesta se guarda al terminar,
+    en un solo paso; las respuestas 5xx no se guardan, para que el cliente pueda reintentar. Una llave reusada
+    con otro método, ruta o cuerpo se rechaza con 422.
+
+    Guarda solo el código, el cuerpo y unas pocas cabeceras de cada respuesta, con expiración y desalojo LRU.
+    Como las cachés de identidad, el almacén es del proceso: cada proceso de la aplicación tiene el suyo.
+
+    La configuración se lee de la aplicación Flask:
+        IDEMPOTENCY_TTL (int): Segundos durante los que se conserva la respuesta de una llave.
+        IDEMPOTENCY_MAX_KEYS (int): Número máximo de llaves guardadas.
+        IDEMPOTENCY_WAIT (float): Segundos que un reintento espera a la solicitud original en curso.
+    """
+
+    def __init__(self):
+        """
+        Inicializa el almacén vacío.
+        """
+        self.ttl = 86400
+        self.max_keys = 10000
+        self.wait = 10.0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stored = 0
+        self.replayed = 0
+        self.mismatched = 0
+        self.evictions = 0
+
+    def init_app(self, app):
+        """
+        Configura el almacén y la revisión de las llaves en cada solicitud.
+
+        Args:
+            app (Flask): La instancia de la aplicación Flask.
+        """
+        app.config.setdefault('IDEMPOTENCY_TTL', 86400)
+        app.config.setdefault('IDEMPOTENCY_MAX_KEYS', 10000)
+        app.config.setdefault('IDEMPOTENCY_WAIT', 10.0)
+        self.ttl = app.config['IDEMPOTENCY_TTL']
+        self.max_keys = app.config['IDEMPOTENCY_MAX_KEYS']
+        self.wait = app.config['IDEMPOTENCY_WAIT']
+        app.extensions['idempotency_store'] = self
+
+        @app.before_request
+        def _check_idempotency_key():
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if request.method not in IDEMPOTENT_METHODS or key is None:
+                return None
+            if not 0 < len(key) <= 255:
+                return jsonify({'message': f'{IDEMPOTENCY_HEADER} debe tener entre 1 y 255 caracteres'}), 400
+            return self.begin((current_tenant(), key), self._fingerprint())
+
+        @app.after_request
+        def _store_response(response):
+            reserved = g.pop('idempotency', None)
+            if reserved is not None:
+                self.complete(*reserved, response)
+            return response
+
+        @app.teardown_request
+        def _release_key(exception):
+            # Si la solicitud terminó con una excepción no manejada, la llave se libera para que pueda reintentarse
+            reserved = g.pop('idempotency', None)
+            if reserved is not None:
+                self.release(*reserved)
+
+    @staticmethod
+    def _fingerprint():
+        """
+        Calcula la huella de la solicitud actual a partir de su método, ruta y cuerpo.
+
+        Returns:
+            str: Huella SHA-256 en hexadecimal.
+        """
+        digest = hashlib.sha256(f'{request.method} {request.full_path}\n'.encode())
+        digest.update(request.get_data(cache=True))
+        return digest.hexdigest()
+
+    def begin(self, key, fingerprint):
+        """
+        Reserva una llave para la solicitud actual, o devuelve la respuesta guardada de la llave.
+
+        Args:
+            key (tuple): Llave de la solicitud (inquilino, Idempotency-Key).
+            fingerprint (str): Huella de la solicitud.
+
+        Returns:
+            Optional[Response]: Respuesta guardada o de error, o None si la solicitud debe ejecutarse.
+        """
+        deadline = time.monotonic() + self.wait
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and not isinstance(entry, _Pending) and entry[0] < time.monotonic():
+                    del self._entries[key]
+                    entry = None
+                if entry is None:
+                    pending = self._entries[key] = _Pending(fingerprint)
+                    g.idempotency = key, pending
+                    return None
+                pending = isinstance(entry, _Pending)
+                if (entry.fingerprint if pending else entry[1]) != fingerprint:
+                    self.mismatched += 1
+                    return jsonify({'message': f'{IDEMPOTENCY_HEADER} ya se usó con otra solicitud'}), 422
+                if not pending:
+                    self._entries.move_to_end(key)
+                    self.replayed += 1
+                    status, body, headers = entry[2:]
+                    return Response(body, status=status, headers={**headers, REPLAYED_HEADER: 'true'})
+
+            # La solicitud original sigue en curso: se espera su respuesta y se vuelve a buscar la llave
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not entry.done.wait(remaining):
+                return jsonify({'message': 'La solicitud original sigue en curso, intente de nuevo'}), 409, \
+                    {'Retry-After': '1'}
+
+    def complete(self, key, pending, response):
+        """
+        Guarda la respuesta de una llave reservada y despierta a los reintentos que la esperan. Las respuestas
+        5xx no se guardan: la llave se libera.
+
+        Args:
+            key (tuple): Llave de la solicitud (inquilino, Idempotency-Key).
+            pending (_Pending): Entrada con la que se reservó la llave.
+            response (Response): Respuesta de la solicitud original.
+        """
+        if response.status_code >= 500 or response.is_streamed:
+            self.release(key, pending)
+            return
+        headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, pending.fingerprint, response.status_code,
+                                  response.get_data(), headers)
+            self._entries.move_to_end(key)
+            self.stored += 1
+            # Se desalojan las llaves más antiguas, salvo las reservadas: sus reintentos esperan la respuesta
+            excess = len(self._entries) - self.max_keys
+            if excess > 0:
+                stored = (old for old, entry in self._entries.items() if not isinstance(entry, _Pending))
+                for old in list(islice(stored, excess)):
+                    del self._entries[old]
+                    self.evictions += 1
+        pending.done.set()
+
+    def release(self, key, pending):
+        """
+        Libera una llave reservada sin guardar respuesta y despierta a los reintentos que la esperan.
+
+        Args:
+            key (tuple): Llave de la solicitud (inquilino, Idempotency-Key).
+            pending (_Pending): Entrada con la que se reservó la llave.
+        """
+        with self._lock:
+            if self._entries.get(key) is pending:
+                del self._entries[key]
+        pending.done.set()
+
+    def stats(self):
+        """
+        Obtiene las estadísticas de uso del almacén.
+
+        Returns:
+            dict: Llaves guardadas, respuestas guardadas y repetidas, llaves reusadas con otra solicitud y desalojos.
+        """
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_keys': self.max_keys,
+                'ttl': self.ttl,
+                'stored': self.stored,
+                'replayed': self.replayed,
+                'mismatched': self.mismatched,
+                'evictions': self.evictions
+            }
+
+
+# Almacén de la aplicación
+idempotency_store = IdempotencyStore()
@@ -0,0 +1,241 @@
+import os
+from flask import Blueprint, jsonify, request, send_file, url_for
+from sqlalchemy import inspect
+from models import current_tenant, replica_router
+from repositories.filter_expression import compile_assignments, compile_filter
+from services.job_queue import format_csv, job_queue
+
+# Número de registros por lote de las exportaciones e importaciones
+LOTE = 1000
+
+bp = Blueprint('jobs', __name__)
+
+
+def _url(endpoint, id):
+    """
+    Construye la URL de una ruta de un trabajo con el mismo estilo de la solicitud actual: con el inquilino como
+    segmento de URL si la solicitud lo usó, o sin él si se eligió con la cabecera X-Tenant.
+    """
+    if request.blueprint and request.blueprint.endswith('_tenant'):
+        return url_for(f'jobs_tenant.{endpoint}', tenant=current_tenant(), id=id)
+    return url_for(f'jobs.{endpoint}', id=id)
+
+
+def _view(job):
+    """
+    Construye la representación pública de un trabajo, con su porcentaje de avance y la URL de su resultado.
+
+    Args:
+        job (dict): Trabajo.
+
+    Returns:
+        dict: Estado, progreso, resultado y fechas del trabajo.
+    """
+    view = {field: job[field] for field in ('id', 'tipo', 'estado', 'progreso', 'total', 'resultado', 'error',
+                                            'cancelar', 'creado', 'iniciado', 'terminado')}
+    view['porcentaje'] = round(100 * job['progreso'] / job['total'], 1) if job['total'] else None
+    if job_queue.result_path(job):
+        view['resultado_url'] = _url('get_job_result', job['id'])
+    return view
+
+
+class JobRoutes:
+    """
+    Rutas de los trabajos en segundo plano de un dominio. Registra, para cada recurso, los trabajos
+    '<recurso>.exportar' (CSV, con filtro opcional), '<recurso>.actualizar' y '<recurso>.eliminar' (escrituras
+    masivas con filtro) y, si el recurso tiene llave natural, '<recurso>.importar' (sincronización por lotes).
+
+    Atributos:
+        bind (str): Bind del dominio, que también es el prefijo de sus tipos de trabajo.
+        resources (dict): Rutas base (BaseRoutes) de cada recurso del dominio, por nombre de recurso.
+    """
+
+    def __init__(self, bind, resources):
+        """
+        Inicializa las rutas y registra los trabajos de los recursos del dominio.
+
+        Args:
+            bind (str): Bind del dominio (p. ej. 'automoviles').
+            resources (dict): Rutas base (BaseRoutes) por nombre de recurso.
+        """
+        self.bind = bind
+        self.resources = resources
+        for name, resource in resources.items():
+            self.register(f'{name}.exportar', self._exportar(resource), self._validate_filter(resource, False))
+            self.register(f'{name}.actualizar', self._write_where(resource, 'update'),
+                          self._validate_filter(resource, True, True))
+            self.register(f'{name}.eliminar', self._write_where(resource, 'delete'),
+                          self._validate_filter(resource, True))
+            if resource.natural_key:
+                self.register(f'{name}.importar', self._importar(resource), self._validate_rows(resource))
+
+    def register(self, tipo, handler, validate=None):
+        """
+        Registra un trabajo del dominio.
+
+        Args:
+            tipo (str): Nombre del trabajo dentro del dominio (p. ej. 'resumen.rebuild').
+            handler (Callable[[JobContext], dict]): Función que ejecuta el trabajo.
+            validate (Callable[[dict], None], optional): Función que valida sus parámetros.
+        """
+        job_queue.register(f'{self.bind}.{tipo}', self.bind, handler, validate)
+
+    @staticmethod
+    def _validate_filter(resource, required, assignments=False):
+        """
+        Construye la validación de los parámetros 'filter', 'set' y 'batch_size' de un trabajo.
+        """
+        def validate(parametros):
+            filter_text = parametros.get('filter')
+            if required and not filter_text:
+                raise ValueError('El parámetro filter es requerido')
+            if filter_text:
+                compile_filter(resource.model, filter_text)
+            if assignments:
+                compile_assignments(resource.model, parametros.get('set') or '')
+            batch_size = parametros.get('batch_size', LOTE)
+            if not isinstance(batch_size, int) or not 1 <= batch_size <= 10000:
+                raise ValueError('El parámetro batch_size debe estar entre 1 y 10000')
+        return validate
+
+    @staticmethod
+    def _validate_rows(resource):
+        """
+        Construye la validación de los registros de un trabajo de importación.
+        """
+        def validate(parametros):
+            message = resource._validate_upsert_rows(parametros.get('rows'), max_rows=100000)
+            if message:
+                raise ValueError(message)
+        return validate
+
+    @staticmethod
+    def _exportar(resource):
+        """
+        Construye el trabajo que exporta a CSV los registros de un recurso, leyendo por lotes desde las réplicas
+        y dando formato a cada lote en el pool de procesos.
+        """
+        def handler(context):
+            filter_text = context.parametros.get('filter')
+            batch_size = context.parametros.get('batch_size', LOTE)
+            columns = [attr.key for attr in inspect(resource.model).column_attrs]
+            path = context.output_path('csv')
+            escritas = 0
+            with replica_router.reading(), open(path, 'w', newline='', encoding='utf-8') as file:
+                context.progress(0, resource.service.count_where(filter_text))
+                file.write(context.run_cpu(format_csv, columns, []))
+                for rows in resource.service.iter_where(filter_text, batch_size):
+                    file.write(context.run_cpu(format_csv, None, [[row[column] for column in columns] for row in rows]))
+                    escritas += len(rows)
+                    context.progress(escritas)
+            return {'archivo': os.path.basename(path), 'filas': escritas}
+        return handler
+
+    @staticmethod
+    def _write_where(resource, operation):
+        """
+        Construye el trabajo que actualiza o elimina por lotes los registros de un recurso que cumplen un filtro.
+        Cada lote se confirma por separado: si el trabajo se cancela, los lotes anteriores quedan confirmados.
+        """
+        def handler(context):
+            filter_text = context.parametros['filter']
+            batch_size = context.parametros.get('batch_size', LOTE)
+            context.progress(0, resource.service.count_where(filter_text))
+            if operation == 'update':
+                afectados = resource.service.update_where(filter_text, context.parametros['set'], batch_size,
+                                                          on_batch=context.progress)
+            else:
+                afectados = resource.service.delete_where(filter_text, batch_size, on_batch=context.progress)
+            return {'afectados': afectados}
+        return handler
+
+    @staticmethod
+    def _importar(resource):
+        """
+        Construye el trabajo que sincroniza registros por la llave natural de un recurso, un lote por transacción.
+        """
+        def handler(context):
+            rows = context.parametros['rows']
+            counts = {'insertados': 0, 'actualizados': 0, 'sin_cambios': 0}
+            context.progress(0, len(rows))
+            for start in range(0, len(rows), LOTE):
+                for name, count in resource.service.upsert_many(resource.natural_key, rows[start:start + LOTE]).items():
+                    counts[name] += count
+                context.progress(min(start + LOTE, len(rows)))
+            return counts
+        return handler
+
+    def enqueue(self):
+        """
+        Encola un trabajo del dominio. El cuerpo indica el 'tipo' del trabajo (p. ej. 'vehiculos.exportar') y
+        sus 'parametros'.
+
+        Returns:
+            Response: Respuesta 202 con el trabajo encolado y la cabecera Location, o mensaje de error.
+        """
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or not isinstance(data.get('parametros', {}), dict):
+            return jsonify({'message': "Se esperaba un objeto con 'tipo' y 'parametros'"}), 400
+        tipo = data.get('tipo')
+        tipos = job_queue.types(f'{self.bind}.')
+        if tipo not in tipos:
+            return jsonify({'message': f'Tipo de trabajo desconocido: {tipo}', 'tipos': tipos}), 400
+
+        try:
+            job = job_queue.enqueue(f'{self.bind}.{tipo}', data.get('parametros', {}))
+        except (TypeError, ValueError) as e:
+            return jsonify({'message': str(e)}), 400
+        return jsonify(_view(job)), 202, {'Location': _url('get_job', job['id'])}
+
+
+@bp.route('/<id>', methods=['GET'])
+def get_job(id):
+    """
+    Obtiene el estado y el progreso de un trabajo.
+
+    Args:
+        id (str): Identificador del trabajo.
+
+    Returns:
+        Response: Respuesta con el trabajo o mensaje de error si no existe.
+    """
+    job = job_queue.get(id)
+    if job is None:
+        return jsonify({'message': 'Trabajo no encontrado'}), 404
+    return jsonify(_view(job))
+
+
+@bp.route('/<id>', methods=['DELETE'])
+def cancel_job(id):
+    """
+    Cancela un trabajo: uno en cola no llega a ejecutarse y uno en ejecución se detiene en su siguiente reporte
+    de progreso.
+
+    Args:
+        id (str): Identificador del trabajo.
+
+    Returns:
+        Response: Respuesta con el trabajo o mensaje de error si no existe.
+    """
+    job = job_queue.cancel(id)
+    if job is None:
+        return jsonify({'message': 'Trabajo no encontrado'}), 404
+    return jsonify(_view(job))
+
+
+@bp.route('/<id>/resultado', methods=['GET'])
+def get_job_result(id):
+    """
+    Descarga el archivo de resultado de un trabajo completado.
+
+    Args:
+        id (str): Identificador del trabajo.
+
+    Returns:
+        Response: Archivo del resultado o mensaje de error si el trabajo no existe o no generó un archivo.
+    """
+    job = job_queue.get(id)
+    path = job_queue.result_path(job) if job is not None else None
+    if path is None or not os.path.exists(path):
+        return jsonify({'message': 'Resultado no encontrado'}), 404
+    return send_file(path, as_attachment=True)
\ No newline at end of file
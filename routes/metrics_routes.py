@@ -0,0 +1,112 @@
+# Este archivo contiene las rutas que exponen métricas internas de la aplicación
+from flask import Blueprint, jsonify
+from repositories.audit_log import audit_log
+from repositories.change_feed import change_feed
+from repositories.group_commit import GroupCommitBuffer
+from repositories.identity_cache import IdentityCache
+from repositories.single_flight import SingleFlight
+from repositories.transaction_retry import transaction_retry
+from routes.admission import admission_controller
+from routes.idempotency import idempotency_store
+from services.job_queue import job_queue
+
+bp = Blueprint('metrics', __name__)
+
+@bp.route('/cache', methods=['GET'])
+def get_cache_stats():
+    """
+    Obtiene las estadísticas de las cachés de identidad de los repositorios.
+
+    Returns:
+        Response: Respuesta con aciertos, fallos y tasa de aciertos de cada caché.
+    """
+    return jsonify({'data': [cache.stats() for cache in IdentityCache.instances]})
+
+
+@bp.route('/group-commit', methods=['GET'])
+def get_group_commit_stats():
+    """
+    Obtiene las estadísticas de los búferes de confirmación en grupo.
+
+    Returns:
+        Response: Respuesta con grupos confirmados, filas por grupo, rechazos y tamaño de la cola de cada búfer.
+    """
+    return jsonify({'data': [buffer.stats() for buffer in GroupCommitBuffer.instances]})
+
+
+@bp.route('/retries', methods=['GET'])
+def get_retry_stats():
+    """
+    Obtiene las estadísticas de reintentos de las transacciones por interbloqueos y esperas de bloqueo.
+
+    Returns:
+        Response: Respuesta con transacciones, reintentos, recuperadas, agotadas y errores de cada tipo, por tabla.
+    """
+    return jsonify({'data': transaction_retry.stats()})
+
+
+@bp.route('/idempotency', methods=['GET'])
+def get_idempotency_stats():
+    """
+    Obtiene las estadísticas del almacén de llaves de idempotencia.
+
+    Returns:
+        Response: Respuesta con llaves guardadas, respuestas repetidas, llaves reusadas y desalojos.
+    """
+    return jsonify({'data': idempotency_store.stats()})
+
+
+@bp.route('/admission', methods=['GET'])
+def get_admission_stats():
+    """
+    Obtiene las estadísticas del control de admisión.
+
+    Returns:
+        Response: Respuesta con solicitudes en ejecución, profundidad de la cola, admitidas y descartadas por
+        clase de prioridad de cada bind y ruta limitada.
+    """
+    return jsonify({'data': admission_controller.stats()})
+
+
+@bp.route('/single-flight', methods=['GET'])
+def get_single_flight_stats():
+    """
+    Obtiene las estadísticas de las lecturas idénticas concurrentes agrupadas por tabla.
+
+    Returns:
+        Response: Respuesta con consultas ejecutadas y lecturas que compartieron una ejecución de cada tabla.
+    """
+    return jsonify({'data': [flights.stats() for flights in SingleFlight.instances]})
+
+
+@bp.route('/jobs', methods=['GET'])
+def get_job_stats():
+    """
+    Obtiene las estadísticas de los trabajos en segundo plano.
+
+    Returns:
+        Response: Respuesta con el límite de trabajos simultáneos por bind y el número de trabajos por estado.
+    """
+    return jsonify({'data': job_queue.stats()})
+
+
+@bp.route('/change-feed', methods=['GET'])
+def get_change_feed_stats():
+    """
+    Obtiene las estadísticas del canal de cambios.
+
+    Returns:
+        Response: Respuesta con eventos publicados, reinicios enviados y suscriptores conectados por bind e inquilino.
+    """
+    return jsonify({'data': change_feed.stats()})
+
+
+@bp.route('/audit', methods=['GET'])
+def get_audit_stats():
+    """
+    Obtiene las estadísticas de la bitácora de auditoría.
+
+    Returns:
+        Response: Respuesta con registros encolados, escritos y descartados, registros por lote y tamaño de la cola.
+    """
+    return jsonify({'data': audit_log.stats()})
\ No newline at end of file
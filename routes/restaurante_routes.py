@@ -1,25 +1,48 @@
+from datetime import datetime
 from flask import Blueprint, request, jsonify
 from routes.base_routes import BaseRoutes
+from routes.batch_routes import BatchRoutes
+from routes.audit_routes import AuditRoutes
+from routes.event_routes import EventRoutes
+from routes.job_routes import JobRoutes
 from services.base_service import BaseService
+from services.serie_pedidos_service import SeriePedidosService
+from services.pedido_service import PedidoService
 from repositories.base_repository import BaseRepository
-from models import db, ClienteRestaurante, Empleado, Plato, Ingrediente, Pedido
+from repositories.pedido_repository import AGRUPACIONES, GRANULARIDADES, PedidoRepository
+from repositories.exceptions import InsufficientStockError
+from repositories.group_commit import GroupCommitBuffer
+from repositories.identity_cache import IdentityCache
+from repositories.reference_snapshot import ReferenceSnapshot
+from models import db, replica_router, ClienteRestaurante, Empleado, Plato, Ingrediente, Pedido, RecetaPlato
 
 # Este archivo contiene las rutas para los endpoints relacionados con la tabla del restaurante
 bp = Blueprint('restaurante', __name__)
 
 # Se crean los servicios para cada tabla
 cliente_service = BaseService(BaseRepository(db, ClienteRestaurante))
-empleado_service = BaseService(BaseRepository(db, Empleado))
-plato_service = BaseService(BaseRepository(db, Plato))
+empleado_service = BaseService(BaseRepository(db, Empleado, cache=IdentityCache('empleado')))
+plato_cache = IdentityCache('plato', ttl=30)
+plato_service = BaseService(BaseRepository(db, Plato, cache=plato_cache))
 ingrediente_service = BaseService(BaseRepository(db, Ingrediente))
-pedido_service = BaseService(BaseRepository(db, Pedido))
+serie_cache = IdentityCache('pedidos_serie', ttl=300, max_size=20000)
+pedido_repository = PedidoRepository(db, series_cache=serie_cache, plato_cache=plato_cache)
+pedido_service = PedidoService(pedido_repository, group_commit=GroupCommitBuffer('pedidos', pedido_repository))
+receta_service = BaseService(BaseRepository(db, RecetaPlato))
+serie_pedidos_service = SeriePedidosService(pedido_repository, serie_cache)
+
+cliente_snapshot = ReferenceSnapshot(db, ClienteRestaurante, 'cliente')
+empleado_snapshot = ReferenceSnapshot(db, Empleado, 'empleado')
+plato_snapshot = ReferenceSnapshot(db, Plato, 'plato')
+ingrediente_snapshot = ReferenceSnapshot(db, Ingrediente, 'ingrediente')
 
 # Los servicios se utilizan para crear las rutas de cada tabla
 clientes_routes = BaseRoutes(
     cliente_service,
     ClienteRestaurante,
     ['nombre', 'correo_electronico', 'telefono'],
-    'Cliente'
+    'Cliente',
+    natural_key='correo_electronico'
 )
 
 # Se definen las rutas del método GET, POST, PUT y DELETE para la tabla de clientes del restaurante
@@ -33,6 +56,30 @@ def get_clientes():
     """
     return clientes_routes.get_all()
 
+@bp.route('/clientes_restaurante/changes', methods=['GET'])
+def get_clientes_changes():
+    """
+    Obtiene los clientes creados, modificados o eliminados después del token 'since', para sincronizar una copia
+    de la tabla sin volver a descargarla completa.
+
+    Returns:
+        Response: Respuesta con los registros escritos, las llaves eliminadas y el token de la siguiente consulta.
+    """
+    return clientes_routes.get_changes()
+
+@bp.route('/clientes_restaurante/<int:id>', methods=['GET'])
+def get_cliente(id):
+    """
+    Obtiene un cliente del restaurante por su identificador.
+
+    Args:
+        id (int): Identificador del cliente.
+
+    Returns:
+        Response: Respuesta con el cliente encontrado.
+    """
+    return clientes_routes.get_by_id(id)
+
 @bp.route('/clientes_restaurante', methods=['POST'])
 def add_cliente():
     """
@@ -69,6 +116,36 @@ def delete_cliente(id):
     """
     return clientes_routes.delete(id)
 
+@bp.route('/clientes_restaurante', methods=['PATCH'])
+def update_clientes_where():
+    """
+    Actualiza los clientes que cumplen el filtro del parámetro 'filter' con las asignaciones del campo 'set'.
+
+    Returns:
+        Response: Respuesta con el número de registros actualizados, o solo contados con 'dry_run=true'.
+    """
+    return clientes_routes.update_many()
+
+@bp.route('/clientes_restaurante', methods=['DELETE'])
+def delete_clientes_where():
+    """
+    Elimina los clientes que cumplen el filtro del parámetro 'filter'.
+
+    Returns:
+        Response: Respuesta con el número de registros eliminados, o solo contados con 'dry_run=true'.
+    """
+    return clientes_routes.delete_many()
+
+@bp.route('/clientes_restaurante/upsert', methods=['PUT'])
+def upsert_clientes():
+    """
+    Inserta o actualiza los clientes de un arreglo, identificándolos por su correo electrónico, en una sola transacción.
+
+    Returns:
+        Response: Respuesta con el número de registros insertados, actualizados y sin cambios.
+    """
+    return clientes_routes.upsert_many()
+
 # Empleados routes
 empleados_routes = BaseRoutes(
     empleado_service,
@@ -87,6 +164,30 @@ def get_empleados():
     """
     return empleados_routes.get_all()
 
+@bp.route('/empleados/changes', methods=['GET'])
+def get_empleados_changes():
+    """
+    Obtiene los empleados creados, modificados o eliminados después del token 'since', para sincronizar una copia
+    de la tabla sin volver a descargarla completa.
+
+    Returns:
+        Response: Respuesta con los registros escritos, las llaves eliminadas y el token de la siguiente consulta.
+    """
+    return empleados_routes.get_changes()
+
+@bp.route('/empleados/<int:id>', methods=['GET'])
+def get_empleado(id):
+    """
+    Obtiene un empleado por su identificador.
+
+    Args:
+        id (int): Identificador del empleado.
+
+    Returns:
+        Response: Respuesta con el empleado encontrado.
+    """
+    return empleados_routes.get_by_id(id)
+
 @bp.route('/empleados', methods=['POST'])
 def add_empleado():
     """
@@ -123,6 +224,26 @@ def delete_empleado(id):
     """
     return empleados_routes.delete(id)
 
+@bp.route('/empleados', methods=['PATCH'])
+def update_empleados_where():
+    """
+    Actualiza los empleados que cumplen el filtro del parámetro 'filter' con las asignaciones del campo 'set'.
+
+    Returns:
+        Response: Respuesta con el número de registros actualizados, o solo contados con 'dry_run=true'.
+    """
+    return empleados_routes.update_many()
+
+@bp.route('/empleados', methods=['DELETE'])
+def delete_empleados_where():
+    """
+    Elimina los empleados que cumplen el filtro del parámetro 'filter'.
+
+    Returns:
+        Response: Respuesta con el número de registros eliminados, o solo contados con 'dry_run=true'.
+    """
+    return empleados_routes.delete_many()
+
 # Platos routes
 platos_routes = BaseRoutes(
     plato_service,
@@ -141,6 +262,30 @@ def get_platos():
     """
     return platos_routes.get_all()
 
+@bp.route('/platos/changes', methods=['GET'])
+def get_platos_changes():
+    """
+    Obtiene los platos creados, modificados o eliminados después del token 'since', para sincronizar una copia
+    de la tabla sin volver a descargarla completa.
+
+    Returns:
+        Response: Respuesta con los registros escritos, las llaves eliminadas y el token de la siguiente consulta.
+    """
+    return platos_routes.get_changes()
+
+@bp.route('/platos/<int:id>', methods=['GET'])
+def get_plato(id):
+    """
+    Obtiene un plato por su identificador.
+
+    Args:
+        id (int): Identificador del plato.
+
+    Returns:
+        Response: Respuesta con el plato encontrado.
+    """
+    return platos_routes.get_by_id(id)
+
 @bp.route('/platos', methods=['POST'])
 def add_plato():
     """
@@ -177,6 +322,26 @@ def delete_plato(id):
     """
     return platos_routes.delete(id)
 
+@bp.route('/platos', methods=['PATCH'])
+def update_platos_where():
+    """
+    Actualiza los platos que cumplen el filtro del parámetro 'filter' con las asignaciones del campo 'set'.
+
+    Returns:
+        Response: Respuesta con el número de registros actualizados, o solo contados con 'dry_run=true'.
+    """
+    return platos_routes.update_many()
+
+@bp.route('/platos', methods=['DELETE'])
+def delete_platos_where():
+    """
+    Elimina los platos que cumplen el filtro del parámetro 'filter'.
+
+    Returns:
+        Response: Respuesta con el número de registros eliminados, o solo contados con 'dry_run=true'.
+    """
+    return platos_routes.delete_many()
+
 # Ingredientes routes
 ingredientes_routes = BaseRoutes(
     ingrediente_service,
@@ -195,6 +360,30 @@ def get_ingredientes():
     """
     return ingredientes_routes.get_all()
 
+@bp.route('/ingredientes/changes', methods=['GET'])
+def get_ingredientes_changes():
+    """
+    Obtiene los ingredientes creados, modificados o eliminados después del token 'since', para sincronizar una copia
+    de la tabla sin volver a descargarla completa.
+
+    Returns:
+        Response: Respuesta con los registros escritos, las llaves eliminadas y el token de la siguiente consulta.
+    """
+    return ingredientes_routes.get_changes()
+
+@bp.route('/ingredientes/<int:id>', methods=['GET'])
+def get_ingrediente(id):
+    """
+    Obtiene un ingrediente por su identificador.
+
+    Args:
+        id (int): Identificador del ingrediente.
+
+    Returns:
+        Response: Respuesta con el ingrediente encontrado.
+    """
+    return ingredientes_routes.get_by_id(id)
+
 @bp.route('/ingredientes', methods=['POST'])
 def add_ingrediente():
     """
@@ -231,12 +420,33 @@ def delete_ingrediente(id):
     """
     return ingredientes_routes.delete(id)
 
+@bp.route('/ingredientes', methods=['PATCH'])
+def update_ingredientes_where():
+    """
+    Actualiza los ingredientes que cumplen el filtro del parámetro 'filter' con las asignaciones del campo 'set'.
+
+    Returns:
+        Response: Respuesta con el número de registros actualizados, o solo contados con 'dry_run=true'.
+    """
+    return ingredientes_routes.update_many()
+
+@bp.route('/ingredientes', methods=['DELETE'])
+def delete_ingredientes_where():
+    """
+    Elimina los ingredientes que cumplen el filtro del parámetro 'filter'.
+
+    Returns:
+        Response: Respuesta con el número de registros eliminados, o solo contados con 'dry_run=true'.
+    """
+    return ingredientes_routes.delete_many()
+
 # Pedidos routes
 pedidos_routes = BaseRoutes(
     pedido_service,
     Pedido,
     ['id_cliente', 'id_empleado', 'fecha_hora'],
-    'Pedido'
+    'Pedido',
+    references={'id_cliente': cliente_snapshot, 'id_empleado': empleado_snapshot}
 )
 
 @bp.route('/pedidos', methods=['GET'])
@@ -249,6 +459,137 @@ def get_pedidos():
     """
     return pedidos_routes.get_all()
 
+@bp.route('/pedidos/changes', methods=['GET'])
+def get_pedidos_changes():
+    """
+    Obtiene los pedidos creados, modificados o eliminados después del token 'since', para sincronizar una copia
+    de la tabla sin volver a descargarla completa.
+
+    Returns:
+        Response: Respuesta con los registros escritos, las llaves eliminadas y el token de la siguiente consulta.
+    """
+    return pedidos_routes.get_changes()
+
+@bp.route('/pedidos/<int:id>', methods=['GET'])
+def get_pedido(id):
+    """
+    Obtiene un pedido por su identificador.
+
+    Args:
+        id (int): Identificador del pedido.
+
+    Returns:
+        Response: Respuesta con el pedido encontrado.
+    """
+    return pedidos_routes.get_by_id(id)
+
+@bp.route('/pedidos/serie', methods=['GET'])
+def get_serie_pedidos():
+    """
+    Obtiene el número de pedidos por intervalo de tiempo, opcionalmente por empleado o cliente.
+
+    Parámetros de consulta:
+        granularidad (str): 'minuto', 'hora' o 'dia' (por defecto 'hora').
+        agrupar (str): 'empleado' o 'cliente' (opcional).
+        desde (str): Inicio del rango en formato ISO (por defecto, según la granularidad: 1 hora, 1 día o 30 días
+            antes de 'hasta').
+        hasta (str): Fin del rango en formato ISO (por defecto, ahora).
+
+    Returns:
+        Response: Respuesta con los pedidos de cada intervalo.
+    """
+    granularidad = request.args.get('granularidad', 'hora')
+    agrupar = request.args.get('agrupar') or None
+    if granularidad not in GRANULARIDADES:
+        return jsonify({'message': f'Granularidad no válida: {granularidad}'}), 400
+    if agrupar is not None and agrupar not in AGRUPACIONES:
+        return jsonify({'message': f'Agrupación no válida: {agrupar}'}), 400
+
+    _, rango_defecto, rango_maximo = GRANULARIDADES[granularidad]
+    try:
+        hasta = datetime.fromisoformat(request.args['hasta']) if 'hasta' in request.args else datetime.now()
+        desde = datetime.fromisoformat(request.args['desde']) if 'desde' in request.args else hasta - rango_defecto
+    except ValueError:
+        return jsonify({'message': 'Las fechas deben tener formato ISO'}), 400
+    if hasta <= desde or hasta - desde > rango_maximo:
+        return jsonify({'message': f'El rango debe ser positivo y de máximo {rango_maximo.days or 1} días'}), 400
+
+    with replica_router.reading():
+        serie = serie_pedidos_service.get_serie(granularidad, agrupar, desde, hasta)
+        snapshot = {'empleado': empleado_snapshot, 'cliente': cliente_snapshot}.get(agrupar)
+        nombres = snapshot.resolve(grupo for _, conteos in serie for grupo in conteos) if snapshot else {}
+
+    data = []
+    for inicio, conteos in serie:
+        item = {'inicio': inicio.isoformat(' '), 'pedidos': sum(conteos.values())}
+        if agrupar:
+            item['grupos'] = [{
+                f'id_{agrupar}': grupo,
+                f'{agrupar}_nombre': nombres.get(grupo),
+                'pedidos': total
+            } for grupo, total in sorted(conteos.items(), key=lambda conteo: conteo[1], reverse=True)]
+        data.append(item)
+    return jsonify({'granularidad': granularidad, 'agrupar': agrupar, 'data': data})
+
+@bp.route('/pedidos/<int:id>/lineas', methods=['GET'])
+def get_lineas_pedido(id):
+    """
+    Obtiene las líneas de un pedido.
+
+    Args:
+        id (int): Identificador del pedido.
+
+    Returns:
+        Response: Respuesta con las líneas del pedido.
+    """
+    with replica_router.reading():
+        if not pedido_service.get_by_id(id):
+            return jsonify({'message': 'Recurso no encontrado'}), 404
+        lineas = pedido_service.get_lineas(id)
+        platos = plato_snapshot.resolve(linea.id_plato for linea in lineas)
+    return jsonify({'data': [{
+        'id': linea.id,
+        'id_plato': linea.id_plato,
+        'plato_nombre': platos.get(linea.id_plato),
+        'cantidad': linea.cantidad
+    } for linea in lineas]})
+
+@bp.route('/pedidos/orden', methods=['POST'])
+def add_pedido_con_lineas():
+    """
+    Coloca un pedido con sus líneas en una sola transacción, descontando las existencias de los platos y de los
+    ingredientes de sus recetas. Si alguna existencia quedaría negativa, el pedido se rechaza completo.
+
+    Cuerpo: los campos del pedido y 'lineas', una lista de {'id_plato', 'cantidad'}.
+
+    Returns:
+        Response: Respuesta con el identificador del pedido creado, o 409 con las existencias insuficientes.
+    """
+    data = request.get_json()
+    validation_result = pedidos_routes._validate_required_fields(data) or pedidos_routes._validate_references(data)
+    if validation_result:
+        return validation_result
+    lineas = data.get('lineas')
+    if not isinstance(lineas, list) or not lineas:
+        return jsonify({'message': 'El pedido debe tener al menos una línea'}), 400
+    for linea in lineas:
+        # Se compara el tipo exacto porque bool es subclase de int y {"cantidad": true} no es una cantidad
+        if not isinstance(linea, dict) or any(type(linea.get(field)) is not int for field in ('id_plato', 'cantidad')) \
+                or linea['cantidad'] <= 0:
+            return jsonify({'message': 'Cada línea requiere id_plato y una cantidad entera positiva'}), 400
+    missing = plato_snapshot.missing(linea['id_plato'] for linea in lineas)
+    if missing:
+        invalid = ', '.join(f'id_plato={key}' for key in sorted(missing))
+        return jsonify({'message': f'Referencias inexistentes: {invalid}'}), 400
+
+    try:
+        pedido = pedido_service.create_with_lineas(data)
+        return jsonify({'message': 'Pedido creado', 'id': pedido.id}), 201, pedidos_routes._consistency_headers()
+    except InsufficientStockError as e:
+        return jsonify({'message': str(e), 'faltantes': e.faltantes}), 409
+    except Exception as e:
+        return pedidos_routes._handle_exception(e, 'Error al crear el recurso')
+
 @bp.route('/pedidos', methods=['POST'])
 def add_pedido():
     """
@@ -283,4 +624,181 @@ def delete_pedido(id):
     Returns:
         Response: Respuesta indicando si el pedido fue eliminado.
     """
-    return pedidos_routes.delete(id)
\ No newline at end of file
+    return pedidos_routes.delete(id)
+
+@bp.route('/pedidos', methods=['PATCH'])
+def update_pedidos_where():
+    """
+    Actualiza los pedidos que cumplen el filtro del parámetro 'filter' con las asignaciones del campo 'set'.
+
+    Returns:
+        Response: Respuesta con el número de registros actualizados, o solo contados con 'dry_run=true'.
+    """
+    return pedidos_routes.update_many()
+
+@bp.route('/pedidos', methods=['DELETE'])
+def delete_pedidos_where():
+    """
+    Elimina los pedidos que cumplen el filtro del parámetro 'filter'.
+
+    Returns:
+        Response: Respuesta con el número de registros eliminados, o solo contados con 'dry_run=true'.
+    """
+    return pedidos_routes.delete_many()
+
+# Recetas routes
+recetas_routes = BaseRoutes(
+    receta_service,
+    RecetaPlato,
+    ['id_plato', 'id_ingrediente', 'cantidad'],
+    'Receta',
+    references={'id_plato': plato_snapshot, 'id_ingrediente': ingrediente_snapshot}
+)
+
+@bp.route('/recetas', methods=['GET'])
+def get_recetas():
+    """
+    Obtiene todos los renglones de las recetas de los platos.
+
+    Returns:
+        Response: Respuesta con la lista de todos los renglones de receta.
+    """
+    return recetas_routes.get_all()
+
+@bp.route('/recetas/<int:id>', methods=['GET'])
+def get_receta(id):
+    """
+    Obtiene un renglón de receta por su identificador.
+
+    Args:
+        id (int): Identificador del renglón de receta.
+
+    Returns:
+        Response: Respuesta con el renglón de receta encontrado.
+    """
+    return recetas_routes.get_by_id(id)
+
+@bp.route('/recetas', methods=['POST'])
+def add_receta():
+    """
+    Agrega un nuevo renglón de receta.
+
+    Returns:
+        Response: Respuesta con el renglón de receta agregado.
+    """
+    return recetas_routes.create()
+
+@bp.route('/recetas/<int:id>', methods=['PUT'])
+def update_receta(id):
+    """
+    Actualiza un renglón de receta existente.
+
+    Args:
+        id (int): Identificador del renglón de receta a actualizar.
+
+    Returns:
+        Response: Respuesta con el renglón de receta actualizado.
+    """
+    return recetas_routes.update(id)
+
+@bp.route('/recetas/<int:id>', methods=['DELETE'])
+def delete_receta(id):
+    """
+    Elimina un renglón de receta existente.
+
+    Args:
+        id (int): Identificador del renglón de receta a eliminar.
+
+    Returns:
+        Response: Respuesta indicando si el renglón de receta fue eliminado.
+    """
+    return recetas_routes.delete(id)
+
+@bp.route('/recetas', methods=['PATCH'])
+def update_recetas_where():
+    """
+    Actualiza los renglones de receta que cumplen el filtro del parámetro 'filter' con las asignaciones del campo 'set'.
+
+    Returns:
+        Response: Respuesta con el número de registros actualizados, o solo contados con 'dry_run=true'.
+    """
+    return recetas_routes.update_many()
+
+@bp.route('/recetas', methods=['DELETE'])
+def delete_recetas_where():
+    """
+    Elimina los renglones de receta que cumplen el filtro del parámetro 'filter'.
+
+    Returns:
+        Response: Respuesta con el número de registros eliminados, o solo contados con 'dry_run=true'.
+    """
+    return recetas_routes.delete_many()
+
+# Lote transaccional con las operaciones sobre los recursos del dominio
+batch_routes = BatchRoutes({
+    'clientes_restaurante': clientes_routes,
+    'empleados': empleados_routes,
+    'platos': platos_routes,
+    'ingredientes': ingredientes_routes,
+    'pedidos': pedidos_routes,
+    'recetas': recetas_routes
+})
+
+@bp.route('/batch', methods=['POST'])
+def execute_batch():
+    """
+    Ejecuta en una sola transacción una lista ordenada de operaciones create, update y delete sobre los recursos
+    del dominio; las operaciones pueden usar los ids creados por las anteriores con '$ref'.
+
+    Returns:
+        Response: Respuesta con el resultado de cada operación, o mensaje de error si el lote se revirtió.
+    """
+    return batch_routes.execute()
+
+# Trabajos en segundo plano sobre los recursos del dominio
+job_routes = JobRoutes('restaurante', {
+    'clientes_restaurante': clientes_routes,
+    'empleados': empleados_routes,
+    'platos': platos_routes,
+    'ingredientes': ingredientes_routes,
+    'pedidos': pedidos_routes,
+    'recetas': recetas_routes
+})
+
+@bp.route('/jobs', methods=['POST'])
+def enqueue_job():
+    """
+    Encola un trabajo en segundo plano del dominio (exportaciones, importaciones, escrituras masivas o
+    recálculos de resúmenes) y responde de inmediato con su identificador.
+
+    Returns:
+        Response: Respuesta 202 con el trabajo encolado y la URL de su estado, o mensaje de error.
+    """
+    return job_routes.enqueue()
+
+# Canal de cambios de las tablas del dominio
+event_routes = EventRoutes('restaurante')
+
+@bp.route('/events', methods=['GET'])
+def get_events():
+    """
+    Abre un flujo Server-Sent Events con un evento por cada registro creado, modificado o eliminado en el
+    dominio, para actualizar los registros en su lugar sin volver a consultar las tablas.
+
+    Returns:
+        Response: Flujo text/event-stream con los cambios del dominio.
+    """
+    return event_routes.stream()
+
+audit_routes = AuditRoutes('restaurante')
+
+@bp.route('/auditoria', methods=['GET'])
+def get_auditoria():
+    """
+    Obtiene el historial de escrituras de un registro del dominio (p. ej. ?tabla=pedido&id=3), con quién
+    hizo cada una y los valores anteriores y nuevos de las columnas que cambió.
+
+    Returns:
+        Response: Respuesta con las escrituras del registro o mensaje de error.
+    """
+    return audit_routes.history()
\ No newline at end of file
@@ -1,6 +1,14 @@
 from .base_service import BaseService
+from .paciente_service import PacienteService
+from .agenda_service import AgendaService
+from .reporte_clinica_service import ReporteClinicaService
+from .reporte_ventas_service import ReporteVentasService
+from .serie_pedidos_service import SeriePedidosService
+from .ranking_vendedores_service import RankingVendedoresService
+from .pedido_service import PedidoService
 
 # Este archivo se encarga de importar el servicio base de la aplicación.
 
 # Se importa el servicio base desde el módulo base_service.
-__all__ = ['BaseService']
\ No newline at end of file
+__all__ = ['BaseService', 'PacienteService', 'AgendaService', 'ReporteClinicaService', 'ReporteVentasService', 'SeriePedidosService',
+           'RankingVendedoresService', 'PedidoService']
\ No newline at end of file
@@ -0,0 +1,106 @@
+import bisect
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List
+from repositories.agenda_index import AgendaIndex, from_minutes, to_minutes
+from repositories.horario_medico_repository import HorarioMedicoRepository
+from repositories.medico_repository import MedicoRepository
+
+class AgendaService:
+    """
+    Servicio de disponibilidad de los médicos: calcula los huecos libres de su horario a partir del
+    índice en memoria de citas reservadas.
+
+    Atributos:
+        medico_repository (MedicoRepository): Repositorio de médicos.
+        horario_repository (HorarioMedicoRepository): Repositorio de horarios de los médicos.
+        agenda (AgendaIndex): Índice de citas reservadas por médico.
+    """
+
+    def __init__(self, medico_repository: MedicoRepository, horario_repository: HorarioMedicoRepository,
+                 agenda: AgendaIndex):
+        """
+        Inicializa el servicio con los repositorios y el índice de citas.
+
+        Args:
+            medico_repository (MedicoRepository): Repositorio de médicos.
+            horario_repository (HorarioMedicoRepository): Repositorio de horarios.
+            agenda (AgendaIndex): Índice de citas reservadas.
+        """
+        self.medico_repository = medico_repository
+        self.horario_repository = horario_repository
+        self.agenda = agenda
+
+    def _free_slots(self, id_medico: int, horario: dict, desde: datetime, hasta: datetime) -> Iterator[datetime]:
+        """
+        Genera en orden los inicios de los huecos libres de un médico en un rango.
+
+        Un hueco [inicio, inicio + duración) está ocupado si alguna cita comienza a menos de una duración de
+        distancia; cada verificación es una búsqueda binaria sobre las citas del médico en el rango.
+
+        Args:
+            id_medico (int): Identificador del médico.
+            horario (dict): Bloques (hora_inicio, hora_fin, duracion_minutos) por día de la semana.
+            desde (datetime): Inicio del rango.
+            hasta (datetime): Fin del rango (exclusivo).
+
+        Yields:
+            datetime: Inicio de cada hueco libre.
+        """
+        max_duracion = max((bloque[2] for bloques in horario.values() for bloque in bloques), default=0)
+        margin = timedelta(minutes=max_duracion)
+        booked = self.agenda.booked(id_medico, desde - margin, hasta + margin)
+        first, last = to_minutes(desde), to_minutes(hasta)
+        day = desde.date()
+        while day <= hasta.date():
+            for hora_inicio, hora_fin, duracion in horario.get(day.weekday(), []):
+                start = to_minutes(datetime.combine(day, hora_inicio))
+                end = min(to_minutes(datetime.combine(day, hora_fin)), last)
+                while start + duracion <= end:
+                    if start >= first:
+                        position = bisect.bisect_right(booked, start - duracion)
+                        if position == len(booked) or booked[position] >= start + duracion:
+                            yield from_minutes(start)
+                    start += duracion
+            day += timedelta(days=1)
+
+    def get_disponibilidad(self, id_medico: int, desde: datetime, hasta: datetime) -> List[datetime]:
+        """
+        Obtiene los huecos libres de un médico en un rango, a partir del instante actual.
+
+        Args:
+            id_medico (int): Identificador del médico.
+            desde (datetime): Inicio del rango.
+            hasta (datetime): Fin del rango (exclusivo).
+
+        Returns:
+            List[datetime]: Inicios de los huecos libres.
+        """
+        desde = max(desde, datetime.now())
+        horario = self.horario_repository.get_by_medicos([id_medico])[id_medico]
+        return list(self._free_slots(id_medico, horario, desde, hasta))
+
+    def search(self, especialidad: str, desde: datetime, hasta: datetime, limit: int) -> List[Dict]:
+        """
+        Busca los primeros huecos libres de cada médico de una especialidad.
+
+        Args:
+            especialidad (str): Especialidad de los médicos.
+            desde (datetime): Inicio del rango.
+            hasta (datetime): Fin del rango (exclusivo).
+            limit (int): Número máximo de huecos por médico.
+
+        Returns:
+            List[Dict]: Por médico, su identificador, nombre y huecos libres.
+        """
+        desde = max(desde, datetime.now())
+        medicos = self.medico_repository.get_by_especialidad(especialidad)
+        horarios = self.horario_repository.get_by_medicos(medico.id for medico in medicos)
+        results = []
+        for medico in medicos:
+            slots = []
+            for slot in self._free_slots(medico.id, horarios[medico.id], desde, hasta):
+                slots.append(slot)
+                if len(slots) >= limit:
+                    break
+            results.append({'id_medico': medico.id, 'nombre': medico.nombre, 'disponibilidad': slots})
+        return results
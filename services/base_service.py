@@ -1,5 +1,7 @@
-from typing import TypeVar, Generic, List, Optional
+from typing import TypeVar, Generic, Callable, Dict, Iterator, List, Optional
 from repositories.base_repository import BaseRepository
+from repositories.batch import in_batch
+from repositories.group_commit import GroupCommitBuffer
 
 T = TypeVar('T')
 
@@ -9,16 +11,20 @@ class BaseService(Generic[T]):
 
     Atributos:
         repository (BaseRepository): Repositorio base para manejar las operaciones CRUD.
+        group_commit (Optional[GroupCommitBuffer]): Búfer con el que se confirman las inserciones en grupo.
     """
 
-    def __init__(self, repository: BaseRepository[T]):
+    def __init__(self, repository: BaseRepository[T], group_commit: Optional[GroupCommitBuffer] = None):
         """
         Inicializa la clase BaseService con el repositorio.
 
         Args:
             repository (BaseRepository): Repositorio base para manejar las operaciones CRUD.
+            group_commit (Optional[GroupCommitBuffer]): Búfer de confirmación en grupo para las inserciones del
+                recurso; solo se usa si está activo en la configuración.
         """
         self.repository = repository
+        self.group_commit = group_commit
 
     def get_all(self) -> List[T]:
         """
@@ -45,12 +51,18 @@ class BaseService(Generic[T]):
         """
         Crea un nuevo registro en el modelo.
 
+        Con el búfer de confirmación en grupo activo (y fuera de un lote transaccional), la inserción se confirma
+        junto con las de otras solicitudes y el registro se reconstruye a partir de sus valores confirmados.
+
         Args:
             data (dict): Datos del nuevo registro.
 
         Returns:
             T: Registro creado.
         """
+        if self.group_commit is not None and self.group_commit.enabled() and not in_batch():
+            values = self.group_commit.submit(data)
+            return self.repository._from_cache(values[self.repository._key_attr], values)
         return self.repository.create(**data)
 
     def update(self, id: int, data: dict) -> Optional[T]:
@@ -76,4 +88,87 @@ class BaseService(Generic[T]):
         Returns:
             bool: True si el registro fue eliminado, False si no existe.
         """
-        return self.repository.delete(id)
\ No newline at end of file
+        return self.repository.delete(id)
+
+    def count_where(self, filter_text: Optional[str]) -> int:
+        """
+        Cuenta los registros que cumplen una expresión de filtro.
+
+        Args:
+            filter_text (Optional[str]): Expresión de filtro; sin filtro se cuentan todos.
+
+        Returns:
+            int: Número de registros que cumplen el filtro.
+        """
+        return self.repository.count_where(filter_text)
+
+    def iter_where(self, filter_text: Optional[str], batch_size: int = 1000) -> Iterator[List[dict]]:
+        """
+        Recorre por lotes los valores de los registros que cumplen una expresión de filtro.
+
+        Args:
+            filter_text (Optional[str]): Expresión de filtro; sin filtro se recorren todos.
+            batch_size (int): Número máximo de registros por lote.
+
+        Returns:
+            Iterator[List[dict]]: Valores de columna de los registros de cada lote.
+        """
+        return self.repository.iter_where(filter_text, batch_size)
+
+    def get_changes(self, cursor: tuple, limit: int = 1000, margin: float = 1.0) -> dict:
+        """
+        Obtiene los registros escritos y eliminados después de una posición de sincronización.
+
+        Args:
+            cursor (tuple): Posición devuelta por la consulta anterior, o (None, None, None, 0) para empezar.
+            limit (int): Número máximo de registros y de eliminaciones.
+            margin (float): Segundos de margen ante las transacciones en curso.
+
+        Returns:
+            dict: Registros, eliminaciones, posición siguiente y si quedan cambios por leer.
+        """
+        return self.repository.get_changes(cursor, limit, margin)
+
+    def update_where(self, filter_text: str, set_text: str, batch_size: int = 1000,
+                     on_batch: Optional[Callable[[int], None]] = None) -> int:
+        """
+        Actualiza por lotes los registros que cumplen una expresión de filtro.
+
+        Args:
+            filter_text (str): Expresión de filtro.
+            set_text (str): Asignaciones separadas por comas.
+            batch_size (int): Número máximo de registros por lote.
+            on_batch (Optional[Callable[[int], None]]): Se llama tras cada lote con el total actualizado.
+
+        Returns:
+            int: Número de registros actualizados.
+        """
+        return self.repository.update_where(filter_text, set_text, batch_size, on_batch)
+
+    def delete_where(self, filter_text: str, batch_size: int = 1000,
+                     on_batch: Optional[Callable[[int], None]] = None) -> int:
+        """
+        Elimina por lotes los registros que cumplen una expresión de filtro.
+
+        Args:
+            filter_text (str): Expresión de filtro.
+            batch_size (int): Número máximo de registros por lote.
+            on_batch (Optional[Callable[[int], None]]): Se llama tras cada lote con el total eliminado.
+
+        Returns:
+            int: Número de registros eliminados.
+        """
+        return self.repository.delete_where(filter_text, batch_size, on_batch)
+
+    def upsert_many(self, key: str, rows: List[dict]) -> Dict[str, int]:
+        """
+        Inserta o actualiza registros identificados por una llave natural, en una sola transacción.
+
+        Args:
+            key (str): Atributo de la llave natural.
+            rows (List[dict]): Registros a sincronizar.
+
+        Returns:
+            Dict[str, int]: Número de registros insertados, actualizados y sin cambios.
+        """
+        return self.repository.upsert_many(key, rows)
\ No newline at end of file
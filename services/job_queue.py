@@ -0,0 +1,294 @@
+import csv
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, List, Optional
+from flask import g
+from models import current_tenant, db
+from repositories.job_repository import JobRepository, CANCELADO, COMPLETADO, ERROR
+
+
+class JobCancelled(Exception):
+    """
+    Excepción con la que se detiene un trabajo cuya cancelación se pidió.
+    """
+
+
+def format_csv(columns: Optional[List[str]], rows: List[list]) -> str:
+    """
+    Da formato CSV a un lote de filas. Se ejecuta en el pool de procesos, por lo que solo recibe valores simples.
+
+    Args:
+        columns (Optional[List[str]]): Encabezados, si el lote es el primero del archivo.
+        rows (List[list]): Valores de cada fila.
+
+    Returns:
+        str: Texto CSV del lote.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if columns is not None:
+        writer.writerow(columns)
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+class JobContext:
+    """
+    Contexto con el que un trabajo reporta su progreso, comprueba si se canceló y usa el pool de procesos.
+
+    Atributos:
+        id (str): Identificador del trabajo.
+        parametros (dict): Parámetros del trabajo.
+    """
+
+    def __init__(self, queue: 'JobQueue', job: dict):
+        self.id = job['id']
+        self.parametros = job['parametros']
+        self._queue = queue
+
+    def progress(self, progreso: int, total: Optional[int] = None) -> None:
+        """
+        Guarda el progreso del trabajo.
+
+        Args:
+            progreso (int): Unidades procesadas.
+            total (Optional[int]): Unidades totales, si se conocen.
+
+        Raises:
+            JobCancelled: Si se pidió cancelar el trabajo.
+        """
+        if self._queue.repository.progress(self.id, progreso, total):
+            raise JobCancelled()
+
+    def run_cpu(self, fn: Callable, *args):
+        """
+        Ejecuta una función de uso intensivo de CPU (p. ej. dar formato a un archivo) en el pool de procesos, para
+        no retener el GIL que necesitan los hilos de las solicitudes.
+
+        Args:
+            fn (Callable): Función de nivel de módulo; sus argumentos y resultado deben poder serializarse.
+            *args: Argumentos de la función.
+
+        Returns:
+            Resultado de la función.
+        """
+        return self._queue._process_pool().submit(fn, *args).result()
+
+    def output_path(self, extension: str) -> str:
+        """
+        Obtiene la ruta del archivo de resultado del trabajo.
+
+        Args:
+            extension (str): Extensión del archivo (p. ej. 'csv').
+
+        Returns:
+            str: Ruta del archivo en el directorio de resultados.
+        """
+        return os.path.join(self._queue.directory, f'{self.id}.{extension}')
+
+
+class JobQueue:
+    """
+    Cola de trabajos en segundo plano: exportaciones, importaciones, escrituras masivas y recálculos de
+    resúmenes que no deben retener un hilo de las solicitudes.
+
+    Cada bind tiene su propio pool de hilos de JOBS_BIND_LIMIT hilos, que limita los trabajos simultáneos sobre
+    su base de datos; los trabajos que exceden el límite esperan en cola. El formato de los archivos se hace en
+    un pool de procesos compartido. El estado y el progreso de cada trabajo se guardan en una tabla SQLite local
+    (ver JobRepository); los trabajos que quedaron sin terminar al reiniciar el proceso se marcan como
+    interrumpidos.
+
+    La configuración se lee de la aplicación Flask:
+        JOBS_DB (str): Ruta del archivo SQLite con el estado de los trabajos.
+        JOBS_DIR (str): Directorio de los archivos de resultado.
+        JOBS_BIND_LIMIT (int): Trabajos simultáneos por bind.
+        JOBS_PROCESSES (int): Procesos del pool de formato.
+    """
+
+    def __init__(self):
+        """
+        Inicializa la cola sin tipos de trabajo registrados; los pools se crean en el primer uso.
+        """
+        self._types = {}
+        self._executors = {}
+        self._processes = None
+        self._lock = threading.Lock()
+        self.repository = None
+        self.directory = None
+        self.app = None
+
+    def init_app(self, app):
+        """
+        Configura el almacenamiento de los trabajos con la aplicación Flask.
+
+        Args:
+            app (Flask): La instancia de la aplicación Flask.
+        """
+        app.config.setdefault('JOBS_DB', os.path.join(app.instance_path, 'jobs.sqlite'))
+        app.config.setdefault('JOBS_DIR', os.path.join(app.instance_path, 'jobs'))
+        app.config.setdefault('JOBS_BIND_LIMIT', 2)
+        app.config.setdefault('JOBS_PROCESSES', 2)
+        os.makedirs(app.config['JOBS_DIR'], exist_ok=True)
+        os.makedirs(os.path.dirname(app.config['JOBS_DB']) or '.', exist_ok=True)
+        self.app = app
+        self.directory = app.config['JOBS_DIR']
+        self.repository = JobRepository(app.config['JOBS_DB'])
+        # Los procesos del pool de formato importan el módulo principal, y con él la aplicación: solo el proceso
+        # principal marca como interrumpidos los trabajos de una ejecución anterior
+        if multiprocessing.parent_process() is None:
+            self.repository.interrupt_unfinished()
+        app.extensions['job_queue'] = self
+
+    def register(self, tipo: str, bind: str, handler: Callable[[JobContext], dict],
+                 validate: Optional[Callable[[dict], None]] = None) -> None:
+        """
+        Registra un tipo de trabajo.
+
+        Args:
+            tipo (str): Nombre del tipo (p. ej. 'automoviles.vehiculos.exportar').
+            bind (str): Bind sobre el que se ejecuta, cuyo límite de trabajos simultáneos ocupa.
+            handler (Callable[[JobContext], dict]): Función que ejecuta el trabajo y devuelve su resultado.
+            validate (Optional[Callable[[dict], None]]): Función que valida los parámetros al encolar y lanza
+                ValueError si no son válidos.
+        """
+        self._types[tipo] = (bind, handler, validate)
+
+    def types(self, prefix: str) -> List[str]:
+        """
+        Obtiene los tipos de trabajo registrados con un prefijo.
+
+        Args:
+            prefix (str): Prefijo del nombre (p. ej. 'clinica.').
+
+        Returns:
+            List[str]: Nombres de los tipos, sin el prefijo.
+        """
+        return sorted(tipo[len(prefix):] for tipo in self._types if tipo.startswith(prefix))
+
+    def _executor(self, bind: str) -> ThreadPoolExecutor:
+        """
+        Obtiene el pool de hilos de un bind, creándolo en el primer uso.
+        """
+        with self._lock:
+            executor = self._executors.get(bind)
+            if executor is None:
+                executor = self._executors[bind] = ThreadPoolExecutor(
+                    max_workers=self.app.config['JOBS_BIND_LIMIT'], thread_name_prefix=f'job-{bind}'
+                )
+            return executor
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        """
+        Obtiene el pool de procesos de formato, creándolo en el primer uso. Los procesos se inician con 'spawn'
+        para no heredar los hilos ni las conexiones del proceso de la aplicación.
+        """
+        with self._lock:
+            if self._processes is None:
+                self._processes = ProcessPoolExecutor(max_workers=self.app.config['JOBS_PROCESSES'],
+                                                      mp_context=multiprocessing.get_context('spawn'))
+            return self._processes
+
+    def enqueue(self, tipo: str, parametros: dict) -> dict:
+        """
+        Encola un trabajo para el inquilino de la solicitud actual.
+
+        Args:
+            tipo (str): Tipo de trabajo registrado.
+            parametros (dict): Parámetros del trabajo.
+
+        Returns:
+            dict: Trabajo encolado.
+
+        Raises:
+            ValueError: Si el tipo no existe o los parámetros no son válidos.
+        """
+        if tipo not in self._types:
+            raise ValueError(f'Tipo de trabajo desconocido: {tipo}')
+        bind, _, validate = self._types[tipo]
+        if validate is not None:
+            validate(parametros)
+        job = self.repository.create(tipo, bind, current_tenant(), parametros)
+        self._executor(bind).submit(self._run, job['id'])
+        return job
+
+    def _run(self, id: str) -> None:
+        """
+        Ejecuta un trabajo en un hilo del pool de su bind, con el inquilino que lo encoló.
+
+        Args:
+            id (str): Identificador del trabajo.
+        """
+        if not self.repository.start(id):
+            return
+        job = self.repository.get_by_id(id)
+        _, handler, _ = self._types[job['tipo']]
+        with self.app.app_context():
+            g.tenant = job['inquilino']
+            # Las escrituras del trabajo se registran en la bitácora de auditoría a nombre del trabajo
+            g.audit_actor = f'trabajo:{id}'
+            try:
+                resultado = handler(JobContext(self, job))
+            except JobCancelled:
+                db.session.rollback()
+                self.repository.finish(id, CANCELADO)
+            except Exception as e:
+                db.session.rollback()
+                self.repository.finish(id, ERROR, error=str(e) or type(e).__name__)
+            else:
+                self.repository.finish(id, COMPLETADO, resultado)
+
+    def get(self, id: str) -> Optional[dict]:
+        """
+        Obtiene un trabajo del inquilino de la solicitud actual.
+
+        Args:
+            id (str): Identificador del trabajo.
+
+        Returns:
+            Optional[dict]: Trabajo o None si no existe o es de otro inquilino.
+        """
+        job = self.repository.get_by_id(id)
+        return job if job is not None and job['inquilino'] == current_tenant() else None
+
+    def cancel(self, id: str) -> Optional[dict]:
+        """
+        Pide cancelar un trabajo del inquilino de la solicitud actual.
+
+        Args:
+            id (str): Identificador del trabajo.
+
+        Returns:
+            Optional[dict]: Trabajo actualizado o None si no existe o es de otro inquilino.
+        """
+        return self.repository.cancel(id) if self.get(id) is not None else None
+
+    def result_path(self, job: dict) -> Optional[str]:
+        """
+        Obtiene la ruta del archivo de resultado de un trabajo completado.
+
+        Args:
+            job (dict): Trabajo.
+
+        Returns:
+            Optional[str]: Ruta del archivo, o None si el trabajo no generó uno.
+        """
+        archivo = (job.get('resultado') or {}).get('archivo')
+        if job['estado'] != COMPLETADO or not archivo:
+            return None
+        return os.path.join(self.directory, os.path.basename(archivo))
+
+    def stats(self) -> dict:
+        """
+        Obtiene las estadísticas de los trabajos.
+
+        Returns:
+            dict: Límite de trabajos simultáneos por bind y número de trabajos por bind y estado.
+        """
+        return {'bind_limit': self.app.config['JOBS_BIND_LIMIT'], 'trabajos': self.repository.count_by_estado()}
+
+
+# Cola de trabajos de la aplicación
+job_queue = JobQueue()
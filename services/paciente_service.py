@@ -0,0 +1,48 @@
+from typing import Optional
+from models import Paciente
+from repositories.base_repository import BaseRepository
+from repositories.cita_repository import CitaRepository
+from services.base_service import BaseService
+
+class PacienteService(BaseService[Paciente]):
+    """
+    Servicio de pacientes que agrega el resumen de su historial de citas.
+
+    Atributos:
+        repository (BaseRepository): Repositorio de pacientes.
+        cita_repository (CitaRepository): Repositorio de citas.
+    """
+
+    def __init__(self, repository: BaseRepository[Paciente], cita_repository: CitaRepository):
+        """
+        Inicializa el servicio con los repositorios de pacientes y de citas.
+
+        Args:
+            repository (BaseRepository): Repositorio de pacientes.
+            cita_repository (CitaRepository): Repositorio de citas.
+        """
+        super().__init__(repository)
+        self.cita_repository = cita_repository
+
+    def get_resumen(self, id: int, limit: int, before: Optional[tuple] = None) -> Optional[dict]:
+        """
+        Obtiene un paciente con sus citas más recientes y el número de visitas por médico.
+
+        Se resuelve con tres consultas indexadas, sin importar cuántas citas tenga el paciente.
+
+        Args:
+            id (int): Identificador del paciente.
+            limit (int): Número máximo de citas a devolver.
+            before (Optional[tuple]): Cursor (fecha_hora, id) desde el cual continuar el historial.
+
+        Returns:
+            Optional[dict]: Paciente, citas recientes y visitas por médico, o None si el paciente no existe.
+        """
+        paciente = self.repository.get_by_id(id)
+        if not paciente:
+            return None
+        return {
+            'paciente': paciente,
+            'citas': self.cita_repository.get_recent_by_paciente(id, limit, before),
+            'visitas_por_medico': self.cita_repository.count_by_medico(id)
+        }
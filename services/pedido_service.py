@@ -0,0 +1,53 @@
+from typing import List, Optional
+from models import LineaPedido, Pedido
+from repositories.group_commit import GroupCommitBuffer
+from repositories.pedido_repository import PedidoRepository
+from services.base_service import BaseService
+
+class PedidoService(BaseService[Pedido]):
+    """
+    Servicio de pedidos que coloca pedidos con sus líneas.
+
+    Atributos:
+        repository (PedidoRepository): Repositorio de pedidos.
+        group_commit (Optional[GroupCommitBuffer]): Búfer de confirmación en grupo de los pedidos.
+    """
+
+    def __init__(self, repository: PedidoRepository, group_commit: Optional[GroupCommitBuffer] = None):
+        """
+        Inicializa el servicio con el repositorio de pedidos.
+
+        Args:
+            repository (PedidoRepository): Repositorio de pedidos.
+            group_commit (Optional[GroupCommitBuffer]): Búfer de confirmación en grupo de los pedidos.
+        """
+        super().__init__(repository, group_commit)
+
+    def create_with_lineas(self, data: dict) -> Pedido:
+        """
+        Coloca un pedido con sus líneas y descuenta las existencias en una sola transacción.
+
+        Args:
+            data (dict): Datos del pedido con la lista 'lineas' ({'id_plato', 'cantidad'}).
+
+        Returns:
+            Pedido: Pedido creado.
+
+        Raises:
+            InsufficientStockError: Si algún plato o ingrediente no tiene existencias suficientes.
+        """
+        data = dict(data)
+        lineas = data.pop('lineas')
+        return self.repository.create_with_lineas(lineas, **data)
+
+    def get_lineas(self, id: int) -> List[LineaPedido]:
+        """
+        Obtiene las líneas de un pedido.
+
+        Args:
+            id (int): Identificador del pedido.
+
+        Returns:
+            List[LineaPedido]: Líneas del pedido.
+        """
+        return self.repository.get_lineas(id)
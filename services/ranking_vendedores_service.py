@@ -0,0 +1,267 @@
+import bisect
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import func, select
+from typing import Dict, List, Optional
+from models import Venta, current_tenant, replica_router
+
+# Días que cubre cada ventana del ranking, terminando en el día actual
+VENTANAS = {'hoy': 1, '7d': 7, '30d': 30}
+
+# Métricas por las que se puede ordenar el ranking (posición en los totales de un vendedor)
+METRICAS = {'ventas': 0, 'ingresos': 1}
+
+
+class _Ranking:
+    """
+    Estado del ranking de un inquilino: ventas por día y vendedor, totales por ventana y, por ventana y métrica,
+    una lista ordenada de (-valor, id_vendedor).
+    """
+
+    def __init__(self, hoy: date, dias: Dict[date, Dict[int, list]]):
+        """
+        Construye los totales y las listas ordenadas a partir de las ventas por día.
+
+        Args:
+            hoy (date): Día en que terminan las ventanas.
+            dias (Dict[date, Dict[int, list]]): Por día, [ventas, ingresos] de cada vendedor.
+        """
+        self.loaded_at = time.monotonic()
+        self.hoy = hoy
+        self.dias = dias
+        self.totales = {ventana: {} for ventana in VENTANAS}
+        self.ordenados = {(ventana, metrica): [] for ventana in VENTANAS for metrica in METRICAS}
+        for dia, vendedores in dias.items():
+            for id_vendedor, (ventas, ingresos) in vendedores.items():
+                self._sumar_ventanas(dia, id_vendedor, ventas, ingresos)
+
+    def _en_ventana(self, ventana: str, dia: date, hoy: date) -> bool:
+        """
+        Indica si un día pertenece a una ventana que termina en 'hoy'.
+        """
+        return hoy - timedelta(days=VENTANAS[ventana] - 1) <= dia <= hoy
+
+    def _sumar(self, ventana: str, id_vendedor: int, ventas: int, ingresos: Decimal) -> None:
+        """
+        Suma ventas al total de un vendedor en una ventana y lo reubica en las listas ordenadas.
+        """
+        total = self.totales[ventana].setdefault(id_vendedor, [0, Decimal(0)])
+        for metrica, posicion in METRICAS.items():
+            ordenados = self.ordenados[(ventana, metrica)]
+            if total[posicion]:
+                del ordenados[bisect.bisect_left(ordenados, (-total[posicion], id_vendedor))]
+        total[0] += ventas
+        total[1] += ingresos
+        for metrica, posicion in METRICAS.items():
+            if total[posicion] > 0:
+                bisect.insort(self.ordenados[(ventana, metrica)], (-total[posicion], id_vendedor))
+        if total[0] <= 0:
+            del self.totales[ventana][id_vendedor]
+
+    def _sumar_ventanas(self, dia: date, id_vendedor: int, ventas: int, ingresos: Decimal) -> None:
+        """
+        Suma ventas de un día a los totales de las ventanas que lo contienen.
+        """
+        for ventana in VENTANAS:
+            if self._en_ventana(ventana, dia, self.hoy):
+                self._sumar(ventana, id_vendedor, ventas, ingresos)
+
+    def aplicar(self, dia: date, id_vendedor: int, ventas: int, ingresos: Decimal) -> None:
+        """
+        Suma (o resta, con valores negativos) ventas de un vendedor en un día.
+        """
+        if dia < self.hoy - timedelta(days=max(VENTANAS.values()) - 1):
+            return
+        total = self.dias.setdefault(dia, {}).setdefault(id_vendedor, [0, Decimal(0)])
+        total[0] += ventas
+        total[1] += ingresos
+        if total[0] <= 0:
+            del self.dias[dia][id_vendedor]
+        self._sumar_ventanas(dia, id_vendedor, ventas, ingresos)
+
+    def avanzar(self, hoy: date) -> None:
+        """
+        Desplaza las ventanas al día actual: resta los días que salen de cada ventana y suma los que entran.
+        """
+        if hoy <= self.hoy:
+            return
+        for ventana in VENTANAS:
+            for dia, vendedores in self.dias.items():
+                antes, ahora = self._en_ventana(ventana, dia, self.hoy), self._en_ventana(ventana, dia, hoy)
+                if antes != ahora:
+                    signo = 1 if ahora else -1
+                    for id_vendedor, (ventas, ingresos) in vendedores.items():
+                        self._sumar(ventana, id_vendedor, signo * ventas, signo * ingresos)
+        self.hoy = hoy
+        limite = hoy - timedelta(days=max(VENTANAS.values()) - 1)
+        self.dias = {dia: vendedores for dia, vendedores in self.dias.items() if dia >= limite}
+
+
+class RankingVendedoresService:
+    """
+    Servicio del ranking de vendedores por número de ventas e ingresos en ventanas móviles (hoy, 7 y 30 días).
+
+    Mantiene en memoria, por inquilino, los totales de cada vendedor y una lista ordenada por ventana y
+    métrica, por lo que obtener los primeros k vendedores no consulta la base de datos. El repositorio de ventas
+    lo actualiza tras confirmar cada escritura, incluidas las masivas; el estado se carga desde la base de datos
+    en el primer uso y se recarga al cumplirse su TTL, para incorporar las escrituras de otros procesos.
+
+    Atributos:
+        db (SQLAlchemy): Instancia de SQLAlchemy para manejar la base de datos.
+        ttl (float): Segundos tras los cuales el estado se recarga desde la base de datos.
+    """
+
+    def __init__(self, db: SQLAlchemy, ttl: float = 300.0):
+        """
+        Inicializa el servicio sin estado; se carga en el primer uso.
+
+        Args:
+            db (SQLAlchemy): Instancia de SQLAlchemy.
+            ttl (float): Segundos de vigencia del estado cargado.
+        """
+        self.db = db
+        self.ttl = ttl
+        self._rankings = {}
+        self._journals = {}
+        self._lock = threading.Lock()
+
+    def _load(self, hoy: date, connection) -> _Ranking:
+        """
+        Carga las ventas por día y vendedor de la ventana más larga.
+
+        Args:
+            hoy (date): Día actual.
+            connection (Connection): Conexión al primario con la transacción de la carga.
+
+        Returns:
+            _Ranking: Estado del ranking.
+        """
+        desde = hoy - timedelta(days=max(VENTANAS.values()) - 1)
+        dia = func.date(Venta.fecha)
+        statement = select(dia, Venta.id_vendedor, func.count(), func.sum(Venta.precio)) \
+            .where(Venta.fecha >= desde) \
+            .group_by(dia, Venta.id_vendedor)
+        dias = {}
+        for fecha, id_vendedor, ventas, ingresos in connection.execute(statement):
+            # SQLite devuelve DATE() como texto
+            fecha = date.fromisoformat(fecha) if isinstance(fecha, str) else fecha
+            dias.setdefault(fecha, {})[id_vendedor] = [ventas, Decimal(str(ingresos))]
+        return _Ranking(hoy, dias)
+
+    @staticmethod
+    def _replay(ranking: _Ranking, connection, journal: list) -> None:
+        """
+        Aplica a un estado recién cargado las escrituras del diario que la carga no vio. La carga y la consulta
+        de versiones comparten la transacción, y por tanto la misma vista de la base de datos: una venta que en
+        esa vista ya tiene la versión de la escritura, o que ya no existe y tiene una eliminación en el diario,
+        está incluida en la carga.
+
+        Args:
+            ranking (_Ranking): Estado cargado, aún no instalado.
+            connection (Connection): Conexión con la transacción de la carga.
+            journal (list): Pares (valores anteriores, valores confirmados) de cada escritura, en orden.
+        """
+        ids = {(current or previous)['id'] for previous, current in journal}
+        versiones = dict(connection.execute(select(Venta.id, Venta.version).where(Venta.id.in_(ids))).all())
+        eliminadas = {previous['id'] for previous, current in journal if current is None}
+        for previous, current in journal:
+            id = (current or previous)['id']
+            if id not in versiones:
+                vista = id in eliminadas
+            else:
+                vista = current is not None and current['version'] <= versiones[id]
+            if not vista:
+                RankingVendedoresService._apply(ranking, previous, current)
+
+    def _current(self) -> _Ranking:
+        """
+        Obtiene el estado del inquilino actual, cargándolo si no existe o expiró.
+
+        La carga se lee del primario, con una conexión propia y fuera del candado, para no detener las
+        escrituras ni las consultas del ranking; mientras tanto se sigue usando el estado vencido, si lo hay. Las
+        escrituras confirmadas durante la carga se anotan en un diario del inquilino y se aplican al estado
+        cargado antes de instalarlo (ver _replay).
+
+        Returns:
+            _Ranking: Estado del ranking.
+        """
+        tenant = current_tenant()
+        with self._lock:
+            ranking = self._rankings.get(tenant)
+            vigente = ranking is not None and time.monotonic() - ranking.loaded_at <= self.ttl
+            if vigente or (ranking is not None and self._journals.get(tenant)):
+                return ranking
+            journal = []
+            self._journals.setdefault(tenant, []).append(journal)
+
+        try:
+            with replica_router.primary():
+                engine = self.db.session.get_bind(mapper=Venta)
+            with engine.connect() as connection:
+                ranking = self._load(date.today(), connection)
+                with self._lock:
+                    if journal:
+                        self._replay(ranking, connection, journal)
+                    self._rankings[tenant] = ranking
+        finally:
+            with self._lock:
+                self._journals[tenant].remove(journal)
+        return ranking
+
+    @staticmethod
+    def _apply(ranking: _Ranking, previous: Optional[dict], current: Optional[dict]) -> None:
+        """
+        Resta de un estado los valores anteriores de una venta y le suma los confirmados.
+
+        Args:
+            ranking (_Ranking): Estado del ranking.
+            previous (Optional[dict]): Valores de la venta antes de la escritura (None al crear).
+            current (Optional[dict]): Valores de la venta tras la escritura (None al eliminar).
+        """
+        ranking.avanzar(date.today())
+        for venta, signo in ((previous, -1), (current, 1)):
+            if venta is not None:
+                ranking.aplicar(venta['fecha'].date(), venta['id_vendedor'], signo, signo * Decimal(venta['precio']))
+
+    def update(self, previous: Optional[dict], current: Optional[dict]) -> None:
+        """
+        Aplica al ranking una escritura de venta confirmada, si el estado del inquilino está cargado, y la anota
+        en los diarios de sus cargas en curso.
+
+        Args:
+            previous (Optional[dict]): Valores de la venta antes de la escritura (None al crear).
+            current (Optional[dict]): Valores de la venta tras la escritura (None al eliminar).
+        """
+        tenant = current_tenant()
+        with self._lock:
+            ranking = self._rankings.get(tenant)
+            if ranking is not None:
+                self._apply(ranking, previous, current)
+            for journal in self._journals.get(tenant, ()):
+                journal.append((previous, current))
+
+    def top(self, ventana: str, k: int, metrica: str = 'ventas') -> List[Dict]:
+        """
+        Obtiene los k vendedores con más ventas o ingresos en una ventana.
+
+        Args:
+            ventana (str): 'hoy', '7d' o '30d'.
+            k (int): Número de vendedores.
+            metrica (str): 'ventas' o 'ingresos'.
+
+        Returns:
+            List[Dict]: Posición, vendedor, ventas e ingresos, del primero al k-ésimo.
+        """
+        ranking = self._current()
+        with self._lock:
+            ranking.avanzar(date.today())
+            totales = ranking.totales[ventana]
+            return [{
+                'posicion': posicion,
+                'id_vendedor': id_vendedor,
+                'ventas': totales[id_vendedor][0],
+                'ingresos': totales[id_vendedor][1]
+            } for posicion, (_, id_vendedor) in enumerate(ranking.ordenados[(ventana, metrica)][:k], start=1)]
@@ -0,0 +1,104 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, List
+from repositories.cita_resumen_repository import CitaResumenRepository
+from repositories.horario_medico_repository import HorarioMedicoRepository
+from repositories.medico_repository import MedicoRepository
+
+class ReporteClinicaService:
+    """
+    Servicio de reportes de utilización de la clínica, calculados sobre el resumen diario de citas.
+
+    Atributos:
+        resumen_repository (CitaResumenRepository): Repositorio del resumen diario de citas.
+        medico_repository (MedicoRepository): Repositorio de médicos.
+        horario_repository (HorarioMedicoRepository): Repositorio de horarios de los médicos.
+    """
+
+    def __init__(self, resumen_repository: CitaResumenRepository, medico_repository: MedicoRepository,
+                 horario_repository: HorarioMedicoRepository):
+        """
+        Inicializa el servicio con los repositorios.
+
+        Args:
+            resumen_repository (CitaResumenRepository): Repositorio del resumen diario de citas.
+            medico_repository (MedicoRepository): Repositorio de médicos.
+            horario_repository (HorarioMedicoRepository): Repositorio de horarios.
+        """
+        self.resumen_repository = resumen_repository
+        self.medico_repository = medico_repository
+        self.horario_repository = horario_repository
+
+    def get_citas_por_medico(self, agrupacion: str, desde: date, hasta: date, id_medico: int = None) -> List[Dict]:
+        """
+        Obtiene el número de citas por médico y periodo.
+
+        Args:
+            agrupacion (str): 'dia', 'semana' o 'mes'.
+            desde (date): Primer día del rango.
+            hasta (date): Último día del rango.
+            id_medico (int): Médico a reportar; si es None, todos.
+
+        Returns:
+            List[Dict]: Periodo, médico y número de citas.
+        """
+        return [{'periodo': periodo, 'id_medico': medico, 'citas': total}
+                for periodo, medico, total in self.resumen_repository.get_por_medico(agrupacion, desde, hasta, id_medico)]
+
+    def get_carga_por_especialidad(self, desde: date, hasta: date) -> List[Dict]:
+        """
+        Obtiene el número de citas y de médicos con citas de cada especialidad.
+
+        Args:
+            desde (date): Primer día del rango.
+            hasta (date): Último día del rango.
+
+        Returns:
+            List[Dict]: Especialidad, médicos con citas, citas y citas por médico.
+        """
+        return [{'especialidad': especialidad, 'medicos': medicos, 'citas': citas,
+                 'citas_por_medico': round(citas / medicos, 2)}
+                for especialidad, medicos, citas in self.resumen_repository.get_por_especialidad(desde, hasta)]
+
+    def get_utilizacion(self, desde: date, hasta: date) -> List[Dict]:
+        """
+        Obtiene la utilización de la agenda de cada médico: citas frente a la capacidad de su horario y días
+        laborables sin citas.
+
+        Args:
+            desde (date): Primer día del rango.
+            hasta (date): Último día del rango.
+
+        Returns:
+            List[Dict]: Por médico, citas, capacidad, utilización, días laborables y días laborables sin citas,
+            del menos utilizado al más utilizado.
+        """
+        medicos = self.medico_repository.get_all()
+        horarios = self.horario_repository.get_by_medicos(medico.id for medico in medicos)
+        totales = self.resumen_repository.get_totales_por_medico(desde, hasta)
+
+        # Veces que aparece cada día de la semana en el rango
+        dias_semana = [0] * 7
+        for offset in range((hasta - desde).days + 1):
+            dias_semana[(desde + timedelta(days=offset)).weekday()] += 1
+
+        reporte = []
+        for medico in medicos:
+            capacidad, dias_laborables = 0, 0
+            for dia, bloques in horarios[medico.id].items():
+                if bloques:
+                    dias_laborables += dias_semana[dia]
+                for inicio, fin, duracion in bloques:
+                    minutos = (datetime.combine(desde, fin) - datetime.combine(desde, inicio)).seconds // 60
+                    capacidad += dias_semana[dia] * (minutos // duracion)
+            citas, dias_con_citas = totales.get(medico.id, (0, 0))
+            reporte.append({
+                'id_medico': medico.id,
+                'nombre': medico.nombre,
+                'especialidad': medico.especialidad,
+                'citas': citas,
+                'capacidad': capacidad,
+                'utilizacion': round(citas / capacidad, 4) if capacidad else None,
+                'dias_laborables': dias_laborables,
+                'dias_sin_citas': max(dias_laborables - dias_con_citas, 0)
+            })
+        return sorted(reporte, key=lambda item: item['utilizacion'] or 0)
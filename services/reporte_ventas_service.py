@@ -0,0 +1,67 @@
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+from models import current_tenant
+from repositories.identity_cache import IdentityCache
+from repositories.venta_resumen_repository import VentaResumenRepository, anio_mes
+
+class ReporteVentasService:
+    """
+    Servicio de reportes de ventas de automóviles, calculados sobre los agregados mensuales.
+
+    Las respuestas se guardan en caché junto con la versión de los agregados de su rango de meses con que se
+    calcularon; cualquier escritura de ventas del rango cambia la versión, por lo que una entrada nunca se sirve
+    desactualizada.
+
+    Atributos:
+        resumen_repository (VentaResumenRepository): Repositorio de los agregados mensuales de ventas.
+        cache (IdentityCache): Caché de respuestas por (inquilino, versión, parámetros).
+    """
+
+    def __init__(self, resumen_repository: VentaResumenRepository, cache: IdentityCache):
+        """
+        Inicializa el servicio con el repositorio de agregados y la caché de respuestas.
+
+        Args:
+            resumen_repository (VentaResumenRepository): Repositorio de los agregados mensuales de ventas.
+            cache (IdentityCache): Caché de respuestas.
+        """
+        self.resumen_repository = resumen_repository
+        self.cache = cache
+
+    def get_version(self, desde: date, hasta: date) -> int:
+        """
+        Obtiene la versión actual de los agregados de un rango de meses.
+
+        Args:
+            desde (date): Fecha del primer mes.
+            hasta (date): Fecha del último mes.
+
+        Returns:
+            int: Versión de los agregados del rango.
+        """
+        return self.resumen_repository.get_version(anio_mes(desde), anio_mes(hasta))
+
+    def get_ventas(self, desde: date, hasta: date, dimensiones: Sequence[str],
+                   filtros: Optional[Dict] = None) -> Tuple[int, List[Dict]]:
+        """
+        Obtiene las unidades, los ingresos y el precio promedio por mes y por las dimensiones indicadas.
+
+        Args:
+            desde (date): Fecha del primer mes.
+            hasta (date): Fecha del último mes.
+            dimensiones (Sequence[str]): Dimensiones de agrupación ('vendedor', 'marca', 'modelo').
+            filtros (Optional[Dict]): Valor exacto por dimensión para filtrar.
+
+        Returns:
+            Tuple[int, List[Dict]]: Versión de los agregados y filas del reporte.
+        """
+        version = self.get_version(desde, hasta)
+        filtros = filtros or {}
+        key = (current_tenant(), version, anio_mes(desde), anio_mes(hasta), tuple(dimensiones),
+               tuple(sorted(filtros.items())))
+        data = self.cache.get(key)
+        if data is None:
+            data = [{**row, 'precio_promedio': round(row['ingresos'] / row['unidades'], 2)}
+                    for row in self.resumen_repository.get_resumen(anio_mes(desde), anio_mes(hasta), dimensiones, filtros)]
+            self.cache.put(key, data)
+        return version, data
@@ -0,0 +1,75 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from repositories.identity_cache import IdentityCache
+from repositories.pedido_repository import GRANULARIDADES, PedidoRepository, inicio_intervalo
+
+class SeriePedidosService:
+    """
+    Servicio de series de tiempo de pedidos del restaurante.
+
+    Los intervalos cerrados (que terminaron antes de la solicitud) se guardan en caché, por lo que un tablero
+    que consulta cada pocos segundos solo calcula en la base de datos el intervalo abierto.
+
+    Atributos:
+        repository (PedidoRepository): Repositorio de pedidos.
+        cache (IdentityCache): Caché de los intervalos cerrados, compartida con el repositorio para invalidarla.
+    """
+
+    def __init__(self, repository: PedidoRepository, cache: IdentityCache):
+        """
+        Inicializa el servicio con el repositorio de pedidos y la caché de intervalos.
+
+        Args:
+            repository (PedidoRepository): Repositorio de pedidos.
+            cache (IdentityCache): Caché de los intervalos cerrados.
+        """
+        self.repository = repository
+        self.cache = cache
+
+    def get_serie(self, granularidad: str, agrupar: Optional[str], desde: datetime, hasta: datetime,
+                  ahora: Optional[datetime] = None) -> List[Tuple[datetime, Dict[Optional[int], int]]]:
+        """
+        Obtiene el número de pedidos de cada intervalo de un rango.
+
+        Args:
+            granularidad (str): 'minuto', 'hora' o 'dia'.
+            agrupar (Optional[str]): 'empleado', 'cliente' o None.
+            desde (datetime): Inicio del rango; se trunca al inicio de su intervalo.
+            hasta (datetime): Fin del rango (excluido).
+            ahora (Optional[datetime]): Instante que separa los intervalos cerrados del abierto (por defecto, ahora).
+
+        Returns:
+            List[Tuple[datetime, Dict]]: Inicio de cada intervalo y número de pedidos por grupo, en orden.
+        """
+        paso = GRANULARIDADES[granularidad][0]
+        abierto = inicio_intervalo(ahora or datetime.now(), granularidad)
+        inicios, inicio = [], inicio_intervalo(desde, granularidad)
+        while inicio < hasta:
+            inicios.append(inicio)
+            inicio += paso
+
+        serie = {}
+        faltantes = []
+        for inicio in inicios:
+            if inicio >= abierto:
+                break
+            conteos = self.cache.get(self.repository.series_key(granularidad, agrupar, inicio))
+            if conteos is None:
+                faltantes.append(inicio)
+            else:
+                serie[inicio] = conteos
+
+        if faltantes:
+            # Una sola consulta cubre todos los intervalos cerrados que no están en caché
+            conteos = self.repository.count_by_intervalo(granularidad, agrupar, faltantes[0], faltantes[-1] + paso)
+            for inicio in faltantes:
+                serie[inicio] = conteos.get(inicio, {})
+                self.cache.put(self.repository.series_key(granularidad, agrupar, inicio), serie[inicio])
+
+        vivos = [inicio for inicio in inicios if inicio >= abierto]
+        if vivos:
+            conteos = self.repository.count_by_intervalo(granularidad, agrupar, vivos[0], vivos[-1] + paso)
+            for inicio in vivos:
+                serie[inicio] = conteos.get(inicio, {})
+
+        return [(inicio, serie[inicio]) for inicio in inicios]